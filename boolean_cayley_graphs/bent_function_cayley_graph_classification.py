@@ -13,6 +13,11 @@ The ``bent_function_cayley_graph_classification`` module defines:
 AUTHORS:
 
 - Paul Leopardi (2016-08-02): initial version
+- Paul Leopardi (2024-07-08): analytic strongly regular parameters in reports
+- Paul Leopardi (2024-07-15): reports computed by ``classification_report``
+- Paul Leopardi (2024-07-29): single pass class cell index
+- Paul Leopardi (2024-08-05): Tonchev graphs matched using ``ReferenceGraphTable``
+- Paul Leopardi (2024-08-12): downsampled matrix plots, saved in parallel
 
 EXAMPLES:
 
@@ -57,13 +62,11 @@ of a bent function are defined by Leopardi [Leo2017]_.
 #*****************************************************************************
 
 
+from collections import namedtuple
 from datetime import datetime
-from numpy import array, argwhere
+from numpy import array
 from sage.coding.linear_code import LinearCode
-from sage.combinat.designs.incidence_structures import IncidenceStructure
-from sage.functions.log import log
 from sage.graphs.graph import Graph
-from sage.graphs.strongly_regular_db import strongly_regular_from_two_weight_code
 from sage.matrix.constructor import matrix
 from sage.misc.latex import latex
 from sage.misc.persist import load
@@ -73,17 +76,20 @@ from sage.structure.sage_object import SageObject
 from sys import stdout
 
 import glob
+import multiprocessing
 import numpy as np
 
 from boolean_cayley_graphs.bent_function import BentFunction
-from boolean_cayley_graphs.binary_projective_two_weight_codes import binary_projective_two_weight_27_6_12
-from boolean_cayley_graphs.binary_projective_two_weight_codes import binary_projective_two_weight_35_6_16
 from boolean_cayley_graphs.boolean_cayley_graph import boolean_cayley_graph
-from boolean_cayley_graphs.boolean_linear_code import linear_code_from_code_gens
-from boolean_cayley_graphs.boolean_linear_code import print_latex_code_parameters
 from boolean_cayley_graphs.boolean_linear_code_graph import boolean_linear_code_graph
+from boolean_cayley_graphs.class_part_manifest import ClassPartManifest
+from boolean_cayley_graphs.classification_report import classification_report, render_report
 from boolean_cayley_graphs.containers import BijectiveList
 from boolean_cayley_graphs.containers import ShelveBijectiveList
+from boolean_cayley_graphs.gf2_rank import batch_length, cayley_graph_ranks
+from boolean_cayley_graphs.graph_invariant_cache import get_default_invariant_cache
+from boolean_cayley_graphs.matrix_plot import downsampled_matrix_plot
+from boolean_cayley_graphs.reference_graphs import reference_graph_table
 from boolean_cayley_graphs.saveable import Saveable
 from boolean_cayley_graphs.strongly_regular_graph import StronglyRegularGraph
 from boolean_cayley_graphs.weight_class import weight_class
@@ -95,6 +101,64 @@ import os.path
 default_algorithm = "sage"
 
 
+ClassCellIndex = namedtuple(
+    "ClassCellIndex",
+    ["first_index_list", "counts", "cells"])
+ClassCellIndex.__doc__ = r"""
+The cells of a Cayley graph index matrix, grouped by extended Cayley class.
+
+- ``first_index_list`` -- a list containing, for each class, the first cell
+  ``(c, b)`` in row major order whose entry is the class index, or ``None``.
+- ``counts`` -- a ``numpy`` array containing the number of cells of each class.
+- ``cells`` -- a list containing, for each class, a ``numpy`` array of shape
+  ``(count, 2)`` of the cells ``(c, b)`` of the class, in row major order.
+"""
+
+
+def class_cell_index(index_matrix, nbr_classes):
+    r"""
+    Group the cells of a Cayley graph index matrix by extended Cayley class, in a single pass.
+
+    INPUT:
+
+    - ``index_matrix`` -- a matrix or ``numpy`` array of integers.
+      A Cayley graph index matrix.
+    - ``nbr_classes`` -- integer. The number of extended Cayley classes.
+
+    OUTPUT: a ``ClassCellIndex``.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import class_cell_index
+        sage: cci = class_cell_index(matrix([[0,2],[2,0]]), 4)
+        sage: [None if ci is None else tuple(int(i) for i in ci) for ci in cci.first_index_list]
+        [(0, 0), None, (0, 1), None]
+        sage: cci.counts.tolist()
+        [2, 0, 2, 0]
+        sage: cci.cells[2].tolist()
+        [[0, 1], [1, 0]]
+    """
+    index_array = array(index_matrix).astype("int64")
+    ncols = index_array.shape[1]
+    flat = index_array.ravel()
+    # A stable sort keeps the cells of each class in row major order.
+    order = np.argsort(flat, kind="stable")
+    counts = np.bincount(flat, minlength=nbr_classes)[:nbr_classes]
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    cell_array = np.column_stack(np.divmod(order, ncols))
+    cells = [
+        cell_array[start:start + count]
+        for start, count in zip(starts, counts)]
+    first_index_list = [
+        None
+        if count == 0 else
+        tuple(class_cells[0, :])
+        for class_cells, count in zip(cells, counts)]
+    return ClassCellIndex(first_index_list, counts, cells)
+
+
 class BentFunctionCayleyGraphClassPart(SageObject, Saveable):
     r"""
     Partial classification of the Cayley graphs within the
@@ -925,6 +989,12 @@ class BentFunctionCayleyGraphClassification(BentFunctionCayleyGraphClassPart):
         An object of class BentFunctionCayleyGraphClassification,
         constructed from the saved class parts.
 
+        If a ``ClassPartManifest`` was saved with the parts, the parts listed
+        in the manifest are used, and a ``ValueError`` listing the missing parts
+        is raised if any part is missing or does not match its checksum.
+        Otherwise, the parts are found by file name, and a ``ValueError``
+        is raised if they do not cover every value of `c` exactly once.
+
         EXAMPLES:
 
         A classification of the bent function defined by the polynomial
@@ -977,12 +1047,60 @@ class BentFunctionCayleyGraphClassification(BentFunctionCayleyGraphClassPart):
             ....:     BentFunctionCGCPart.remove_mangled(
             ....:         part_prefix,
             ....:         dir=prefix_dirname)
+
+        TESTS:
+
+        Missing parts are reported rather than merged.
+
+        ::
+
+            sage: from boolean_cayley_graphs.bent_function import BentFunction
+            sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification as BentFunctionCGC
+            sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassPart as BentFunctionCGCPart
+            sage: from boolean_cayley_graphs.class_part_manifest import ClassPartManifest
+            sage: f = BentFunction([0,0,0,1])
+            sage: d = tmp_dir()
+            sage: for row in [0, 2, 3]:
+            ....:     c = BentFunctionCGCPart.from_function(f, c_start=row, c_stop=row+1)
+            ....:     c.save_mangled("test_from_parts_" + str(row), dir=d)
+            sage: BentFunctionCGC.from_parts("test_from_parts", dir=d)
+            Traceback (most recent call last):
+            ...
+            ValueError: Missing class parts for values of c in [1, 2).
+            sage: mangled_prefix = BentFunctionCGCPart.mangled_name("test_from_parts", dir=d)
+            sage: manifest = ClassPartManifest.create(mangled_prefix, 4, 1)
+            sage: manifest.save()
+            sage: BentFunctionCGC.from_parts("test_from_parts", dir=d)
+            Traceback (most recent call last):
+            ...
+            ValueError: Missing class parts: ..._1 (c in [1, 2)).
+            sage: for row in [0, 2, 3]:
+            ....:     BentFunctionCGCPart.remove_mangled("test_from_parts_" + str(row), dir=d)
+            sage: manifest.remove()
+            sage: os.rmdir(d)
         """
         mangled_part_prefix = BentFunctionCayleyGraphClassPart.mangled_name(
             prefix_basename,
             dir=dir)
-        file_name_list = glob.glob(mangled_part_prefix + "_[0-9]*.sobj")
-        file_name_list.sort()
+        if ClassPartManifest.exists(mangled_part_prefix):
+            # Use the parts listed in the manifest, and refuse to merge
+            # if any of them are missing or have been corrupted.
+            manifest = ClassPartManifest.load(mangled_part_prefix)
+            missing_parts = manifest.missing_parts()
+            if missing_parts:
+                raise ValueError(
+                    "Missing class parts: " +
+                    manifest.describe_parts(missing_parts) + ".")
+            file_name_list = [
+                manifest.part_file_name(part)
+                for part in manifest.parts]
+        else:
+            file_name_list = glob.glob(mangled_part_prefix + "_[0-9]*.sobj")
+            file_name_list.sort()
+            if not file_name_list:
+                raise ValueError(
+                    "No class parts found with prefix " +
+                    mangled_part_prefix + ".")
 
         # Load the first part to see how large the matrices need to be.
         part_nbr = 0
@@ -1012,6 +1130,9 @@ class BentFunctionCayleyGraphClassification(BentFunctionCayleyGraphClassPart):
             dual_cayley_graph_index_matrix = None
         weight_class_matrix = matrix(v,v)
 
+        # Record which values of c are covered by the parts.
+        c_covered = [False] * v
+
         for part_nbr in range(len(file_name_list)):
             # In the main loop, map each part classification into
             # the whole classification.
@@ -1025,6 +1146,10 @@ class BentFunctionCayleyGraphClassification(BentFunctionCayleyGraphClassPart):
             c_len = part.bent_cayley_graph_index_matrix.nrows()
             for part_c in range(c_len):
                 c = part.c_start + part_c
+                if c_covered[c]:
+                    raise ValueError(
+                        "More than one class part contains c == " + str(c) + ".")
+                c_covered[c] = True
                 for b in range(v):
                     bent_cayley_graph_index_matrix[c, b] = (
                         whole_cg_index[
@@ -1041,6 +1166,22 @@ class BentFunctionCayleyGraphClassification(BentFunctionCayleyGraphClassPart):
         cayley_graph_class_bijection.close_dict()
         cayley_graph_class_bijection.remove_dict()
 
+        # Refuse to return a classification with missing rows.
+        missing_c_ranges = []
+        for c in range(v):
+            if not c_covered[c]:
+                if missing_c_ranges and missing_c_ranges[-1][1] == c:
+                    missing_c_ranges[-1][1] = c + 1
+                else:
+                    missing_c_ranges.append([c, c + 1])
+        if missing_c_ranges:
+            raise ValueError(
+                "Missing class parts for values of c in " +
+                ", ".join(
+                    "[{}, {})".format(c_start, c_stop)
+                    for c_start, c_stop in missing_c_ranges) +
+                ".")
+
         return cls(
             algebraic_normal_form=algebraic_normal_form,
             cayley_graph_class_list=cayley_graph_class_list,
@@ -1092,6 +1233,78 @@ class BentFunctionCayleyGraphClassification(BentFunctionCayleyGraphClassPart):
             self.weight_class_matrix == other.weight_class_matrix)
 
 
+    def __getstate__(self):
+        r"""
+        Pickle the classification without its cached class cell indexes.
+        """
+        state = self.__dict__.copy()
+        state.pop("_class_cell_index_cache", None)
+        return state
+
+
+    def class_cell_index(self, dual=False):
+        r"""
+        Group the cells of a Cayley graph index matrix by extended Cayley class.
+
+        The result is computed in a single pass over the matrix, as per
+        the function ``class_cell_index``, and is cached until the matrix is replaced.
+        The matrix is made immutable when the result is cached, so that the
+        cached result cannot be made stale by changing the matrix in place.
+        The cache is not pickled.
+
+        INPUT:
+
+        - ``self`` -- the current object.
+        - ``dual`` -- Boolean (default: False). If True, use
+          ``self.dual_cayley_graph_index_matrix``, otherwise use
+          ``self.bent_cayley_graph_index_matrix``.
+
+        OUTPUT: a ``ClassCellIndex``, or ``None`` if ``dual`` is True and
+        there is no dual Cayley graph index matrix.
+
+        EXAMPLES:
+
+        ::
+
+            sage: from boolean_cayley_graphs.bent_function import BentFunction
+            sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification as BentFunctionCGC
+            sage: c = BentFunctionCGC.from_function(BentFunction([0,0,0,1]))
+            sage: cci = c.class_cell_index()
+            sage: cci.counts.tolist()
+            [12, 4]
+            sage: cci.cells[1].tolist()
+            [[0, 3], [1, 1], [2, 2], [3, 0]]
+            sage: c.class_cell_index() is cci
+            True
+            sage: c.bent_cayley_graph_index_matrix.is_immutable()
+            True
+            sage: c.bent_cayley_graph_index_matrix[0, 0] = 1
+            Traceback (most recent call last):
+            ...
+            ValueError: matrix is immutable; please change a copy instead (i.e., use copy(M) to change a copy of M).
+            sage: loads(dumps(c)).__dict__.get("_class_cell_index_cache") is None
+            True
+        """
+        index_matrix = (
+            self.dual_cayley_graph_index_matrix
+            if dual else
+            self.bent_cayley_graph_index_matrix)
+        if index_matrix is None:
+            return None
+        cache = self.__dict__.setdefault("_class_cell_index_cache", dict())
+        cached = cache.get(dual)
+        if cached is None or cached[0] is not index_matrix:
+            if hasattr(index_matrix, "set_immutable"):
+                index_matrix.set_immutable()
+            else:
+                index_matrix.flags.writeable = False
+            cached = (
+                index_matrix,
+                class_cell_index(index_matrix, len(self.cayley_graph_class_list)))
+            cache[dual] = cached
+        return cached[1]
+
+
     def first_matrix_index_list(self):
         r"""
         Obtain a representative bent function corresponding to each extended Cayley class.
@@ -1103,8 +1316,9 @@ class BentFunctionCayleyGraphClassification(BentFunctionCayleyGraphClassPart):
         OUTPUT:
 
         A list of tuples `(i_n,j_n)`, each of which is the first index into
-        the matrix `self.bent_cayley_graph_index_matrix` that contains the entry `n`.
-        The first index is determined by ``argwhere``.
+        the matrix `self.bent_cayley_graph_index_matrix` that contains the entry `n`,
+        in row major order, or ``None`` if there is no such entry.
+        The list is obtained from ``class_cell_index``.
 
         EXAMPLES:
 
@@ -1121,25 +1335,85 @@ class BentFunctionCayleyGraphClassification(BentFunctionCayleyGraphClassPart):
             sage: c.first_matrix_index_list()
             [(0, 0), (0, 1)]
         """
-        tot_cayley_graph_classes = len(self.cayley_graph_class_list)
-        ci_matrix = self.bent_cayley_graph_index_matrix
+        return list(self.class_cell_index().first_index_list)
+
+
+    def cayley_graph_class_ranks(self, batch_bytes=None):
+        r"""
+        Compute the 2-rank of the Cayley graph of each extended Cayley class.
+
+        Each rank is computed from the truth table of a representative bent function,
+        as given by ``first_matrix_index_list``, without constructing a graph,
+        using ``cayley_graph_ranks``, in batches of ``batch_length`` classes.
+        If a default invariant cache is set, as per ``graph_invariant_cache``,
+        ranks are read from the cache, and the computed ranks are stored in it.
+
+        INPUT:
+
+        - ``self`` -- the current object.
+        - ``batch_bytes`` -- integer (default: `None`). The maximum number of bytes
+          of unpacked adjacency bits in each batch, as per ``batch_length``.
+
+        OUTPUT:
+
+        A list, indexed by the classes in ``self.cayley_graph_class_list``, of integers,
+        or of `None` for a class with no representative.
+
+        EXAMPLES:
+
+        ::
+
+            sage: from boolean_cayley_graphs.bent_function import BentFunction
+            sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification as BentFunctionCGC
+            sage: from boolean_cayley_graphs.strongly_regular_graph import StronglyRegularGraph
+            sage: c = BentFunctionCGC.from_function(BentFunction([0,0,0,1,0,0,0,1,0,0,0,1,1,1,1,0]))
+            sage: c.cayley_graph_class_ranks() == [
+            ....:     StronglyRegularGraph(Graph(label)).rank
+            ....:     for label in c.cayley_graph_class_list]
+            True
+            sage: c.cayley_graph_class_ranks(batch_bytes=1) == c.cayley_graph_class_ranks()
+            True
+        """
+        cache = get_default_invariant_cache()
+        cg_list = self.cayley_graph_class_list
+        cb_list = self.first_matrix_index_list()
+        ranks = [None] * len(cg_list)
+        pending = []
+        for index, c_b in enumerate(cb_list):
+            if c_b is None:
+                continue
+            rank = cache.get(cg_list[index], "rank") if cache is not None else None
+            if rank is None:
+                pending.append(index)
+            else:
+                ranks[index] = rank
+        if not pending:
+            return ranks
 
-        ci_array  = array(ci_matrix)
-        ci_where  = [
-            argwhere(ci_array == index)
-            for index in range(tot_cayley_graph_classes)]
-        cb_list = [
-            (None
-            if ci_where[index].shape[0] == 0
-            else tuple(ci_where[index][0,:]))
-            for index in range(tot_cayley_graph_classes)]
-        return cb_list
+        bentf = BentFunction(self.algebraic_normal_form)
+        f = bentf.extended_translate()
+        v = 2 ** bentf.nvariables()
+        length = batch_length(v, batch_bytes)
+        for start in range(0, len(pending), length):
+            batch = pending[start:start + length]
+            truth_tables = []
+            for index in batch:
+                c = Integer(cb_list[index][0])
+                b = Integer(cb_list[index][1])
+                fbc = bentf.extended_translate(b, c, f(b))
+                truth_tables.append([fbc(x) for x in range(v)])
+            for index, rank in zip(batch, cayley_graph_ranks(truth_tables, batch_bytes)):
+                ranks[index] = rank
+                if cache is not None:
+                    cache.put(cg_list[index], "rank", rank)
+        return ranks
 
 
     def report(
         self,
         report_on_matrix_details=False,
-        report_on_graph_details=False):
+        report_on_graph_details=False,
+        ncpus=1):
         r"""
         Print a report on the classification.
 
@@ -1152,6 +1426,8 @@ class BentFunctionCayleyGraphClassification(BentFunctionCayleyGraphClassPart):
            If True, print each matrix.
         - ``report_on_graph_details`` -- Boolean (default: False).
            If True, produce a detailed report for each Cayley graph.
+        - ``ncpus`` -- integer (default: 1). The number of worker processes used
+          to produce the detailed reports, as per ``classification_report``.
 
         OUTPUT:
 
@@ -1267,203 +1543,15 @@ class BentFunctionCayleyGraphClassification(BentFunctionCayleyGraphClassPart):
 
         - [Leo2017]_.
         """
-        def graph_and_linear_code_report(
-            bentf,
-            report_on_matrix_details,
-            report_on_graph_details,
-            cayley_graph_class_list,
-            pair_c_b_list,
-            bent_cayley_graph_index_matrix,
-            dual_cayley_graph_index_matrix=None):
-            r"""
-            Report on the Cayley graphs and linear codes given by the
-            representative bent functions in the extended translation class.
-            """
-            def print_compare(verb, a, b):
-
-                print((
-                    verb + " the same."
-                    if a == b
-                    else a), end=' ')
-
-
-            verbose = controls.verbose
-
-            nbr_bent_cayley_graph_classes = len(
-                np.unique(bent_cayley_graph_index_matrix))
-            print("")
-            print("There are", nbr_bent_cayley_graph_classes, end=' ')
-            print("extended Cayley classes in the extended translation class.")
-
-            tot_cayley_graph_classes = len(cayley_graph_class_list)
-
-            if dual_cayley_graph_index_matrix != None:
-                nbr_dual_cayley_graph_classes = len(
-                    np.unique(dual_cayley_graph_index_matrix))
-                print("There are", nbr_dual_cayley_graph_classes, end=' ')
-                print("extended Cayley classes of dual bent functions", end=' ')
-                print("in the extended translation class,")
-                print("and", tot_cayley_graph_classes, end=' ')
-                print("extended Cayley classes in the union of the two.")
-
-            if report_on_matrix_details:
-                print("")
-                print("Matrix of indices of Cayley graphs:")
-                print(bent_cayley_graph_index_matrix)
-
-                if dual_cayley_graph_index_matrix != None:
-                    print("Matrix of indices of Cayley graphs", end=' ')
-                    print("of dual bent functions:")
-                    print(dual_cayley_graph_index_matrix)
-
-            if not report_on_graph_details:
-                return
-
-            print("")
-            print("For each extended Cayley class in the extended translation class:")
-            print("Clique polynomial, strongly regular parameters,", end=' ')
-            print("rank, and order of a representative graph; and")
-            print("linear code and generator matrix for a representative bent function:")
-
-            for index in range(tot_cayley_graph_classes):
-                print("")
-                print("EC class", index, ":")
-                c_b = pair_c_b_list[index]
-                if c_b == None:
-                    print("No such representative graph.")
-                else:
-                    c = Integer(c_b[0])
-                    b = Integer(c_b[1])
-                    fb = f(b)
-                    fbc = bentf.extended_translate(b, c, fb)
-                    bent_fbc = BentFunction([fbc(x) for x in range(v)])
-                    p = bent_fbc.algebraic_normal_form()
-                    print("Algebraic normal form of representative:", p)
-                    g = Graph(cayley_graph_class_list[index])
-                    s = StronglyRegularGraph(g)
-                    print("Clique polynomial:", end=' ')
-                    print(s.stored_clique_polynomial)
-                    print("Strongly regular parameters:", end=' ')
-                    print(s.strongly_regular_parameters)
-                    print("Rank:", s.rank, end=' ')
-                    print("Order:", s.group_order)
-
-                    if dual_cayley_graph_index_matrix != None:
-                        dual_index = dual_cayley_graph_index_matrix[c, b]
-                        if dual_index != index:
-                            print("Cayley graph of dual of representative differs:")
-                            print("Index is", dual_index)
-                            dual_g = Graph(cayley_graph_class_list[dual_index])
-                            dual_s = StronglyRegularGraph(dual_g)
-                            print("Clique polynomial", end=' ')
-                            print_compare(
-                                "is",
-                                dual_s.stored_clique_polynomial,
-                                s.stored_clique_polynomial)
-                            print("")
-                            print("Strongly regular parameters", end=' ')
-                            print_compare (
-                                "are",
-                                dual_s.strongly_regular_parameters,
-                                s.strongly_regular_parameters)
-                            print("")
-                            print("Rank", end=' ')
-                            print_compare ("is", dual_s.rank, s.rank)
-                            print("Order", end=' ')
-                            print_compare (
-                                "is", dual_s.group_order, s.group_order)
-                            print("")
-                            if verbose:
-                                if log(s.group_order, Integer(2)).is_integer():
-                                    print("Order is a power of 2.")
-                                else:
-                                    print("")
-                                    print("Automorphism group", end=' ')
-                                    dual_a = dual_s.automorphism_group
-                                    print((
-                                        "is"
-                                        if dual_a.is_isomorphic(s.automorphism_group)
-                                        else "is not"), end=' ')
-                                    print("isomorphic.")
-
-                    print("")
-                    print("Linear code from representative:")
-                    lc = bent_fbc.linear_code()
-                    print(lc)
-                    print("Generator matrix:")
-                    print(lc.generator_matrix().echelon_form())
-                    print("Linear code", end=' ')
-                    print("is" if lc.is_projective() else "is not", end=' ')
-                    print("projective.")
-                    print("Weight distribution:", end=' ')
-                    wd = lc.weight_distribution()
-                    print(dict([
-                        (w,wd[w]) for w in range(len(wd)) if wd[w] > 0]))
-
-
-        p = self.algebraic_normal_form
-        print("Algebraic normal form of Boolean function:", p)
-        bentf = BentFunction(p)
-        f = bentf.extended_translate()
+        render_report(
+            classification_report(
+                self,
+                report_on_matrix_details=report_on_matrix_details,
+                report_on_graph_details=report_on_graph_details,
+                ncpus=ncpus))
 
-        dim = bentf.nvariables()
-        v = 2 ** dim
-
-        print("Function", ("is" if bentf.is_bent() else "is not"), "bent.")
-        print("")
-        D = self.weight_class_matrix
-        if report_on_matrix_details:
-            print("Weight class matrix:")
-            print(D)
-
-        print("")
-        print("SDP design incidence structure t-design parameters:", end=' ')
-        I = IncidenceStructure(D)
-        print(I.is_t_design(return_parameters=True))
 
-        cg_list   = self.cayley_graph_class_list
-        ci_matrix = self.bent_cayley_graph_index_matrix
-        di_matrix = self.dual_cayley_graph_index_matrix
-        cb_list   = self.first_matrix_index_list()
-
-        print("")
-        if di_matrix == None:
-            print("Classification of Cayley graphs:")
-
-            graph_and_linear_code_report(
-                bentf,
-                report_on_matrix_details,
-                report_on_graph_details,
-                cg_list,
-                cb_list,
-                ci_matrix)
-        else:
-            print("Classification of Cayley graphs and", end=' ')
-            print("classification of Cayley graphs of duals", end=' ')
-            if ci_matrix == di_matrix:
-                print("are the same:")
-
-                graph_and_linear_code_report(
-                    bentf,
-                    report_on_matrix_details,
-                    report_on_graph_details,
-                    cg_list,
-                    cb_list,
-                    ci_matrix)
-            else:
-                print("differ in matrices of indexes:")
-
-                graph_and_linear_code_report(
-                    bentf,
-                    report_on_matrix_details,
-                    report_on_graph_details,
-                    cg_list,
-                    cb_list,
-                    ci_matrix,
-                    di_matrix)
-
-
-    def print_latex_table_of_cayley_classes(self, width=40, rows_per_table=6):
+    def print_latex_table_of_cayley_classes(self, width=40, rows_per_table=6, report=None):
         r"""
         Print a table of Cayley classes in LaTeX format.
 
@@ -1476,6 +1564,10 @@ class BentFunctionCayleyGraphClassification(BentFunctionCayleyGraphClassPart):
         - ``width`` -- integer (default: 40): the table width.
         - ``rows_per_table`` -- integer (default: 6). 
           The number of rows to include before starting a new table.
+        - ``report`` -- a ``ClassificationReport`` (default: `None`).
+          A report on ``self``, as per ``classification_report``.
+          If this includes graph details, the properties of each class are
+          taken from the report, rather than computed.
 
         OUTPUT:
 
@@ -1548,6 +1640,12 @@ class BentFunctionCayleyGraphClassification(BentFunctionCayleyGraphClassPart):
 
         print_latex_header()
         cg_list = self.cayley_graph_class_list
+        class_reports = report.class_reports if report is not None else None
+        # Compute the ranks of all of the classes as batches, unless the report has them.
+        ranks = (
+            self.cayley_graph_class_ranks()
+            if class_reports is None else
+            [None] * len(cg_list))
         for n in range(len(cg_list)):
             if n > 0 and n % rows_per_table == 0:
                 print_latex_footer()
@@ -1555,11 +1653,19 @@ class BentFunctionCayleyGraphClassification(BentFunctionCayleyGraphClassPart):
                 print_latex_header()
 
             print(n, "&")
-            g = Graph(cg_list[n])
-            srg = StronglyRegularGraph(g)
-            print(srg.strongly_regular_parameters, "&")
-            print(srg.rank, "&")
-            cp = srg.stored_clique_polynomial
+            class_report = class_reports[n] if class_reports is not None else None
+            if class_report is not None:
+                print(class_report.strongly_regular_parameters, "&")
+                print(class_report.rank, "&")
+                cp = class_report.clique_polynomial
+            else:
+                # Each graph is the Cayley graph of an extended translate of a bent function.
+                srg = StronglyRegularGraph.from_canonical_label(
+                    cg_list[n],
+                    bent_cayley_graph=True)
+                print(srg.strongly_regular_parameters, "&")
+                print(ranks[n] if ranks[n] is not None else srg.rank, "&")
+                cp = srg.stored_clique_polynomial
             print("\\begin{array}{l}")
             lf = latex(cp)
             cut = 0
@@ -1578,7 +1684,12 @@ class BentFunctionCayleyGraphClassification(BentFunctionCayleyGraphClassPart):
         print_latex_footer()
 
 
-    def print_latex_table_of_tonchev_graphs(self, width=40):
+    def print_latex_table_of_tonchev_graphs(
+        self,
+        width=40,
+        algorithm=default_algorithm,
+        reference_table=None,
+        dir=None):
         r"""
         Print a table comparing Cayley graphs with graphs from Tonchev's codes.
 
@@ -1591,6 +1702,12 @@ class BentFunctionCayleyGraphClassification(BentFunctionCayleyGraphClassPart):
         - ``width`` -- integer (default: 40): the table width.
         - ``algorithm`` -- string (default: ``default_algorithm``).
           Algorithm used for canonical labelling.
+        - ``reference_table`` -- a ``ReferenceGraphTable`` (default: `None`).
+          The table of known graphs, whose canonical labels must be computed using
+          ``algorithm``. Default is None, meaning ``reference_graph_table(algorithm, dir)``.
+        - ``dir`` -- string (default: `None`). The directory of the saved table
+          of known graphs, as per ``reference_graph_table``.
+          Used only if ``reference_table`` is None.
 
         OUTPUT:
 
@@ -1650,41 +1767,17 @@ class BentFunctionCayleyGraphClassification(BentFunctionCayleyGraphClassPart):
         print("\\\\")
         print("\\hline")
 
-        tw_155 = binary_projective_two_weight_27_6_12()
-        lc_155 = [
-            linear_code_from_code_gens(tw)
-            for tw in tw_155]
-        sr_155 = [
-            strongly_regular_from_two_weight_code(lc).canonical_label(algorithm=algorithm).graph6_string()
-            for lc in lc_155]
-
-        tw_156 = binary_projective_two_weight_35_6_16()
-        lc_156 = [
-            linear_code_from_code_gens(tw)
-            for tw in tw_156]
-        sr_156 = [
-            strongly_regular_from_two_weight_code(lc).complement().canonical_label(algorithm=algorithm).graph6_string()
-            for lc in lc_156]
-
-        cg_list = self.cayley_graph_class_list
-        for n in range(len(cg_list)):
-            cg = cg_list[n]
-            for k in range(len(sr_155)):
-                if cg == sr_155[k]:
-                    print(n, "&", end=' ')
-                    print_latex_code_parameters(lc_155[k])
-                    print("& \\text{Table 1.155", end=' ')
-                    print(k + 1, end=' ')
-                    print("}")
-                    print("\\\\")
-            for k in range(len(sr_156)):
-                if cg == sr_156[k]:
-                    print(n, "&", end=' ')
-                    print_latex_code_parameters(lc_156[k])
-                    print("& \\text{Table 1.156", end=' ')
-                    print(k + 1, end=' ')
-                    print("(complement)}")
-                    print("\\\\")
+        if reference_table is None:
+            reference_table = reference_graph_table(algorithm=algorithm, dir=dir)
+        for n, reference in reference_table.classification_matches(
+            self,
+            families=["Table 1.155", "Table 1.156"]):
+            print(n, "&", end=' ')
+            print("[{},{},{}]".format(*reference.code_parameters), end=' ')
+            print("& \\text{" + reference.family, end=' ')
+            print(reference.entry, end=' ')
+            print("(complement)}" if reference.complement else "}")
+            print("\\\\")
 
         print("\\hline")
         print("\\end{array}")
@@ -1694,13 +1787,17 @@ class BentFunctionCayleyGraphClassification(BentFunctionCayleyGraphClassPart):
     def save_matrix_plots(
         self,
         figure_name,
-        cmap='gist_stern'):
+        cmap='gist_stern',
+        target_size=None,
+        method="mode"):
         r"""
         Plot the matrix attributes to figure files.
 
         Use ``matrix_plot`` to plot the matrix attributes
         ``bent_cayley_graph_index_matrix``, ``dual_cayley_graph_index_matrix``,
         and ``weight_class_matrix`` to corresponding figure files.
+        Large matrices can be downsampled to at most ``target_size`` by
+        ``target_size`` pixels, as per ``downsampled_matrix_plot``.
 
         INPUT:
 
@@ -1709,6 +1806,11 @@ class BentFunctionCayleyGraphClassification(BentFunctionCayleyGraphClassPart):
           The prefix to use in the file names for the figures.
         - ``cmap`` -- string (default: ``'gist_stern'``). 
           The colormap to use with ``matrixplot``.
+        - ``target_size`` -- positive integer (default: `None`).
+          The maximum number of pixels in each direction of each plot.
+          Default is None, meaning that the matrices are not downsampled.
+        - ``method`` -- string (default: "mode"). The aggregate used to downsample,
+          one of ``downsample_methods`` in the ``matrix_tiles`` module.
 
         OUTPUT:
 
@@ -1753,7 +1855,16 @@ class BentFunctionCayleyGraphClassification(BentFunctionCayleyGraphClassPart):
 
         attributes = self.__dict__
         for name in matrix_names:
-            graphic = matrix_plot(matrix(attributes[name]),cmap=cmap)
+            if attributes[name] is None:
+                continue
+            if target_size is None:
+                graphic = matrix_plot(matrix(attributes[name]),cmap=cmap)
+            else:
+                graphic = downsampled_matrix_plot(
+                    attributes[name],
+                    target_size=target_size,
+                    method=method,
+                    cmap=cmap)
             graphic.save(figure_name + "_" + name + ".png")
 
 
@@ -1948,3 +2059,82 @@ class BentFunctionCayleyGraphClassification(BentFunctionCayleyGraphClassPart):
 
         self.save_matrices_as_csv(
             file_name_prefix + cls.matrices_csv_suffix)
+
+
+def _save_matrix_plots_star(args):
+    r"""
+    Save the matrix plots of one classification, given a tuple of arguments.
+
+    This function is called by the worker processes of ``save_matrix_plots_in_parallel``.
+    """
+    classification, figure_name, dir, cmap, target_size, method = args
+    if isinstance(classification, str):
+        classification = BentFunctionCayleyGraphClassification.load_mangled(
+            classification,
+            dir=dir)
+    classification.save_matrix_plots(
+        figure_name,
+        cmap=cmap,
+        target_size=target_size,
+        method=method)
+    return figure_name
+
+
+def save_matrix_plots_in_parallel(
+    classifications,
+    figure_names,
+    dir=None,
+    cmap='gist_stern',
+    target_size=None,
+    method="mode",
+    ncpus=1):
+    r"""
+    Save the matrix plots of a number of classifications, using a pool of worker processes.
+
+    INPUT:
+
+    - ``classifications`` -- a list. Each item is a ``BentFunctionCayleyGraphClassification``,
+      or the name of a classification saved using ``save_mangled``, which is
+      loaded by the worker process that plots it.
+    - ``figure_names`` -- a list of strings, of the same length as ``classifications``.
+      The prefixes of the file names of the figures of each classification.
+    - ``dir`` -- string (default: `None`). The directory of the saved classifications.
+    - ``cmap``, ``target_size``, ``method`` -- as per ``save_matrix_plots``.
+    - ``ncpus`` -- integer (default: 1). The number of worker processes.
+      If 1, no worker processes are used.
+
+    OUTPUT: None.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import *
+        sage: import glob
+        sage: import os
+        sage: c = [BentFunctionCayleyGraphClassification.from_function(BentFunction(tt)) for tt in ([0,0,0,1], [1,1,0,1])]
+        sage: figure_names = [tmp_filename(), tmp_filename()]
+        sage: save_matrix_plots_in_parallel(c, figure_names, target_size=2, ncpus=2)
+        sage: figure_list = [f for name in figure_names for f in glob.glob(name + "*.png")]
+        sage: len(figure_list)
+        6
+        sage: for figure in figure_list:
+        ....:     os.remove(figure)
+    """
+    tasks = [
+        (classification, figure_name, dir, cmap, target_size, method)
+        for classification, figure_name in zip(classifications, figure_names)]
+    pool = (
+        multiprocessing.get_context("fork").Pool(ncpus)
+        if ncpus > 1 and len(tasks) > 1 else
+        None)
+    try:
+        if pool is not None:
+            pool.map(_save_matrix_plots_star, tasks)
+        else:
+            list(map(_save_matrix_plots_star, tasks))
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
@@ -11,6 +11,7 @@ which returns the Cayley graph of the Boolean function.
 AUTHORS:
 
 - Paul Leopardi (2016-08-23): initial version
+- Paul Leopardi (2024-08-26): Cayley graph fingerprints to reject non-equivalent functions
 
 EXAMPLES:
 
@@ -45,6 +46,7 @@ from sys import stdout
 
 from boolean_cayley_graphs.boolean_cayley_graph import boolean_cayley_graph
 from boolean_cayley_graphs.boolean_linear_code import boolean_linear_code
+from boolean_cayley_graphs.graph_fingerprint import cayley_graph_fingerprint
 from boolean_cayley_graphs.integer_bits import base2, inner
 from boolean_cayley_graphs.linear import is_linear
 from boolean_cayley_graphs.saveable import Saveable
@@ -433,6 +435,41 @@ class BooleanFunctionImproved(BooleanFunction, Saveable):
         return boolean_cayley_graph(dim, f)
 
 
+    def cayley_graph_fingerprint(self):
+        r"""
+        Return the fingerprint of the Cayley graph of ``self``.
+
+        The fingerprint is computed from the truth table of ``self``,
+        as per ``cayley_graph_fingerprint`` in the ``graph_fingerprint`` module,
+        and is cached until the truth table changes.
+
+        INPUT:
+
+        - ``self`` -- the current object.
+
+        OUTPUT:
+
+        A ``CayleyGraphFingerprint``. If the fingerprints of two functions differ,
+        their Cayley graphs are not isomorphic.
+
+        EXAMPLES::
+
+            sage: from boolean_cayley_graphs.boolean_function_improved import BooleanFunctionImproved
+            sage: bf1 = BooleanFunctionImproved([0,1,0,0])
+            sage: bf2 = BooleanFunctionImproved([0,1,1,0])
+            sage: bf1.cayley_graph_fingerprint() == bf2.cayley_graph_fingerprint()
+            False
+            sage: bf1.cayley_graph_fingerprint() is bf1.cayley_graph_fingerprint()
+            True
+        """
+        tt = self.truth_table(format='int')
+        cached = self.__dict__.get("_cayley_graph_fingerprint_cache")
+        if cached is None or cached[0] != tt:
+            cached = (tt, cayley_graph_fingerprint(tt))
+            self.__dict__["_cayley_graph_fingerprint_cache"] = cached
+        return cached[1]
+
+
     def extended_cayley_graph(self):
         r"""
         Return the extended Cayley graph of ``self``.
@@ -604,6 +641,9 @@ class BooleanFunctionImproved(BooleanFunction, Saveable):
                   [0 1]
             True, [1 0]
             )
+            sage: bf3 = BooleanFunctionImproved([0,1,1,0])
+            sage: bf1.is_linear_equivalent(bf3, certificate=True)
+            (False, None)
 
         """
 
@@ -624,6 +664,15 @@ class BooleanFunctionImproved(BooleanFunction, Saveable):
                 self.truth_table())
 
 
+        try:
+            other_fingerprint = other.cayley_graph_fingerprint()
+        except AttributeError:
+            return (False, None) if certificate else False
+
+        # Reject non-isomorphic Cayley graphs before computing canonical labels.
+        if self.cayley_graph_fingerprint() != other_fingerprint:
+            return (False, None) if certificate else False
+
         self_cg  = self.cayley_graph()
         try:
             other_cg = other.cayley_graph()
@@ -9,6 +9,7 @@ which represents a Graph whose order is a power of 2.
 AUTHORS:
 
 - Paul Leopardi (2017-11-11): initial version
+- Paul Leopardi (2024-08-26): graph fingerprints to reject non-isomorphic graphs
 
 """
 #*****************************************************************************
@@ -27,6 +28,10 @@ from sage.matrix.constructor import matrix
 from sage.rings.finite_rings.finite_field_constructor import FiniteField as GF
 from sage.rings.integer import Integer
 
+import numpy as np
+
+from boolean_cayley_graphs.gf2_rank import graph6_adjacency_bits
+from boolean_cayley_graphs.graph_fingerprint import graph_fingerprint
 from boolean_cayley_graphs.integer_bits import base2
 from boolean_cayley_graphs.linear import is_linear
 from boolean_cayley_graphs.saveable import Saveable
@@ -77,6 +82,37 @@ class BooleanGraph(Graph, Saveable):
             raise ValueError
 
 
+    def fingerprint(self):
+        r"""
+        Return the fingerprint of ``self``.
+
+        INPUT:
+
+        - ``self`` -- the current object.
+
+        OUTPUT:
+
+        A ``GraphFingerprint``, as per ``graph_fingerprint`` in the ``graph_fingerprint`` module.
+        If the fingerprints of two graphs differ, the graphs are not isomorphic.
+
+        EXAMPLES:
+
+        ::
+
+            sage: from boolean_cayley_graphs.boolean_function_improved import BooleanFunctionImproved
+            sage: from boolean_cayley_graphs.boolean_graph import BooleanGraph
+            sage: cg1 = BooleanGraph(BooleanFunctionImproved([0,1,0,0]).cayley_graph())
+            sage: cg2 = BooleanGraph(BooleanFunctionImproved([0,1,1,0]).cayley_graph())
+            sage: cg1.fingerprint().degrees, cg2.fingerprint().degrees
+            (((1, 4),), ((2, 4),))
+        """
+        if self.has_loops():
+            adjacency = np.array(self.adjacency_matrix())
+        else:
+            adjacency = graph6_adjacency_bits(self.graph6_string())
+        return graph_fingerprint(adjacency)
+
+
     def is_linear_isomorphic(
         self, 
         other, 
@@ -120,6 +156,10 @@ class BooleanGraph(Graph, Saveable):
 
 
         """
+        # Reject non-isomorphic graphs before computing canonical labels.
+        if self.fingerprint() != BooleanGraph.fingerprint(other):
+            return (False, None) if certificate else False
+
         # Check the isomorphism between self and other via canonical labels.
         # This is to work around the slow speed of is_isomorphic in some cases.
         if self.canonical_label() != other.canonical_label():
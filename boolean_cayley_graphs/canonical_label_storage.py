@@ -0,0 +1,277 @@
+r"""
+Storage of canonical labels in a classification database
+========================================================
+
+The ``canonical_label_storage`` module defines classes that encode and decode
+the canonical labels of graphs, as stored in the ``graph`` table of a
+classification database.
+
+The canonical labels are ``graph6_string`` strings, which dominate the size
+of a database of classifications of bent functions of 8 or more variables.
+A label can be stored in one of the following ways, known as storage methods:
+
+- ``"text"``: as text, in the ``graph`` table;
+- ``"zlib"``: compressed using ``zlib``, in the ``graph`` table;
+- ``"store"``: compressed using ``zlib``, in a ``CanonicalLabelStore``,
+  a directory of files addressed by the hash of the label,
+  with ``NULL`` in the ``graph`` table.
+
+In each case, the ``canonical_label_hash`` column of the ``graph`` table
+contains the SHA-256 hash of the uncompressed label.
+
+AUTHORS:
+
+- Paul Leopardi (2024-05-27): initial version
+
+"""
+#*****************************************************************************
+#       Copyright (C) 2024 Paul Leopardi paul.leopardi@gmail.com
+#
+#  Distributed under the terms of the GNU General Public License (GPL)
+#  as published by the Free Software Foundation; either version 2 of
+#  the License, or (at your option) any later version.
+#                  http://www.gnu.org/licenses/
+#*****************************************************************************
+
+from builtins import object
+import binascii
+import os
+import os.path
+import zlib
+
+from boolean_cayley_graphs.saveable import write_file_atomically
+
+
+encoding = "UTF-8"
+
+
+# The storage methods for canonical labels.
+label_storage_methods = ("text", "zlib", "store")
+
+
+def compress_label(canonical_label):
+    r"""
+    Compress a canonical label.
+
+    INPUT:
+
+    - ``canonical_label`` -- string. A graph6_string encoding a Graph canonical label.
+
+    OUTPUT: a bytes object.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.canonical_label_storage import *
+        sage: decompress_label(compress_label("CK"))
+        'CK'
+    """
+    return zlib.compress(canonical_label.encode(encoding), 9)
+
+
+def decompress_label(data):
+    r"""
+    Decompress a canonical label compressed by ``compress_label``.
+
+    INPUT:
+
+    - ``data`` -- a bytes-like object.
+
+    OUTPUT: a string.
+    """
+    return zlib.decompress(bytes(data)).decode(encoding)
+
+
+class CanonicalLabelStore(object):
+    r"""
+    A content-addressed store of compressed canonical labels.
+
+    Each label is compressed and saved in its own file, whose name is the hexadecimal
+    form of the hash of the label, within a subdirectory named by the first byte of the hash.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.canonical_label_storage import *
+        sage: from boolean_cayley_graphs.classification_database_sqlite3 import canonical_label_hash
+        sage: store = CanonicalLabelStore(tmp_dir())
+        sage: label_hash = canonical_label_hash("CK")
+        sage: store.contains(label_hash)
+        False
+        sage: store.put(label_hash, "CK")
+        sage: store.contains(label_hash)
+        True
+        sage: store.get(label_hash)
+        'CK'
+    """
+    def __init__(self, directory):
+        r"""
+        Constructor.
+
+        INPUT:
+
+        - ``directory`` -- string. The directory of the store.
+          It is created if it does not exist.
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+
+    def file_name(self, label_hash):
+        r"""
+        Return the name of the file of a label.
+
+        INPUT:
+
+        - ``label_hash`` -- bytes-like. The hash of the label.
+
+        OUTPUT: a string.
+
+        EXAMPLES:
+
+        ::
+
+            sage: from boolean_cayley_graphs.canonical_label_storage import CanonicalLabelStore
+            sage: import os
+            sage: store = CanonicalLabelStore(tmp_dir())
+            sage: os.path.relpath(store.file_name(b"\x01\xab"), store.directory)
+            '01/01ab.g6.z'
+        """
+        hex_hash = binascii.hexlify(bytes(label_hash)).decode(encoding)
+        return os.path.join(self.directory, hex_hash[:2], hex_hash + ".g6.z")
+
+
+    def contains(self, label_hash):
+        r"""
+        Test whether the store contains a label.
+
+        INPUT:
+
+        - ``label_hash`` -- bytes-like. The hash of the label.
+
+        OUTPUT: ``True`` if the store contains the label, otherwise ``False``.
+        """
+        return os.path.isfile(self.file_name(label_hash))
+
+
+    def put(self, label_hash, canonical_label):
+        r"""
+        Save a label in the store, unless it is already there.
+
+        INPUT:
+
+        - ``label_hash`` -- bytes-like. The hash of the label.
+        - ``canonical_label`` -- string. The label.
+
+        OUTPUT: None.
+        """
+        file_name = self.file_name(label_hash)
+        if os.path.isfile(file_name):
+            return
+        os.makedirs(os.path.dirname(file_name), exist_ok=True)
+        write_file_atomically(compress_label(canonical_label), file_name)
+
+
+    def get(self, label_hash):
+        r"""
+        Load a label from the store.
+
+        INPUT:
+
+        - ``label_hash`` -- bytes-like. The hash of the label.
+
+        OUTPUT: a string.
+        """
+        with open(self.file_name(label_hash), "rb") as label_file:
+            return decompress_label(label_file.read())
+
+
+class CanonicalLabelCodec(object):
+    r"""
+    Encode canonical labels as values of the ``canonical_label`` column of the ``graph`` table,
+    and decode these values, using a given storage method.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.canonical_label_storage import *
+        sage: from boolean_cayley_graphs.classification_database_sqlite3 import canonical_label_hash
+        sage: label_hash = canonical_label_hash("CK")
+        sage: codec = CanonicalLabelCodec()
+        sage: codec.encode("CK", label_hash)
+        'CK'
+        sage: codec = CanonicalLabelCodec("zlib")
+        sage: codec.decode(codec.encode("CK", label_hash), label_hash)
+        'CK'
+        sage: codec = CanonicalLabelCodec("store", tmp_dir())
+        sage: codec.encode("CK", label_hash) is None
+        True
+        sage: codec.decode(None, label_hash)
+        'CK'
+        sage: CanonicalLabelCodec("store")
+        Traceback (most recent call last):
+        ...
+        ValueError: The storage method 'store' needs a store directory.
+    """
+    def __init__(self, method="text", store_directory=None):
+        r"""
+        Constructor.
+
+        INPUT:
+
+        - ``method`` -- string (default: "text"). One of ``label_storage_methods``.
+        - ``store_directory`` -- string (default: `None`). The directory of the
+          ``CanonicalLabelStore``, used only if ``method`` is "store".
+        """
+        if method not in label_storage_methods:
+            raise ValueError("Unknown storage method: {!r}".format(method))
+        if method == "store" and store_directory is None:
+            raise ValueError("The storage method 'store' needs a store directory.")
+        self.method = method
+        self.store_directory = store_directory
+        self.store = (
+            CanonicalLabelStore(store_directory)
+            if method == "store" else
+            None)
+
+
+    def encode(self, canonical_label, label_hash):
+        r"""
+        Encode a canonical label as a value of the ``canonical_label`` column.
+
+        If the storage method is "store", the label is also saved in the store.
+
+        INPUT:
+
+        - ``canonical_label`` -- string. The label.
+        - ``label_hash`` -- bytes-like. The hash of the label.
+
+        OUTPUT: a string, a bytes object, or ``None``.
+        """
+        if self.method == "text":
+            return canonical_label
+        if self.method == "zlib":
+            return compress_label(canonical_label)
+        self.store.put(label_hash, canonical_label)
+        return None
+
+
+    def decode(self, value, label_hash):
+        r"""
+        Decode a value of the ``canonical_label`` column as a canonical label.
+
+        INPUT:
+
+        - ``value`` -- a string, a bytes-like object, or ``None``.
+        - ``label_hash`` -- bytes-like. The hash of the label.
+
+        OUTPUT: a string.
+        """
+        if self.method == "text":
+            return str(value)
+        if self.method == "zlib":
+            return decompress_label(value)
+        return self.store.get(label_hash)
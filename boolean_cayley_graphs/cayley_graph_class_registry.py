@@ -0,0 +1,602 @@
+r"""
+A registry of Cayley graph classes shared between classifications
+=================================================================
+
+The ``cayley_graph_class_registry`` module defines
+the ``CayleyGraphClassRegistry`` class, which assigns a global identifier
+to each Cayley graph class found in any of a number of classifications
+of bent functions. Each canonical label is stored once, and
+invariants of each class are computed at most once.
+
+The registry can be used to classify a batch of bent functions,
+such as the component functions of the CAST-128 S-boxes,
+and then to report statistics on the classes shared between functions.
+
+AUTHORS:
+
+- Paul Leopardi (2024-04-08): initial version
+
+EXAMPLES:
+
+::
+
+    sage: from boolean_cayley_graphs.bent_function import BentFunction
+    sage: from boolean_cayley_graphs.cayley_graph_class_registry import CayleyGraphClassRegistry
+    sage: registry = CayleyGraphClassRegistry()
+    sage: registry.classify_all(
+    ....:     [BentFunction([0,0,0,1]), BentFunction([0,0,1,0])],
+    ....:     names=["f0", "f1"])
+    ['f0', 'f1']
+    sage: registry
+    Registry of 2 Cayley graph classes from 2 functions
+    sage: registry.report()
+    Number of functions: 2
+    Number of distinct Cayley graph classes: 2
+    Sum over functions of the number of Cayley graph classes: 4
+    Number of classes shared by more than one function: 2
+    Largest number of functions sharing a class: 2
+"""
+#*****************************************************************************
+#       Copyright (C) 2024 Paul Leopardi paul.leopardi@gmail.com
+#
+#  Distributed under the terms of the GNU General Public License (GPL)
+#  as published by the Free Software Foundation; either version 2 of
+#  the License, or (at your option) any later version.
+#                  http://www.gnu.org/licenses/
+#*****************************************************************************
+
+import multiprocessing
+
+from sage.graphs.graph import Graph
+from sage.matrix.constructor import matrix
+from sage.structure.sage_object import SageObject
+
+from boolean_cayley_graphs.bent_function import BentFunction
+from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
+from boolean_cayley_graphs.containers import BijectiveList
+from boolean_cayley_graphs.graph_invariant_cache import get_default_invariant_cache, invariant_functions
+from boolean_cayley_graphs.saveable import Saveable
+
+import boolean_cayley_graphs.cayley_graph_controls as controls
+
+
+def _classify_one(n, form):
+    r"""
+    Classify a bent function, in a worker process of ``classify_all``.
+
+    INPUT:
+
+    - ``n`` -- integer. The number of the function in the batch.
+    - ``form`` -- a form or a bent function.
+
+    OUTPUT: a tuple ``(n, classification, error)``. If the classification fails,
+    ``classification`` is ``None`` and ``error`` is a string describing the exception;
+    otherwise ``error`` is ``None``.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.cayley_graph_class_registry import _classify_one
+        sage: n, classification, error = _classify_one(0, [0,0,0,1])
+        sage: n, classification.cayley_graph_class_list, error
+        (0, ['CK', 'C~'], None)
+        sage: n, classification, error = _classify_one(1, [0,1,1])
+        sage: n, classification, error is None
+        (1, None, False)
+    """
+    try:
+        return (
+            n,
+            BentFunctionCayleyGraphClassification.from_function(BentFunction(form)),
+            None)
+    except Exception as e:
+        return n, None, "{}: {}".format(type(e).__name__, e)
+
+
+def _classify_one_star(args):
+    r"""
+    Call ``_classify_one`` with a tuple of arguments, for use with ``Pool.imap_unordered``.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.cayley_graph_class_registry import _classify_one_star
+        sage: n, classification, error = _classify_one_star((2, [0,1,1,1]))
+        sage: n, classification.cayley_graph_class_list, error
+        (2, ['C~', 'CK'], None)
+    """
+    return _classify_one(*args)
+
+
+class CayleyGraphClassRegistry(SageObject, Saveable):
+    r"""
+    A registry of Cayley graph classes, with a global identifier for each class,
+    shared between the classifications of a number of bent functions.
+
+    The attributes are:
+
+    - ``cayley_graph_class_bijection`` -- a ``BijectiveList`` of ``graph6_string`` strings.
+      The global identifier of a class is its index in this list.
+    - ``function_class_ids`` -- a dict mapping the name of each registered function
+      to a list mapping each index into its ``cayley_graph_class_list``
+      to a global identifier.
+    - ``function_names`` -- the list of names of registered functions, in order of registration.
+    - ``invariants`` -- a dict mapping global identifiers to dicts of computed invariants.
+
+    EXAMPLES:
+
+    ::
+
+        sage: import os
+        sage: from boolean_cayley_graphs.cayley_graph_class_registry import CayleyGraphClassRegistry
+        sage: registry = CayleyGraphClassRegistry()
+        sage: registry
+        Registry of 0 Cayley graph classes from 0 functions
+        sage: d = tmp_dir()
+        sage: registry.save_mangled("test", dir=d)
+        sage: CayleyGraphClassRegistry.load_mangled("test", dir=d)
+        Registry of 0 Cayley graph classes from 0 functions
+        sage: CayleyGraphClassRegistry.remove_mangled("test", dir=d)
+        sage: os.rmdir(d)
+    """
+
+
+    def __init__(self, *args, **kwargs):
+        r"""
+        Constructor from an object or from attributes.
+
+        INPUT:
+
+        - ``args`` -- tuple, optional. A registry to copy.
+        - ``kwargs`` -- not used.
+
+        EXAMPLES:
+
+        ::
+
+            sage: from boolean_cayley_graphs.bent_function import BentFunction
+            sage: from boolean_cayley_graphs.cayley_graph_class_registry import CayleyGraphClassRegistry
+            sage: registry = CayleyGraphClassRegistry()
+            sage: _ = registry.classify_all([BentFunction([0,0,0,1])], names=["f"])
+            sage: copy = CayleyGraphClassRegistry(registry)
+            sage: copy.function_names
+            ['f']
+        """
+        if len(args) == 1:
+            obj = args[0]
+            self.cayley_graph_class_bijection = obj.cayley_graph_class_bijection
+            self.function_class_ids = obj.function_class_ids
+            self.function_names = obj.function_names
+            self.invariants = obj.invariants
+        else:
+            self.cayley_graph_class_bijection = BijectiveList()
+            self.function_class_ids = dict()
+            self.function_names = []
+            self.invariants = dict()
+
+
+    def _repr_(self):
+        r"""
+        Sage string representation.
+
+        EXAMPLES:
+
+        ::
+
+            sage: from boolean_cayley_graphs.cayley_graph_class_registry import CayleyGraphClassRegistry
+            sage: CayleyGraphClassRegistry()
+            Registry of 0 Cayley graph classes from 0 functions
+        """
+        return "Registry of {} Cayley graph classes from {} functions".format(
+            len(self.cayley_graph_class_bijection),
+            len(self.function_names))
+
+
+    def nbr_classes(self):
+        r"""
+        Return the number of distinct Cayley graph classes in the registry.
+
+        EXAMPLES:
+
+        ::
+
+            sage: from boolean_cayley_graphs.cayley_graph_class_registry import CayleyGraphClassRegistry
+            sage: CayleyGraphClassRegistry().nbr_classes()
+            0
+        """
+        return len(self.cayley_graph_class_bijection)
+
+
+    def class_label(self, class_id):
+        r"""
+        Return the ``graph6_string`` canonical label of a class, given its global identifier.
+
+        EXAMPLES:
+
+        ::
+
+            sage: from boolean_cayley_graphs.bent_function import BentFunction
+            sage: from boolean_cayley_graphs.cayley_graph_class_registry import CayleyGraphClassRegistry
+            sage: registry = CayleyGraphClassRegistry()
+            sage: _ = registry.classify_all([BentFunction([0,0,0,1])], names=["f"])
+            sage: registry.class_label(0)
+            'CK'
+        """
+        return self.cayley_graph_class_bijection[class_id]
+
+
+    def is_registered(self, name):
+        r"""
+        Test whether a function with a given name has been registered.
+
+        EXAMPLES:
+
+        ::
+
+            sage: from boolean_cayley_graphs.cayley_graph_class_registry import CayleyGraphClassRegistry
+            sage: CayleyGraphClassRegistry().is_registered("f")
+            False
+        """
+        return name in self.function_class_ids
+
+
+    def register_classification(self, name, classification):
+        r"""
+        Register the Cayley graph classes of a classification under a given name.
+
+        INPUT:
+
+        - ``name`` -- string. The name of the classified function.
+        - ``classification`` -- a ``BentFunctionCayleyGraphClassification``.
+
+        OUTPUT:
+
+        A list mapping each index into ``classification.cayley_graph_class_list``
+        to a global identifier.
+
+        A ``ValueError`` is raised if ``name`` has already been registered.
+
+        EXAMPLES:
+
+        ::
+
+            sage: from boolean_cayley_graphs.bent_function import BentFunction
+            sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification as BFCGC
+            sage: from boolean_cayley_graphs.cayley_graph_class_registry import CayleyGraphClassRegistry
+            sage: registry = CayleyGraphClassRegistry()
+            sage: c0 = BFCGC.from_function(BentFunction([0,0,0,1]))
+            sage: c0.cayley_graph_class_list
+            ['CK', 'C~']
+            sage: registry.register_classification("f0", c0)
+            [0, 1]
+            sage: c1 = BFCGC.from_function(BentFunction([0,1,1,1]))
+            sage: c1.cayley_graph_class_list
+            ['C~', 'CK']
+            sage: registry.register_classification("f1", c1)
+            [1, 0]
+            sage: registry.register_classification("f1", c1)
+            Traceback (most recent call last):
+            ...
+            ValueError: Function f1 is already registered.
+        """
+        if self.is_registered(name):
+            raise ValueError("Function " + str(name) + " is already registered.")
+        class_ids = [
+            self.cayley_graph_class_bijection.index_append(label)
+            for label in classification.cayley_graph_class_list]
+        self.function_class_ids[name] = class_ids
+        self.function_names.append(name)
+        return class_ids
+
+
+    def global_index_matrix(self, name, index_matrix):
+        r"""
+        Map a matrix of indices into the ``cayley_graph_class_list`` of a registered
+        function to the corresponding matrix of global identifiers.
+
+        INPUT:
+
+        - ``name`` -- string. The name of a registered function.
+        - ``index_matrix`` -- a matrix of indices, such as ``bent_cayley_graph_index_matrix``.
+
+        OUTPUT:
+
+        A matrix of global identifiers.
+
+        EXAMPLES:
+
+        ::
+
+            sage: from boolean_cayley_graphs.bent_function import BentFunction
+            sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification as BFCGC
+            sage: from boolean_cayley_graphs.cayley_graph_class_registry import CayleyGraphClassRegistry
+            sage: registry = CayleyGraphClassRegistry()
+            sage: _ = registry.register_classification("f0", BFCGC.from_function(BentFunction([0,0,0,1])))
+            sage: c1 = BFCGC.from_function(BentFunction([0,1,1,1]))
+            sage: _ = registry.register_classification("f1", c1)
+            sage: c1.bent_cayley_graph_index_matrix
+            [0 1 1 1]
+            [1 1 0 1]
+            [1 0 1 1]
+            [1 1 1 0]
+            sage: registry.global_index_matrix("f1", c1.bent_cayley_graph_index_matrix)
+            [1 0 0 0]
+            [0 0 1 0]
+            [0 1 0 0]
+            [0 0 0 1]
+        """
+        class_ids = self.function_class_ids[name]
+        return matrix(
+            index_matrix.nrows(),
+            index_matrix.ncols(),
+            [class_ids[index] for index in index_matrix.list()])
+
+
+    def invariant(self, class_id, invariant_name):
+        r"""
+        Return an invariant of a Cayley graph class, computing it at most once.
+
+        If a default ``GraphInvariantCache`` is set, as per ``set_default_invariant_cache``,
+        the invariant is looked up in, and stored in, this cache.
+
+        INPUT:
+
+        - ``class_id`` -- integer. The global identifier of the class.
+        - ``invariant_name`` -- string. One of the keys of ``invariant_functions``:
+          ``"clique_polynomial"``, ``"group_order"``, ``"rank"``,
+          or ``"strongly_regular_parameters"``.
+
+        OUTPUT:
+
+        The value of the invariant.
+
+        EXAMPLES:
+
+        ::
+
+            sage: from boolean_cayley_graphs.bent_function import BentFunction
+            sage: from boolean_cayley_graphs.cayley_graph_class_registry import CayleyGraphClassRegistry
+            sage: registry = CayleyGraphClassRegistry()
+            sage: _ = registry.classify_all([BentFunction([0,0,0,1,0,0,0,1,0,0,0,1,1,1,1,0])], names=["f"])
+            sage: registry.invariant(0, "strongly_regular_parameters")
+            (16, 6, 2, 2)
+            sage: registry.invariant(0, "rank")
+            6
+            sage: sorted(registry.invariants[0])
+            ['rank', 'strongly_regular_parameters']
+        """
+        class_invariants = self.invariants.setdefault(class_id, dict())
+        if invariant_name not in class_invariants:
+            label = self.class_label(class_id)
+            cache = get_default_invariant_cache()
+            if cache is not None:
+                class_invariants[invariant_name] = cache.invariant(label, invariant_name)
+            else:
+                g = Graph(label)
+                class_invariants[invariant_name] = invariant_functions[invariant_name](g)
+        return class_invariants[invariant_name]
+
+
+    def class_function_counts(self):
+        r"""
+        Return the number of registered functions having each Cayley graph class.
+
+        OUTPUT:
+
+        A list, indexed by global identifier.
+
+        EXAMPLES:
+
+        ::
+
+            sage: from boolean_cayley_graphs.bent_function import BentFunction
+            sage: from boolean_cayley_graphs.cayley_graph_class_registry import CayleyGraphClassRegistry
+            sage: registry = CayleyGraphClassRegistry()
+            sage: _ = registry.classify_all([BentFunction([0,0,0,1])], names=["f"])
+            sage: registry.class_function_counts()
+            [1, 1]
+        """
+        counts = [0] * self.nbr_classes()
+        for name in self.function_names:
+            for class_id in set(self.function_class_ids[name]):
+                counts[class_id] += 1
+        return counts
+
+
+    def statistics(self):
+        r"""
+        Return statistics on the Cayley graph classes shared between registered functions.
+
+        OUTPUT:
+
+        A dict with the following keys.
+
+        - ``"nbr_functions"`` -- the number of registered functions.
+        - ``"nbr_classes"`` -- the number of distinct Cayley graph classes.
+        - ``"sum_of_class_counts"`` -- the sum over functions of the number of classes of each function.
+        - ``"nbr_shared_classes"`` -- the number of classes belonging to more than one function.
+        - ``"max_functions_per_class"`` -- the largest number of functions having the same class.
+
+        EXAMPLES:
+
+        ::
+
+            sage: from boolean_cayley_graphs.bent_function import BentFunction
+            sage: from boolean_cayley_graphs.cayley_graph_class_registry import CayleyGraphClassRegistry
+            sage: registry = CayleyGraphClassRegistry()
+            sage: _ = registry.classify_all([BentFunction([0,0,0,1])], names=["f"])
+            sage: sorted(registry.statistics().items())
+            [('max_functions_per_class', 1),
+             ('nbr_classes', 2),
+             ('nbr_functions', 1),
+             ('nbr_shared_classes', 0),
+             ('sum_of_class_counts', 2)]
+        """
+        counts = self.class_function_counts()
+        return {
+            "nbr_functions": len(self.function_names),
+            "nbr_classes": self.nbr_classes(),
+            "sum_of_class_counts": sum(
+                len(self.function_class_ids[name])
+                for name in self.function_names),
+            "nbr_shared_classes": sum(1 for count in counts if count > 1),
+            "max_functions_per_class": max(counts) if counts else 0}
+
+
+    def report(self):
+        r"""
+        Print statistics on the Cayley graph classes shared between registered functions.
+
+        EXAMPLES:
+
+        ::
+
+            sage: from boolean_cayley_graphs.cayley_graph_class_registry import CayleyGraphClassRegistry
+            sage: CayleyGraphClassRegistry().report()
+            Number of functions: 0
+            Number of distinct Cayley graph classes: 0
+            Sum over functions of the number of Cayley graph classes: 0
+            Number of classes shared by more than one function: 0
+            Largest number of functions sharing a class: 0
+        """
+        statistics = self.statistics()
+        print("Number of functions:", statistics["nbr_functions"])
+        print("Number of distinct Cayley graph classes:", statistics["nbr_classes"])
+        print(
+            "Sum over functions of the number of Cayley graph classes:",
+            statistics["sum_of_class_counts"])
+        print(
+            "Number of classes shared by more than one function:",
+            statistics["nbr_shared_classes"])
+        print(
+            "Largest number of functions sharing a class:",
+            statistics["max_functions_per_class"])
+
+
+    def classify_all(
+        self,
+        list_of_f,
+        names=None,
+        ncpus=1,
+        insert=None,
+        dir=None,
+        registry_name=None,
+        save_interval=100):
+        r"""
+        Classify a batch of bent functions, registering the Cayley graph classes
+        of each classification.
+
+        Functions whose names are already registered are skipped, so that
+        an interrupted batch can be resumed from a saved registry.
+        Each classification is registered, saved and inserted as soon as it
+        has been computed, in order of completion if ``ncpus > 1``.
+        The registry is saved in batches, so a batch that is killed resumes
+        from the classifications registered as of the last save of the registry.
+        A function whose classification fails is reported and skipped.
+
+        INPUT:
+
+        - ``list_of_f`` -- List of forms or bent functions.
+        - ``names`` -- list of string (default: ``None``).
+          The names of the functions. ``None`` means ``str(n)`` for function number ``n``.
+        - ``ncpus`` -- integer (default: 1). The number of cpus to use in parallel.
+        - ``insert`` -- function (default: ``None``). If not ``None``, a function called as
+          ``insert(classification, name)`` for each new classification, for example to insert
+          the classification into a database.
+        - ``dir`` -- string (default: ``None``). If not ``None``, the directory in which
+          to save each new classification, using ``save_mangled`` with its name.
+        - ``registry_name`` -- string (default: ``None``). If not ``None``, the name
+          used with ``save_mangled`` to save the registry in ``dir``
+          every ``save_interval`` classifications, and when the batch ends.
+        - ``save_interval`` -- integer (default: 100). The number of classifications
+          registered between saves of the registry.
+
+        OUTPUT:
+
+        The list of names of the functions classified by this call,
+        in the order of ``list_of_f``, excluding functions whose classification failed.
+
+        EXAMPLES:
+
+        ::
+
+            sage: import os
+            sage: from boolean_cayley_graphs.bent_function import BentFunction
+            sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification as BFCGC
+            sage: from boolean_cayley_graphs.cayley_graph_class_registry import CayleyGraphClassRegistry
+            sage: registry = CayleyGraphClassRegistry()
+            sage: d = tmp_dir()
+            sage: registry.classify_all(
+            ....:     [BentFunction([0,0,0,1])],
+            ....:     names=["f0"],
+            ....:     dir=d,
+            ....:     registry_name="registry")
+            ['f0']
+            sage: registry = CayleyGraphClassRegistry.load_mangled("registry", dir=d)
+            sage: registry.classify_all(
+            ....:     [BentFunction([0,0,0,1]), BentFunction([0,1,1,1])],
+            ....:     names=["f0", "f1"],
+            ....:     ncpus=2,
+            ....:     dir=d,
+            ....:     registry_name="registry")
+            ['f1']
+            sage: BFCGC.load_mangled("f1", dir=d).cayley_graph_class_list
+            ['C~', 'CK']
+            sage: registry.function_class_ids["f1"]
+            [1, 0]
+            sage: for name in ["f0", "f1"]:
+            ....:     BFCGC.remove_mangled(name, dir=d)
+            sage: CayleyGraphClassRegistry.remove_mangled("registry", dir=d)
+            sage: os.rmdir(d)
+        """
+        verbose = controls.verbose
+
+        if names is None:
+            names = [str(n) for n in range(len(list_of_f))]
+        todo = [
+            n
+            for n in range(len(list_of_f))
+            if not self.is_registered(names[n])]
+
+        tasks = [(n, list_of_f[n]) for n in todo]
+        pool = (
+            multiprocessing.get_context("fork").Pool(ncpus)
+            if ncpus > 1 and len(tasks) > 1 else
+            None)
+        classified = set()
+        nbr_unsaved = 0
+        try:
+            # Register and save each classification as soon as it arrives,
+            # so that an interrupted batch keeps the work already done.
+            results = (
+                pool.imap_unordered(_classify_one_star, tasks)
+                if pool is not None else
+                map(_classify_one_star, tasks))
+            for n, classification, error in results:
+                name = names[n]
+                if classification is None:
+                    print("Function", name, ": classification failed:", error)
+                    continue
+                if verbose:
+                    print("Function", name, ":")
+                self.register_classification(name, classification)
+                if dir is not None:
+                    classification.save_mangled(name, dir=dir)
+                if insert is not None:
+                    insert(classification, name)
+                classified.add(n)
+                nbr_unsaved += 1
+                # Saving the registry after every classification would make
+                # the total time spent saving grow quadratically with the batch.
+                if registry_name is not None and nbr_unsaved >= save_interval:
+                    self.save_mangled(registry_name, dir=dir)
+                    nbr_unsaved = 0
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+            if registry_name is not None and nbr_unsaved > 0:
+                self.save_mangled(registry_name, dir=dir)
+        return [names[n] for n in todo if n in classified]
@@ -0,0 +1,540 @@
+r"""
+Manifests of class parts
+========================
+
+The ``class_part_manifest`` module defines the ``ClassPartManifest`` class:
+a record of the class parts expected from a run that saves a Cayley graph
+classification in parts, together with the range of values of `c`,
+the status and the SHA-256 checksum of each part.
+
+The manifest is saved as a JSON file alongside the class parts,
+so that an interrupted run can be resumed by computing only the parts
+that are not yet complete, and so that the parts are only merged
+when all of them are present and intact.
+
+AUTHORS:
+
+- Paul Leopardi (2024-03-18): initial version
+
+EXAMPLES:
+
+::
+
+    sage: import os
+    sage: from boolean_cayley_graphs.class_part_manifest import ClassPartManifest
+    sage: d = tmp_dir()
+    sage: prefix = os.path.join(d, "test_manifest")
+    sage: manifest = ClassPartManifest.create(prefix, 4, 2)
+    sage: manifest
+    Manifest of 2 class parts: 0 complete, 2 pending
+    sage: [part["suffix"] for part in manifest.pending_parts()]
+    ['0', '1']
+    sage: manifest.remove()
+    sage: os.rmdir(d)
+"""
+#*****************************************************************************
+#       Copyright (C) 2024 Paul Leopardi paul.leopardi@gmail.com
+#
+#  Distributed under the terms of the GNU General Public License (GPL)
+#  as published by the Free Software Foundation; either version 2 of
+#  the License, or (at your option) any later version.
+#                  http://www.gnu.org/licenses/
+#*****************************************************************************
+
+import hashlib
+import json
+import os
+import os.path
+
+from boolean_cayley_graphs.saveable import write_file_atomically
+
+
+def file_sha256(file_name, block_size=2 ** 20):
+    r"""
+    Return the SHA-256 checksum of the contents of a file, as a hexadecimal string.
+
+    INPUT:
+
+    - ``file_name`` -- string. The name of the file.
+    - ``block_size`` -- integer (default: `2^{20}`). The number of bytes to read at a time.
+
+    OUTPUT:
+
+    A string of 64 hexadecimal digits.
+
+    EXAMPLES:
+
+    ::
+
+        sage: import os
+        sage: from boolean_cayley_graphs.class_part_manifest import file_sha256
+        sage: file_name = tmp_filename()
+        sage: with open(file_name, "wb") as f:
+        ....:     _ = f.write(b"abc")
+        sage: file_sha256(file_name)
+        'ba7816bf8f01cfea414140de5dae2223b00361a396177a9cb410ff61f20015ad'
+        sage: os.remove(file_name)
+    """
+    sha256 = hashlib.sha256()
+    with open(file_name, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            sha256.update(block)
+    return sha256.hexdigest()
+
+
+class ClassPartManifest(object):
+    r"""
+    A record of the class parts expected from a run that saves a
+    Cayley graph classification in parts.
+
+    Each part is a dict with the following keys.
+
+    - ``"suffix"`` -- the suffix appended to the part prefix, after ``"_"``,
+      to obtain the name of the part.
+    - ``"c_start"``, ``"c_stop"`` -- the range of values of `c` in the part.
+    - ``"status"`` -- either ``"pending"`` or ``"complete"``.
+    - ``"sha256"`` -- the checksum of the saved part, or ``None``.
+    - ``"size"``, ``"mtime"`` -- the size and modification time of the saved part
+      when its checksum was recorded, or ``None``.
+
+    The file names of the parts and of the manifest are derived from
+    ``mangled_part_prefix``, which is usually obtained from
+    ``BentFunctionCayleyGraphClassPart.mangled_name(name_prefix, dir=dir)``.
+
+    EXAMPLES:
+
+    ::
+
+        sage: import os
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassPart as BFCP
+        sage: from boolean_cayley_graphs.class_part_manifest import ClassPartManifest
+        sage: f = BentFunction([0,0,0,1])
+        sage: d = tmp_dir()
+        sage: prefix = BFCP.mangled_name("test_manifest", dir=d)
+        sage: manifest = ClassPartManifest.create(prefix, 4, 2)
+        sage: manifest.save()
+        sage: ClassPartManifest.exists(prefix)
+        True
+        sage: BFCP.from_function(f, c_start=0, c_stop=2).save_mangled("test_manifest_0", dir=d)
+        sage: manifest.refresh()
+        sage: manifest
+        Manifest of 2 class parts: 1 complete, 1 pending
+        sage: [(part["suffix"], part["status"]) for part in manifest.parts]
+        [('0', 'complete'), ('1', 'pending')]
+        sage: manifest.describe_parts(manifest.missing_parts())
+        '..._test_manifest_1 (c in [2, 4))'
+        sage: BFCP.remove_mangled("test_manifest_0", dir=d)
+        sage: manifest.remove()
+        sage: os.rmdir(d)
+    """
+
+
+    # The suffix of the file name of the manifest.
+    manifest_suffix = "_manifest.json"
+
+
+    def __init__(self, mangled_part_prefix, v, c_len, parts):
+        r"""
+        Constructor.
+
+        INPUT:
+
+        - ``mangled_part_prefix`` -- string. The prefix of the file names of the parts,
+          including the directory, if any.
+        - ``v`` -- integer. The number of rows of the whole classification matrices.
+        - ``c_len`` -- integer. The number of values of `c` in each part.
+        - ``parts`` -- list of dict. The parts, as described above.
+
+        EXAMPLES:
+
+        ::
+
+            sage: from boolean_cayley_graphs.class_part_manifest import ClassPartManifest
+            sage: parts = [{"suffix": "0", "c_start": 0, "c_stop": 4, "status": "pending", "sha256": None}]
+            sage: ClassPartManifest("prefix", 4, 4, parts)
+            Manifest of 1 class parts: 0 complete, 1 pending
+        """
+        self.mangled_part_prefix = mangled_part_prefix
+        self.v = v
+        self.c_len = c_len
+        self.parts = parts
+
+
+    def __repr__(self):
+        r"""
+        Return a short description of the manifest.
+
+        EXAMPLES:
+
+        ::
+
+            sage: from boolean_cayley_graphs.class_part_manifest import ClassPartManifest
+            sage: ClassPartManifest.create("prefix", 16, 4)
+            Manifest of 4 class parts: 0 complete, 4 pending
+        """
+        nbr_complete = sum(1 for part in self.parts if part["status"] == "complete")
+        return "Manifest of {} class parts: {} complete, {} pending".format(
+            len(self.parts),
+            nbr_complete,
+            len(self.parts) - nbr_complete)
+
+
+    @classmethod
+    def create(cls, mangled_part_prefix, v, c_len, suffixes=None):
+        r"""
+        Create a manifest of pending parts covering all `v` values of `c`.
+
+        INPUT:
+
+        - ``mangled_part_prefix`` -- string. The prefix of the file names of the parts.
+        - ``v`` -- integer. The number of rows of the whole classification matrices.
+        - ``c_len`` -- integer. The number of values of `c` in each part.
+        - ``suffixes`` -- list of string (default: ``None``).
+          The suffixes of the part names. ``None`` means ``str(n)`` for part number ``n``.
+
+        OUTPUT:
+
+        A ``ClassPartManifest``. The manifest is not saved.
+
+        EXAMPLES:
+
+        ::
+
+            sage: from boolean_cayley_graphs.class_part_manifest import ClassPartManifest
+            sage: manifest = ClassPartManifest.create("prefix", 16, 6, ["00", "01", "02"])
+            sage: [(part["suffix"], part["c_start"], part["c_stop"]) for part in manifest.parts]
+            [('00', 0, 6), ('01', 6, 12), ('02', 12, 16)]
+        """
+        # Use Python integers, so that the manifest can be saved as JSON.
+        v = int(v)
+        c_len = int(c_len)
+        nbr_parts = (v + c_len - 1) // c_len
+        if suffixes is None:
+            suffixes = [str(n) for n in range(nbr_parts)]
+        if len(suffixes) != nbr_parts:
+            raise ValueError(
+                "Expected {} part suffixes, got {}.".format(nbr_parts, len(suffixes)))
+        parts = [
+            {
+                "suffix": suffixes[n],
+                "c_start": c_len * n,
+                "c_stop": min(c_len * (n + 1), v),
+                "status": "pending",
+                "sha256": None,
+                "size": None,
+                "mtime": None}
+            for n in range(nbr_parts)]
+        return cls(mangled_part_prefix, v, c_len, parts)
+
+
+    @classmethod
+    def file_name(cls, mangled_part_prefix):
+        r"""
+        Return the file name of the manifest for a given part prefix.
+
+        EXAMPLES:
+
+        ::
+
+            sage: from boolean_cayley_graphs.class_part_manifest import ClassPartManifest
+            sage: ClassPartManifest.file_name("d/Part__p")
+            'd/Part__p_manifest.json'
+        """
+        return mangled_part_prefix + cls.manifest_suffix
+
+
+    @classmethod
+    def exists(cls, mangled_part_prefix):
+        r"""
+        Test whether a manifest has been saved for a given part prefix.
+
+        EXAMPLES:
+
+        ::
+
+            sage: from boolean_cayley_graphs.class_part_manifest import ClassPartManifest
+            sage: ClassPartManifest.exists(tmp_filename())
+            False
+        """
+        return os.path.isfile(cls.file_name(mangled_part_prefix))
+
+
+    @classmethod
+    def load(cls, mangled_part_prefix):
+        r"""
+        Load the manifest saved for a given part prefix.
+
+        INPUT:
+
+        - ``mangled_part_prefix`` -- string. The prefix of the file names of the parts.
+
+        OUTPUT:
+
+        A ``ClassPartManifest``.
+
+        EXAMPLES:
+
+        ::
+
+            sage: from boolean_cayley_graphs.class_part_manifest import ClassPartManifest
+            sage: prefix = tmp_filename()
+            sage: ClassPartManifest.create(prefix, 4, 1).save()
+            sage: manifest = ClassPartManifest.load(prefix)
+            sage: manifest.v, manifest.c_len, len(manifest.parts)
+            (4, 1, 4)
+            sage: manifest.remove()
+        """
+        with open(cls.file_name(mangled_part_prefix)) as manifest_file:
+            contents = json.load(manifest_file)
+        return cls(
+            mangled_part_prefix,
+            contents["v"],
+            contents["c_len"],
+            contents["parts"])
+
+
+    def save(self):
+        r"""
+        Save the manifest atomically as a JSON file.
+
+        EXAMPLES:
+
+        ::
+
+            sage: import json
+            sage: from boolean_cayley_graphs.class_part_manifest import ClassPartManifest
+            sage: prefix = tmp_filename()
+            sage: manifest = ClassPartManifest.create(prefix, 2, 2)
+            sage: manifest.save()
+            sage: json.load(open(ClassPartManifest.file_name(prefix)))["c_len"]
+            2
+            sage: manifest.remove()
+        """
+        contents = {
+            "v": self.v,
+            "c_len": self.c_len,
+            "parts": self.parts}
+        write_file_atomically(
+            json.dumps(contents, indent=1, sort_keys=True).encode("utf-8"),
+            self.file_name(self.mangled_part_prefix))
+
+
+    def remove(self):
+        r"""
+        Remove the saved manifest, if it exists. The parts are not removed.
+
+        EXAMPLES:
+
+        ::
+
+            sage: from boolean_cayley_graphs.class_part_manifest import ClassPartManifest
+            sage: prefix = tmp_filename()
+            sage: manifest = ClassPartManifest.create(prefix, 2, 2)
+            sage: manifest.save()
+            sage: manifest.remove()
+            sage: ClassPartManifest.exists(prefix)
+            False
+        """
+        file_name = self.file_name(self.mangled_part_prefix)
+        if os.path.isfile(file_name):
+            os.remove(file_name)
+
+
+    def part_file_name(self, part):
+        r"""
+        Return the file name of a part.
+
+        EXAMPLES:
+
+        ::
+
+            sage: from boolean_cayley_graphs.class_part_manifest import ClassPartManifest
+            sage: manifest = ClassPartManifest.create("d/Part__p", 4, 2)
+            sage: manifest.part_file_name(manifest.parts[1])
+            'd/Part__p_1.sobj'
+        """
+        return self.mangled_part_prefix + "_" + part["suffix"] + ".sobj"
+
+
+    def part_file_stat(self, part):
+        r"""
+        Return the size and modification time of the file of a part,
+        or ``None`` if the file does not exist.
+
+        EXAMPLES:
+
+        ::
+
+            sage: from boolean_cayley_graphs.class_part_manifest import ClassPartManifest
+            sage: manifest = ClassPartManifest.create(tmp_filename(), 4, 2)
+            sage: manifest.part_file_stat(manifest.parts[0]) is None
+            True
+        """
+        try:
+            stat = os.stat(self.part_file_name(part))
+        except FileNotFoundError:
+            return None
+        return (stat.st_size, stat.st_mtime_ns)
+
+
+    def is_part_intact(self, part):
+        r"""
+        Test whether a part has been saved and, if its checksum
+        has been recorded, whether the checksum still matches.
+
+        Since parts are saved atomically, a part whose file exists
+        is complete, even if the manifest has not yet been refreshed.
+        A part whose checksum has been recorded is trusted without hashing
+        its file only if the size and modification time of the file are unchanged.
+        Otherwise, its file is hashed again, and the part is intact only if
+        the checksum still matches.
+
+        EXAMPLES:
+
+        ::
+
+            sage: import os
+            sage: from boolean_cayley_graphs.class_part_manifest import ClassPartManifest
+            sage: manifest = ClassPartManifest.create(tmp_filename(), 4, 2)
+            sage: part = manifest.parts[0]
+            sage: manifest.is_part_intact(part)
+            False
+            sage: file_name = manifest.part_file_name(part)
+            sage: with open(file_name, "wb") as f:
+            ....:     _ = f.write(b"abc")
+            sage: manifest.refresh()
+            sage: manifest.is_part_intact(part)
+            True
+            sage: with open(file_name, "wb") as f:
+            ....:     _ = f.write(b"abcd")
+            sage: manifest.is_part_intact(part)
+            False
+            sage: os.remove(file_name)
+        """
+        file_stat = self.part_file_stat(part)
+        if file_stat is None:
+            return False
+        if part["status"] != "complete" or part["sha256"] is None:
+            return True
+        if file_stat == (part.get("size"), part.get("mtime")):
+            return True
+        return file_sha256(self.part_file_name(part)) == part["sha256"]
+
+
+    def pending_parts(self):
+        r"""
+        Return the list of parts that need to be computed: those whose files
+        have not yet been saved, and those whose checksums do not match.
+
+        EXAMPLES:
+
+        ::
+
+            sage: import os
+            sage: from boolean_cayley_graphs.class_part_manifest import ClassPartManifest
+            sage: manifest = ClassPartManifest.create(tmp_filename(), 4, 2)
+            sage: len(manifest.pending_parts())
+            2
+            sage: file_name = manifest.part_file_name(manifest.parts[0])
+            sage: with open(file_name, "wb") as f:
+            ....:     _ = f.write(b"abc")
+            sage: manifest.refresh()
+            sage: [part["suffix"] for part in manifest.pending_parts()]
+            ['1']
+            sage: with open(file_name, "wb") as f:
+            ....:     _ = f.write(b"abcd")
+            sage: [part["suffix"] for part in manifest.pending_parts()]
+            ['0', '1']
+            sage: os.remove(file_name)
+        """
+        return [
+            part
+            for part in self.parts
+            if not self.is_part_intact(part)]
+
+
+    def missing_parts(self):
+        r"""
+        Return the list of parts that are missing or whose checksums do not match.
+
+        EXAMPLES:
+
+        ::
+
+            sage: from boolean_cayley_graphs.class_part_manifest import ClassPartManifest
+            sage: manifest = ClassPartManifest.create(tmp_filename(), 4, 4)
+            sage: [part["suffix"] for part in manifest.missing_parts()]
+            ['0']
+        """
+        return self.pending_parts()
+
+
+    def refresh(self):
+        r"""
+        Update the status and checksum of each part from the saved part files.
+
+        A part whose file exists is marked ``"complete"``, and its checksum is
+        recorded, together with the size and modification time of its file,
+        unless these have been recorded already and the size and modification
+        time are unchanged. A part whose file does not exist is marked
+        ``"pending"``. The manifest is not saved.
+
+        EXAMPLES:
+
+        ::
+
+            sage: import os
+            sage: from boolean_cayley_graphs.class_part_manifest import ClassPartManifest, file_sha256
+            sage: manifest = ClassPartManifest.create(tmp_filename(), 4, 2)
+            sage: manifest.refresh()
+            sage: manifest
+            Manifest of 2 class parts: 0 complete, 2 pending
+            sage: part = manifest.parts[0]
+            sage: file_name = manifest.part_file_name(part)
+            sage: with open(file_name, "wb") as f:
+            ....:     _ = f.write(b"abc")
+            sage: manifest.refresh()
+            sage: with open(file_name, "wb") as f:
+            ....:     _ = f.write(b"abcd")
+            sage: manifest.refresh()
+            sage: part["sha256"] == file_sha256(file_name), manifest.is_part_intact(part)
+            (True, True)
+            sage: os.remove(file_name)
+        """
+        for part in self.parts:
+            file_stat = self.part_file_stat(part)
+            if file_stat is not None:
+                if (part["status"] != "complete" or
+                    part["sha256"] is None or
+                    file_stat != (part.get("size"), part.get("mtime"))):
+                    part["sha256"] = file_sha256(self.part_file_name(part))
+                    part["size"], part["mtime"] = file_stat
+                part["status"] = "complete"
+            else:
+                part["sha256"] = None
+                part["size"] = None
+                part["mtime"] = None
+                part["status"] = "pending"
+
+
+    def describe_parts(self, parts):
+        r"""
+        Return a description of a list of parts, listing the part names and ranges of `c`.
+
+        EXAMPLES:
+
+        ::
+
+            sage: from boolean_cayley_graphs.class_part_manifest import ClassPartManifest
+            sage: manifest = ClassPartManifest.create("d/Part__p", 8, 2)
+            sage: manifest.describe_parts(manifest.parts[1:3])
+            'd/Part__p_1 (c in [2, 4)), d/Part__p_2 (c in [4, 6))'
+        """
+        return ", ".join(
+            "{}_{} (c in [{}, {}))".format(
+                self.mangled_part_prefix,
+                part["suffix"],
+                part["c_start"],
+                part["c_stop"])
+            for part in parts)
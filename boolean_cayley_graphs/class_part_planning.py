@@ -0,0 +1,426 @@
+r"""
+Planning the sizes of class parts
+=================================
+
+The ``class_part_planning`` module defines functions that estimate the cost
+of computing the cells of a Cayley graph classification, and use this estimate
+to choose the number of values of `c` to use in each class part,
+and the number of cpus to use, so that a parallel classification fits within
+a target wall time and memory limit.
+
+The chosen plan can be saved as a file of shell variable assignments,
+so that the PBS and MPI wrappers can request exactly the resources they need.
+
+AUTHORS:
+
+- Paul Leopardi (2024-03-11): initial version
+
+EXAMPLES:
+
+::
+
+    sage: from boolean_cayley_graphs.bent_function import BentFunction
+    sage: from boolean_cayley_graphs.class_part_planning import sample_cell_costs, plan_class_parts
+    sage: bentf = BentFunction([0,0,0,1,0,0,0,1,0,0,0,1,1,1,1,0])
+    sage: costs = sample_cell_costs(bentf, nbr_samples=2)
+    sage: plan = plan_class_parts(costs, target_walltime=3600, max_ncpus=4)
+    sage: plan["dim"], plan["ncpus"], plan["c_len"]
+    (4, 1, 16)
+"""
+#*****************************************************************************
+#       Copyright (C) 2024 Paul Leopardi paul.leopardi@gmail.com
+#
+#  Distributed under the terms of the GNU General Public License (GPL)
+#  as published by the Free Software Foundation; either version 2 of
+#  the License, or (at your option) any later version.
+#                  http://www.gnu.org/licenses/
+#*****************************************************************************
+
+import random
+import resource
+import time
+
+from boolean_cayley_graphs.bent_function import BentFunction
+from boolean_cayley_graphs.bent_function_cayley_graph_classification import default_algorithm
+from boolean_cayley_graphs.boolean_cayley_graph import boolean_cayley_graph
+from boolean_cayley_graphs.weight_class import weight_class
+
+
+# The approximate number of bytes used by each entry of each of the
+# three matrices of a class part.
+matrix_entry_bytes = 8
+
+# The number of matrices in a class part.
+nbr_part_matrices = 3
+
+
+def _max_rss_bytes():
+    r"""
+    Return the maximum resident set size of the current process, in bytes.
+
+    TESTS:
+
+    ::
+
+        sage: from boolean_cayley_graphs.class_part_planning import _max_rss_bytes
+        sage: _max_rss_bytes() > 0
+        True
+    """
+    # On Linux, ru_maxrss is measured in kilobytes.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def sample_cell_costs(
+    form,
+    nbr_samples=4,
+    list_dual_graphs=True,
+    algorithm=default_algorithm,
+    seed=None):
+    r"""
+    Estimate the time and memory needed to classify each cell of the
+    matrices of a Cayley graph classification.
+
+    A small number of cells `(c, b)` are chosen at random. For each cell,
+    the Cayley graph of the extended translate of the bent function is
+    constructed and canonically labelled, as in
+    ``BentFunctionCayleyGraphClassPart.from_function``.
+
+    INPUT:
+
+    - ``form`` -- A bent function or an algebraic normal form.
+    - ``nbr_samples`` -- integer (default: 4). The number of cells to sample.
+    - ``list_dual_graphs`` -- boolean (default: ``True``).
+      A flag indicating whether the classification will list dual graphs.
+    - ``algorithm`` -- string (default: ``default_algorithm``).
+      The algorithm used for canonical labelling.
+    - ``seed`` -- integer (default: ``None``). A seed for the random choice of cells.
+
+    OUTPUT:
+
+    A dict with the following keys.
+
+    - ``"dim"`` -- the number of variables of the bent function.
+    - ``"nbr_samples"`` -- the number of cells sampled.
+    - ``"seconds_per_cell"`` -- the mean time taken per cell, in seconds.
+    - ``"label_bytes"`` -- the mean length of a canonical label, in bytes.
+    - ``"labels_per_cell"`` -- the number of canonical labels computed per cell.
+    - ``"new_label_fraction"`` -- the fraction of sampled labels that were distinct.
+    - ``"base_memory"`` -- the memory used by the process before sampling, in bytes.
+    - ``"transient_memory"`` -- the increase in peak memory during sampling, in bytes.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.class_part_planning import sample_cell_costs
+        sage: bentf = BentFunction([0,0,0,1])
+        sage: costs = sample_cell_costs(bentf, nbr_samples=3, seed=1)
+        sage: costs["dim"], costs["nbr_samples"], costs["labels_per_cell"]
+        (2, 3, 2)
+        sage: costs["seconds_per_cell"] > 0
+        True
+    """
+    bentf = BentFunction(form)
+    dim = bentf.nvariables()
+    v = 2 ** dim
+    f = bentf.extended_translate()
+    rng = random.Random(seed)
+
+    base_memory = _max_rss_bytes()
+    labels = []
+    start_time = time.time()
+    for sample in range(nbr_samples):
+        b = rng.randrange(v)
+        c = rng.randrange(v)
+        fbc = bentf.extended_translate(b, c, f(b))
+        cg = boolean_cayley_graph(dim, fbc).canonical_label(algorithm=algorithm)
+        labels.append(cg.graph6_string())
+        if list_dual_graphs:
+            weight = sum(fbc(x) for x in range(v))
+            wc = weight_class(v, weight)
+            bentfbc = BentFunction([fbc(x) for x in range(v)])
+            dual_fbc = bentfbc.walsh_hadamard_dual().extended_translate(d=wc)
+            dg = boolean_cayley_graph(dim, dual_fbc).canonical_label(algorithm=algorithm)
+            labels.append(dg.graph6_string())
+    elapsed = time.time() - start_time
+
+    return {
+        "dim": int(dim),
+        "nbr_samples": nbr_samples,
+        "seconds_per_cell": elapsed / max(nbr_samples, 1),
+        "label_bytes": sum(len(label) for label in labels) // max(len(labels), 1),
+        "labels_per_cell": 2 if list_dual_graphs else 1,
+        "new_label_fraction": len(set(labels)) * 1.0 / max(len(labels), 1),
+        "base_memory": base_memory,
+        "transient_memory": max(_max_rss_bytes() - base_memory, 0)}
+
+
+def class_part_memory(cell_costs, c_len):
+    r"""
+    Estimate the peak memory used by one worker computing one class part.
+
+    INPUT:
+
+    - ``cell_costs`` -- dict. The result of ``sample_cell_costs``.
+    - ``c_len`` -- integer. The number of values of `c` to use in the class part.
+
+    OUTPUT:
+
+    An integer: the estimated number of bytes used by the worker.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.class_part_planning import class_part_memory
+        sage: costs = {"dim": 8, "label_bytes": 5462, "labels_per_cell": 2,
+        ....:     "new_label_fraction": 0.5, "base_memory": 2**30, "transient_memory": 0}
+        sage: class_part_memory(costs, 16) - 2**30
+        22470656
+    """
+    v = 2 ** cell_costs["dim"]
+    bytes_per_cell = (
+        nbr_part_matrices * matrix_entry_bytes +
+        cell_costs["label_bytes"] *
+        cell_costs["labels_per_cell"] *
+        cell_costs["new_label_fraction"])
+    return int(
+        cell_costs["base_memory"] +
+        cell_costs["transient_memory"] +
+        c_len * v * bytes_per_cell)
+
+
+def plan_class_parts(
+    cell_costs,
+    target_walltime,
+    memory_limit=None,
+    max_ncpus=None,
+    safety_factor=1.5):
+    r"""
+    Choose the number of values of `c` per class part, and the number of cpus,
+    so that a parallel classification fits within a target wall time and memory limit.
+
+    The number of values of `c` per class part is always a power of 2.
+    Among all plans that fit, the plan with the fewest cpus is chosen,
+    and among these, the plan with the fewest class parts.
+
+    INPUT:
+
+    - ``cell_costs`` -- dict. The result of ``sample_cell_costs``.
+    - ``target_walltime`` -- number. The target wall time, in seconds.
+    - ``memory_limit`` -- integer (default: ``None``).
+      The total memory available to all cpus, in bytes.
+      ``None`` means that memory is not limited.
+    - ``max_ncpus`` -- integer (default: ``None``).
+      The maximum number of cpus to use. ``None`` means one cpu per class part.
+    - ``safety_factor`` -- number (default: 1.5).
+      The factor used to inflate the estimated time per cell.
+
+    OUTPUT:
+
+    A dict with the following keys.
+
+    - ``"dim"`` -- the number of variables of the bent function.
+    - ``"c_len"`` -- the number of values of `c` to use in each class part.
+    - ``"nbr_parts"`` -- the number of class parts.
+    - ``"ncpus"`` -- the number of cpus to use.
+    - ``"walltime"`` -- the estimated wall time, in seconds.
+    - ``"memory_per_cpu"`` -- the estimated memory used per cpu, in bytes.
+    - ``"memory"`` -- the estimated memory used by all cpus, in bytes.
+
+    A ``ValueError`` is raised if no plan fits.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.class_part_planning import plan_class_parts
+        sage: costs = {"dim": 8, "seconds_per_cell": 0.05, "label_bytes": 5462,
+        ....:     "labels_per_cell": 2, "new_label_fraction": 0.5,
+        ....:     "base_memory": 2**30, "transient_memory": 0}
+        sage: plan = plan_class_parts(costs, target_walltime=1800, max_ncpus=256)
+        sage: plan["c_len"], plan["nbr_parts"], plan["ncpus"]
+        (8, 32, 3)
+        sage: plan = plan_class_parts(costs, target_walltime=600, max_ncpus=256)
+        sage: plan["c_len"], plan["nbr_parts"], plan["ncpus"]
+        (2, 128, 9)
+        sage: plan_class_parts(costs, target_walltime=600, max_ncpus=4)
+        Traceback (most recent call last):
+        ...
+        ValueError: No class part plan fits within 600 seconds and None bytes using at most 4 cpus.
+    """
+    dim = cell_costs["dim"]
+    v = 2 ** dim
+    seconds_per_cell = cell_costs["seconds_per_cell"] * safety_factor
+
+    best_plan = None
+    c_len = 1
+    while c_len <= v:
+        nbr_parts = (v + c_len - 1) // c_len
+        part_seconds = c_len * v * seconds_per_cell
+        if part_seconds > target_walltime:
+            break
+        parts_per_cpu = (
+            nbr_parts
+            if part_seconds == 0 else
+            max(int(target_walltime // part_seconds), 1))
+        ncpus = (nbr_parts + parts_per_cpu - 1) // parts_per_cpu
+        memory_per_cpu = class_part_memory(cell_costs, c_len)
+        memory = ncpus * memory_per_cpu
+        fits = (
+            (max_ncpus is None or ncpus <= max_ncpus) and
+            (memory_limit is None or memory <= memory_limit))
+        if fits and (best_plan is None or ncpus <= best_plan["ncpus"]):
+            best_plan = {
+                "dim": int(dim),
+                "c_len": c_len,
+                "nbr_parts": nbr_parts,
+                "ncpus": ncpus,
+                "walltime": ((nbr_parts + ncpus - 1) // ncpus) * part_seconds,
+                "memory_per_cpu": memory_per_cpu,
+                "memory": memory}
+        c_len *= 2
+
+    if best_plan is None:
+        raise ValueError(
+            "No class part plan fits within {} seconds and {} bytes using at most {} cpus.".format(
+                target_walltime,
+                memory_limit,
+                max_ncpus))
+    return best_plan
+
+
+def save_class_part_plan(plan, file_name):
+    r"""
+    Save a class part plan as a file of shell variable assignments.
+
+    The file can be sourced by the PBS and MPI wrapper scripts.
+    It defines ``C_LEN``, ``NBR_PARTS``, ``NCPUS``, ``MEM`` (in GB, rounded up),
+    and ``WALLTIME`` (in the form ``H:MM:SS``, rounded up to the next minute).
+
+    INPUT:
+
+    - ``plan`` -- dict. The result of ``plan_class_parts``.
+    - ``file_name`` -- string. The name of the file to write.
+
+    OUTPUT:
+
+    None.
+
+    EXAMPLES:
+
+    ::
+
+        sage: import os
+        sage: from boolean_cayley_graphs.class_part_planning import save_class_part_plan, load_class_part_plan
+        sage: plan = {"dim": 8, "c_len": 16, "nbr_parts": 16, "ncpus": 16,
+        ....:     "walltime": 5000.0, "memory_per_cpu": 2**30, "memory": 2**34}
+        sage: plan_name = tmp_filename(ext=".sh")
+        sage: save_class_part_plan(plan, plan_name)
+        sage: print(open(plan_name).read())
+        C_LEN=16
+        NBR_PARTS=16
+        NCPUS=16
+        MEM=16
+        WALLTIME=1:24:00
+        <BLANKLINE>
+        sage: load_class_part_plan(plan_name)
+        {'C_LEN': 16, 'MEM': 16, 'NBR_PARTS': 16, 'NCPUS': 16, 'WALLTIME': '1:24:00'}
+        sage: os.remove(plan_name)
+    """
+    gigabyte = 2 ** 30
+    mem_gb = max((int(plan["memory"]) + gigabyte - 1) // gigabyte, 1)
+    minutes = max(int(-(-plan["walltime"] // 60)), 1)
+    walltime = "{}:{:02d}:00".format(minutes // 60, minutes % 60)
+    with open(file_name, "w") as plan_file:
+        plan_file.write("C_LEN={}\n".format(plan["c_len"]))
+        plan_file.write("NBR_PARTS={}\n".format(plan["nbr_parts"]))
+        plan_file.write("NCPUS={}\n".format(plan["ncpus"]))
+        plan_file.write("MEM={}\n".format(mem_gb))
+        plan_file.write("WALLTIME={}\n".format(walltime))
+
+
+def load_class_part_plan(file_name):
+    r"""
+    Load a class part plan saved by ``save_class_part_plan``.
+
+    INPUT:
+
+    - ``file_name`` -- string. The name of the file to read.
+
+    OUTPUT:
+
+    A dict mapping each shell variable name to its value.
+    Integer values are converted to ``int``.
+
+    EXAMPLES:
+
+    ::
+
+        sage: import os
+        sage: from boolean_cayley_graphs.class_part_planning import save_class_part_plan, load_class_part_plan
+        sage: plan = {"dim": 4, "c_len": 2, "nbr_parts": 8, "ncpus": 4,
+        ....:     "walltime": 10.0, "memory_per_cpu": 2**20, "memory": 2**22}
+        sage: plan_name = tmp_filename(ext=".sh")
+        sage: save_class_part_plan(plan, plan_name)
+        sage: load_class_part_plan(plan_name)["C_LEN"]
+        2
+        sage: os.remove(plan_name)
+    """
+    result = {}
+    with open(file_name) as plan_file:
+        for line in plan_file:
+            line = line.strip()
+            if line == "" or line.startswith("#"):
+                continue
+            key, value = line.split("=", 1)
+            result[key] = int(value) if value.isdigit() else value
+    return dict(sorted(result.items()))
+
+
+def plan_class_parts_for_function(
+    form,
+    target_walltime,
+    memory_limit=None,
+    max_ncpus=None,
+    nbr_samples=4,
+    list_dual_graphs=True):
+    r"""
+    Sample the cell costs of a bent function, and choose a class part plan.
+
+    INPUT:
+
+    - ``form`` -- A bent function or an algebraic normal form.
+    - ``target_walltime`` -- number. The target wall time, in seconds.
+    - ``memory_limit`` -- integer (default: ``None``).
+      The total memory available to all cpus, in bytes.
+    - ``max_ncpus`` -- integer (default: ``None``). The maximum number of cpus to use.
+    - ``nbr_samples`` -- integer (default: 4). The number of cells to sample.
+    - ``list_dual_graphs`` -- boolean (default: ``True``).
+      A flag indicating whether the classification will list dual graphs.
+
+    OUTPUT:
+
+    A dict, as returned by ``plan_class_parts``.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.class_part_planning import plan_class_parts_for_function
+        sage: bentf = BentFunction([0,0,0,1])
+        sage: plan = plan_class_parts_for_function(bentf, 60, max_ncpus=2)
+        sage: plan["c_len"], plan["ncpus"]
+        (4, 1)
+    """
+    cell_costs = sample_cell_costs(
+        form,
+        nbr_samples=nbr_samples,
+        list_dual_graphs=list_dual_graphs)
+    return plan_class_parts(
+        cell_costs,
+        target_walltime,
+        memory_limit=memory_limit,
+        max_ncpus=max_ncpus)
@@ -0,0 +1,551 @@
+r"""
+A content-addressed cache of rendered classification artifacts
+==============================================================
+
+The ``classification_artifact_cache`` module defines the
+``ClassificationArtifactCache`` class, a persistent store of the artifacts
+rendered from the classifications in a database, such as reports,
+CSV and ZIP downloads, and the matrices used for figures.
+
+Each artifact is stored once, keyed by the SHA-256 digest of its content,
+and is indexed by database, database version, bent function name and artifact name.
+The database version is given by ``select_database_version``, so that when a
+database changes, its artifacts can be invalidated using ``invalidate``.
+
+The cache is an SQLite3 database, so that it can be populated in bulk offline,
+using ``precompute_artifacts``, and shared by the processes of a web server,
+such as ``bent_function_cayley_graph_dashboard.py``.
+
+AUTHORS:
+
+- Paul Leopardi (2024-08-19): initial version
+
+EXAMPLES:
+
+::
+
+    sage: from boolean_cayley_graphs.bent_function import BentFunction
+    sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification as BentFunctionCGC
+    sage: from boolean_cayley_graphs.classification_artifact_cache import *
+    sage: c = BentFunctionCGC.from_function(BentFunction([0,0,0,1]))
+    sage: cache = ClassificationArtifactCache(tmp_filename(ext='.db'))
+    sage: cache.put_many("p2", "v1", "p2_1", classification_artifacts(c))
+    sage: report_from_artifact(cache.get("p2", "v1", "p2_1", "report.json"))[:2]
+    ['Algebraic normal form of Boolean function: x0*x1', 'Function is bent.']
+    sage: cache.get("p2", "v2", "p2_1", "report.json") is None
+    True
+"""
+#*****************************************************************************
+#       Copyright (C) 2024 Paul Leopardi paul.leopardi@gmail.com
+#
+#  Distributed under the terms of the GNU General Public License (GPL)
+#  as published by the Free Software Foundation; either version 2 of
+#  the License, or (at your option) any later version.
+#                  http://www.gnu.org/licenses/
+#*****************************************************************************
+
+import datetime
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import tempfile
+import zipfile
+
+import numpy as np
+
+from boolean_cayley_graphs.classification_report import classification_report, report_lines
+from boolean_cayley_graphs.sqlite_cache import SQLiteCache
+
+
+# The matrices of a classification stored as artifacts, for figures.
+matrix_names = (
+    "weight_class_matrix",
+    "bent_cayley_graph_index_matrix",
+    "dual_cayley_graph_index_matrix")
+
+
+# The names of the artifacts of a classification, in the order rendered.
+artifact_names = (
+    ("report.json",
+     "bent_function.csv",
+     "cg_class_list.csv",
+     "matrices.csv",
+     "classification.zip") +
+    tuple(name + ".npy" for name in matrix_names))
+
+
+def artifact_digest(content):
+    r"""
+    Return the digest of the content of an artifact, used as its key.
+
+    INPUT:
+
+    - ``content`` -- a bytes object.
+
+    OUTPUT: a bytes object. The SHA-256 hash of ``content``.
+    """
+    return hashlib.sha256(content).digest()
+
+
+def classification_artifacts(classification, names=None):
+    r"""
+    Render the artifacts of a classification.
+
+    INPUT:
+
+    - ``classification`` -- a ``BentFunctionCayleyGraphClassification``.
+    - ``names`` -- a list of strings (default: `None`). Items of ``artifact_names``.
+      Default is None, meaning all of ``artifact_names``.
+
+    OUTPUT: a dictionary mapping each artifact name to a bytes object:
+
+    - "report.json" -- the lines of the report of the classification,
+      as per ``report_lines``, encoded as JSON.
+    - "bent_function.csv", "cg_class_list.csv", "matrices.csv" --
+      the CSV files written by ``save_as_csv``.
+    - "classification.zip" -- a ZIP file containing the CSV files.
+    - "weight_class_matrix.npy", "bent_cayley_graph_index_matrix.npy",
+      "dual_cayley_graph_index_matrix.npy" -- the matrices of the classification,
+      in ``numpy`` format. A matrix that is `None` is omitted.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification as BentFunctionCGC
+        sage: from boolean_cayley_graphs.classification_artifact_cache import *
+        sage: c = BentFunctionCGC.from_function(BentFunction([0,0,0,1]))
+        sage: artifacts = classification_artifacts(c)
+        sage: sorted(artifacts) == sorted(artifact_names)
+        True
+        sage: matrix_from_artifact(artifacts["weight_class_matrix.npy"]).tolist()
+        [[0, 0, 0, 1], [0, 1, 0, 0], [0, 0, 1, 0], [1, 0, 0, 0]]
+    """
+    if names is None:
+        names = artifact_names
+    artifacts = dict()
+    if "report.json" in names:
+        lines = report_lines(classification_report(classification))
+        artifacts["report.json"] = json.dumps(lines).encode("UTF-8")
+
+    csv_names = ("bent_function.csv", "cg_class_list.csv", "matrices.csv")
+    if "classification.zip" in names or any(name in names for name in csv_names):
+        with tempfile.TemporaryDirectory() as csv_dir:
+            prefix = os.path.join(csv_dir, "classification")
+            classification.save_as_csv(prefix)
+            csv_contents = dict()
+            for name in csv_names:
+                with open(prefix + "_" + name, "rb") as csv_file:
+                    csv_contents[name] = csv_file.read()
+        for name in csv_names:
+            if name in names:
+                artifacts[name] = csv_contents[name]
+        if "classification.zip" in names:
+            zip_buffer = io.BytesIO()
+            with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
+                for name in csv_names:
+                    zip_file.writestr(name, csv_contents[name])
+            artifacts["classification.zip"] = zip_buffer.getvalue()
+
+    for name in matrix_names:
+        mat = getattr(classification, name)
+        if name + ".npy" in names and mat is not None:
+            npy_buffer = io.BytesIO()
+            np.save(npy_buffer, np.array(mat).astype(np.int64), allow_pickle=False)
+            artifacts[name + ".npy"] = npy_buffer.getvalue()
+    return artifacts
+
+
+def report_from_artifact(content):
+    r"""
+    Return the lines of a report from the content of a "report.json" artifact.
+
+    INPUT:
+
+    - ``content`` -- a bytes object.
+
+    OUTPUT: a list of strings.
+    """
+    return json.loads(content.decode("UTF-8"))
+
+
+def matrix_from_artifact(content):
+    r"""
+    Return a matrix from the content of a ".npy" artifact.
+
+    INPUT:
+
+    - ``content`` -- a bytes object.
+
+    OUTPUT: a ``numpy`` array.
+    """
+    return np.load(io.BytesIO(content), allow_pickle=False)
+
+
+class ClassificationArtifactCache(SQLiteCache):
+    r"""
+    A persistent, content-addressed cache of the artifacts of classifications.
+
+    A database connection is opened on first use by each thread of each process,
+    as per ``SQLiteCache``.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_artifact_cache import ClassificationArtifactCache
+        sage: db_name = tmp_filename(ext='.db')
+        sage: cache = ClassificationArtifactCache(db_name)
+        sage: cache.put_many("p2", "v1", "f", {"a.csv": b"1,2", "b.csv": b"1,2"})
+        sage: ClassificationArtifactCache(db_name).get("p2", "v1", "f", "b.csv")
+        b'1,2'
+        sage: len(cache)
+        1
+        sage: cache.invalidate("p2", "v2")
+        2
+        sage: cache.get("p2", "v1", "f", "b.csv") is None
+        True
+        sage: len(cache)
+        0
+    """
+    def __init__(self, db_name):
+        r"""
+        Constructor.
+
+        INPUT:
+
+        - ``db_name`` -- string. The file name of the cache database.
+          It is created if it does not exist.
+        """
+        SQLiteCache.__init__(self, db_name)
+        conn = self.connection()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS artifact(
+            digest BLOB,
+            content BLOB,
+            PRIMARY KEY(digest))""")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS artifact_index(
+            database TEXT,
+            database_version TEXT,
+            bent_function_name TEXT,
+            artifact_name TEXT,
+            digest BLOB,
+            PRIMARY KEY(database, bent_function_name, artifact_name))""")
+        conn.commit()
+
+
+    def __len__(self):
+        r"""
+        Return the number of distinct artifacts in the cache.
+        """
+        return self.connection().execute(
+            "SELECT COUNT(*) FROM artifact").fetchone()[0]
+
+
+    def get_many(self, database, database_version, bent_function_name, names):
+        r"""
+        Return cached artifacts of a classification.
+
+        INPUT:
+
+        - ``database`` -- string. The name of the classification database.
+        - ``database_version`` -- string. The version of the database,
+          as per ``select_database_version``.
+        - ``bent_function_name`` -- string. The name of the bent function.
+        - ``names`` -- a list of strings. The names of the artifacts.
+
+        OUTPUT: a dictionary mapping the name of each cached artifact to its content.
+        Artifacts cached for a different version of the database are omitted.
+        """
+        names = list(names)
+        if not names:
+            return dict()
+        curs = self.connection().execute("""
+            SELECT artifact_name, content
+            FROM artifact_index
+            JOIN artifact USING(digest)
+            WHERE database = (?)
+            AND database_version = (?)
+            AND bent_function_name = (?)
+            AND artifact_name IN ({})""".format(",".join("?" * len(names))),
+            [database, database_version, bent_function_name] + names)
+        return {
+            artifact_name: bytes(content)
+            for artifact_name, content in curs.fetchall()}
+
+
+    def get(self, database, database_version, bent_function_name, name):
+        r"""
+        Return a cached artifact of a classification.
+
+        INPUT:
+
+        - ``database``, ``database_version``, ``bent_function_name`` -- as per ``get_many``.
+        - ``name`` -- string. The name of the artifact.
+
+        OUTPUT: a bytes object, or `None` if the artifact is not cached
+        for this version of the database.
+        """
+        return self.get_many(
+            database,
+            database_version,
+            bent_function_name,
+            [name]).get(name)
+
+
+    def get_chunks(
+        self,
+        database,
+        database_version,
+        bent_function_name,
+        name,
+        chunk_size=1 << 16):
+        r"""
+        Return an iterator over the content of a cached artifact, in chunks.
+
+        Each chunk is read from the cache as it is needed, so that a large artifact
+        can be sent without reading all of its content into memory.
+
+        INPUT:
+
+        - ``database``, ``database_version``, ``bent_function_name`` -- as per ``get_many``.
+        - ``name`` -- string. The name of the artifact.
+        - ``chunk_size`` -- integer (default: 65536). The number of bytes in each chunk.
+
+        OUTPUT: an iterator over bytes objects, or `None` if the artifact is not cached
+        for this version of the database. If the artifact is removed from the cache
+        while the iterator is in use, the iterator stops early.
+
+        EXAMPLES:
+
+        ::
+
+            sage: from boolean_cayley_graphs.classification_artifact_cache import ClassificationArtifactCache
+            sage: cache = ClassificationArtifactCache(tmp_filename(ext='.db'))
+            sage: cache.put_many("p2", "v1", "f", {"a.csv": b"0123456789"})
+            sage: list(cache.get_chunks("p2", "v1", "f", "a.csv", chunk_size=4))
+            [b'0123', b'4567', b'89']
+            sage: cache.get_chunks("p2", "v1", "f", "b.csv") is None
+            True
+        """
+        row = self.connection().execute("""
+            SELECT digest, length(content)
+            FROM artifact_index
+            JOIN artifact USING(digest)
+            WHERE database = (?)
+            AND database_version = (?)
+            AND bent_function_name = (?)
+            AND artifact_name = (?)""",
+            (database, database_version, bent_function_name, name)).fetchone()
+        if row is None:
+            return None
+        digest, size = row
+        return self._chunks(digest, size, chunk_size)
+
+
+    def _chunks(self, digest, size, chunk_size):
+        r"""
+        Generate the chunks of the content of an artifact, as per ``get_chunks``.
+        """
+        for start in range(0, size, chunk_size):
+            # The connection is obtained for each chunk, since a response
+            # may be generated in a different thread from the request.
+            row = self.connection().execute("""
+                SELECT substr(content, ?, ?)
+                FROM artifact
+                WHERE digest = (?)""",
+                (start + 1, chunk_size, digest)).fetchone()
+            if row is None:
+                return
+            yield bytes(row[0])
+
+
+    def put_many(self, database, database_version, bent_function_name, artifacts):
+        r"""
+        Store artifacts of a classification, in one transaction.
+
+        Each artifact replaces any artifact of the same name cached for the
+        same bent function. Artifacts with the same content are stored once.
+
+        INPUT:
+
+        - ``database``, ``database_version``, ``bent_function_name`` -- as per ``get_many``.
+        - ``artifacts`` -- a dictionary mapping artifact names to bytes objects.
+
+        OUTPUT: None.
+        """
+        digests = {
+            name: artifact_digest(content)
+            for name, content in artifacts.items()}
+        conn = self.connection()
+        with conn:
+            conn.executemany("""
+                INSERT OR IGNORE INTO artifact
+                VALUES (?,?)""",
+                [
+                    (digests[name], content)
+                    for name, content in artifacts.items()])
+            conn.executemany("""
+                INSERT OR REPLACE INTO artifact_index
+                VALUES (?,?,?,?,?)""",
+                [
+                    (database, database_version, bent_function_name, name, digest)
+                    for name, digest in digests.items()])
+
+
+    def invalidate(self, database, database_version):
+        r"""
+        Remove the artifacts of a database cached for other versions of the database.
+
+        INPUT:
+
+        - ``database`` -- string. The name of the classification database.
+        - ``database_version`` -- string. The current version of the database.
+
+        OUTPUT: the number of index entries removed.
+        """
+        conn = self.connection()
+        with conn:
+            nbr_removed = conn.execute("""
+                DELETE FROM artifact_index
+                WHERE database = (?)
+                AND database_version != (?)""",
+                (database, database_version)).rowcount
+            conn.execute("""
+                DELETE FROM artifact
+                WHERE digest NOT IN (
+                    SELECT digest
+                    FROM artifact_index)""")
+        return nbr_removed
+
+
+    def missing(self, database, database_version, bent_function_names, names=None):
+        r"""
+        Return the names of the bent functions with artifacts that are not cached.
+
+        INPUT:
+
+        - ``database``, ``database_version`` -- as per ``get_many``.
+        - ``bent_function_names`` -- an iterable of strings.
+        - ``names`` -- a list of strings (default: `None`). The names of the artifacts.
+          Default is None, meaning all of ``artifact_names``.
+
+        OUTPUT: a list of strings, in the order of ``bent_function_names``.
+        """
+        if names is None:
+            names = artifact_names
+        curs = self.connection().execute("""
+            SELECT bent_function_name, artifact_name
+            FROM artifact_index
+            WHERE database = (?)
+            AND database_version = (?)""",
+            (database, database_version))
+        cached = dict()
+        for bent_function_name, artifact_name in curs.fetchall():
+            cached.setdefault(bent_function_name, set()).add(artifact_name)
+        # A classification without a dual matrix has no artifact for it.
+        required = [name for name in names if not name.startswith("dual_")]
+        return [
+            bent_function_name
+            for bent_function_name in bent_function_names
+            if not cached.get(bent_function_name, set()).issuperset(required)]
+
+
+def _classification_artifacts_star(args):
+    r"""
+    Load and render the artifacts of a named classification, given a tuple of arguments.
+
+    This function is called by the worker processes of ``precompute_artifacts``.
+    """
+    bent_function_name, load_classification, names = args
+    return bent_function_name, classification_artifacts(
+        load_classification(bent_function_name),
+        names)
+
+
+def precompute_artifacts(
+    cache,
+    database,
+    database_version,
+    bent_function_names,
+    load_classification,
+    names=None,
+    ncpus=4,
+    verbose=False):
+    r"""
+    Render and cache the artifacts of a number of classifications that are not yet cached.
+
+    The artifacts cached for other versions of the database are first removed,
+    using ``invalidate``. A pool of worker processes loads the classifications and
+    renders their artifacts, while the parent process stores them in the cache.
+
+    INPUT:
+
+    - ``cache`` -- a ``ClassificationArtifactCache``.
+    - ``database``, ``database_version`` -- as per ``ClassificationArtifactCache.get_many``.
+    - ``bent_function_names`` -- an iterable of strings. The names of the bent functions.
+    - ``load_classification`` -- a function that returns the
+      ``BentFunctionCayleyGraphClassification`` of a bent function, given its name.
+      It is called by the worker processes, each of which should use its own
+      connection to the classification database.
+    - ``names`` -- a list of strings (default: `None`). The names of the artifacts.
+      Default is None, meaning all of ``artifact_names``.
+    - ``ncpus`` -- integer (default: 4). The number of worker processes.
+      If 1, no worker processes are used.
+    - ``verbose`` -- boolean (default: ``False``). If ``True``, print the progress.
+
+    OUTPUT: the number of classifications whose artifacts were rendered.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification as BentFunctionCGC
+        sage: from boolean_cayley_graphs.classification_artifact_cache import *
+        sage: c = {name: BentFunctionCGC.from_function(BentFunction(tt)) for name, tt in (("f0", [0,0,0,1]), ("f1", [1,1,0,1]))}
+        sage: cache = ClassificationArtifactCache(tmp_filename(ext='.db'))
+        sage: precompute_artifacts(cache, "p2", "v1", ["f0", "f1"], c.get, ncpus=2)
+        2
+        sage: cache.missing("p2", "v1", ["f0", "f1", "f2"])
+        ['f2']
+        sage: precompute_artifacts(cache, "p2", "v1", ["f0", "f1"], c.get, ncpus=2)
+        0
+    """
+    if names is None:
+        names = artifact_names
+    cache.invalidate(database, database_version)
+    tasks = [
+        (bent_function_name, load_classification, names)
+        for bent_function_name in cache.missing(
+            database,
+            database_version,
+            bent_function_names,
+            names)]
+
+    pool = (
+        multiprocessing.get_context("fork").Pool(ncpus)
+        if ncpus > 1 and len(tasks) > 1 else
+        None)
+    nbr_rendered = 0
+    try:
+        results = (
+            pool.imap_unordered(_classification_artifacts_star, tasks)
+            if pool is not None else
+            map(_classification_artifacts_star, tasks))
+        for bent_function_name, artifacts in results:
+            cache.put_many(database, database_version, bent_function_name, artifacts)
+            nbr_rendered += 1
+            if verbose:
+                print(
+                    datetime.datetime.now(),
+                    "rendered", nbr_rendered, "of", len(tasks))
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+    return nbr_rendered
@@ -0,0 +1,285 @@
+r"""
+Asynchronous reads from a classification database
+=================================================
+
+The ``classification_database_async`` module defines an ``asyncio`` interface
+for reading a database of Cayley graph classifications, using either
+``classification_database_sqlite3`` or ``classification_database_psycopg2``.
+
+Each read runs in a thread of an executor, using a connection from the
+``ConnectionManager`` of the database module, so that a slow read does not
+block the event loop, and concurrent reads run in parallel. When the task
+awaiting a read is cancelled, the statement running on its connection is
+interrupted, so that a server can abandon a read that is no longer wanted,
+for example when a user changes their selection.
+
+AUTHORS:
+
+- Paul Leopardi (2024-06-17): initial version
+
+"""
+#*****************************************************************************
+#       Copyright (C) 2024 Paul Leopardi paul.leopardi@gmail.com
+#
+#  Distributed under the terms of the GNU General Public License (GPL)
+#  as published by the Free Software Foundation; either version 2 of
+#  the License, or (at your option) any later version.
+#                  http://www.gnu.org/licenses/
+#*****************************************************************************
+
+from builtins import object
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import threading
+
+from boolean_cayley_graphs.bent_function import BentFunction
+
+
+class AsyncClassificationReader(object):
+    r"""
+    An ``asyncio`` interface for reading a classification database.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
+        sage: from boolean_cayley_graphs.classification_database_async import AsyncClassificationReader
+        sage: import boolean_cayley_graphs.classification_database_sqlite3 as cdb
+        sage: import asyncio
+        sage: db_name = tmp_filename(ext='.db')
+        sage: conn = cdb.create_classification_tables(db_name)
+        sage: bfcgc0 = BentFunctionCayleyGraphClassification.from_function(BentFunction([0,0,0,1]))
+        sage: bfcgc1 = BentFunctionCayleyGraphClassification.from_function(BentFunction([0,1,1,1]))
+        sage: cdb.insert_classifications(conn, [bfcgc0, bfcgc1], ["bentf0", "bentf1"])
+        sage: conn.close()
+        sage: reader = AsyncClassificationReader(cdb, cdb.ConnectionManager(db_name))
+        sage: async def client():
+        ....:     names = await reader.select_bent_function_names()
+        ....:     classifications = await asyncio.gather(*[
+        ....:         reader.select_classification_where_name(name)
+        ....:         for name in names])
+        ....:     projections = await reader.select_projections_where_name("bentf0")
+        ....:     return names, classifications, projections
+        sage: names, classifications, projections = asyncio.run(client())
+        sage: names
+        ['bentf0', 'bentf1']
+        sage: classifications == [bfcgc0, bfcgc1]
+        True
+        sage: projections["bent_cayley_graph_index"].tolist()
+        [[0, 0, 0, 1], [0, 1, 0, 0], [0, 0, 1, 0], [1, 0, 0, 0]]
+        sage: reader.close()
+        sage: cdb.drop_database(db_name)
+    """
+    def __init__(
+        self,
+        cdb,
+        manager,
+        max_workers=4):
+        r"""
+        Constructor.
+
+        INPUT:
+
+        - ``cdb`` -- the module ``classification_database_sqlite3`` or
+          ``classification_database_psycopg2``.
+        - ``manager`` -- a ``ConnectionManager`` of the module ``cdb``.
+        - ``max_workers`` -- integer (default: 4). The maximum number of
+          concurrent reads. For PostgreSQL, this should not exceed
+          the maximum number of connections in the pool of ``manager``.
+        """
+        self.cdb = cdb
+        self.manager = manager
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._lock = threading.Lock()
+        self._latest = dict()
+
+
+    async def run(self, function, *args):
+        r"""
+        Call a function of a connection in a thread of the executor.
+
+        If the awaiting task is cancelled while the function is running,
+        the statement running on the connection is interrupted.
+        If the task is cancelled before the function starts, the function is not called.
+
+        INPUT:
+
+        - ``function`` -- a function whose first argument is a connection object,
+          such as the ``select_`` functions of ``cdb``.
+        - ``args`` -- the remaining arguments of ``function``.
+
+        OUTPUT: the result of ``function``.
+        """
+        state = {"cancelled": False, "conn": None}
+        state_lock = threading.Lock()
+
+        def call():
+            with self.manager.connection() as conn:
+                with state_lock:
+                    if state["cancelled"]:
+                        return None
+                    state["conn"] = conn
+                try:
+                    return function(conn, *args)
+                finally:
+                    with state_lock:
+                        state["conn"] = None
+
+        future = asyncio.get_running_loop().run_in_executor(self.executor, call)
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            with state_lock:
+                state["cancelled"] = True
+                if state["conn"] is not None:
+                    self.manager.interrupt(state["conn"])
+            # Wait for the interrupted call to release its connection.
+            await asyncio.wait([future])
+            if not future.cancelled():
+                future.exception()
+            raise
+
+
+    async def latest(self, key, coroutine):
+        r"""
+        Await a coroutine, first cancelling any coroutine previously awaited for the same key.
+
+        This is intended for reads made on behalf of a user selection, such as
+        the bent function chosen in a dashboard, where only the latest selection matters.
+
+        INPUT:
+
+        - ``key`` -- a hashable object, such as a session identifier.
+        - ``coroutine`` -- a coroutine, such as the result of a method of this class.
+
+        OUTPUT: the result of ``coroutine``.
+
+        EXAMPLES:
+
+        ::
+
+            sage: from boolean_cayley_graphs.classification_database_async import AsyncClassificationReader
+            sage: import boolean_cayley_graphs.classification_database_sqlite3 as cdb
+            sage: import asyncio
+            sage: db_name = tmp_filename(ext='.db')
+            sage: conn = cdb.create_classification_tables(db_name)
+            sage: conn.close()
+            sage: reader = AsyncClassificationReader(cdb, cdb.ConnectionManager(db_name))
+            sage: async def client():
+            ....:     first = asyncio.ensure_future(reader.latest("user", asyncio.sleep(10)))
+            ....:     await asyncio.sleep(0)
+            ....:     second = await reader.latest("user", asyncio.sleep(0, "second"))
+            ....:     await asyncio.wait([first])
+            ....:     return first.cancelled(), second
+            sage: asyncio.run(client())
+            (True, 'second')
+            sage: reader.close()
+            sage: cdb.drop_database(db_name)
+        """
+        task = asyncio.ensure_future(coroutine)
+        with self._lock:
+            previous = self._latest.get(key)
+            self._latest[key] = task
+        if previous is not None and not previous.done():
+            previous.cancel()
+        try:
+            return await task
+        finally:
+            with self._lock:
+                if self._latest.get(key) is task:
+                    del self._latest[key]
+
+
+    async def select_bent_function_names(self):
+        r"""
+        Retrieve the names of the bent functions in the database.
+
+        OUTPUT: a sorted list of strings.
+        """
+        def select(conn):
+            return [
+                row[0]
+                for row in self.manager.execute_prepared(
+                    conn,
+                    "select_bent_function_names")]
+
+        return await self.run(select)
+
+
+    async def select_bent_function_where_name(self, name):
+        r"""
+        Retrieve the bent function with a given name.
+
+        INPUT:
+
+        - ``name`` -- string. The name of the bent function.
+
+        OUTPUT: an object of class ``BentFunction``, or `None` if there is no such name.
+        """
+        def select(conn):
+            row = self.manager.execute_prepared(
+                conn,
+                "select_bent_function_where_name",
+                (name,)).fetchone()
+            if row is None:
+                return None
+            return BentFunction.from_tt_buffer(row[0], bytes(row[1]))
+
+        return await self.run(select)
+
+
+    async def select_classification_where_name(self, name):
+        r"""
+        Retrieve the Cayley graph classification for a bent function with a given name.
+
+        INPUT:
+
+        - ``name`` -- string. The name of the bent function.
+
+        OUTPUT: class BentFunctionCayleyGraphClassification, or `None` if there is no such name.
+        """
+        return await self.run(self.cdb.select_classification_where_name, name)
+
+
+    async def select_projections_where_name(
+        self,
+        name,
+        matrix_columns=None):
+        r"""
+        Retrieve matrices of the classification of a bent function with a given name,
+        using concurrent reads.
+
+        INPUT:
+
+        - ``name`` -- string. The name of the bent function.
+        - ``matrix_columns`` -- a list of strings (default: `None`). The names of the
+          matrices to retrieve. Default is None, meaning ``cdb.matrix_columns``.
+
+        OUTPUT:
+
+        A dictionary mapping each name in ``matrix_columns`` to a ``numpy`` array,
+        as per ``cdb.select_matrix_where_bent_function``,
+        or `None` if there is no such name.
+        """
+        if matrix_columns is None:
+            matrix_columns = self.cdb.matrix_columns
+        bentf = await self.select_bent_function_where_name(name)
+        if bentf is None:
+            return None
+        matrices = await asyncio.gather(*[
+            self.run(self.cdb.select_matrix_where_bent_function, bentf, matrix_column)
+            for matrix_column in matrix_columns])
+        return dict(zip(matrix_columns, matrices))
+
+
+    def close(self):
+        r"""
+        Shut down the executor and close the connections of the manager.
+
+        The executor is shut down first, so that no thread is using a connection
+        when the connections are closed.
+        """
+        self.executor.shutdown(wait=True)
+        self.manager.close()
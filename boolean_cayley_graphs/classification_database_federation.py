@@ -0,0 +1,465 @@
+r"""
+Federation of sharded SQLite classification databases
+=====================================================
+
+The ``classification_database_federation`` module defines a federation of
+SQLite3 databases of Cayley graph classifications, as per
+``classification_database_sqlite3``, with one database, known as a shard,
+per family of bent functions, such as ``p6``, ``sigma`` or ``cast128``.
+
+Keeping the families in separate files means that each shard can have its own
+writer, so that shards can be populated in parallel. The federation ATTACHes
+all of the shards to one connection, so that a query over all families,
+such as finding all bent functions having a given Cayley graph, is a single
+statement, and routes each insertion to the shard of its family.
+
+AUTHORS:
+
+- Paul Leopardi (2024-06-10): initial version
+
+"""
+#*****************************************************************************
+#       Copyright (C) 2024 Paul Leopardi paul.leopardi@gmail.com
+#
+#  Distributed under the terms of the GNU General Public License (GPL)
+#  as published by the Free Software Foundation; either version 2 of
+#  the License, or (at your option) any later version.
+#                  http://www.gnu.org/licenses/
+#*****************************************************************************
+
+from builtins import object
+from collections import namedtuple
+import multiprocessing
+import os.path
+import sqlite3
+
+import boolean_cayley_graphs.classification_database_sqlite3 as cdb
+
+from boolean_cayley_graphs.bent_function import BentFunction
+from boolean_cayley_graphs.classification_database_population import classification_file_prefix, populate_database
+
+
+# A bent function, in a given shard, one of whose Cayley graphs has a given canonical label.
+ShardCayleyGraphMatch = namedtuple(
+    "ShardCayleyGraphMatch",
+    ["shard", "name", "nvariables", "bent_function", "cayley_graph_index"])
+
+
+def name_family(name):
+    r"""
+    Return the family of a bent function name.
+
+    INPUT:
+
+    - ``name`` -- string. The name of a bent function.
+
+    OUTPUT: a string. The part of ``name`` before the first underscore.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_federation import name_family
+        sage: name_family("cast128_1_9")
+        'cast128'
+        sage: name_family("p6")
+        'p6'
+    """
+    return name.split("_", 1)[0]
+
+
+def _check_shard_names(shard_names):
+    r"""
+    Check that each shard name can be used as the schema name of an attached database.
+    """
+    for shard in shard_names:
+        if not shard.isidentifier() or shard.lower() in ("main", "temp"):
+            raise ValueError("Invalid shard name: {!r}".format(shard))
+
+
+def create_shard_databases(shard_db_names, **kwargs):
+    r"""
+    Create the shard databases of a federation, with tables, unless they already exist.
+
+    INPUT:
+
+    - ``shard_db_names`` -- dictionary. The database name of each shard, by shard name.
+    - ``kwargs`` -- keyword arguments passed to ``create_classification_tables``.
+
+    OUTPUT: None.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_federation import create_shard_databases
+        sage: import os
+        sage: d = tmp_dir()
+        sage: shard_db_names = {"p2": os.path.join(d, "p2.db")}
+        sage: create_shard_databases(shard_db_names)
+        sage: os.path.isfile(shard_db_names["p2"])
+        True
+    """
+    _check_shard_names(shard_db_names)
+    for db_name in shard_db_names.values():
+        if not os.path.isfile(db_name):
+            conn = cdb.create_classification_tables(db_name, **kwargs)
+            conn.close()
+
+
+class ClassificationFederation(object):
+    r"""
+    A federation of shard databases, attached to one connection.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
+        sage: from boolean_cayley_graphs.classification_database_federation import *
+        sage: import os
+        sage: d = tmp_dir()
+        sage: shard_db_names = {"p2": os.path.join(d, "p2.db"), "q2": os.path.join(d, "q2.db")}
+        sage: create_shard_databases(shard_db_names)
+        sage: federation = ClassificationFederation(shard_db_names)
+        sage: bfcgc0 = BentFunctionCayleyGraphClassification.from_function(BentFunction([0,0,0,1]))
+        sage: bfcgc1 = BentFunctionCayleyGraphClassification.from_function(BentFunction([0,1,1,1]))
+        sage: federation.insert_classifications([bfcgc0, bfcgc1], ["p2_0", "q2_1"])
+        sage: matches = federation.select_matches_where_canonical_label("CK")
+        sage: [(m.shard, m.name, m.cayley_graph_index) for m in matches]
+        [('p2', 'p2_0', 0), ('q2', 'q2_1', 1)]
+        sage: federation.select_shard_where_name("q2_1")
+        'q2'
+        sage: federation.select_classification_where_name("q2_1") == bfcgc1
+        True
+        sage: federation.select_classification_where_name("r2_2") is None
+        True
+        sage: federation.insert_classification(bfcgc0, "r2_0")
+        Traceback (most recent call last):
+        ...
+        ValueError: No shard for name 'r2_0' with 2 variables.
+        sage: federation.close()
+    """
+    def __init__(
+        self,
+        shard_db_names,
+        nvariables_shards=None,
+        router=None):
+        r"""
+        Constructor.
+
+        INPUT:
+
+        - ``shard_db_names`` -- dictionary. The database name of each existing shard,
+          by shard name. Each shard name must be an identifier.
+          At most 10 shards can be attached, the default limit of SQLite.
+        - ``nvariables_shards`` -- dictionary (default: `None`). The shard name to use,
+          by number of variables, for bent functions whose name does not match a shard.
+        - ``router`` -- function (default: `None`). A function that maps the name of a bent
+          function to a shard name, or to `None`. Default is None, meaning ``name_family``.
+        """
+        _check_shard_names(shard_db_names)
+        self.shard_db_names = dict(shard_db_names)
+        self.nvariables_shards = (
+            dict(nvariables_shards)
+            if nvariables_shards is not None else
+            dict())
+        self.router = router if router is not None else name_family
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.row_factory = sqlite3.Row
+        for shard, db_name in sorted(self.shard_db_names.items()):
+            if not os.path.isfile(db_name):
+                raise IOError("File not found: {}".format(db_name))
+            self.conn.execute(
+                "ATTACH DATABASE ? AS {}".format(shard),
+                (db_name,))
+        self.shard_connections = dict()
+        self.codecs = {
+            shard: cdb.select_label_codec(self.shard_connection(shard))
+            for shard in self.shard_db_names}
+
+
+    def shard_connection(self, shard):
+        r"""
+        Return a connection to a single shard, opening it if necessary.
+
+        INPUT:
+
+        - ``shard`` -- string. The name of the shard.
+
+        OUTPUT: a database connection object.
+        """
+        if shard not in self.shard_connections:
+            self.shard_connections[shard] = cdb.connect_to_database(
+                self.shard_db_names[shard])
+        return self.shard_connections[shard]
+
+
+    def route(self, name, nvariables):
+        r"""
+        Return the shard name for a bent function.
+
+        The shard is chosen by the ``router`` applied to ``name``, if this is a shard name,
+        otherwise by ``nvariables_shards``.
+
+        INPUT:
+
+        - ``name`` -- string. The name of the bent function.
+        - ``nvariables`` -- integer. The number of variables of the bent function.
+
+        OUTPUT: a string.
+        """
+        shard = self.router(name) if name is not None else None
+        if shard not in self.shard_db_names:
+            shard = self.nvariables_shards.get(nvariables)
+        if shard not in self.shard_db_names:
+            raise ValueError("No shard for name {!r} with {} variables.".format(
+                name,
+                nvariables))
+        return shard
+
+
+    def insert_classifications(
+        self,
+        list_of_bfcgc,
+        names,
+        batch_size=64):
+        r"""
+        Insert a list of Cayley graph classifications, each into the shard given by ``route``.
+
+        INPUT:
+
+        - ``list_of_bfcgc`` -- a list of Cayley graph classifications.
+        - ``names`` -- a list of strings. The names of the bent functions.
+        - ``batch_size`` -- integer (default: 64). The number of classifications
+          to insert per transaction.
+
+        OUTPUT: None.
+        """
+        shard_batches = dict()
+        for bfcgc, name in zip(list_of_bfcgc, names):
+            shard = self.route(
+                name,
+                int(BentFunction(bfcgc.algebraic_normal_form).nvariables()))
+            shard_batches.setdefault(shard, ([], []))
+            shard_batches[shard][0].append(bfcgc)
+            shard_batches[shard][1].append(name)
+        for shard, (shard_list_of_bfcgc, shard_names) in sorted(shard_batches.items()):
+            cdb.insert_classifications(
+                self.shard_connection(shard),
+                shard_list_of_bfcgc,
+                shard_names,
+                batch_size=batch_size)
+
+
+    def insert_classification(self, bfcgc, name):
+        r"""
+        Insert a Cayley graph classification into the shard given by ``route``.
+
+        INPUT:
+
+        - ``bfcgc`` -- a Cayley graph classification.
+        - ``name`` -- string. The name of the bent function.
+
+        OUTPUT: None.
+        """
+        self.insert_classifications([bfcgc], [name])
+
+
+    def select_matches_where_canonical_label(self, canonical_label):
+        r"""
+        Retrieve the bent functions, in all shards, having a Cayley graph with a given canonical label.
+
+        All shards are searched using a single statement, which uses the index
+        on ``cayley_graph(canonical_label_hash)`` of each shard.
+
+        INPUT:
+
+        - ``canonical_label`` -- string. A graph6_string encoding a Graph canonical label.
+
+        OUTPUT:
+
+        A list of ``ShardCayleyGraphMatch`` named tuples, sorted by shard,
+        by name and by bent function.
+        """
+        cgcl_hash = cdb.canonical_label_hash(canonical_label)
+        shards = sorted(self.shard_db_names)
+        statement = "\nUNION ALL\n".join(
+            """
+            SELECT
+                '{shard}' AS shard,
+                bent_function.name AS name,
+                cayley_graph.nvariables AS nvariables,
+                cayley_graph.bent_function AS bent_function,
+                cayley_graph.cayley_graph_index AS cayley_graph_index,
+                graph.canonical_label AS canonical_label
+            FROM {shard}.cayley_graph AS cayley_graph
+            JOIN {shard}.graph AS graph
+                ON graph.canonical_label_hash = cayley_graph.canonical_label_hash
+            LEFT JOIN {shard}.bent_function AS bent_function
+                ON bent_function.nvariables = cayley_graph.nvariables
+                AND bent_function.bent_function = cayley_graph.bent_function
+            WHERE cayley_graph.canonical_label_hash = (?)""".format(shard=shard)
+            for shard in shards)
+        curs = self.conn.execute(
+            statement + "\nORDER BY shard, name, nvariables, bent_function",
+            (cgcl_hash,) * len(shards))
+        # Check for hash collisions -- very unlikely.
+        return [
+            ShardCayleyGraphMatch(
+                row["shard"],
+                row["name"],
+                row["nvariables"],
+                row["bent_function"],
+                row["cayley_graph_index"])
+            for row in curs.fetchall()
+            if self.codecs[row["shard"]].decode(
+                row["canonical_label"],
+                cgcl_hash) == canonical_label]
+
+
+    def select_shard_where_name(self, name):
+        r"""
+        Return the name of the shard containing a bent function with a given name.
+
+        INPUT:
+
+        - ``name`` -- string. The name of the bent function.
+
+        OUTPUT: a string, or `None` if no shard contains ``name``.
+        """
+        shards = sorted(self.shard_db_names)
+        statement = "\nUNION ALL\n".join(
+            """
+            SELECT '{shard}' AS shard
+            FROM {shard}.bent_function
+            WHERE name = (?)""".format(shard=shard)
+            for shard in shards)
+        row = self.conn.execute(
+            statement + "\nLIMIT 1",
+            (name,) * len(shards)).fetchone()
+        return row["shard"] if row is not None else None
+
+
+    def select_classification_where_name(self, name):
+        r"""
+        Retrieve the Cayley graph classification for a bent function with a given name,
+        from whichever shard contains it.
+
+        INPUT:
+
+        - ``name`` -- string. The name of the bent function.
+
+        OUTPUT: class BentFunctionCayleyGraphClassification,
+        or `None` if no shard contains ``name``.
+        """
+        shard = self.select_shard_where_name(name)
+        if shard is None:
+            return None
+        return cdb.select_classification_where_name(
+            self.shard_connection(shard),
+            name)
+
+
+    def close(self):
+        r"""
+        Close the federated connection and all shard connections.
+        """
+        for conn in self.shard_connections.values():
+            conn.close()
+        self.shard_connections = dict()
+        self.conn.close()
+
+
+def _populate_shard(shard, db_name, directory, pattern, batch_size):
+    r"""
+    Populate one shard database, in a worker process of ``populate_shards``.
+    """
+    conn = cdb.connect_to_database(db_name)
+    try:
+        return shard, populate_database(
+            conn,
+            cdb,
+            directory,
+            pattern=pattern,
+            ncpus=1,
+            batch_size=batch_size)
+    finally:
+        conn.close()
+
+
+def populate_shards(
+    shard_db_names,
+    directory,
+    patterns=None,
+    ncpus=None,
+    batch_size=32):
+    r"""
+    Populate shard databases from the classifications saved in a directory,
+    using one writer process per shard.
+
+    INPUT:
+
+    - ``shard_db_names`` -- dictionary. The database name of each existing shard,
+      by shard name.
+    - ``directory`` -- string. The directory containing the saved classifications.
+    - ``patterns`` -- dictionary (default: `None`). A glob pattern for the file names
+      of each shard, by shard name. The default pattern for a shard matches the files
+      saved using ``save_mangled`` with names whose family is the shard name.
+    - ``ncpus`` -- integer (default: `None`). The maximum number of writer processes.
+      Default is None, meaning one per shard.
+    - ``batch_size`` -- integer (default: 32). The number of classifications
+      to insert per transaction.
+
+    OUTPUT:
+
+    A dictionary containing the statistics returned by ``populate_database``,
+    for each shard, by shard name.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
+        sage: from boolean_cayley_graphs.classification_database_federation import *
+        sage: import os
+        sage: d = tmp_dir()
+        sage: bfcgc0 = BentFunctionCayleyGraphClassification.from_function(BentFunction([0,0,0,1]))
+        sage: bfcgc0.save_mangled("p2_0", dir=d)
+        sage: bfcgc1 = BentFunctionCayleyGraphClassification.from_function(BentFunction([1,0,0,0]))
+        sage: bfcgc1.save_mangled("q2_1", dir=d)
+        sage: shard_db_names = {"p2": os.path.join(d, "p2.db"), "q2": os.path.join(d, "q2.db")}
+        sage: create_shard_databases(shard_db_names)
+        sage: stats = populate_shards(shard_db_names, d)
+        sage: [(shard, stats[shard]["nbr_inserted"]) for shard in sorted(stats)]
+        [('p2', 1), ('q2', 1)]
+        sage: federation = ClassificationFederation(shard_db_names)
+        sage: federation.select_shard_where_name("q2_1")
+        'q2'
+        sage: federation.close()
+        sage: BentFunctionCayleyGraphClassification.remove_mangled("p2_0", dir=d)
+        sage: BentFunctionCayleyGraphClassification.remove_mangled("q2_1", dir=d)
+    """
+    _check_shard_names(shard_db_names)
+    if patterns is None:
+        patterns = dict()
+    tasks = [
+        (
+            shard,
+            db_name,
+            directory,
+            patterns.get(shard, classification_file_prefix + shard + "_*.sobj"),
+            batch_size)
+        for shard, db_name in sorted(shard_db_names.items())]
+    if ncpus is None:
+        ncpus = len(tasks)
+    if ncpus <= 1 or len(tasks) <= 1:
+        return dict(_populate_shard(*task) for task in tasks)
+    pool = multiprocessing.get_context("fork").Pool(min(ncpus, len(tasks)))
+    try:
+        return dict(pool.starmap(_populate_shard, tasks))
+    finally:
+        pool.terminate()
+        pool.join()
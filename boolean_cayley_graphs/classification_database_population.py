@@ -0,0 +1,323 @@
+r"""
+Population of a classification database from saved classifications
+===================================================================
+
+The ``classification_database_population`` module defines functions that
+insert the Cayley graph classifications saved in a directory into a database,
+using either ``classification_database_sqlite3`` or ``classification_database_psycopg2``.
+
+A pool of worker processes loads the saved classifications and prepares
+their rows, as per ``classification_rows``, while the parent process inserts
+the rows into the database in batches, so that the CPU bound loading, hashing
+and encoding overlaps with the I/O bound insertion. Classifications whose names
+are already in the database are skipped, so that an interrupted population
+can be resumed.
+
+AUTHORS:
+
+- Paul Leopardi (2024-04-29): initial version
+
+"""
+#*****************************************************************************
+#       Copyright (C) 2024 Paul Leopardi paul.leopardi@gmail.com
+#
+#  Distributed under the terms of the GNU General Public License (GPL)
+#  as published by the Free Software Foundation; either version 2 of
+#  the License, or (at your option) any later version.
+#                  http://www.gnu.org/licenses/
+#*****************************************************************************
+
+import datetime
+import glob
+import multiprocessing
+import os.path
+import time
+
+from sage.misc.persist import load
+
+from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
+
+
+# The prefix of the file names of classifications saved using ``save_mangled``.
+classification_file_prefix = BentFunctionCayleyGraphClassification.mangled_name("")
+
+
+def classification_name(file_name):
+    r"""
+    Return the name used with ``save_mangled`` to save a classification.
+
+    INPUT:
+
+    - ``file_name`` -- string. The file name of a saved classification.
+
+    OUTPUT: a string. The file name without its directory, class name prefix and extension.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_population import classification_name
+        sage: classification_name("/data/sobj/BentFunctionCayleyGraphClassification__cast128_1_9.sobj")
+        'cast128_1_9'
+        sage: classification_name("p6_1.sobj")
+        'p6_1'
+    """
+    name = os.path.basename(file_name)
+    if name.startswith(classification_file_prefix):
+        name = name[len(classification_file_prefix):]
+    if name.endswith(".sobj"):
+        name = name[:-len(".sobj")]
+    return name
+
+
+def classification_file_names(directory, pattern=None):
+    r"""
+    List the files of the classifications saved in a directory.
+
+    INPUT:
+
+    - ``directory`` -- string. The directory containing the saved classifications.
+    - ``pattern`` -- string (default: `None`). A glob pattern for the file names.
+      Default is None, meaning all files saved using
+      ``BentFunctionCayleyGraphClassification.save_mangled``.
+
+    OUTPUT: a sorted list of file names.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
+        sage: from boolean_cayley_graphs.classification_database_population import *
+        sage: d = tmp_dir()
+        sage: bfcgc = BentFunctionCayleyGraphClassification.from_function(BentFunction([0,0,0,1]))
+        sage: bfcgc.save_mangled("a", dir=d)
+        sage: [classification_name(file_name) for file_name in classification_file_names(d)]
+        ['a']
+        sage: BentFunctionCayleyGraphClassification.remove_mangled("a", dir=d)
+    """
+    if pattern is None:
+        pattern = classification_file_prefix + "*.sobj"
+    return sorted(glob.glob(os.path.join(directory, pattern)))
+
+
+def load_classification_file(file_name):
+    r"""
+    Load a saved classification.
+
+    INPUT:
+
+    - ``file_name`` -- string. The file name of a saved classification.
+
+    OUTPUT: an object of class ``BentFunctionCayleyGraphClassification``.
+    """
+    return BentFunctionCayleyGraphClassification(load(file_name))
+
+
+# The database module and the options of ``classification_rows``
+# used by the worker processes of ``populate_database``.
+_row_preparation = None
+
+
+def _init_row_preparation(cdb, options):
+    r"""
+    Record the database module and the options used to prepare rows,
+    in a worker process of ``populate_database``.
+
+    INPUT:
+
+    - ``cdb`` -- the module ``classification_database_sqlite3`` or
+      ``classification_database_psycopg2``.
+    - ``options`` -- a dictionary of keyword arguments for ``cdb.classification_rows``.
+    """
+    global _row_preparation
+    _row_preparation = (cdb, options)
+
+
+def prepare_classification_rows(file_name_and_name):
+    r"""
+    Load a saved classification and prepare its rows for insertion.
+
+    This function is called by the worker processes of ``populate_database``,
+    after ``_init_row_preparation``.
+
+    INPUT:
+
+    - ``file_name_and_name`` -- a pair of strings. The file name of
+      a saved classification and the name to record in the database.
+
+    OUTPUT: the ``ClassificationRows`` of the classification, as per ``cdb.classification_rows``.
+    """
+    file_name, name = file_name_and_name
+    cdb, options = _row_preparation
+    return cdb.classification_rows(
+        load_classification_file(file_name),
+        name,
+        **options)
+
+
+def select_bent_function_names(conn):
+    r"""
+    Return the set of names of the bent functions in a classification database.
+
+    INPUT:
+
+    - ``conn`` -- a connection object for the database.
+
+    OUTPUT: a set of strings.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_population import select_bent_function_names
+        sage: from boolean_cayley_graphs.classification_database_sqlite3 import *
+        sage: db_name = tmp_filename(ext='.db')
+        sage: conn = create_classification_tables(db_name)
+        sage: select_bent_function_names(conn)
+        set()
+        sage: conn.close()
+        sage: drop_database(db_name)
+    """
+    curs = conn.cursor()
+    curs.execute("""
+        SELECT name
+        FROM bent_function
+        WHERE name IS NOT NULL""")
+    return set(row[0] for row in curs.fetchall())
+
+
+def populate_database(
+    conn,
+    cdb,
+    directory,
+    pattern=None,
+    rename=None,
+    ncpus=4,
+    batch_size=32,
+    verbose=False):
+    r"""
+    Insert the classifications saved in a directory into a database.
+
+    INPUT:
+
+    - ``conn`` -- a connection object for the database.
+    - ``cdb`` -- the module ``classification_database_sqlite3`` or
+      ``classification_database_psycopg2``, matching ``conn``.
+    - ``directory`` -- string. The directory containing the saved classifications.
+    - ``pattern`` -- string (default: `None`). A glob pattern for the file names.
+      Default is None, meaning all files saved using
+      ``BentFunctionCayleyGraphClassification.save_mangled``.
+    - ``rename`` -- function (default: `None`). A function that maps the name used
+      to save each classification to the name to record in the database.
+      Default is None, meaning that the names are unchanged.
+    - ``ncpus`` -- integer (default: 4). The number of worker processes used
+      to load the classifications and prepare their rows.
+      If 1, no worker processes are used.
+    - ``batch_size`` -- integer (default: 32). The number of classifications
+      to insert per transaction.
+    - ``verbose`` -- boolean (default: ``False``). If ``True``,
+      print the progress and throughput after each batch.
+
+    OUTPUT:
+
+    A dictionary with keys ``"nbr_files"``, ``"nbr_skipped"``, ``"nbr_inserted"``,
+    ``"seconds"`` and ``"per_second"``, the number of classifications inserted per second.
+
+    EFFECT:
+
+    Each classification whose name is not already in the database is inserted.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
+        sage: from boolean_cayley_graphs.classification_database_population import populate_database
+        sage: import boolean_cayley_graphs.classification_database_sqlite3 as cdb
+        sage: d = tmp_dir()
+        sage: bfcgc0 = BentFunctionCayleyGraphClassification.from_function(BentFunction([0,0,0,1]))
+        sage: bfcgc0.save_mangled("f_0", dir=d)
+        sage: bfcgc1 = BentFunctionCayleyGraphClassification.from_function(BentFunction([1,0,0,0]))
+        sage: bfcgc1.save_mangled("f_1", dir=d)
+        sage: db_name = tmp_filename(ext='.db')
+        sage: conn = cdb.create_classification_tables(db_name)
+        sage: cdb.insert_classification(conn, bfcgc0, "f_0")
+        sage: stats = populate_database(conn, cdb, d, ncpus=2)
+        sage: [stats[key] for key in ("nbr_files", "nbr_skipped", "nbr_inserted")]
+        [2, 1, 1]
+        sage: cdb.select_classification_where_name(conn, "f_1") == bfcgc1
+        True
+        sage: stats = populate_database(conn, cdb, d, ncpus=1)
+        sage: [stats[key] for key in ("nbr_files", "nbr_skipped", "nbr_inserted")]
+        [2, 2, 0]
+        sage: conn.close()
+        sage: cdb.drop_database(db_name)
+        sage: BentFunctionCayleyGraphClassification.remove_mangled("f_0", dir=d)
+        sage: BentFunctionCayleyGraphClassification.remove_mangled("f_1", dir=d)
+    """
+    start_time = time.time()
+    file_names = classification_file_names(directory, pattern=pattern)
+    existing_names = select_bent_function_names(conn)
+    pending = []
+    for file_name in file_names:
+        name = classification_name(file_name)
+        if rename is not None:
+            name = rename(name)
+        if name not in existing_names:
+            pending.append((file_name, name))
+
+    nbr_inserted = 0
+
+    def insert_batch(batch):
+        nonlocal nbr_inserted
+        cdb.insert_classification_rows(
+            conn,
+            batch,
+            batch_size=len(batch))
+        nbr_inserted += len(batch)
+        if verbose:
+            seconds = time.time() - start_time
+            print(
+                datetime.datetime.now(),
+                "inserted", nbr_inserted, "of", len(pending),
+                "({:.2f} per second)".format(nbr_inserted / seconds))
+
+    # The forked workers inherit the module and options, which need not be picklable.
+    options = cdb.classification_row_options(conn)
+    pool = (
+        multiprocessing.get_context("fork").Pool(
+            ncpus,
+            initializer=_init_row_preparation,
+            initargs=(cdb, options))
+        if ncpus > 1 and len(pending) > 1 else
+        None)
+    try:
+        # The workers prepare rows while the parent inserts the previous batch.
+        if pool is not None:
+            prepared = pool.imap(prepare_classification_rows, pending)
+        else:
+            _init_row_preparation(cdb, options)
+            prepared = map(prepare_classification_rows, pending)
+        batch = []
+        for rows in prepared:
+            batch.append(rows)
+            if len(batch) == batch_size:
+                insert_batch(batch)
+                batch = []
+        if batch:
+            insert_batch(batch)
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+    seconds = time.time() - start_time
+    return {
+        "nbr_files": len(file_names),
+        "nbr_skipped": len(file_names) - len(pending),
+        "nbr_inserted": nbr_inserted,
+        "seconds": seconds,
+        "per_second": nbr_inserted / seconds if seconds > 0 else 0.0}
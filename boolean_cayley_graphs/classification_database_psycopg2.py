@@ -8,6 +8,14 @@ to manipulate a PostgreSQL database of Cayley graph classifications.
 AUTHORS:
 
 - Paul Leopardi (2017-10-28)
+- Paul Leopardi (2024-04-22): bulk insertion using COPY
+- Paul Leopardi (2024-05-06): indexed summaries of the classifications containing a Cayley graph
+- Paul Leopardi (2024-05-13): projection queries
+- Paul Leopardi (2024-05-20): summary tables
+- Paul Leopardi (2024-05-27): compressed canonical labels
+- Paul Leopardi (2024-06-03): connection pool and prepared statements
+- Paul Leopardi (2024-07-08): analytic strongly regular parameters
+- Paul Leopardi (2024-08-19): database version digest
 
 """
 #*****************************************************************************
@@ -20,10 +28,18 @@ AUTHORS:
 #*****************************************************************************
 
 from builtins import object
+from collections import namedtuple
 import binascii
 import hashlib
+import io
+import numpy as np
 import psycopg2
 import psycopg2.extras
+import psycopg2.pool
+import threading
+import uuid
+
+from contextlib import contextmanager
 
 from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT, quote_ident
 
@@ -31,6 +47,8 @@ from sage.matrix.constructor import matrix
 
 from boolean_cayley_graphs.bent_function import BentFunction
 from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification, default_algorithm
+from boolean_cayley_graphs.canonical_label_storage import CanonicalLabelCodec
+from boolean_cayley_graphs.strongly_regular_graph import bent_cayley_class_parameters
 from boolean_cayley_graphs.weight_class import weight_class
 
 
@@ -238,12 +256,177 @@ def drop_database(
             pass
     conn.close()
 
+# Statements used by ``ConnectionManager.execute_prepared``, by name.
+prepared_statements = {
+    "select_bent_function_names": """
+        SELECT name
+        FROM bent_function
+        WHERE name IS NOT NULL
+        ORDER BY name""",
+    "select_bent_function_where_name": """
+        SELECT nvariables, bent_function
+        FROM bent_function
+        WHERE name = $1"""}
+
+
+class ConnectionManager(object):
+    r"""
+    A manager of a pool of connections to an existing database, for read-heavy serving.
+
+    The connections are kept open in a ``ThreadedConnectionPool``, so that each call
+    borrows a connection rather than opening a new one. Each named statement run by
+    ``execute_prepared`` is prepared on a connection the first time that it is used
+    there, using ``PREPARE``, and is thereafter reused using ``EXECUTE``.
+
+    EXAMPLE:
+
+    ::
+
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
+        sage: from boolean_cayley_graphs.classification_database_psycopg2 import *
+        sage: dbname = 'doctest_connection_manager_dbname'
+        sage: drop_database(dbname)
+        sage: conn = create_database(dbname)
+        sage: conn.close()
+        sage: conn = create_classification_tables(dbname)
+        sage: bfcgc = BentFunctionCayleyGraphClassification.from_function(BentFunction([0,0,0,1]))
+        sage: insert_classification(conn, bfcgc, "bentf")
+        sage: conn.close()
+        sage: manager = ConnectionManager(dbname, maxconn=2)
+        sage: for _ in range(2):
+        ....:     with manager.connection() as conn:
+        ....:         [row["name"] for row in manager.execute_prepared(conn, "select_bent_function_names")]
+        ['bentf']
+        ['bentf']
+        sage: with manager.connection() as conn:
+        ....:     select_classification_where_name(conn, "bentf") == bfcgc
+        True
+        sage: manager.close()
+        sage: drop_database(dbname)
+    """
+    def __init__(
+        self,
+        dbname,
+        minconn=1,
+        maxconn=8,
+        user=None,
+        password=None,
+        host=None,
+        statements=None):
+        r"""
+        Constructor.
+
+        INPUT:
+
+        - ``dbname`` -- string. The name of the existing database.
+        - ``minconn`` -- integer (default: 1). The number of connections opened initially.
+        - ``maxconn`` -- integer (default: 8). The maximum number of open connections.
+        - ``user`` -- string, optional. A Postgres user with appropriate
+          permissions on the host.
+        - ``password`` -- string, optional. The Postgres password of ``user``.
+        - ``host`` -- string, optional. The machine running the Postgres database
+          management system that hosts the database.
+        - ``statements`` -- dictionary (default: `None`). Statements, by name, to add to
+          ``prepared_statements`` for use with ``execute_prepared``.
+          Parameters are written as ``$1``, ``$2``, etc.
+        """
+        self.pool = psycopg2.pool.ThreadedConnectionPool(
+            minconn,
+            maxconn,
+            dbname=dbname,
+            user=user,
+            password=password,
+            host=host)
+        self.statements = dict(prepared_statements)
+        if statements is not None:
+            self.statements.update(statements)
+        self._lock = threading.Lock()
+        self._prepared = dict()
+
+
+    @contextmanager
+    def connection(self):
+        r"""
+        Borrow a connection from the pool.
+
+        OUTPUT: a context manager that yields a database connection object.
+        The connection is returned to the pool after use, with any open
+        transaction rolled back.
+        """
+        conn = self.pool.getconn()
+        try:
+            yield conn
+        finally:
+            if conn.closed:
+                self.pool.putconn(conn, close=True)
+            else:
+                if conn.status != psycopg2.extensions.STATUS_READY:
+                    conn.rollback()
+                self.pool.putconn(conn)
+
+
+    def execute_prepared(self, conn, name, parameters=()):
+        r"""
+        Execute a named statement, preparing it on the connection if necessary.
+
+        INPUT:
+
+        - ``conn`` -- a connection object obtained from ``connection``.
+        - ``name`` -- string. The name of the statement.
+        - ``parameters`` -- tuple (default: ()). The parameters of the statement.
+
+        OUTPUT: a ``DictCursor`` containing the result of the statement.
+        """
+        # The backend process identifies the session, and so its prepared statements.
+        session = (id(conn), conn.get_backend_pid())
+        with self._lock:
+            prepared = self._prepared.setdefault(session, set())
+        curs = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
+        if name not in prepared:
+            curs.execute("PREPARE {} AS {}".format(name, self.statements[name]))
+            prepared.add(name)
+        if parameters:
+            curs.execute(
+                "EXECUTE {} ({})".format(name, ", ".join(["%s"] * len(parameters))),
+                parameters)
+        else:
+            curs.execute("EXECUTE {}".format(name))
+        return curs
+
+
+    def interrupt(self, conn):
+        r"""
+        Cancel any statement running on a connection.
+
+        This method may be called from any thread.
+        The cancelled statement raises ``psycopg2.extensions.QueryCanceledError``.
+
+        INPUT:
+
+        - ``conn`` -- a connection object obtained from ``connection``.
+
+        OUTPUT: None.
+        """
+        conn.cancel()
+
+
+    def close(self):
+        r"""
+        Close all of the connections in the pool.
+        """
+        self.pool.closeall()
+        with self._lock:
+            self._prepared.clear()
+
 
 def create_classification_tables(
     dbname,
     user=None,
     password=None,
-    host=None):
+    host=None,
+    label_storage="text",
+    label_store_directory=None):
     """
     Create the tables used for a database of Cayley graph classifications.
 
@@ -255,6 +438,13 @@ def create_classification_tables(
     - ``password`` -- string, optional. The Postgres password of ``user``.
     - ``host`` -- string, optional. The machine running the Postgres database
       management system that hosts the database.
+    - ``label_storage`` -- string (default: "text"). The storage method for
+      canonical labels, one of ``label_storage_methods``, as per the
+      ``canonical_label_storage`` module. Any method other than "text"
+      is recorded in the ``metadata`` table, which also contains
+      the version counter, as per ``create_version_counter``.
+    - ``label_store_directory`` -- string (default: `None`). The directory
+      of the store of canonical labels, used only if ``label_storage`` is "store".
 
     OUTPUT: a database connection object.
 
@@ -283,11 +473,17 @@ def create_classification_tables(
         ....:
         bent_function
         cayley_graph
+        class_summary
+        function_summary
         graph
+        graph_summary
         matrices
+        metadata
         sage: conn.close()
         sage: drop_database(dbname)
     """
+    # Check the storage method before creating any tables.
+    CanonicalLabelCodec(label_storage, label_store_directory)
     conn = connect_to_database(
         dbname,
         user=user,
@@ -305,7 +501,8 @@ def create_classification_tables(
         CREATE TABLE graph(
         graph_id SERIAL PRIMARY KEY,
         canonical_label_hash BYTEA UNIQUE,
-        canonical_label TEXT)""")
+        canonical_label {})""".format(
+            "BYTEA" if label_storage == "zlib" else "TEXT"))
     curs.execute("""
         CREATE TABLE cayley_graph(
         nvariables INTEGER,
@@ -333,383 +530,2051 @@ def create_classification_tables(
         FOREIGN KEY(bent_function, dual_cayley_graph_index)
             REFERENCES cayley_graph(bent_function, cayley_graph_index),
         PRIMARY KEY(bent_function, b, c))""")
+    if label_storage != "text":
+        curs.execute("""
+            CREATE TABLE metadata(
+            key TEXT PRIMARY KEY,
+            value TEXT)""")
+        curs.executemany("""
+            INSERT INTO metadata
+            VALUES (%s,%s)""",
+            [
+                ("label_storage", label_storage),
+                ("label_store_directory", label_store_directory)])
     conn.commit()
+    create_classification_indexes(conn)
+    create_summary_tables(conn)
+    create_version_counter(conn)
     return conn
 
 
-def canonical_label_hash(canonical_label):
-    r"""
-    Hash function for Graph canonical labels.
+def select_label_codec(conn):
+    """
+    Return the codec for the canonical labels stored in a database.
 
     INPUT:
 
-    - ``canonical_label`` -- string. A graph6_string encoding a Graph canonical label.
+    - ``conn`` -- a connection object for the database.
 
-    OUTPUT: The sha256 hash of ``canonical_label`` as a ``psycopg2.Binary`` buffer.
+    OUTPUT: a ``CanonicalLabelCodec`` using the storage method recorded in the
+    ``metadata`` table, or the "text" method if there is no ``metadata`` table.
 
-    TESTS:
+    EXAMPLE:
 
     ::
 
         sage: from boolean_cayley_graphs.classification_database_psycopg2 import *
-        sage: clh = canonical_label_hash("Arbitrary string")
-        sage: type(clh)
-        <class 'psycopg2.extensions.Binary'>
+        sage: dbname = 'doctest_select_label_codec_dbname'
+        sage: drop_database(dbname)
+        sage: conn = create_database(dbname)
+        sage: conn.close()
+        sage: conn = create_classification_tables(dbname, label_storage="zlib")
+        sage: select_label_codec(conn).method
+        'zlib'
+        sage: conn.close()
+        sage: drop_database(dbname)
     """
-    # return psycopg2.Binary(buffer(hashlib.sha256(canonical_label).digest()))
-    encoded_canonical_label = canonical_label.encode(encoding)
-    return psycopg2.Binary(hashlib.sha256(encoded_canonical_label).digest())
+    curs = conn.cursor()
+    curs.execute("SELECT to_regclass('metadata') IS NOT NULL")
+    if not curs.fetchone()[0]:
+        return CanonicalLabelCodec()
+    curs.execute("""
+        SELECT key, value
+        FROM metadata
+        WHERE key IN ('label_storage', 'label_store_directory')""")
+    metadata = dict(curs.fetchall())
+    return CanonicalLabelCodec(
+        metadata.get("label_storage", "text"),
+        metadata.get("label_store_directory"))
 
 
-def insert_classification(
-    conn,
-    bfcgc,
-    name=None):
+def _canonical_label_is_stored(conn, codec, cgcl_hash, canonical_label):
     """
-    Insert a Cayley graph classification into a database.
+    Test whether the ``graph`` table contains a given canonical label,
+    checking for a hash collision -- very unlikely.
 
     INPUT:
 
     - ``conn`` -- a connection object for the database.
-    - ``bfcgc`` -- a Cayley graph classification.
-    - ``name`` -- string (default: `None`). The name of the bent function.
+    - ``codec`` -- a ``CanonicalLabelCodec``.
+    - ``cgcl_hash`` -- ``psycopg2.Binary``. The hash of ``canonical_label``.
+    - ``canonical_label`` -- string. A graph6_string encoding a Graph canonical label.
 
-    OUTPUT: None.
+    OUTPUT: ``True`` if the label is stored, otherwise ``False``.
+    """
+    curs = conn.cursor()
+    curs.execute("""
+        SELECT canonical_label
+        FROM graph
+        WHERE canonical_label_hash = (%s)""",
+        (cgcl_hash,))
+    row = curs.fetchone()
+    return row is not None and codec.decode(row[0], cgcl_hash.adapted) == canonical_label
 
-    A cursor object corresponding to state of the database after the
-    classification is inserted.
 
-    EXAMPLE:
+def create_classification_indexes(conn):
+    """
+    Create the secondary indexes used by a database of Cayley graph classifications,
+    if they do not already exist.
 
-    Create a database, with tables, using a standardized name, insert
-    a classification, retrieve it by bent function, then drop the database.
+    This function is called by ``create_classification_tables``.
+    It can also be used to add the indexes to an existing database.
+
+    INPUT:
+
+    - ``conn`` -- a connection object for the database.
+
+    OUTPUT: None.
+
+    EXAMPLE:
 
     ::
 
         sage: from boolean_cayley_graphs.classification_database_psycopg2 import *
-        sage: from boolean_cayley_graphs.bent_function import BentFunction
-        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
-        sage: bentf = BentFunction([0,0,0,1])
-        sage: bfcgc = BentFunctionCayleyGraphClassification.from_function(bentf)
-        sage: bfcgc.algebraic_normal_form
-        x0*x1
-        sage: dbname = 'doctest_insert_classification_dbname'
+        sage: dbname = 'doctest_create_classification_indexes_dbname'
         sage: drop_database(dbname)
         sage: conn = create_database(dbname)
         sage: conn.close()
         sage: conn = create_classification_tables(dbname)
-        sage: insert_classification(conn, bfcgc, 'bentf')
-        sage: result = select_classification_where_bent_function(conn, bentf)
-        sage: result.algebraic_normal_form
-        x0*x1
+        sage: create_classification_indexes(conn)
+        sage: curs = conn.cursor()
+        sage: curs.execute(
+        ....:     "SELECT indexname FROM pg_indexes " +
+        ....:     "WHERE tablename = 'cayley_graph' AND indexname LIKE 'cayley_graph_graph_id%'")
+        sage: [row[0] for row in curs]
+        ['cayley_graph_graph_id']
         sage: conn.close()
         sage: drop_database(dbname)
     """
-    bentf = BentFunction(bfcgc.algebraic_normal_form)
-    dim = bentf.nvariables()
-    nvar = int(dim)
-    bftt = psycopg2.Binary(bentf.tt_buffer())
-    cgcl = bfcgc.cayley_graph_class_list
-    bcim = bfcgc.bent_cayley_graph_index_matrix
-    dcim = bfcgc.dual_cayley_graph_index_matrix
-    wcm  = bfcgc.weight_class_matrix
-
-    curs = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
+    curs = conn.cursor()
     curs.execute("""
-        INSERT INTO bent_function
-        VALUES (%s,%s,%s)""",
-        (nvar, bftt, name))
-    for n in range(len(cgcl)):
-        cgc = cgcl[n]
-        cgc_hash = canonical_label_hash(cgc)
-        curs.execute("""
-            INSERT INTO graph
-            VALUES (%s,%s,%s)
-            ON CONFLICT DO NOTHING""",
-            (PSYCOPG2_DEFAULT, cgc_hash, cgc))
+        CREATE INDEX IF NOT EXISTS cayley_graph_graph_id
+        ON cayley_graph(graph_id)""")
+    conn.commit()
 
-        curs.execute("""
-            SELECT graph_id
-            FROM graph
-            WHERE canonical_label_hash = (%s)""",
-            (cgc_hash,))
 
-        row = curs.fetchone()
-        graph_id = row["graph_id"]
+def create_summary_tables(conn):
+    """
+    Create the summary tables of a database of Cayley graph classifications,
+    if they do not already exist.
 
-        curs.execute("""
-            INSERT INTO cayley_graph
-            VALUES (%s,%s,%s,%s)""",
-            (nvar, bftt, n, graph_id))
+    The summary tables are:
 
-    v = 2 ** dim
-    for b in range(v):
-        matrices_b_rows = (
-            (
-                nvar,
-                bftt,
-                b,
-                c,
-                int(bcim[c,b]),
-                int(dcim[c,b]),
-                int(wcm[c,b]))
-            for c in range(v))
-        curs.executemany("""
-            INSERT INTO matrices
-            VALUES (%s,%s,%s,%s,%s,%s,%s)""",
-            matrices_b_rows)
+    - ``function_summary``: the number of extended Cayley classes of each bent function;
+    - ``class_summary``: the number of cells of the bent and dual Cayley graph index matrices
+      in each extended Cayley class of each bent function;
+    - ``graph_summary``: the number of bent functions whose classification contains each graph.
+
+    This function is called by ``create_classification_tables``.
+    The summary tables are maintained by ``insert_classifications``,
+    and can be rebuilt from the other tables by ``rebuild_summary_tables``.
+
+    INPUT:
+
+    - ``conn`` -- a connection object for the database.
 
+    OUTPUT: None.
+    """
+    curs = conn.cursor()
+    curs.execute("""
+        CREATE TABLE IF NOT EXISTS function_summary(
+        nvariables INTEGER,
+        bent_function BYTEA,
+        nbr_classes INTEGER,
+        FOREIGN KEY(nvariables, bent_function)
+            REFERENCES bent_function(nvariables, bent_function),
+        PRIMARY KEY(nvariables, bent_function))""")
+    curs.execute("""
+        CREATE TABLE IF NOT EXISTS class_summary(
+        nvariables INTEGER,
+        bent_function BYTEA,
+        cayley_graph_index INTEGER,
+        nbr_bent_cells INTEGER,
+        nbr_dual_cells INTEGER,
+        FOREIGN KEY(bent_function, cayley_graph_index)
+            REFERENCES cayley_graph(bent_function, cayley_graph_index),
+        PRIMARY KEY(bent_function, cayley_graph_index))""")
+    curs.execute("""
+        CREATE TABLE IF NOT EXISTS graph_summary(
+        graph_id INTEGER PRIMARY KEY,
+        nbr_functions INTEGER,
+        FOREIGN KEY(graph_id)
+            REFERENCES graph(graph_id))""")
     conn.commit()
 
 
-def select_classification_where_bent_function(
-    conn,
-    bentf):
+def has_summary_tables(conn):
     """
-    Retrieve a Cayley graph classification for a given bent function from a database.
+    Test whether a database has summary tables.
 
     INPUT:
 
     - ``conn`` -- a connection object for the database.
-    - ``bentf`` -- class BentFunction. A bent function.
-
-    OUTPUT:
 
-    class BentFunctionCayleyGraphClassification.
-    The corresponding a Cayley graph classification.
+    OUTPUT: ``True`` if the database has a ``function_summary`` table, otherwise ``False``.
 
     EXAMPLE:
 
-    Create a database, with tables, using a standardized name, insert
-    a classification, retrieve it by bent function, then drop the database.
-
     ::
 
         sage: from boolean_cayley_graphs.classification_database_psycopg2 import *
-        sage: from boolean_cayley_graphs.bent_function import BentFunction
-        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
-        sage: bentf = BentFunction([0,0,0,1])
-        sage: bfcgc = BentFunctionCayleyGraphClassification.from_function(bentf)
-        sage: bfcgc.algebraic_normal_form
-        x0*x1
-        sage: dbname = 'doctest_select_classification_where_bent_function_dbname'
+        sage: dbname = 'doctest_has_summary_tables_dbname'
         sage: drop_database(dbname)
         sage: conn = create_database(dbname)
         sage: conn.close()
         sage: conn = create_classification_tables(dbname)
-        sage: insert_classification(conn, bfcgc, 'bentf')
-        sage: result = select_classification_where_bent_function(conn, bentf)
-        sage: result.algebraic_normal_form
-        x0*x1
-        sage: type(result)
-        <class 'boolean_cayley_graphs.bent_function_cayley_graph_classification.BentFunctionCayleyGraphClassification'>
-        sage: result.report(report_on_matrix_details=True)
-        Algebraic normal form of Boolean function: x0*x1
-        Function is bent.
-        <BLANKLINE>
-        Weight class matrix:
-        [0 0 0 1]
-        [0 1 0 0]
-        [0 0 1 0]
-        [1 0 0 0]
-        <BLANKLINE>
-        SDP design incidence structure t-design parameters: (True, (1, 4, 1, 1))
-        <BLANKLINE>
-        Classification of Cayley graphs and classification of Cayley graphs of duals are the same:
-        <BLANKLINE>
-        There are 2 extended Cayley classes in the extended translation class.
-        <BLANKLINE>
-        Matrix of indices of Cayley graphs:
-        [0 0 0 1]
-        [0 1 0 0]
-        [0 0 1 0]
-        [1 0 0 0]
+        sage: has_summary_tables(conn)
+        True
         sage: conn.close()
         sage: drop_database(dbname)
     """
-    dim = bentf.nvariables()
-    nvar = int(dim)
-    bftt = psycopg2.Binary(bentf.tt_buffer())
-
-    curs = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
-    curs.execute("""
-        SELECT COUNT(*)
-        FROM cayley_graph
-        WHERE nvariables = (%s)
-        AND bent_function = (%s)""",
-        (nvar, bftt))
-    row = curs.fetchone()
-    if row == None:
-        return None
+    curs = conn.cursor()
+    curs.execute("SELECT to_regclass('function_summary') IS NOT NULL")
+    return curs.fetchone()[0]
 
-    cgcl_len = row[0]
-    cgcl = [None] * cgcl_len
-    curs.execute("""
-        SELECT cayley_graph_index, canonical_label
-        FROM cayley_graph, graph
-        WHERE nvariables = (%s)
-        AND bent_function = (%s)
-        AND cayley_graph.graph_id = graph.graph_id""",
-        (nvar, bftt))
-    for row in curs:
-        cayley_graph_index = row["cayley_graph_index"]
-        canonical_label = row["canonical_label"]
-        cgcl[cayley_graph_index] = str(canonical_label)
 
-    v = 2 ** dim
-    bcim = matrix(v, v)
-    dcim = matrix(v, v)
-    wcm  = matrix(v, v)
-    curs.execute("""
-        SELECT *
-        FROM matrices
-        WHERE nvariables = (%s)
-        AND bent_function = (%s)""",
-        (nvar, bftt))
-    for row in curs:
-        b = row["b"]
-        c = row["c"]
+def canonical_label_hash(canonical_label):
+    r"""
+    Hash function for Graph canonical labels.
 
-        bent_cayley_graph_index = row["bent_cayley_graph_index"]
-        bcim[c, b] = bent_cayley_graph_index
+    INPUT:
 
-        dual_cayley_graph_index = row["dual_cayley_graph_index"]
-        dcim[c, b] = dual_cayley_graph_index
+    - ``canonical_label`` -- string. A graph6_string encoding a Graph canonical label.
 
-        weight_class = row["weight_class"]
-        wcm[c, b] = weight_class
+    OUTPUT: The sha256 hash of ``canonical_label`` as a ``psycopg2.Binary`` buffer.
 
-    return BentFunctionCayleyGraphClassification(
-        algebraic_normal_form=bentf.algebraic_normal_form(),
-        cayley_graph_class_list=cgcl,
-        bent_cayley_graph_index_matrix=bcim,
-        dual_cayley_graph_index_matrix=dcim,
-        weight_class_matrix=wcm)
+    TESTS:
 
+    ::
 
-def select_classification_where_bent_function_cayley_graph(
+        sage: from boolean_cayley_graphs.classification_database_psycopg2 import *
+        sage: clh = canonical_label_hash("Arbitrary string")
+        sage: type(clh)
+        <class 'psycopg2.extensions.Binary'>
+    """
+    # return psycopg2.Binary(buffer(hashlib.sha256(canonical_label).digest()))
+    encoded_canonical_label = canonical_label.encode(encoding)
+    return psycopg2.Binary(hashlib.sha256(encoded_canonical_label).digest())
+
+
+def bytea_copy_text(data):
+    r"""
+    Encode binary data as a ``bytea`` value in the text format of ``COPY``.
+
+    INPUT:
+
+    - ``data`` -- a bytes-like object.
+
+    OUTPUT: a string containing the hex format of ``data``,
+    with its backslash escaped as required by ``COPY``.
+
+    TESTS:
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_psycopg2 import *
+        sage: print(bytea_copy_text(b"\x01\xab"))
+        \\x01ab
+    """
+    return "\\\\x" + binascii.hexlify(bytes(data)).decode(encoding)
+
+
+def copy_rows(curs, table, rows):
+    r"""
+    Use ``COPY FROM STDIN`` to append rows to a table.
+
+    INPUT:
+
+    - ``curs`` -- a cursor object for the database.
+    - ``table`` -- string. The name of the table.
+    - ``rows`` -- an iterable of strings. Each string is a row in
+      the text format of ``COPY``, with tab separated columns
+      and without a terminating newline.
+
+    OUTPUT: None.
+    """
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write(row)
+        buffer.write("\n")
+    buffer.seek(0)
+    curs.copy_expert(
+        "COPY %s FROM STDIN" % quote_ident(table, curs),
+        buffer)
+
+
+def insert_graphs(curs, canonical_labels, codec=None):
+    r"""
+    Insert a list of canonical labels into the ``graph`` table,
+    skipping those already present, and return their ``graph_id`` values.
+
+    A single statement both inserts the new labels and selects the existing ones,
+    using ``INSERT ... ON CONFLICT DO NOTHING RETURNING``.
+
+    INPUT:
+
+    - ``curs`` -- a cursor object for the database.
+    - ``canonical_labels`` -- a list of strings. Graph6 strings encoding Graph canonical labels.
+    - ``codec`` -- a ``CanonicalLabelCodec`` (default: `None`).
+      The codec used to store canonical labels. Default is None, meaning text.
+
+    OUTPUT: a dictionary mapping each of ``canonical_labels`` to its ``graph_id``.
+
+    EXAMPLE:
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_psycopg2 import *
+        sage: dbname = 'doctest_insert_graphs_dbname'
+        sage: drop_database(dbname)
+        sage: conn = create_database(dbname)
+        sage: conn.close()
+        sage: conn = create_classification_tables(dbname)
+        sage: curs = conn.cursor()
+        sage: graph_ids = insert_graphs(curs, ["C~", "CK"])
+        sage: sorted(insert_graphs(curs, ["CK", "C~"]).items()) == sorted(graph_ids.items())
+        True
+        sage: curs.execute("SELECT COUNT(*) FROM graph")
+        sage: curs.fetchone()[0]
+        2
+        sage: conn.close()
+        sage: drop_database(dbname)
+    """
+    if codec is None:
+        codec = CanonicalLabelCodec()
+    encoded_graphs = []
+    for label in sorted(set(canonical_labels)):
+        clh = hashlib.sha256(label.encode(encoding)).digest()
+        encoded_graphs.append((label, clh, codec.encode(label, clh)))
+    return _insert_encoded_graphs(curs, encoded_graphs, codec.method)
+
+
+def _insert_encoded_graphs(curs, encoded_graphs, label_storage):
+    r"""
+    Insert a list of encoded canonical labels into the ``graph`` table,
+    skipping those already present, and return their ``graph_id`` values.
+
+    INPUT:
+
+    - ``curs`` -- a cursor object for the database.
+    - ``encoded_graphs`` -- a list of tuples ``(label, label_hash, value)``,
+      where ``label_hash`` is the SHA-256 digest of ``label`` and ``value``
+      is the label encoded by a ``CanonicalLabelCodec``.
+    - ``label_storage`` -- string. The storage method of the codec.
+
+    OUTPUT: a dictionary mapping each label to its ``graph_id``.
+    """
+    hash_label = dict()
+    hash_value = dict()
+    for label, clh, value in encoded_graphs:
+        clh = bytes(clh)
+        hash_label[clh] = label
+        hash_value[clh] = value
+    if not hash_label:
+        return dict()
+
+    def encoded_label(value):
+        return psycopg2.Binary(value) if isinstance(value, bytes) else value
+
+    rows = psycopg2.extras.execute_values(
+        curs,
+        """
+        WITH input(canonical_label_hash, canonical_label) AS (
+            VALUES %s),
+        inserted AS (
+            INSERT INTO graph(canonical_label_hash, canonical_label)
+            SELECT canonical_label_hash, canonical_label
+            FROM input
+            ON CONFLICT (canonical_label_hash) DO NOTHING
+            RETURNING canonical_label_hash, graph_id)
+        SELECT canonical_label_hash, graph_id
+        FROM inserted
+        UNION ALL
+        SELECT graph.canonical_label_hash, graph.graph_id
+        FROM graph, input
+        WHERE graph.canonical_label_hash = input.canonical_label_hash""",
+        [
+            (psycopg2.Binary(clh), encoded_label(value))
+            for clh, value in hash_value.items()],
+        template="(%s::BYTEA, %s::{})".format(
+            "BYTEA" if label_storage == "zlib" else "TEXT"),
+        page_size=len(hash_label),
+        fetch=True)
+    graph_ids = {
+        hash_label[bytes(row[0])]: row[1]
+        for row in rows}
+    if len(graph_ids) < len(hash_label):
+        # A concurrent transaction inserted some of the labels
+        # after this statement took its snapshot.
+        curs.execute("""
+            SELECT canonical_label_hash, graph_id
+            FROM graph
+            WHERE canonical_label_hash = ANY(%s)""",
+            ([
+                psycopg2.Binary(clh)
+                for clh, label in hash_label.items()
+                if label not in graph_ids],))
+        for row in curs.fetchall():
+            graph_ids[hash_label[bytes(row[0])]] = row[1]
+    return graph_ids
+
+
+# The rows of one Cayley graph classification, ready to insert into a database.
+ClassificationRows = namedtuple(
+    "ClassificationRows",
+    [
+        "nvariables",
+        "bent_function",
+        "name",
+        "graphs",
+        "class_counts",
+        "matrices"])
+ClassificationRows.__doc__ = """
+The rows of one Cayley graph classification, ready to insert into a database,
+as returned by ``classification_rows``.
+
+- ``nvariables``, ``bent_function``, ``name`` -- the row of the ``bent_function`` table.
+- ``graphs`` -- a list of tuples ``(label, label_hash, value)``, one per class,
+  as per ``_insert_encoded_graphs``.
+- ``class_counts`` -- a list of pairs ``(bent_count, dual_count)``, one per class,
+  or ``None`` if the database has no summary tables.
+- ``matrices`` -- a list of strings. The rows of the ``matrices`` table,
+  in the text format of ``COPY``.
+"""
+
+
+def classification_row_options(conn):
+    """
+    Return the options of ``classification_rows`` that match a database.
+
+    INPUT:
+
+    - ``conn`` -- a connection object for the database.
+
+    OUTPUT: a dictionary with keys "summary_tables" and "codec".
+    """
+    return {
+        "summary_tables": has_summary_tables(conn),
+        "codec": select_label_codec(conn)}
+
+
+def classification_rows(
+    bfcgc,
+    name=None,
+    summary_tables=False,
+    codec=None):
+    """
+    Prepare the rows of a Cayley graph classification, ready to insert into a database.
+
+    This function does not use a database connection, so that the rows
+    can be prepared by worker processes, as per ``populate_database``.
+
+    INPUT:
+
+    - ``bfcgc`` -- a Cayley graph classification.
+    - ``name`` -- string (default: `None`). The name of the bent function.
+    - ``summary_tables`` -- boolean (default: ``False``).
+      Whether the database has summary tables to maintain.
+    - ``codec`` -- a ``CanonicalLabelCodec`` (default: `None`).
+      The codec used to store canonical labels. Default is None, meaning text.
+
+    OUTPUT: a ``ClassificationRows``.
+
+    EXAMPLE:
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_psycopg2 import *
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
+        sage: bfcgc = BentFunctionCayleyGraphClassification.from_function(BentFunction([0,0,0,1]))
+        sage: rows = classification_rows(bfcgc, "bentf")
+        sage: rows.nvariables, [label for label, clh, value in rows.graphs], len(rows.matrices)
+        (2, ['C~', 'CK'], 16)
+    """
+    if codec is None:
+        codec = CanonicalLabelCodec()
+    bentf = BentFunction(bfcgc.algebraic_normal_form)
+    nvar = int(bentf.nvariables())
+    bftt = bentf.tt_buffer()
+    cgcl = bfcgc.cayley_graph_class_list
+
+    graphs = []
+    for label in cgcl:
+        clh = hashlib.sha256(label.encode(encoding)).digest()
+        graphs.append((label, clh, codec.encode(label, clh)))
+
+    class_counts = None
+    if summary_tables:
+        class_counts = list(zip(
+            bfcgc.class_cell_index().counts.tolist(),
+            bfcgc.class_cell_index(dual=True).counts.tolist()))
+
+    # The rows of the matrices table are in the order b, c.
+    prefix = "%d\t%s\t" % (nvar, bytea_copy_text(bftt))
+    v = 2 ** nvar
+    c_array, b_array = np.meshgrid(np.arange(v), np.arange(v), indexing="ij")
+    columns = np.stack([
+        b_array,
+        c_array,
+        bfcgc.bent_cayley_graph_index_matrix.numpy(),
+        bfcgc.dual_cayley_graph_index_matrix.numpy(),
+        bfcgc.weight_class_matrix.numpy()]).astype(np.int64)
+    cells = columns.transpose(2, 1, 0).reshape(v * v, 5)
+    matrices = [
+        prefix + "%d\t%d\t%d\t%d\t%d" % tuple(cell)
+        for cell in cells.tolist()]
+
+    return ClassificationRows(
+        nvariables=nvar,
+        bent_function=bftt,
+        name=name,
+        graphs=graphs,
+        class_counts=class_counts,
+        matrices=matrices)
+
+
+def insert_classification_rows(
     conn,
-    bentf,
-    algorithm=default_algorithm):
+    list_of_rows,
+    batch_size=64):
     """
-    Given a bent function ``bentf``, retrieve all classifications that
-    contain a Cayley graph isomorphic to the Cayley graph of ``bentf``.
+    Insert the prepared rows of a list of Cayley graph classifications into a database, in bulk.
+
+    The classifications are inserted in batches of ``batch_size``,
+    with one transaction per batch. Within each batch, the canonical labels
+    of all of the classifications are resolved to ``graph_id`` values using
+    a single statement, and the ``cayley_graph`` and ``matrices`` rows
+    are loaded using ``COPY FROM STDIN``.
 
     INPUT:
 
     - ``conn`` -- a connection object for the database.
-    - ``bentf`` -- class BentFunction. A bent function.
-    - ``algorithm`` -- string (default: BentFunctionCayleyGraphClassification.default_algorithm). 
-      Algorithm used for canonical labelling.
+    - ``list_of_rows`` -- a list of ``ClassificationRows``, as returned by
+      ``classification_rows`` with the options given by ``classification_row_options``.
+    - ``batch_size`` -- integer (default: 64). The number of classifications
+      to insert per transaction.
 
-    OUTPUT:
+    OUTPUT: None.
+    """
+    summary_tables = has_summary_tables(conn)
+    label_storage = select_label_codec(conn).method
+    curs = conn.cursor()
+    for batch_start in range(0, len(list_of_rows), batch_size):
+        batch = list_of_rows[batch_start:batch_start + batch_size]
+
+        psycopg2.extras.execute_values(
+            curs,
+            """
+            INSERT INTO bent_function
+            VALUES %s""",
+            [
+                (rows.nvariables, psycopg2.Binary(rows.bent_function), rows.name)
+                for rows in batch],
+            page_size=len(batch))
+
+        graph_ids = _insert_encoded_graphs(
+            curs,
+            [
+                graph
+                for rows in batch
+                for graph in rows.graphs],
+            label_storage)
+
+        cayley_graph_rows = []
+        matrices_rows = []
+        function_summary_rows = []
+        class_summary_rows = []
+        graph_function_counts = dict()
+        for rows in batch:
+            prefix = "%d\t%s\t" % (rows.nvariables, bytea_copy_text(rows.bent_function))
+            cgcl = [label for label, clh, value in rows.graphs]
+            cayley_graph_rows.extend(
+                prefix + "%d\t%d" % (n, graph_ids[cgc])
+                for n, cgc in enumerate(cgcl))
+
+            if summary_tables:
+                function_summary_rows.append(prefix + "%d" % len(cgcl))
+                class_summary_rows.extend(
+                    prefix + "%d\t%d\t%d" % (n, bent_count, dual_count)
+                    for n, (bent_count, dual_count) in enumerate(rows.class_counts))
+                for cgc in cgcl:
+                    graph_id = graph_ids[cgc]
+                    graph_function_counts[graph_id] = graph_function_counts.get(graph_id, 0) + 1
+
+            matrices_rows.extend(rows.matrices)
+
+        copy_rows(curs, "cayley_graph", cayley_graph_rows)
+        copy_rows(curs, "matrices", matrices_rows)
+        if summary_tables:
+            copy_rows(curs, "function_summary", function_summary_rows)
+            copy_rows(curs, "class_summary", class_summary_rows)
+            psycopg2.extras.execute_values(
+                curs,
+                """
+                INSERT INTO graph_summary
+                VALUES %s
+                ON CONFLICT (graph_id) DO UPDATE
+                SET nbr_functions = graph_summary.nbr_functions + EXCLUDED.nbr_functions""",
+                sorted(graph_function_counts.items()),
+                page_size=max(1, len(graph_function_counts)))
+        conn.commit()
+
+
+def insert_classifications(
+    conn,
+    list_of_bfcgc,
+    names=None,
+    batch_size=64):
+    """
+    Insert a list of Cayley graph classifications into a database, in bulk.
 
-    A list where each entry has class BentFunctionCayleyGraphClassification.
-    The corresponding list of Cayley graph classifications.
+    The classifications are inserted in batches of ``batch_size``,
+    with one transaction per batch. Within each batch, the canonical labels
+    of all of the classifications are resolved to ``graph_id`` values using
+    a single statement, and the ``cayley_graph`` and ``matrices`` rows
+    are loaded using ``COPY FROM STDIN``.
+
+    INPUT:
+
+    - ``conn`` -- a connection object for the database.
+    - ``list_of_bfcgc`` -- a list of Cayley graph classifications.
+    - ``names`` -- a list of strings (default: `None`). The names of the bent functions.
+      If `None`, no names are recorded.
+    - ``batch_size`` -- integer (default: 64). The number of classifications
+      to insert per transaction.
+
+    OUTPUT: None.
+
+    EXAMPLE:
+
+    Create a database, with tables, using a standardized name, insert
+    two classifications, retrieve one by name, then drop the database.
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_psycopg2 import *
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
+        sage: bfcgc0 = BentFunctionCayleyGraphClassification.from_function(BentFunction([0,0,0,1]))
+        sage: bfcgc1 = BentFunctionCayleyGraphClassification.from_function(BentFunction([1,0,0,0]))
+        sage: dbname = 'doctest_insert_classifications_dbname'
+        sage: drop_database(dbname)
+        sage: conn = create_database(dbname)
+        sage: conn.close()
+        sage: conn = create_classification_tables(dbname)
+        sage: insert_classifications(conn, [bfcgc0, bfcgc1], ['bentf0', 'bentf1'], batch_size=1)
+        sage: result = select_classification_where_name(conn, 'bentf1')
+        sage: result == bfcgc1
+        True
+        sage: curs = conn.cursor()
+        sage: curs.execute("SELECT COUNT(*) FROM graph")
+        sage: curs.fetchone()[0]
+        2
+        sage: curs.execute("SELECT COUNT(*) FROM matrices")
+        sage: curs.fetchone()[0]
+        32
+        sage: conn.close()
+        sage: drop_database(dbname)
+    """
+    if names is None:
+        names = [None] * len(list_of_bfcgc)
+    options = classification_row_options(conn)
+    for batch_start in range(0, len(list_of_bfcgc), batch_size):
+        batch_stop = batch_start + batch_size
+        insert_classification_rows(
+            conn,
+            [
+                classification_rows(bfcgc, name, **options)
+                for bfcgc, name in zip(
+                    list_of_bfcgc[batch_start:batch_stop],
+                    names[batch_start:batch_stop])],
+            batch_size=batch_size)
+
+
+def insert_classification(
+    conn,
+    bfcgc,
+    name=None):
+    """
+    Insert a Cayley graph classification into a database.
+
+    INPUT:
+
+    - ``conn`` -- a connection object for the database.
+    - ``bfcgc`` -- a Cayley graph classification.
+    - ``name`` -- string (default: `None`). The name of the bent function.
+
+    OUTPUT: None.
+
+    A cursor object corresponding to state of the database after the
+    classification is inserted.
 
     NOTE:
 
     ::
 
-        The list is not sorted in any way.
+        To insert many classifications, ``insert_classifications`` is faster,
+        since it uses one transaction for each batch of classifications.
 
     EXAMPLE:
 
-    Create a database, with tables, using a standardized name,
-    insert a classification, retrieve all related classifications
-    by bent function Cayley graph, then drop the database.
+    Create a database, with tables, using a standardized name, insert
+    a classification, retrieve it by bent function, then drop the database.
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_psycopg2 import *
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
+        sage: bentf = BentFunction([0,0,0,1])
+        sage: bfcgc = BentFunctionCayleyGraphClassification.from_function(bentf)
+        sage: bfcgc.algebraic_normal_form
+        x0*x1
+        sage: dbname = 'doctest_insert_classification_dbname'
+        sage: drop_database(dbname)
+        sage: conn = create_database(dbname)
+        sage: conn.close()
+        sage: conn = create_classification_tables(dbname)
+        sage: insert_classification(conn, bfcgc, 'bentf')
+        sage: result = select_classification_where_bent_function(conn, bentf)
+        sage: result.algebraic_normal_form
+        x0*x1
+        sage: conn.close()
+        sage: drop_database(dbname)
+    """
+    insert_classifications(conn, [bfcgc], [name])
+
+
+def select_classification_where_bent_function(
+    conn,
+    bentf):
+    """
+    Retrieve a Cayley graph classification for a given bent function from a database.
+
+    INPUT:
+
+    - ``conn`` -- a connection object for the database.
+    - ``bentf`` -- class BentFunction. A bent function.
+
+    OUTPUT:
+
+    class BentFunctionCayleyGraphClassification.
+    The corresponding a Cayley graph classification,
+    or ``None`` if the bent function is not in the database.
+
+    EXAMPLE:
+
+    Create a database, with tables, using a standardized name, insert
+    a classification, retrieve it by bent function, then drop the database.
 
     ::
 
         sage: from boolean_cayley_graphs.classification_database_psycopg2 import *
         sage: from boolean_cayley_graphs.bent_function import BentFunction
         sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
+        sage: bentf = BentFunction([0,0,0,1])
+        sage: bfcgc = BentFunctionCayleyGraphClassification.from_function(bentf)
+        sage: bfcgc.algebraic_normal_form
+        x0*x1
         sage: dbname = 'doctest_select_classification_where_bent_function_dbname'
         sage: drop_database(dbname)
         sage: conn = create_database(dbname)
         sage: conn.close()
         sage: conn = create_classification_tables(dbname)
-        sage: bentf0 = BentFunction([0,0,0,1])
-        sage: bfcgc0 = BentFunctionCayleyGraphClassification.from_function(bentf0)
-        sage: bfcgc0.algebraic_normal_form
+        sage: insert_classification(conn, bfcgc, 'bentf')
+        sage: result = select_classification_where_bent_function(conn, bentf)
+        sage: result.algebraic_normal_form
         x0*x1
-        sage: insert_classification(conn, bfcgc0, 'bentf0')
-        sage: bentf1 = BentFunction([1,0,0,0])
-        sage: bfcgc1 = BentFunctionCayleyGraphClassification.from_function(bentf1)
-        sage: bfcgc1.algebraic_normal_form
-        x0*x1 + x0 + x1 + 1
-        sage: insert_classification(conn, bfcgc1, 'bentf1')
-        sage: result = select_classification_where_bent_function_cayley_graph(conn, bentf1)
         sage: type(result)
-        <class 'list'>
-        sage: len(result)
-        2
-        sage: sorted_result = sorted(result, key=lambda c: str(c.algebraic_normal_form))
-        sage: for c in sorted_result:
-        ....:     type(c)
-        ....:     c.algebraic_normal_form
-        ....:     c.report()
         <class 'boolean_cayley_graphs.bent_function_cayley_graph_classification.BentFunctionCayleyGraphClassification'>
-        x0*x1
+        sage: result.report(report_on_matrix_details=True)
         Algebraic normal form of Boolean function: x0*x1
         Function is bent.
         <BLANKLINE>
+        Weight class matrix:
+        [0 0 0 1]
+        [0 1 0 0]
+        [0 0 1 0]
+        [1 0 0 0]
         <BLANKLINE>
         SDP design incidence structure t-design parameters: (True, (1, 4, 1, 1))
         <BLANKLINE>
         Classification of Cayley graphs and classification of Cayley graphs of duals are the same:
         <BLANKLINE>
         There are 2 extended Cayley classes in the extended translation class.
-        <class 'boolean_cayley_graphs.bent_function_cayley_graph_classification.BentFunctionCayleyGraphClassification'>
-        x0*x1 + x0 + x1 + 1
-        Algebraic normal form of Boolean function: x0*x1 + x0 + x1 + 1
-        Function is bent.
-        <BLANKLINE>
-        <BLANKLINE>
-        SDP design incidence structure t-design parameters: (True, (1, 4, 1, 1))
-        <BLANKLINE>
-        Classification of Cayley graphs and classification of Cayley graphs of duals are the same:
         <BLANKLINE>
-        There are 2 extended Cayley classes in the extended translation class.
+        Matrix of indices of Cayley graphs:
+        [0 0 0 1]
+        [0 1 0 0]
+        [0 0 1 0]
+        [1 0 0 0]
         sage: conn.close()
         sage: drop_database(dbname)
     """
-    cayley_graph = bentf.extended_cayley_graph()
-    cgcl = cayley_graph.canonical_label(algorithm=algorithm).graph6_string()
-    cgcl_hash = canonical_label_hash(cgcl)
+    dim = bentf.nvariables()
+    nvar = int(dim)
+    bftt = psycopg2.Binary(bentf.tt_buffer())
 
     curs = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
     curs.execute("""
-        SELECT graph_id, canonical_label
+        SELECT COUNT(*)
+        FROM cayley_graph
+        WHERE nvariables = (%s)
+        AND bent_function = (%s)""",
+        (nvar, bftt))
+    cgcl_len = curs.fetchone()[0]
+    if cgcl_len == 0:
+        return None
+
+    cgcl = [None] * cgcl_len
+    codec = select_label_codec(conn)
+    curs.execute("""
+        SELECT cayley_graph_index, canonical_label_hash, canonical_label
+        FROM cayley_graph, graph
+        WHERE nvariables = (%s)
+        AND bent_function = (%s)
+        AND cayley_graph.graph_id = graph.graph_id""",
+        (nvar, bftt))
+    for row in curs.fetchall():
+        cayley_graph_index = row["cayley_graph_index"]
+        canonical_label = codec.decode(row["canonical_label"], row["canonical_label_hash"])
+        cgcl[cayley_graph_index] = canonical_label
+
+    v = 2 ** dim
+    bcim = matrix(v, v)
+    dcim = matrix(v, v)
+    wcm  = matrix(v, v)
+    curs.execute("""
+        SELECT *
+        FROM matrices
+        WHERE nvariables = (%s)
+        AND bent_function = (%s)""",
+        (nvar, bftt))
+    for row in curs:
+        b = row["b"]
+        c = row["c"]
+
+        bent_cayley_graph_index = row["bent_cayley_graph_index"]
+        bcim[c, b] = bent_cayley_graph_index
+
+        dual_cayley_graph_index = row["dual_cayley_graph_index"]
+        dcim[c, b] = dual_cayley_graph_index
+
+        weight_class = row["weight_class"]
+        wcm[c, b] = weight_class
+
+    return BentFunctionCayleyGraphClassification(
+        algebraic_normal_form=bentf.algebraic_normal_form(),
+        cayley_graph_class_list=cgcl,
+        bent_cayley_graph_index_matrix=bcim,
+        dual_cayley_graph_index_matrix=dcim,
+        weight_class_matrix=wcm)
+
+
+# A summary of one extended Cayley class of one bent function in a database.
+CayleyGraphSummary = namedtuple(
+    "CayleyGraphSummary",
+    ["name", "nvariables", "bent_function", "cayley_graph_index", "cell_count"])
+
+
+def select_cayley_graph_summaries_where_canonical_label(
+    conn,
+    canonical_label):
+    """
+    Retrieve summaries of the extended Cayley classes, within all classifications
+    in a database, whose Cayley graph has a given canonical label.
+
+    The classifications are found using the index on ``cayley_graph(graph_id)``.
+    The cell counts are read from the ``class_summary`` table, if the database
+    has summary tables; otherwise they are counted from the matrices.
+
+    INPUT:
+
+    - ``conn`` -- a connection object for the database.
+    - ``canonical_label`` -- string. A graph6_string encoding a Graph canonical label.
+
+    OUTPUT:
+
+    A list of ``CayleyGraphSummary`` named tuples, sorted by name and by bent function.
+    Each summary contains the name, number of variables, and truth table buffer
+    of a bent function, the index of the matching Cayley class within its classification,
+    and the number of cells of the bent Cayley graph index matrix in this class.
+    The list is empty if no classification contains the canonical label.
+
+    EXAMPLE:
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_psycopg2 import *
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
+        sage: dbname = 'doctest_select_cayley_graph_summaries_dbname'
+        sage: drop_database(dbname)
+        sage: conn = create_database(dbname)
+        sage: conn.close()
+        sage: conn = create_classification_tables(dbname)
+        sage: bfcgc0 = BentFunctionCayleyGraphClassification.from_function(BentFunction([0,0,0,1]))
+        sage: bfcgc1 = BentFunctionCayleyGraphClassification.from_function(BentFunction([0,1,1,1]))
+        sage: insert_classifications(conn, [bfcgc0, bfcgc1], ['bentf0', 'bentf1'])
+        sage: summaries = select_cayley_graph_summaries_where_canonical_label(conn, 'CK')
+        sage: [(s.name, s.cayley_graph_index, s.cell_count) for s in summaries]
+        [('bentf0', 0, 12), ('bentf1', 1, 12)]
+        sage: select_cayley_graph_summaries_where_canonical_label(conn, 'Not a label')
+        []
+        sage: conn.close()
+        sage: drop_database(dbname)
+    """
+    cgcl_hash = canonical_label_hash(canonical_label)
+    if not _canonical_label_is_stored(conn, select_label_codec(conn), cgcl_hash, canonical_label):
+        return []
+    if has_summary_tables(conn):
+        # Read the cell counts maintained in the summary tables.
+        cell_count = """
+            class_summary.nbr_bent_cells"""
+        summary_join = """
+        LEFT JOIN class_summary
+            ON class_summary.bent_function = cayley_graph.bent_function
+            AND class_summary.cayley_graph_index = cayley_graph.cayley_graph_index"""
+    else:
+        cell_count = """
+            (
+                SELECT COUNT(*)
+                FROM matrices
+                WHERE matrices.bent_function = cayley_graph.bent_function
+                AND matrices.bent_cayley_graph_index = cayley_graph.cayley_graph_index
+            )"""
+        summary_join = ""
+    curs = conn.cursor()
+    curs.execute("""
+        SELECT
+            bent_function.name,
+            cayley_graph.nvariables,
+            cayley_graph.bent_function,
+            cayley_graph.cayley_graph_index,{}
         FROM graph
-        WHERE canonical_label_hash = (%s)""",
+        JOIN cayley_graph
+            ON cayley_graph.graph_id = graph.graph_id
+        LEFT JOIN bent_function
+            ON bent_function.nvariables = cayley_graph.nvariables
+            AND bent_function.bent_function = cayley_graph.bent_function{}
+        WHERE graph.canonical_label_hash = (%s)
+        ORDER BY bent_function.name, cayley_graph.nvariables, cayley_graph.bent_function""".format(
+            cell_count,
+            summary_join),
         (cgcl_hash,))
+    return [
+        CayleyGraphSummary(
+            name,
+            nvar,
+            bytes(bftt),
+            cayley_graph_index,
+            cell_count)
+        for name, nvar, bftt, cayley_graph_index, cell_count in curs.fetchall()]
 
-    row = curs.fetchone()
-    graph_id = row["graph_id"]
-    canonical_label = row["canonical_label"]
 
-    # The result is a list of classifications.
-    result = []
-    # Check for a hash collision -- very unlikely.
-    if canonical_label != cgcl:
-        return result
+def select_cayley_graph_summaries_where_bent_function_cayley_graph(
+    conn,
+    bentf,
+    algorithm=default_algorithm):
+    """
+    Given a bent function ``bentf``, retrieve summaries of the extended Cayley classes,
+    within all classifications in a database, whose Cayley graph is isomorphic to
+    the Cayley graph of ``bentf``.
 
-    curs.execute("""
-        SELECT DISTINCT nvariables, bent_function
-        FROM cayley_graph
-        WHERE graph_id = (%s)""",
-        (graph_id,))
+    INPUT:
 
-    for row in curs:
-        nvar = row["nvariables"]
-        bftt = row["bent_function"]
-        row_bentf = BentFunction.from_tt_buffer(nvar, bftt)
-        result.append(
-            select_classification_where_bent_function(
-                conn,
-                row_bentf))
-    return result
+    - ``conn`` -- a connection object for the database.
+    - ``bentf`` -- class BentFunction. A bent function.
+    - ``algorithm`` -- string (default: BentFunctionCayleyGraphClassification.default_algorithm).
+      Algorithm used for canonical labelling.
+
+    OUTPUT:
+
+    A list of ``CayleyGraphSummary`` named tuples, as per
+    ``select_cayley_graph_summaries_where_canonical_label``.
+
+    EXAMPLE:
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_psycopg2 import *
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
+        sage: dbname = 'doctest_select_cayley_graph_summaries_dbname'
+        sage: drop_database(dbname)
+        sage: conn = create_database(dbname)
+        sage: conn.close()
+        sage: conn = create_classification_tables(dbname)
+        sage: bentf0 = BentFunction([0,0,0,1])
+        sage: bfcgc0 = BentFunctionCayleyGraphClassification.from_function(bentf0)
+        sage: insert_classification(conn, bfcgc0, 'bentf0')
+        sage: summaries = select_cayley_graph_summaries_where_bent_function_cayley_graph(conn, bentf0)
+        sage: [(s.name, s.cayley_graph_index, s.cell_count) for s in summaries]
+        [('bentf0', 0, 12)]
+        sage: conn.close()
+        sage: drop_database(dbname)
+    """
+    cayley_graph = bentf.extended_cayley_graph()
+    cgcl = cayley_graph.canonical_label(algorithm=algorithm).graph6_string()
+    return select_cayley_graph_summaries_where_canonical_label(conn, cgcl)
+
+
+def select_classifications_where_summaries(
+    conn,
+    summaries):
+    """
+    Lazily retrieve the Cayley graph classifications of the bent functions in a list of summaries.
+
+    INPUT:
+
+    - ``conn`` -- a connection object for the database.
+    - ``summaries`` -- a list of ``CayleyGraphSummary`` named tuples.
+
+    OUTPUT:
+
+    A generator yielding one ``BentFunctionCayleyGraphClassification`` for each distinct
+    bent function in ``summaries``, in order of first appearance. Each classification
+    is retrieved only when the generator reaches it.
+
+    EXAMPLE:
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_psycopg2 import *
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
+        sage: dbname = 'doctest_select_classifications_where_summaries_dbname'
+        sage: drop_database(dbname)
+        sage: conn = create_database(dbname)
+        sage: conn.close()
+        sage: conn = create_classification_tables(dbname)
+        sage: bentf0 = BentFunction([0,0,0,1])
+        sage: bfcgc0 = BentFunctionCayleyGraphClassification.from_function(bentf0)
+        sage: insert_classification(conn, bfcgc0, 'bentf0')
+        sage: summaries = select_cayley_graph_summaries_where_bent_function_cayley_graph(conn, bentf0)
+        sage: classifications = select_classifications_where_summaries(conn, summaries)
+        sage: next(classifications) == bfcgc0
+        True
+        sage: conn.close()
+        sage: drop_database(dbname)
+    """
+    seen = set()
+    for summary in summaries:
+        key = (summary.nvariables, bytes(summary.bent_function))
+        if key in seen:
+            continue
+        seen.add(key)
+        yield select_classification_where_bent_function(
+            conn,
+            BentFunction.from_tt_buffer(summary.nvariables, summary.bent_function))
+
+
+def select_classification_where_bent_function_cayley_graph(
+    conn,
+    bentf,
+    algorithm=default_algorithm):
+    """
+    Given a bent function ``bentf``, retrieve all classifications that
+    contain a Cayley graph isomorphic to the Cayley graph of ``bentf``.
+
+    INPUT:
+
+    - ``conn`` -- a connection object for the database.
+    - ``bentf`` -- class BentFunction. A bent function.
+    - ``algorithm`` -- string (default: BentFunctionCayleyGraphClassification.default_algorithm). 
+      Algorithm used for canonical labelling.
+
+    OUTPUT:
+
+    A list where each entry has class BentFunctionCayleyGraphClassification.
+    The corresponding list of Cayley graph classifications.
+
+    NOTE:
+
+    ::
+
+        The list is not sorted in any way.
+
+    EXAMPLE:
+
+    Create a database, with tables, using a standardized name,
+    insert a classification, retrieve all related classifications
+    by bent function Cayley graph, then drop the database.
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_psycopg2 import *
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
+        sage: dbname = 'doctest_select_classification_where_bent_function_dbname'
+        sage: drop_database(dbname)
+        sage: conn = create_database(dbname)
+        sage: conn.close()
+        sage: conn = create_classification_tables(dbname)
+        sage: bentf0 = BentFunction([0,0,0,1])
+        sage: bfcgc0 = BentFunctionCayleyGraphClassification.from_function(bentf0)
+        sage: bfcgc0.algebraic_normal_form
+        x0*x1
+        sage: insert_classification(conn, bfcgc0, 'bentf0')
+        sage: bentf1 = BentFunction([1,0,0,0])
+        sage: bfcgc1 = BentFunctionCayleyGraphClassification.from_function(bentf1)
+        sage: bfcgc1.algebraic_normal_form
+        x0*x1 + x0 + x1 + 1
+        sage: insert_classification(conn, bfcgc1, 'bentf1')
+        sage: result = select_classification_where_bent_function_cayley_graph(conn, bentf1)
+        sage: type(result)
+        <class 'list'>
+        sage: len(result)
+        2
+        sage: sorted_result = sorted(result, key=lambda c: str(c.algebraic_normal_form))
+        sage: for c in sorted_result:
+        ....:     type(c)
+        ....:     c.algebraic_normal_form
+        ....:     c.report()
+        <class 'boolean_cayley_graphs.bent_function_cayley_graph_classification.BentFunctionCayleyGraphClassification'>
+        x0*x1
+        Algebraic normal form of Boolean function: x0*x1
+        Function is bent.
+        <BLANKLINE>
+        <BLANKLINE>
+        SDP design incidence structure t-design parameters: (True, (1, 4, 1, 1))
+        <BLANKLINE>
+        Classification of Cayley graphs and classification of Cayley graphs of duals are the same:
+        <BLANKLINE>
+        There are 2 extended Cayley classes in the extended translation class.
+        <class 'boolean_cayley_graphs.bent_function_cayley_graph_classification.BentFunctionCayleyGraphClassification'>
+        x0*x1 + x0 + x1 + 1
+        Algebraic normal form of Boolean function: x0*x1 + x0 + x1 + 1
+        Function is bent.
+        <BLANKLINE>
+        <BLANKLINE>
+        SDP design incidence structure t-design parameters: (True, (1, 4, 1, 1))
+        <BLANKLINE>
+        Classification of Cayley graphs and classification of Cayley graphs of duals are the same:
+        <BLANKLINE>
+        There are 2 extended Cayley classes in the extended translation class.
+        sage: conn.close()
+        sage: drop_database(dbname)
+    """
+    summaries = select_cayley_graph_summaries_where_bent_function_cayley_graph(
+        conn,
+        bentf,
+        algorithm=algorithm)
+    return list(select_classifications_where_summaries(conn, summaries))
+
+
+# The columns of the matrices table, one for each matrix of a classification.
+matrix_columns = (
+    "bent_cayley_graph_index",
+    "dual_cayley_graph_index",
+    "weight_class")
+
+
+def _check_matrix_column(matrix_column):
+    r"""
+    Check that ``matrix_column`` is one of ``matrix_columns``.
+
+    TESTS:
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_psycopg2 import _check_matrix_column
+        sage: _check_matrix_column("weight_class")
+        sage: _check_matrix_column("name")
+        Traceback (most recent call last):
+        ...
+        ValueError: Unknown matrix column: 'name'
+    """
+    if matrix_column not in matrix_columns:
+        raise ValueError("Unknown matrix column: {!r}".format(matrix_column))
+
+
+def select_class_count_where_bent_function(
+    conn,
+    bentf):
+    """
+    Retrieve the number of extended Cayley classes in the classification of a bent function.
+
+    INPUT:
+
+    - ``conn`` -- a connection object for the database.
+    - ``bentf`` -- class BentFunction. A bent function.
+
+    OUTPUT: an integer, or ``None`` if the bent function is not in the database.
+
+    EXAMPLE:
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_psycopg2 import *
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
+        sage: bentf = BentFunction([0,0,0,1])
+        sage: bfcgc = BentFunctionCayleyGraphClassification.from_function(bentf)
+        sage: dbname = 'doctest_projection_dbname'
+        sage: drop_database(dbname)
+        sage: conn = create_database(dbname)
+        sage: conn.close()
+        sage: conn = create_classification_tables(dbname)
+        sage: insert_classification(conn, bfcgc, 'bentf')
+        sage: select_class_count_where_bent_function(conn, bentf)
+        2
+        sage: select_class_count_where_bent_function(conn, BentFunction([1,0,0,0])) is None
+        True
+        sage: conn.close()
+        sage: drop_database(dbname)
+    """
+    nvar = int(bentf.nvariables())
+    bftt = psycopg2.Binary(bentf.tt_buffer())
+    curs = conn.cursor()
+    curs.execute("""
+        SELECT COUNT(*)
+        FROM cayley_graph
+        WHERE nvariables = (%s)
+        AND bent_function = (%s)""",
+        (nvar, bftt))
+    count = curs.fetchone()[0]
+    return count if count > 0 else None
+
+
+def select_class_hashes_where_bent_function(
+    conn,
+    bentf):
+    """
+    Retrieve the list of extended Cayley classes in the classification of a bent function,
+    as canonical label hashes rather than canonical labels.
+
+    INPUT:
+
+    - ``conn`` -- a connection object for the database.
+    - ``bentf`` -- class BentFunction. A bent function.
+
+    OUTPUT: a list of bytes objects, in order of Cayley graph index.
+    Each is the hash of the canonical label of the corresponding class,
+    as per ``hashlib.sha256``.
+
+    EXAMPLE:
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_psycopg2 import *
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
+        sage: bentf = BentFunction([0,0,0,1])
+        sage: bfcgc = BentFunctionCayleyGraphClassification.from_function(bentf)
+        sage: dbname = 'doctest_projection_dbname'
+        sage: drop_database(dbname)
+        sage: conn = create_database(dbname)
+        sage: conn.close()
+        sage: conn = create_classification_tables(dbname)
+        sage: insert_classification(conn, bfcgc, 'bentf')
+        sage: hashes = select_class_hashes_where_bent_function(conn, bentf)
+        sage: hashes == [bytes(canonical_label_hash(cgc).adapted) for cgc in bfcgc.cayley_graph_class_list]
+        True
+        sage: conn.close()
+        sage: drop_database(dbname)
+    """
+    nvar = int(bentf.nvariables())
+    bftt = psycopg2.Binary(bentf.tt_buffer())
+    curs = conn.cursor()
+    curs.execute("""
+        SELECT graph.canonical_label_hash
+        FROM cayley_graph, graph
+        WHERE cayley_graph.nvariables = (%s)
+        AND cayley_graph.bent_function = (%s)
+        AND cayley_graph.graph_id = graph.graph_id
+        ORDER BY cayley_graph.cayley_graph_index""",
+        (nvar, bftt))
+    return [bytes(row[0]) for row in curs.fetchall()]
+
+
+def select_matrix_where_bent_function(
+    conn,
+    bentf,
+    matrix_column="bent_cayley_graph_index"):
+    """
+    Retrieve one matrix of the classification of a bent function, as a numpy array.
+
+    INPUT:
+
+    - ``conn`` -- a connection object for the database.
+    - ``bentf`` -- class BentFunction. A bent function.
+    - ``matrix_column`` -- string (default: "bent_cayley_graph_index").
+      One of ``matrix_columns``, selecting the matrix.
+
+    OUTPUT: a ``v`` by ``v`` numpy array of ``int64``, indexed by ``[c, b]``,
+    or ``None`` if the bent function is not in the database.
+
+    EXAMPLE:
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_psycopg2 import *
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
+        sage: bentf = BentFunction([0,0,0,1])
+        sage: bfcgc = BentFunctionCayleyGraphClassification.from_function(bentf)
+        sage: dbname = 'doctest_projection_dbname'
+        sage: drop_database(dbname)
+        sage: conn = create_database(dbname)
+        sage: conn.close()
+        sage: conn = create_classification_tables(dbname)
+        sage: insert_classification(conn, bfcgc, 'bentf')
+        sage: wcm = select_matrix_where_bent_function(conn, bentf, "weight_class")
+        sage: matrix(wcm) == bfcgc.weight_class_matrix
+        True
+        sage: conn.close()
+        sage: drop_database(dbname)
+    """
+    _check_matrix_column(matrix_column)
+    nvar = int(bentf.nvariables())
+    bftt = psycopg2.Binary(bentf.tt_buffer())
+    v = 2 ** nvar
+    curs = conn.cursor()
+
+    curs.execute("""
+        SELECT c, b, {}
+        FROM matrices
+        WHERE nvariables = (%s)
+        AND bent_function = (%s)""".format(matrix_column),
+        (nvar, bftt))
+    cells = np.array(curs.fetchall(), dtype=np.int64).reshape(-1, 3)
+    if len(cells) == 0:
+        return None
+    result = np.zeros((v, v), dtype=np.int64)
+    result[cells[:, 0], cells[:, 1]] = cells[:, 2]
+    return result
+
+
+def select_matrix_row_where_bent_function(
+    conn,
+    bentf,
+    c,
+    matrix_column="bent_cayley_graph_index"):
+    """
+    Retrieve one row, for a given value of ``c``, of one matrix of the classification
+    of a bent function, as a numpy array.
+
+    INPUT:
+
+    - ``conn`` -- a connection object for the database.
+    - ``bentf`` -- class BentFunction. A bent function.
+    - ``c`` -- integer. The row index.
+    - ``matrix_column`` -- string (default: "bent_cayley_graph_index").
+      One of ``matrix_columns``, selecting the matrix.
+
+    OUTPUT: a numpy array of ``int64`` of length ``v``, indexed by ``b``,
+    or ``None`` if the bent function is not in the database.
+
+    EXAMPLE:
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_psycopg2 import *
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
+        sage: bentf = BentFunction([0,0,0,1])
+        sage: bfcgc = BentFunctionCayleyGraphClassification.from_function(bentf)
+        sage: dbname = 'doctest_projection_dbname'
+        sage: drop_database(dbname)
+        sage: conn = create_database(dbname)
+        sage: conn.close()
+        sage: conn = create_classification_tables(dbname)
+        sage: insert_classification(conn, bfcgc, 'bentf')
+        sage: select_matrix_row_where_bent_function(conn, bentf, 1).tolist()
+        [0, 1, 0, 0]
+        sage: conn.close()
+        sage: drop_database(dbname)
+    """
+    _check_matrix_column(matrix_column)
+
+    nvar = int(bentf.nvariables())
+    bftt = psycopg2.Binary(bentf.tt_buffer())
+    curs = conn.cursor()
+    curs.execute("""
+        SELECT b, {}
+        FROM matrices
+        WHERE nvariables = (%s)
+        AND bent_function = (%s)
+        AND c = (%s)""".format(matrix_column),
+        (nvar, bftt, int(c)))
+    cells = np.array(curs.fetchall(), dtype=np.int64).reshape(-1, 2)
+    if len(cells) == 0:
+        return None
+    result = np.zeros(2 ** nvar, dtype=np.int64)
+    result[cells[:, 0]] = cells[:, 1]
+    return result
+
+
+def select_matrix_column_where_bent_function(
+    conn,
+    bentf,
+    b,
+    matrix_column="bent_cayley_graph_index"):
+    """
+    Retrieve one column, for a given value of ``b``, of one matrix of the classification
+    of a bent function, as a numpy array.
+
+    INPUT:
+
+    - ``conn`` -- a connection object for the database.
+    - ``bentf`` -- class BentFunction. A bent function.
+    - ``b`` -- integer. The column index.
+    - ``matrix_column`` -- string (default: "bent_cayley_graph_index").
+      One of ``matrix_columns``, selecting the matrix.
+
+    OUTPUT: a numpy array of ``int64`` of length ``v``, indexed by ``c``,
+    or ``None`` if the bent function is not in the database.
+
+    EXAMPLE:
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_psycopg2 import *
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
+        sage: bentf = BentFunction([0,0,0,1])
+        sage: bfcgc = BentFunctionCayleyGraphClassification.from_function(bentf)
+        sage: dbname = 'doctest_projection_dbname'
+        sage: drop_database(dbname)
+        sage: conn = create_database(dbname)
+        sage: conn.close()
+        sage: conn = create_classification_tables(dbname)
+        sage: insert_classification(conn, bfcgc, 'bentf')
+        sage: select_matrix_column_where_bent_function(conn, bentf, 3).tolist()
+        [1, 0, 0, 0]
+        sage: conn.close()
+        sage: drop_database(dbname)
+    """
+    _check_matrix_column(matrix_column)
+
+    nvar = int(bentf.nvariables())
+    bftt = psycopg2.Binary(bentf.tt_buffer())
+    curs = conn.cursor()
+    curs.execute("""
+        SELECT c, {}
+        FROM matrices
+        WHERE nvariables = (%s)
+        AND bent_function = (%s)
+        AND b = (%s)""".format(matrix_column),
+        (nvar, bftt, int(b)))
+    cells = np.array(curs.fetchall(), dtype=np.int64).reshape(-1, 2)
+    if len(cells) == 0:
+        return None
+    result = np.zeros(2 ** nvar, dtype=np.int64)
+    result[cells[:, 0]] = cells[:, 1]
+    return result
+
+
+def select_class_histogram_where_bent_function(
+    conn,
+    bentf,
+    matrix_column="bent_cayley_graph_index"):
+    """
+    Retrieve the number of cells with each value in one matrix of the classification
+    of a bent function.
+
+    INPUT:
+
+    - ``conn`` -- a connection object for the database.
+    - ``bentf`` -- class BentFunction. A bent function.
+    - ``matrix_column`` -- string (default: "bent_cayley_graph_index").
+      One of ``matrix_columns``, selecting the matrix.
+
+    OUTPUT: a numpy array of ``int64``, whose entry ``n`` is the number of cells
+    with value ``n``, or ``None`` if the bent function is not in the database.
+    For the Cayley graph index matrices, the length of the array is the number of
+    extended Cayley classes.
+
+    EXAMPLE:
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_psycopg2 import *
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
+        sage: bentf = BentFunction([0,0,0,1])
+        sage: bfcgc = BentFunctionCayleyGraphClassification.from_function(bentf)
+        sage: dbname = 'doctest_projection_dbname'
+        sage: drop_database(dbname)
+        sage: conn = create_database(dbname)
+        sage: conn.close()
+        sage: conn = create_classification_tables(dbname)
+        sage: insert_classification(conn, bfcgc, 'bentf')
+        sage: select_class_histogram_where_bent_function(conn, bentf).tolist()
+        [12, 4]
+        sage: select_class_histogram_where_bent_function(conn, bentf, "weight_class").tolist()
+        [12, 4]
+        sage: conn.close()
+        sage: drop_database(dbname)
+    """
+    _check_matrix_column(matrix_column)
+    minlength = (
+        select_class_count_where_bent_function(conn, bentf) or 0
+        if matrix_column != "weight_class" else
+        0)
+
+    nvar = int(bentf.nvariables())
+    bftt = psycopg2.Binary(bentf.tt_buffer())
+    curs = conn.cursor()
+    curs.execute("""
+        SELECT {0}, COUNT(*)
+        FROM matrices
+        WHERE nvariables = (%s)
+        AND bent_function = (%s)
+        GROUP BY {0}""".format(matrix_column),
+        (nvar, bftt))
+    counts = np.array(curs.fetchall(), dtype=np.int64).reshape(-1, 2)
+    if len(counts) == 0:
+        return None
+    result = np.zeros(max(minlength, int(counts[:, 0].max()) + 1), dtype=np.int64)
+    result[counts[:, 0]] = counts[:, 1]
+    return result
+
+
+def select_strongly_regular_parameters_where_bent_function(
+    conn,
+    bentf):
+    """
+    Retrieve the strongly regular parameters of the Cayley graph of each
+    extended Cayley class of the classification of a bent function.
+
+    The parameters are computed from the number of variables of the bent function
+    and the weight class of a cell of each class, as per ``bent_cayley_class_parameters``,
+    without constructing the graphs.
+
+    INPUT:
+
+    - ``conn`` -- a connection object for the database.
+    - ``bentf`` -- class BentFunction. A bent function on at least 4 variables.
+
+    OUTPUT: a list of tuples of 4 integers, in order of Cayley graph index,
+    or ``None`` if the bent function is not in the database.
+
+    EXAMPLE:
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_psycopg2 import *
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
+        sage: bentf = BentFunction([0,0,0,1,0,0,0,1,0,0,0,1,1,1,1,0])
+        sage: bfcgc = BentFunctionCayleyGraphClassification.from_function(bentf)
+        sage: dbname = 'doctest_parameters_dbname'
+        sage: drop_database(dbname)
+        sage: conn = create_database(dbname)
+        sage: conn.close()
+        sage: conn = create_classification_tables(dbname)
+        sage: insert_classification(conn, bfcgc, 'bentf')
+        sage: select_strongly_regular_parameters_where_bent_function(conn, bentf)
+        [(16, 6, 2, 2), (16, 10, 6, 6)]
+        sage: conn.close()
+        sage: drop_database(dbname)
+    """
+    bent_cayley_graph_index_array = select_matrix_where_bent_function(
+        conn,
+        bentf,
+        "bent_cayley_graph_index")
+    if bent_cayley_graph_index_array is None:
+        return None
+    weight_class_array = select_matrix_where_bent_function(
+        conn,
+        bentf,
+        "weight_class")
+    return bent_cayley_class_parameters(
+        int(bentf.nvariables()),
+        bent_cayley_graph_index_array,
+        weight_class_array)
+
+
+def _update_digest(digest, curs, batch_size=4096):
+    """
+    Update a digest with the rows of the result of a query.
+
+    Each field is preceded by its length, so that the digest
+    does not depend on how the fields are split into rows and columns.
+
+    INPUT:
+
+    - ``digest`` -- a ``hashlib`` hash object.
+    - ``curs`` -- a cursor, after the query has been executed.
+    - ``batch_size`` -- integer (default: 4096). The number of rows fetched at a time.
+
+    OUTPUT: None.
+    """
+    rows = curs.fetchmany(batch_size)
+    while rows:
+        for row in rows:
+            for value in row:
+                data = (
+                    bytes(value)
+                    if isinstance(value, (bytes, memoryview)) else
+                    str(value).encode("UTF-8"))
+                digest.update(str(len(data)).encode("UTF-8") + b":" + data)
+            digest.update(b";")
+        rows = curs.fetchmany(batch_size)
+
+
+# The tables whose changes are counted by the version counter of a database.
+version_counter_tables = (
+    "bent_function",
+    "graph",
+    "cayley_graph",
+    "matrices")
+
+
+def create_version_counter(conn):
+    """
+    Create the version counter of a database, if it does not already exist.
+
+    The version counter consists of a random database identifier and a count
+    of changes, stored in the ``metadata`` table. The count is incremented
+    by a statement level trigger on each of ``version_counter_tables``,
+    so that every change to a classification is counted, however it is made.
+
+    INPUT:
+
+    - ``conn`` -- a connection object for the database.
+
+    OUTPUT: None.
+
+    EXAMPLE:
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_psycopg2 import *
+        sage: dbname = 'doctest_version_counter_dbname'
+        sage: drop_database(dbname)
+        sage: conn = create_database(dbname)
+        sage: conn.close()
+        sage: conn = create_classification_tables(dbname)
+        sage: version = select_database_version(conn)
+        sage: create_version_counter(conn)
+        sage: select_database_version(conn) == version
+        True
+        sage: conn.close()
+        sage: drop_database(dbname)
+    """
+    curs = conn.cursor()
+    curs.execute("""
+        CREATE TABLE IF NOT EXISTS metadata(
+        key TEXT PRIMARY KEY,
+        value TEXT)""")
+    curs.executemany("""
+        INSERT INTO metadata
+        VALUES (%s,%s)
+        ON CONFLICT DO NOTHING""",
+        [
+            ("database_id", uuid.uuid4().hex),
+            ("change_count", "0")])
+    curs.execute("""
+        CREATE OR REPLACE FUNCTION count_change() RETURNS trigger AS $$
+        BEGIN
+            UPDATE metadata
+            SET value = (value::BIGINT + 1)::TEXT
+            WHERE key = 'change_count';
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql""")
+    for table in version_counter_tables:
+        curs.execute("""
+            DROP TRIGGER IF EXISTS {0}_change_count ON {0};
+            CREATE TRIGGER {0}_change_count
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {0}
+            FOR EACH STATEMENT
+            EXECUTE PROCEDURE count_change()""".format(table))
+    conn.commit()
+
+
+def select_database_version(conn):
+    """
+    Return the version of a database, which changes
+    when a classification is inserted, deleted, renamed or changed.
+
+    The version is used to invalidate caches of results computed from the database,
+    such as the cache used by ``bent_function_cayley_graph_dashboard.py``.
+    It is read from the version counter, as per ``create_version_counter``,
+    without reading any classifications. For a database created without
+    a version counter, the version is given by the numbers of rows inserted,
+    updated and deleted, as recorded by the statistics collector instead.
+
+    INPUT:
+
+    - ``conn`` -- a connection object for the database.
+
+    OUTPUT: a string.
+
+    EXAMPLE:
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_psycopg2 import *
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
+        sage: bfcgc = BentFunctionCayleyGraphClassification.from_function(BentFunction([0,0,0,1]))
+        sage: dbname = 'doctest_version_dbname'
+        sage: drop_database(dbname)
+        sage: conn = create_database(dbname)
+        sage: conn.close()
+        sage: conn = create_classification_tables(dbname)
+        sage: version = select_database_version(conn)
+        sage: insert_classification(conn, bfcgc, 'bentf')
+        sage: select_database_version(conn) == version
+        False
+        sage: version = select_database_version(conn)
+        sage: curs = conn.cursor()
+        sage: curs.execute("UPDATE matrices SET weight_class = 1 - weight_class WHERE b = 0 AND c = 0")
+        sage: conn.commit()
+        sage: select_database_version(conn) == version
+        False
+        sage: conn.close()
+        sage: drop_database(dbname)
+    """
+    curs = conn.cursor()
+    curs.execute("SELECT to_regclass('metadata') IS NOT NULL")
+    if curs.fetchone()[0]:
+        curs.execute("""
+            SELECT key, value
+            FROM metadata
+            WHERE key IN ('database_id', 'change_count')""")
+        metadata = dict(curs.fetchall())
+        if len(metadata) == 2:
+            return "{}-{}".format(metadata["database_id"], metadata["change_count"])
+
+    # There is no version counter, so use the table statistics.
+    curs.execute("""
+        SELECT relname, n_tup_ins, n_tup_upd, n_tup_del
+        FROM pg_stat_user_tables
+        WHERE relname IN %s
+        ORDER BY relname""",
+        (version_counter_tables,))
+    return "-".join(
+        "{}:{}:{}:{}".format(*row)
+        for row in curs.fetchall())
+
+
+def select_database_digest(conn):
+    """
+    Return a digest of the classifications in a database, which changes
+    when a classification is inserted, deleted, renamed or changed.
+
+    The digest is computed from the contents of the bent function, Cayley graph,
+    graph and matrix tables, so each call reads every row of these tables.
+    The matrices of each bent function are digested by the server,
+    so that only one row per bent function is transferred.
+    The digest is intended for offline checks, such as comparing two copies
+    of a database. To detect changes cheaply, use ``select_database_version`` instead.
+
+    INPUT:
+
+    - ``conn`` -- a connection object for the database.
+
+    OUTPUT: a string of 64 hexadecimal digits.
+
+    EXAMPLE:
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_psycopg2 import *
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
+        sage: bfcgc = BentFunctionCayleyGraphClassification.from_function(BentFunction([0,0,0,1]))
+        sage: dbname = 'doctest_digest_dbname'
+        sage: drop_database(dbname)
+        sage: conn = create_database(dbname)
+        sage: conn.close()
+        sage: conn = create_classification_tables(dbname)
+        sage: digest = select_database_digest(conn)
+        sage: insert_classification(conn, bfcgc, 'bentf')
+        sage: select_database_digest(conn) == digest
+        False
+        sage: len(select_database_digest(conn))
+        64
+        sage: digest = select_database_digest(conn)
+        sage: curs = conn.cursor()
+        sage: curs.execute("UPDATE matrices SET weight_class = 1 - weight_class WHERE b = 0 AND c = 0")
+        sage: conn.commit()
+        sage: select_database_digest(conn) == digest
+        False
+        sage: conn.close()
+        sage: drop_database(dbname)
+    """
+    queries = [
+        ("bent_function", """
+            SELECT nvariables, bent_function, name
+            FROM bent_function
+            ORDER BY nvariables, bent_function"""),
+        ("cayley_graph", """
+            SELECT cayley_graph.nvariables, cayley_graph.bent_function,
+                cayley_graph_index, canonical_label_hash
+            FROM cayley_graph
+            JOIN graph
+            ON graph.graph_id = cayley_graph.graph_id
+            ORDER BY cayley_graph.nvariables, cayley_graph.bent_function, cayley_graph_index"""),
+        ("graph", """
+            SELECT canonical_label_hash
+            FROM graph
+            ORDER BY canonical_label_hash"""),
+        ("matrices", """
+            SELECT nvariables, bent_function,
+                md5(string_agg(
+                    format('%s,%s,%s,%s,%s', c, b,
+                        bent_cayley_graph_index,
+                        dual_cayley_graph_index,
+                        weight_class),
+                    ';' ORDER BY c, b))
+            FROM matrices
+            GROUP BY nvariables, bent_function
+            ORDER BY nvariables, bent_function""")]
+    digest = hashlib.sha256()
+    curs = conn.cursor()
+    for table, query in queries:
+        digest.update(table.encode("UTF-8") + b"|")
+        curs.execute(query)
+        _update_digest(digest, curs)
+    return digest.hexdigest()
+
+
+def rebuild_summary_tables(conn):
+    """
+    Create the summary tables of a database, if they do not already exist,
+    and rebuild their contents from the other tables.
+
+    INPUT:
+
+    - ``conn`` -- a connection object for the database.
+
+    OUTPUT: None.
+
+    EXAMPLE:
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_psycopg2 import *
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
+        sage: bfcgc0 = BentFunctionCayleyGraphClassification.from_function(BentFunction([0,0,0,1]))
+        sage: bfcgc1 = BentFunctionCayleyGraphClassification.from_function(BentFunction([0,1,1,1]))
+        sage: dbname = 'doctest_rebuild_summary_tables_dbname'
+        sage: drop_database(dbname)
+        sage: conn = create_database(dbname)
+        sage: conn.close()
+        sage: conn = create_classification_tables(dbname)
+        sage: insert_classifications(conn, [bfcgc0, bfcgc1], ['bentf0', 'bentf1'])
+        sage: before = (select_function_summaries(conn), select_graph_summaries(conn))
+        sage: rebuild_summary_tables(conn)
+        sage: before == (select_function_summaries(conn), select_graph_summaries(conn))
+        True
+        sage: conn.close()
+        sage: drop_database(dbname)
+    """
+    create_summary_tables(conn)
+    curs = conn.cursor()
+    curs.execute("TRUNCATE function_summary, class_summary, graph_summary")
+    curs.execute("""
+        INSERT INTO function_summary
+        SELECT nvariables, bent_function, COUNT(*)
+        FROM cayley_graph
+        GROUP BY nvariables, bent_function""")
+    curs.execute("""
+        INSERT INTO graph_summary
+        SELECT graph_id, COUNT(*)
+        FROM cayley_graph
+        GROUP BY graph_id""")
+    curs.execute("""
+        WITH
+        bent AS (
+            SELECT bent_function, bent_cayley_graph_index AS n, COUNT(*) AS nbr_cells
+            FROM matrices
+            GROUP BY bent_function, bent_cayley_graph_index),
+        dual AS (
+            SELECT bent_function, dual_cayley_graph_index AS n, COUNT(*) AS nbr_cells
+            FROM matrices
+            GROUP BY bent_function, dual_cayley_graph_index)
+        INSERT INTO class_summary
+        SELECT
+            cayley_graph.nvariables,
+            cayley_graph.bent_function,
+            cayley_graph.cayley_graph_index,
+            COALESCE(bent.nbr_cells, 0),
+            COALESCE(dual.nbr_cells, 0)
+        FROM cayley_graph
+        LEFT JOIN bent
+            ON bent.bent_function = cayley_graph.bent_function
+            AND bent.n = cayley_graph.cayley_graph_index
+        LEFT JOIN dual
+            ON dual.bent_function = cayley_graph.bent_function
+            AND dual.n = cayley_graph.cayley_graph_index""")
+    conn.commit()
+
+
+# A summary of the classification of one bent function in a database.
+FunctionSummary = namedtuple(
+    "FunctionSummary",
+    ["name", "nvariables", "bent_function", "nbr_classes"])
+
+
+# A summary of one extended Cayley class of one bent function in a database.
+ClassSummary = namedtuple(
+    "ClassSummary",
+    ["cayley_graph_index", "nbr_bent_cells", "nbr_dual_cells"])
+
+
+# A summary of one graph in a database.
+GraphSummary = namedtuple(
+    "GraphSummary",
+    ["canonical_label_hash", "nbr_functions"])
+
+
+def select_function_summaries(conn):
+    """
+    Retrieve the number of extended Cayley classes of each bent function in a database,
+    using the ``function_summary`` table.
+
+    INPUT:
+
+    - ``conn`` -- a connection object for the database.
+
+    OUTPUT: a list of ``FunctionSummary`` named tuples, sorted by name and by bent function.
+
+    EXAMPLE:
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_psycopg2 import *
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
+        sage: bfcgc = BentFunctionCayleyGraphClassification.from_function(BentFunction([0,0,0,1]))
+        sage: dbname = 'doctest_select_function_summaries_dbname'
+        sage: drop_database(dbname)
+        sage: conn = create_database(dbname)
+        sage: conn.close()
+        sage: conn = create_classification_tables(dbname)
+        sage: insert_classification(conn, bfcgc, 'bentf')
+        sage: [(s.name, s.nvariables, s.nbr_classes) for s in select_function_summaries(conn)]
+        [('bentf', 2, 2)]
+        sage: conn.close()
+        sage: drop_database(dbname)
+    """
+    curs = conn.cursor()
+    curs.execute("""
+        SELECT
+            bent_function.name,
+            function_summary.nvariables,
+            function_summary.bent_function,
+            function_summary.nbr_classes
+        FROM function_summary
+        LEFT JOIN bent_function
+            ON bent_function.nvariables = function_summary.nvariables
+            AND bent_function.bent_function = function_summary.bent_function
+        ORDER BY
+            bent_function.name,
+            function_summary.nvariables,
+            function_summary.bent_function""")
+    return [
+        FunctionSummary(name, nvar, bytes(bftt), nbr_classes)
+        for name, nvar, bftt, nbr_classes in curs.fetchall()]
+
+
+def select_class_summaries_where_bent_function(
+    conn,
+    bentf):
+    """
+    Retrieve the number of cells in each extended Cayley class of a bent function,
+    using the ``class_summary`` table.
+
+    INPUT:
+
+    - ``conn`` -- a connection object for the database.
+    - ``bentf`` -- class BentFunction. A bent function.
+
+    OUTPUT: a list of ``ClassSummary`` named tuples, in order of Cayley graph index.
+
+    EXAMPLE:
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_psycopg2 import *
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
+        sage: bentf = BentFunction([0,0,0,1])
+        sage: bfcgc = BentFunctionCayleyGraphClassification.from_function(bentf)
+        sage: dbname = 'doctest_select_class_summaries_dbname'
+        sage: drop_database(dbname)
+        sage: conn = create_database(dbname)
+        sage: conn.close()
+        sage: conn = create_classification_tables(dbname)
+        sage: insert_classification(conn, bfcgc, 'bentf')
+        sage: [tuple(s) for s in select_class_summaries_where_bent_function(conn, bentf)]
+        [(0, 12, 12), (1, 4, 4)]
+        sage: conn.close()
+        sage: drop_database(dbname)
+    """
+    nvar = int(bentf.nvariables())
+    bftt = psycopg2.Binary(bentf.tt_buffer())
+    curs = conn.cursor()
+    curs.execute("""
+        SELECT cayley_graph_index, nbr_bent_cells, nbr_dual_cells
+        FROM class_summary
+        WHERE nvariables = (%s)
+        AND bent_function = (%s)
+        ORDER BY cayley_graph_index""",
+        (nvar, bftt))
+    return [
+        ClassSummary(*row)
+        for row in curs.fetchall()]
+
+
+def select_graph_summaries(
+    conn,
+    min_nbr_functions=1):
+    """
+    Retrieve the number of bent functions whose classification contains each graph,
+    using the ``graph_summary`` table.
+
+    INPUT:
+
+    - ``conn`` -- a connection object for the database.
+    - ``min_nbr_functions`` -- integer (default: 1). Only graphs contained in
+      the classifications of at least this many bent functions are retrieved.
+
+    OUTPUT: a list of ``GraphSummary`` named tuples, sorted by decreasing
+    number of functions, then by canonical label hash.
+
+    EXAMPLE:
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_psycopg2 import *
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
+        sage: bfcgc0 = BentFunctionCayleyGraphClassification.from_function(BentFunction([0,0,0,1]))
+        sage: bfcgc1 = BentFunctionCayleyGraphClassification.from_function(BentFunction([0,1,1,1]))
+        sage: dbname = 'doctest_select_graph_summaries_dbname'
+        sage: drop_database(dbname)
+        sage: conn = create_database(dbname)
+        sage: conn.close()
+        sage: conn = create_classification_tables(dbname)
+        sage: insert_classifications(conn, [bfcgc0, bfcgc1], ['bentf0', 'bentf1'])
+        sage: [s.nbr_functions for s in select_graph_summaries(conn)]
+        [2, 2]
+        sage: select_graph_summaries(conn, min_nbr_functions=3)
+        []
+        sage: conn.close()
+        sage: drop_database(dbname)
+    """
+    curs = conn.cursor()
+    curs.execute("""
+        SELECT graph.canonical_label_hash, graph_summary.nbr_functions
+        FROM graph_summary, graph
+        WHERE graph_summary.graph_id = graph.graph_id
+        AND graph_summary.nbr_functions >= (%s)
+        ORDER BY graph_summary.nbr_functions DESC, graph.canonical_label_hash""",
+        (int(min_nbr_functions),))
+    return [
+        GraphSummary(bytes(clh), nbr_functions)
+        for clh, nbr_functions in curs.fetchall()]
 
 
 def select_classification_where_name(
@@ -5,9 +5,23 @@ Interface to a classification database using sqlite3
 The ``classification_database_sqlite3`` module defines interfaces
 to manipulate an SQLite3 database of Cayley graph classifications.
 
+The matrices of each classification are stored either in the ``matrices`` table,
+with one row per cell, or, if the database was created with ``matrices_as_blobs=True``,
+in the ``matrices_blob`` table, with one row per bent function and each matrix stored
+as a single compressed BLOB. A cell-level view of the ``matrices_blob`` table is
+available on demand via ``create_matrices_cell_view``.
+
 AUTHORS:
 
 - Paul Leopardi (2017-10-28)
+- Paul Leopardi (2024-04-15): matrices stored as compressed BLOBs
+- Paul Leopardi (2024-05-06): indexed summaries of the classifications containing a Cayley graph
+- Paul Leopardi (2024-05-13): projection queries
+- Paul Leopardi (2024-05-20): summary tables
+- Paul Leopardi (2024-05-27): compressed canonical labels
+- Paul Leopardi (2024-06-03): connection manager for read-heavy serving
+- Paul Leopardi (2024-07-08): analytic strongly regular parameters
+- Paul Leopardi (2024-08-19): database version digest
 
 """
 #*****************************************************************************
@@ -21,14 +35,26 @@ AUTHORS:
 
 
 import hashlib
+import numpy as np
 import os
 import sqlite3
-
+import threading
+import uuid
+import zlib
+
+from builtins import object
+from collections import namedtuple
+from contextlib import contextmanager
+from functools import lru_cache
+from urllib.request import pathname2url
 #from exceptions import OSError
 from sage.matrix.constructor import matrix
+from sage.rings.integer_ring import ZZ
 
 from boolean_cayley_graphs.bent_function import BentFunction
 from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification, default_algorithm
+from boolean_cayley_graphs.canonical_label_storage import CanonicalLabelCodec
+from boolean_cayley_graphs.strongly_regular_graph import bent_cayley_class_parameters
 from boolean_cayley_graphs.weight_class import weight_class
 
 
@@ -130,13 +156,230 @@ def drop_database(db_name):
             pass
 
 
-def create_classification_tables(db_name):
+# Statements used by ``ConnectionManager.execute_prepared``, by name.
+prepared_statements = {
+    "select_bent_function_names": """
+        SELECT name
+        FROM bent_function
+        WHERE name IS NOT NULL
+        ORDER BY name""",
+    "select_bent_function_where_name": """
+        SELECT nvariables, bent_function
+        FROM bent_function
+        WHERE name = (?)"""}
+
+
+class ConnectionManager(object):
+    r"""
+    A manager of cached connections to an existing database, for read-heavy serving.
+
+    Each thread that uses the manager gets its own connection, which is opened on first use
+    and then reused, so that the statement cache of ``sqlite3`` can reuse prepared statements
+    across calls, including the named statements run by ``execute_prepared``. If ``read_only`` is ``True``, the connections are opened in read-only mode.
+    Each connection is tuned using the PRAGMAs ``mmap_size`` and ``cache_size``.
+    If the database file is writable, its journal mode is set to ``journal_mode``,
+    which persists in the file, so that readers do not block a concurrent writer.
+
+    EXAMPLE:
+
+    ::
+
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
+        sage: from boolean_cayley_graphs.classification_database_sqlite3 import *
+        sage: db_name = tmp_filename(ext='.db')
+        sage: conn = create_classification_tables(db_name)
+        sage: bfcgc = BentFunctionCayleyGraphClassification.from_function(BentFunction([0,0,0,1]))
+        sage: insert_classification(conn, bfcgc, "bentf")
+        sage: conn.close()
+        sage: manager = ConnectionManager(db_name)
+        sage: with manager.connection() as conn:
+        ....:     select_classification_where_name(conn, "bentf") == bfcgc
+        True
+        sage: with manager.connection() as con2:
+        ....:     con2 is conn
+        True
+        sage: [row["name"] for row in manager.execute_prepared(con2, "select_bent_function_names")]
+        ['bentf']
+        sage: con2.execute("PRAGMA journal_mode").fetchone()[0]
+        'wal'
+        sage: con2.execute("DELETE FROM bent_function")
+        Traceback (most recent call last):
+        ...
+        sqlite3.OperationalError: attempt to write a readonly database
+
+    The connections opened by other threads are also closed::
+
+        sage: import threading
+        sage: conns = []
+        sage: def use_connection():
+        ....:     with manager.connection() as conn:
+        ....:         conns.append(conn)
+        sage: thread = threading.Thread(target=use_connection)
+        sage: thread.start(); thread.join()
+        sage: manager.close()
+        sage: conns[0].execute("SELECT 1")
+        Traceback (most recent call last):
+        ...
+        sqlite3.ProgrammingError: Cannot operate on a closed database.
+        sage: drop_database(db_name)
+    """
+    def __init__(
+        self,
+        db_name,
+        read_only=True,
+        journal_mode="wal",
+        mmap_size=2**28,
+        cache_size=-2**16,
+        cached_statements=256,
+        statements=None):
+        r"""
+        Constructor.
+
+        INPUT:
+
+        - ``db_name`` -- string. The name of the existing database.
+        - ``read_only`` -- boolean (default: ``True``). If ``True``,
+          open each connection in read-only mode.
+        - ``journal_mode`` -- string (default: "wal"). The journal mode to set,
+          if the database file is writable. If ``None``, the journal mode is not changed.
+        - ``mmap_size`` -- integer (default: 2**28). The maximum number of bytes
+          of the database file to access using memory-mapped I/O.
+        - ``cache_size`` -- integer (default: -2**16). The page cache size
+          of each connection, in pages if positive, or in KiB if negative.
+        - ``cached_statements`` -- integer (default: 256). The number of prepared statements
+          cached by each connection.
+        - ``statements`` -- dictionary (default: `None`). Statements, by name, to add to
+          ``prepared_statements`` for use with ``execute_prepared``.
+        """
+        if not os.path.isfile(db_name):
+            raise IOError("File not found: {}".format(db_name))
+        self.db_name = db_name
+        self.read_only = read_only
+        self.mmap_size = mmap_size
+        self.cache_size = cache_size
+        self.cached_statements = cached_statements
+        self.statements = dict(prepared_statements)
+        if statements is not None:
+            self.statements.update(statements)
+        if journal_mode is not None and os.access(db_name, os.W_OK):
+            conn = sqlite3.connect(db_name)
+            conn.execute("PRAGMA journal_mode = {}".format(journal_mode))
+            conn.close()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+
+
+    def _connect(self):
+        r"""
+        Open and tune a new connection.
+        """
+        if self.read_only:
+            uri = "file:{}?mode=ro".format(pathname2url(os.path.abspath(self.db_name)))
+        else:
+            uri = "file:{}".format(pathname2url(os.path.abspath(self.db_name)))
+        # Each connection is used only by the thread that opened it,
+        # but may be closed by another thread, using ``close``.
+        conn = sqlite3.connect(
+            uri,
+            uri=True,
+            check_same_thread=False,
+            cached_statements=self.cached_statements)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA mmap_size = {:d}".format(self.mmap_size))
+        conn.execute("PRAGMA cache_size = {:d}".format(self.cache_size))
+        return conn
+
+
+    @contextmanager
+    def connection(self):
+        r"""
+        Use the connection of the current thread, opening it if necessary.
+
+        OUTPUT: a context manager that yields a database connection object.
+        The connection remains open after use.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        try:
+            yield conn
+        finally:
+            if not self.read_only and conn.in_transaction:
+                conn.rollback()
+
+
+    def execute_prepared(self, conn, name, parameters=()):
+        r"""
+        Execute a named statement.
+
+        INPUT:
+
+        - ``conn`` -- a connection object obtained from ``connection``.
+        - ``name`` -- string. The name of the statement.
+        - ``parameters`` -- tuple (default: ()). The parameters of the statement.
+
+        OUTPUT: a cursor object containing the result of the statement.
+        """
+        return conn.execute(self.statements[name], parameters)
+
+
+    def interrupt(self, conn):
+        r"""
+        Abort any statement running on a connection.
+
+        This method may be called from any thread.
+        The aborted statement raises ``sqlite3.OperationalError``.
+
+        INPUT:
+
+        - ``conn`` -- a connection object obtained from ``connection``.
+
+        OUTPUT: None.
+        """
+        conn.interrupt()
+
+
+    def close(self):
+        r"""
+        Close all of the connections opened by the manager, by any thread.
+
+        No other thread should be using a connection of the manager
+        when this method is called.
+        """
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+
+def create_classification_tables(
+    db_name,
+    matrices_as_blobs=False,
+    label_storage="text",
+    label_store_directory=None):
     """
     Create the tables used for a database of Cayley graph classifications.
 
     INPUT:
 
     - ``db_name`` -- string. The name of an existing database.
+    - ``matrices_as_blobs`` -- boolean (default: ``False``).
+      If ``False``, create the ``matrices`` table, with one row per cell.
+      If ``True``, instead create the ``matrices_blob`` table,
+      with one row per bent function and one compressed BLOB per matrix.
+    - ``label_storage`` -- string (default: "text"). The storage method for
+      canonical labels, one of ``label_storage_methods``, as per the
+      ``canonical_label_storage`` module. Any method other than "text"
+      is recorded in the ``metadata`` table, which also contains
+      the version counter, as per ``create_version_counter``.
+    - ``label_store_directory`` -- string (default: `None`). The directory
+      of the store of canonical labels, used only if ``label_storage`` is "store".
 
     OUTPUT: a database connection object.
 
@@ -165,9 +408,30 @@ def create_classification_tables(db_name):
         graph
         cayley_graph
         matrices
+        function_summary
+        class_summary
+        graph_summary
+        metadata
+        sage: conn.close()
+        sage: drop_database(db_name)
+
+    Create a database whose matrices are stored as BLOBs.
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_sqlite3 import *
+        sage: db_name = tmp_filename(ext='.db')
+        sage: conn = create_classification_tables(db_name, matrices_as_blobs=True)
+        sage: curs = conn.cursor()
+        sage: result = curs.execute("SELECT name FROM sqlite_master WHERE type='table'")
+        sage: [row["name"] for row in curs]
+        ['bent_function', 'graph', 'cayley_graph', 'matrices_blob',
+         'function_summary', 'class_summary', 'graph_summary', 'metadata']
         sage: conn.close()
         sage: drop_database(db_name)
     """
+    # Check the storage method before creating any tables.
+    CanonicalLabelCodec(label_storage, label_store_directory)
     conn = connect_to_database(db_name)
     curs = conn.cursor()
 
@@ -194,24 +458,233 @@ def create_classification_tables(db_name):
         FOREIGN KEY(canonical_label_hash)
             REFERENCES graph(canonical_label_hash),
         PRIMARY KEY(nvariables, bent_function, cayley_graph_index))""")
+    create_classification_indexes(conn)
+    if matrices_as_blobs:
+        curs.execute("""
+            CREATE TABLE matrices_blob(
+            nvariables INTEGER,
+            bent_function BLOB,
+            bent_cayley_graph_index_matrix BLOB,
+            dual_cayley_graph_index_matrix BLOB,
+            weight_class_matrix BLOB,
+            FOREIGN KEY(nvariables, bent_function)
+                REFERENCES bent_function(nvariables, bent_function),
+            PRIMARY KEY(nvariables, bent_function))""")
+    else:
+        curs.execute("""
+            CREATE TABLE matrices(
+            nvariables INTEGER,
+            bent_function BLOB,
+            b INTEGER,
+            c INTEGER,
+            bent_cayley_graph_index INTEGER,
+            dual_cayley_graph_index INTEGER,
+            weight_class INTEGER,
+            FOREIGN KEY(nvariables, bent_function)
+                REFERENCES bent_function(nvariables, bent_function),
+            FOREIGN KEY(nvariables, bent_function, bent_cayley_graph_index)
+                REFERENCES cayley_graph(nvariables, bent_function, cayley_graph_index),
+            FOREIGN KEY(nvariables, bent_function, dual_cayley_graph_index)
+                REFERENCES cayley_graph(nvariables, bent_function, cayley_graph_index),
+            PRIMARY KEY(nvariables, bent_function, b, c))""")
+    if label_storage != "text":
+        curs.execute("""
+            CREATE TABLE metadata(
+            key TEXT PRIMARY KEY,
+            value TEXT)""")
+        curs.executemany("""
+            INSERT INTO metadata
+            VALUES (?,?)""",
+            [
+                ("label_storage", label_storage),
+                ("label_store_directory", label_store_directory)])
+    conn.commit()
+    create_summary_tables(conn)
+    create_version_counter(conn)
+    return conn
+
+
+def select_label_codec(conn):
+    """
+    Return the codec for the canonical labels stored in a database.
+
+    INPUT:
+
+    - ``conn`` -- a connection object for the database.
+
+    OUTPUT: a ``CanonicalLabelCodec`` using the storage method recorded in the
+    ``metadata`` table, or the "text" method if there is no ``metadata`` table.
+
+    EXAMPLE:
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_sqlite3 import *
+        sage: db_name = tmp_filename(ext='.db')
+        sage: conn = create_classification_tables(db_name, label_storage="zlib")
+        sage: select_label_codec(conn).method
+        'zlib'
+        sage: conn.close()
+        sage: drop_database(db_name)
+    """
+    curs = conn.cursor()
+    curs.execute("""
+        SELECT COUNT(*)
+        FROM sqlite_master
+        WHERE type = 'table'
+        AND name = 'metadata'""")
+    if curs.fetchone()[0] == 0:
+        return CanonicalLabelCodec()
+    curs.execute("""
+        SELECT key, value
+        FROM metadata
+        WHERE key IN ('label_storage', 'label_store_directory')""")
+    metadata = {row[0]: row[1] for row in curs.fetchall()}
+    return CanonicalLabelCodec(
+        metadata.get("label_storage", "text"),
+        metadata.get("label_store_directory"))
+
+
+def _canonical_label_is_stored(conn, codec, cgcl_hash, canonical_label):
+    """
+    Test whether the ``graph`` table contains a given canonical label,
+    checking for a hash collision -- very unlikely.
+
+    INPUT:
+
+    - ``conn`` -- a connection object for the database.
+    - ``codec`` -- a ``CanonicalLabelCodec``.
+    - ``cgcl_hash`` -- bytes. The hash of ``canonical_label``.
+    - ``canonical_label`` -- string. A graph6_string encoding a Graph canonical label.
+
+    OUTPUT: ``True`` if the label is stored, otherwise ``False``.
+    """
+    curs = conn.cursor()
+    curs.execute("""
+        SELECT canonical_label
+        FROM graph
+        WHERE canonical_label_hash = (?)""",
+        (cgcl_hash,))
+    row = curs.fetchone()
+    return row is not None and codec.decode(row[0], cgcl_hash) == canonical_label
+
+
+def create_summary_tables(conn):
+    """
+    Create the summary tables of a database of Cayley graph classifications,
+    if they do not already exist.
+
+    The summary tables are:
+
+    - ``function_summary``: the number of extended Cayley classes of each bent function;
+    - ``class_summary``: the number of cells of the bent and dual Cayley graph index matrices
+      in each extended Cayley class of each bent function;
+    - ``graph_summary``: the number of bent functions whose classification contains each graph.
+
+    This function is called by ``create_classification_tables``.
+    The summary tables are maintained by ``insert_classification``,
+    and can be rebuilt from the other tables by ``rebuild_summary_tables``.
+
+    INPUT:
+
+    - ``conn`` -- a connection object for the database.
+
+    OUTPUT: None.
+    """
+    curs = conn.cursor()
     curs.execute("""
-        CREATE TABLE matrices(
+        CREATE TABLE IF NOT EXISTS function_summary(
         nvariables INTEGER,
         bent_function BLOB,
-        b INTEGER,
-        c INTEGER,
-        bent_cayley_graph_index INTEGER,
-        dual_cayley_graph_index INTEGER,
-        weight_class INTEGER,
+        nbr_classes INTEGER,
         FOREIGN KEY(nvariables, bent_function)
             REFERENCES bent_function(nvariables, bent_function),
-        FOREIGN KEY(nvariables, bent_function, bent_cayley_graph_index)
-            REFERENCES cayley_graph(nvariables, bent_function, cayley_graph_index),
-        FOREIGN KEY(nvariables, bent_function, dual_cayley_graph_index)
+        PRIMARY KEY(nvariables, bent_function))""")
+    curs.execute("""
+        CREATE TABLE IF NOT EXISTS class_summary(
+        nvariables INTEGER,
+        bent_function BLOB,
+        cayley_graph_index INTEGER,
+        nbr_bent_cells INTEGER,
+        nbr_dual_cells INTEGER,
+        FOREIGN KEY(nvariables, bent_function, cayley_graph_index)
             REFERENCES cayley_graph(nvariables, bent_function, cayley_graph_index),
-        PRIMARY KEY(nvariables, bent_function, b, c))""")
+        PRIMARY KEY(nvariables, bent_function, cayley_graph_index))""")
+    curs.execute("""
+        CREATE TABLE IF NOT EXISTS graph_summary(
+        canonical_label_hash BLOB,
+        nbr_functions INTEGER,
+        FOREIGN KEY(canonical_label_hash)
+            REFERENCES graph(canonical_label_hash),
+        PRIMARY KEY(canonical_label_hash))""")
+    conn.commit()
+
+
+def has_summary_tables(conn):
+    r"""
+    Test whether a database has summary tables.
+
+    INPUT:
+
+    - ``conn`` -- a connection object for the database.
+
+    OUTPUT: ``True`` if the database has a ``function_summary`` table, otherwise ``False``.
+
+    EXAMPLE:
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_sqlite3 import *
+        sage: db_name = tmp_filename(ext='.db')
+        sage: conn = create_classification_tables(db_name)
+        sage: has_summary_tables(conn)
+        True
+        sage: conn.close()
+        sage: drop_database(db_name)
+    """
+    curs = conn.cursor()
+    curs.execute("""
+        SELECT COUNT(*)
+        FROM sqlite_master
+        WHERE type = 'table'
+        AND name = 'function_summary'""")
+    return curs.fetchone()[0] > 0
+
+
+def create_classification_indexes(conn):
+    """
+    Create the secondary indexes used by a database of Cayley graph classifications,
+    if they do not already exist.
+
+    This function is called by ``create_classification_tables``.
+    It can also be used to add the indexes to an existing database.
+
+    INPUT:
+
+    - ``conn`` -- a connection object for the database.
+
+    OUTPUT: None.
+
+    EXAMPLE:
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_sqlite3 import *
+        sage: db_name = tmp_filename(ext='.db')
+        sage: conn = create_classification_tables(db_name)
+        sage: create_classification_indexes(conn)
+        sage: curs = conn.cursor()
+        sage: result = curs.execute("SELECT name FROM sqlite_master WHERE type='index' AND sql IS NOT NULL")
+        sage: [row["name"] for row in curs]
+        ['cayley_graph_canonical_label_hash']
+        sage: conn.close()
+        sage: drop_database(db_name)
+    """
+    curs = conn.cursor()
+    curs.execute("""
+        CREATE INDEX IF NOT EXISTS cayley_graph_canonical_label_hash
+        ON cayley_graph(canonical_label_hash)""")
     conn.commit()
-    return conn
 
 
 def canonical_label_hash(g):
@@ -247,119 +720,280 @@ def canonical_label_hash(g):
 flatten = lambda t: [item for sublist in t for item in sublist]
 
 
-def insert_classification(
-    conn,
-    bfcgc,
-    name=None):
-    """
-    Insert a Cayley graph classification into a database.
+# The type codes used in matrix BLOBs, and the corresponding numpy dtypes.
+# Each dtype is little-endian, so that BLOBs are portable.
+matrix_blob_dtypes = {
+    b"B": np.dtype("<u1"),
+    b"H": np.dtype("<u2"),
+    b"I": np.dtype("<u4")}
 
-    INPUT:
 
-    - ``conn`` -- a connection object for the database.
-    - ``bfcgc`` -- a Cayley graph classification.
-    - ``name`` -- string (default: `None`). The name of the bent function.
+def encode_matrix_blob(mat):
+    r"""
+    Encode an integer matrix with non-negative entries as a compressed BLOB.
 
-    OUTPUT: None.
+    The BLOB consists of a one byte type code, followed by the
+    ``zlib`` compressed entries of the matrix, in row major order,
+    using the smallest unsigned integer type that holds every entry.
 
-    A cursor object corresponding to state of the database after the
-    classification is inserted.
+    INPUT:
 
-    EXAMPLE:
+    - ``mat`` -- a matrix of non-negative integers, or ``None``.
 
-    Create a database, with tables, using a temporary filename, insert
-    a classification, retrieve it by bent function, then drop the database.
+    OUTPUT: a bytes object, or ``None`` if ``mat`` is ``None``.
+
+    EXAMPLE:
 
     ::
 
         sage: from boolean_cayley_graphs.classification_database_sqlite3 import *
-        sage: from boolean_cayley_graphs.bent_function import BentFunction
-        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
-        sage: bentf = BentFunction([0,0,0,1])
-        sage: bfcgc = BentFunctionCayleyGraphClassification.from_function(bentf)
-        sage: bfcgc.algebraic_normal_form
-        x0*x1
-        sage: db_name = tmp_filename(ext='.db')
-        sage: conn = create_classification_tables(db_name)
-        sage: insert_classification(conn, bfcgc, 'bentf')
-        sage: result = select_classification_where_bent_function(conn, bentf)
-        sage: result.algebraic_normal_form
-        x0*x1
-        sage: drop_database(db_name)
+        sage: m = matrix([[0, 1], [300, 2]])
+        sage: blob = encode_matrix_blob(m)
+        sage: blob[:1]
+        b'H'
+        sage: decode_matrix_blob(blob, 2) == m
+        True
+        sage: encode_matrix_blob(None) is None
+        True
     """
-    bentf = BentFunction(bfcgc.algebraic_normal_form)
-    dim = bentf.nvariables()
-    nvar = int(dim)
-    bftt = bentf.tt_buffer()
-    cgcl = bfcgc.cayley_graph_class_list
-    bcim = bfcgc.bent_cayley_graph_index_matrix
-    dcim = bfcgc.dual_cayley_graph_index_matrix
-    wcm  = bfcgc.weight_class_matrix
+    if mat is None:
+        return None
+    array = np.asarray(mat.numpy(), dtype=np.int64)
+    max_entry = int(array.max()) if array.size else 0
+    for type_code, dtype in matrix_blob_dtypes.items():
+        if max_entry <= np.iinfo(dtype).max:
+            break
+    return type_code + zlib.compress(array.astype(dtype).tobytes())
 
-    curs = conn.cursor()
-    curs.execute("BEGIN")
-    curs.execute("""
-        INSERT INTO bent_function
-        VALUES (?,?,?)""",
-        (nvar, bftt, name))
-    
-    cgcl_len = len(cgcl)
-    cgc_hash_list = [
-        canonical_label_hash(cgc)
-        for cgc in cgcl]
-    graph_param_list = [
-        (None, cgc_hash_list[n], cgcl[n])
-        for n in range(cgcl_len)]
-    curs.executemany("""
-        INSERT OR IGNORE INTO graph
-        VALUES (?,?,?)""",
-        graph_param_list)
 
-    cayley_graph_param_list = [
-        (nvar, bftt, n, cgc_hash_list[n])
-        for n in range(cgcl_len)]
-    curs.executemany("""
-        INSERT INTO cayley_graph
-        VALUES (?,?,?,?)""",
-        cayley_graph_param_list)
+def decode_matrix_blob_array(blob, v):
+    r"""
+    Decode a BLOB created by ``encode_matrix_blob`` as a ``v`` by ``v`` numpy array.
 
-    v = 2 ** dim
-    matrices_param_list = flatten([[(
-            nvar,
-            bftt,
-            b,
-            c,
-            int(bcim[c,b]),
-            int(dcim[c,b]),
-            int(wcm[c,b]))
-        for c in range(v)]
-        for b in range(v)])
-    curs.executemany("""
-        INSERT INTO matrices
-        VALUES (?,?,?,?,?,?,?)""",
-        matrices_param_list)
-    conn.commit()
+    INPUT:
 
+    - ``blob`` -- a bytes object, or ``None``.
+    - ``v`` -- integer. The number of rows and columns of the matrix.
 
-def select_classification_where_bent_function(
-    conn,
-    bentf):
+    OUTPUT: a numpy array, or ``None`` if ``blob`` is ``None``.
+
+    EXAMPLE:
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_sqlite3 import *
+        sage: blob = encode_matrix_blob(matrix([[0, 1], [3, 2]]))
+        sage: decode_matrix_blob_array(blob, 2)
+        array([[0, 1],
+               [3, 2]], dtype=uint8)
     """
-    Retrieve a Cayley graph classification for a given bent function from a database.
+    if blob is None:
+        return None
+    blob = bytes(blob)
+    dtype = matrix_blob_dtypes[blob[:1]]
+    return np.frombuffer(zlib.decompress(blob[1:]), dtype=dtype).reshape(v, v)
 
-    INPUT:
 
-    - ``conn`` -- a connection object for the database.
-    - ``bentf`` -- class BentFunction. A bent function.
+def decode_matrix_blob(blob, v):
+    r"""
+    Decode a BLOB created by ``encode_matrix_blob`` as a ``v`` by ``v`` Sage matrix.
 
-    OUTPUT:
+    INPUT:
 
-    class BentFunctionCayleyGraphClassification.
-    The corresponding Cayley graph classification.
+    - ``blob`` -- a bytes object, or ``None``.
+    - ``v`` -- integer. The number of rows and columns of the matrix.
+
+    OUTPUT: a matrix over the integers, or ``None`` if ``blob`` is ``None``.
 
     EXAMPLE:
 
-    Create a database, with tables, using a temporary filename, insert
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_sqlite3 import *
+        sage: blob = encode_matrix_blob(matrix([[0, 1], [3, 2]]))
+        sage: decode_matrix_blob(blob, 2)
+        [0 1]
+        [3 2]
+    """
+    array = decode_matrix_blob_array(blob, v)
+    if array is None:
+        return None
+    return matrix(ZZ, array.astype(np.int64))
+
+
+def has_matrices_blob_table(conn):
+    r"""
+    Test whether a database stores its matrices in the ``matrices_blob`` table.
+
+    INPUT:
+
+    - ``conn`` -- a connection object for the database.
+
+    OUTPUT: ``True`` if the database has a ``matrices_blob`` table, otherwise ``False``.
+
+    EXAMPLE:
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_sqlite3 import *
+        sage: db_name = tmp_filename(ext='.db')
+        sage: conn = create_classification_tables(db_name)
+        sage: has_matrices_blob_table(conn)
+        False
+        sage: conn.close()
+        sage: drop_database(db_name)
+    """
+    curs = conn.cursor()
+    curs.execute("""
+        SELECT COUNT(*)
+        FROM sqlite_master
+        WHERE type = 'table'
+        AND name = 'matrices_blob'""")
+    return curs.fetchone()[0] > 0
+
+
+def _matrix_blob_cell(blob, v, c, b):
+    r"""
+    Return the entry ``[c, b]`` of a ``v`` by ``v`` matrix stored as a BLOB.
+
+    This function is registered with SQLite by ``create_matrices_cell_view``.
+    The most recently decoded BLOBs are cached, so that a scan of the view
+    decodes each BLOB once.
+
+    TESTS:
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_sqlite3 import *
+        sage: from boolean_cayley_graphs.classification_database_sqlite3 import _matrix_blob_cell
+        sage: blob = encode_matrix_blob(matrix([[0, 1], [3, 2]]))
+        sage: _matrix_blob_cell(blob, 2, 1, 0)
+        3
+        sage: _matrix_blob_cell(None, 2, 1, 0) is None
+        True
+    """
+    if blob is None:
+        return None
+    return int(_cached_matrix_blob_array(bytes(blob), v)[c, b])
+
+
+@lru_cache(maxsize=6)
+def _cached_matrix_blob_array(blob, v):
+    r"""
+    Decode a matrix BLOB, caching the result.
+
+    TESTS:
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_sqlite3 import *
+        sage: from boolean_cayley_graphs.classification_database_sqlite3 import _cached_matrix_blob_array
+        sage: blob = encode_matrix_blob(matrix([[0, 1], [3, 2]]))
+        sage: _cached_matrix_blob_array(blob, 2) is _cached_matrix_blob_array(blob, 2)
+        True
+    """
+    return decode_matrix_blob_array(blob, v)
+
+
+def create_matrices_cell_view(conn):
+    r"""
+    Create a temporary view ``matrices_cell`` of the ``matrices_blob`` table,
+    with the same columns as the ``matrices`` table, one row per cell.
+
+    The view uses a recursive common table expression to enumerate the cells,
+    and a Python function registered with the connection to decode the BLOBs.
+    Both the function and the view exist only for the lifetime of ``conn``.
+
+    INPUT:
+
+    - ``conn`` -- a connection object for a database created with ``matrices_as_blobs=True``.
+
+    OUTPUT: None.
+
+    EXAMPLE:
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_sqlite3 import *
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
+        sage: bentf = BentFunction([0,0,0,1])
+        sage: bfcgc = BentFunctionCayleyGraphClassification.from_function(bentf)
+        sage: db_name = tmp_filename(ext='.db')
+        sage: conn = create_classification_tables(db_name, matrices_as_blobs=True)
+        sage: insert_classification(conn, bfcgc, 'bentf')
+        sage: create_matrices_cell_view(conn)
+        sage: curs = conn.cursor()
+        sage: result = curs.execute("SELECT COUNT(*) FROM matrices_cell")
+        sage: curs.fetchone()[0]
+        16
+        sage: result = curs.execute(
+        ....:     "SELECT c, b, bent_cayley_graph_index, weight_class FROM matrices_cell")
+        sage: all(
+        ....:     bfcgc.bent_cayley_graph_index_matrix[row["c"], row["b"]] == row["bent_cayley_graph_index"] and
+        ....:     bfcgc.weight_class_matrix[row["c"], row["b"]] == row["weight_class"]
+        ....:     for row in curs)
+        True
+        sage: conn.close()
+        sage: drop_database(db_name)
+    """
+    conn.create_function("matrix_blob_cell", 4, _matrix_blob_cell)
+    curs = conn.cursor()
+    curs.execute("""
+        CREATE TEMP VIEW IF NOT EXISTS matrices_cell AS
+        WITH RECURSIVE cell(nvariables, bent_function, n) AS (
+            SELECT nvariables, bent_function, 0
+            FROM matrices_blob
+            UNION ALL
+            SELECT nvariables, bent_function, n + 1
+            FROM cell
+            WHERE n + 1 < (1 << (2 * nvariables)))
+        SELECT
+            cell.nvariables AS nvariables,
+            cell.bent_function AS bent_function,
+            cell.n % (1 << cell.nvariables) AS b,
+            cell.n / (1 << cell.nvariables) AS c,
+            matrix_blob_cell(
+                m.bent_cayley_graph_index_matrix,
+                1 << cell.nvariables,
+                cell.n / (1 << cell.nvariables),
+                cell.n % (1 << cell.nvariables)) AS bent_cayley_graph_index,
+            matrix_blob_cell(
+                m.dual_cayley_graph_index_matrix,
+                1 << cell.nvariables,
+                cell.n / (1 << cell.nvariables),
+                cell.n % (1 << cell.nvariables)) AS dual_cayley_graph_index,
+            matrix_blob_cell(
+                m.weight_class_matrix,
+                1 << cell.nvariables,
+                cell.n / (1 << cell.nvariables),
+                cell.n % (1 << cell.nvariables)) AS weight_class
+        FROM cell, matrices_blob AS m
+        WHERE cell.nvariables = m.nvariables
+        AND cell.bent_function = m.bent_function""")
+
+
+def insert_classification(
+    conn,
+    bfcgc,
+    name=None):
+    """
+    Insert a Cayley graph classification into a database.
+
+    INPUT:
+
+    - ``conn`` -- a connection object for the database.
+    - ``bfcgc`` -- a Cayley graph classification.
+    - ``name`` -- string (default: `None`). The name of the bent function.
+
+    OUTPUT: None.
+
+    A cursor object corresponding to state of the database after the
+    classification is inserted.
+
+    EXAMPLE:
+
+    Create a database, with tables, using a temporary filename, insert
     a classification, retrieve it by bent function, then drop the database.
 
     ::
@@ -367,220 +1001,1744 @@ def select_classification_where_bent_function(
         sage: from boolean_cayley_graphs.classification_database_sqlite3 import *
         sage: from boolean_cayley_graphs.bent_function import BentFunction
         sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
-        sage: bentf = BentFunction([0,0,0,1])
-        sage: bfcgc = BentFunctionCayleyGraphClassification.from_function(bentf)
-        sage: bfcgc.algebraic_normal_form
-        x0*x1
+        sage: bentf = BentFunction([0,0,0,1])
+        sage: bfcgc = BentFunctionCayleyGraphClassification.from_function(bentf)
+        sage: bfcgc.algebraic_normal_form
+        x0*x1
+        sage: db_name = tmp_filename(ext='.db')
+        sage: conn = create_classification_tables(db_name)
+        sage: insert_classification(conn, bfcgc, 'bentf')
+        sage: result = select_classification_where_bent_function(conn, bentf)
+        sage: result.algebraic_normal_form
+        x0*x1
+        sage: drop_database(db_name)
+    """
+    insert_classifications(conn, [bfcgc], [name])
+
+
+# The rows of one Cayley graph classification, ready to insert into a database.
+ClassificationRows = namedtuple(
+    "ClassificationRows",
+    [
+        "bent_function",
+        "graph",
+        "cayley_graph",
+        "function_summary",
+        "class_summary",
+        "graph_summary",
+        "matrices_blob",
+        "matrices"])
+ClassificationRows.__doc__ = """
+The rows of one Cayley graph classification, ready to insert into a database,
+as returned by ``classification_rows``.
+
+Each field is a list of parameter tuples for the table of the same name,
+and is empty if the table is not used.
+"""
+
+
+# The statement used to insert the rows of each table of ``ClassificationRows``.
+insert_row_statements = ClassificationRows(
+    bent_function="""
+        INSERT INTO bent_function
+        VALUES (?,?,?)""",
+    graph="""
+        INSERT OR IGNORE INTO graph
+        VALUES (?,?,?)""",
+    cayley_graph="""
+        INSERT INTO cayley_graph
+        VALUES (?,?,?,?)""",
+    function_summary="""
+        INSERT INTO function_summary
+        VALUES (?,?,?)""",
+    class_summary="""
+        INSERT INTO class_summary
+        VALUES (?,?,?,?,?)""",
+    graph_summary="""
+        INSERT INTO graph_summary
+        VALUES (?,1)
+        ON CONFLICT(canonical_label_hash)
+        DO UPDATE SET nbr_functions = nbr_functions + 1""",
+    matrices_blob="""
+        INSERT INTO matrices_blob
+        VALUES (?,?,?,?,?)""",
+    matrices="""
+        INSERT INTO matrices
+        VALUES (?,?,?,?,?,?,?)""")
+
+
+def classification_row_options(conn):
+    """
+    Return the options of ``classification_rows`` that match a database.
+
+    INPUT:
+
+    - ``conn`` -- a connection object for the database.
+
+    OUTPUT: a dictionary with keys "matrices_as_blobs", "summary_tables" and "codec".
+
+    EXAMPLE:
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_sqlite3 import *
+        sage: db_name = tmp_filename(ext='.db')
+        sage: conn = create_classification_tables(db_name)
+        sage: options = classification_row_options(conn)
+        sage: options["matrices_as_blobs"], options["summary_tables"], options["codec"].method
+        (False, True, 'text')
+        sage: conn.close()
+        sage: drop_database(db_name)
+    """
+    return {
+        "matrices_as_blobs": has_matrices_blob_table(conn),
+        "summary_tables": has_summary_tables(conn),
+        "codec": select_label_codec(conn)}
+
+
+def classification_rows(
+    bfcgc,
+    name=None,
+    matrices_as_blobs=False,
+    summary_tables=False,
+    codec=None):
+    """
+    Prepare the rows of a Cayley graph classification, ready to insert into a database.
+
+    This function does not use a database connection, so that the rows
+    can be prepared by worker processes, as per ``populate_database``.
+
+    INPUT:
+
+    - ``bfcgc`` -- a Cayley graph classification.
+    - ``name`` -- string (default: `None`). The name of the bent function.
+    - ``matrices_as_blobs`` -- boolean (default: ``False``).
+      Whether the database has a ``matrices_blob`` table.
+    - ``summary_tables`` -- boolean (default: ``False``).
+      Whether the database has summary tables to maintain.
+    - ``codec`` -- a ``CanonicalLabelCodec`` (default: `None`).
+      The codec used to store canonical labels. Default is None, meaning text.
+
+    OUTPUT: a ``ClassificationRows``.
+
+    EXAMPLE:
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_sqlite3 import *
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
+        sage: bfcgc = BentFunctionCayleyGraphClassification.from_function(BentFunction([0,0,0,1]))
+        sage: rows = classification_rows(bfcgc, "bentf")
+        sage: rows.bent_function
+        [(2, b'\\x08', 'bentf')]
+        sage: len(rows.cayley_graph), len(rows.matrices), len(rows.matrices_blob)
+        (2, 16, 0)
+    """
+    if codec is None:
+        codec = CanonicalLabelCodec()
+    bentf = BentFunction(bfcgc.algebraic_normal_form)
+    dim = bentf.nvariables()
+    nvar = int(dim)
+    bftt = bentf.tt_buffer()
+    cgcl = bfcgc.cayley_graph_class_list
+    bcim = bfcgc.bent_cayley_graph_index_matrix
+    dcim = bfcgc.dual_cayley_graph_index_matrix
+    wcm  = bfcgc.weight_class_matrix
+
+    cgcl_len = len(cgcl)
+    cgc_hash_list = [
+        canonical_label_hash(cgc)
+        for cgc in cgcl]
+    graph_rows = [
+        (None, cgc_hash_list[n], codec.encode(cgcl[n], cgc_hash_list[n]))
+        for n in range(cgcl_len)]
+    cayley_graph_rows = [
+        (nvar, bftt, n, cgc_hash_list[n])
+        for n in range(cgcl_len)]
+
+    function_summary_rows = []
+    class_summary_rows = []
+    graph_summary_rows = []
+    if summary_tables:
+        bent_counts = bfcgc.class_cell_index().counts.tolist()
+        dual_index = bfcgc.class_cell_index(dual=True)
+        dual_counts = (
+            dual_index.counts.tolist()
+            if dual_index is not None else
+            [None] * cgcl_len)
+        function_summary_rows = [(nvar, bftt, cgcl_len)]
+        class_summary_rows = [
+            (nvar, bftt, n, bent_counts[n], dual_counts[n])
+            for n in range(cgcl_len)]
+        graph_summary_rows = [(cgc_hash,) for cgc_hash in cgc_hash_list]
+
+    matrices_blob_rows = []
+    matrices_rows = []
+    if matrices_as_blobs:
+        matrices_blob_rows = [(
+            nvar,
+            bftt,
+            encode_matrix_blob(bcim),
+            encode_matrix_blob(dcim),
+            encode_matrix_blob(wcm))]
+    else:
+        # Build the parameter list column by column, in the order b, c.
+        v = 2 ** dim
+        c_array, b_array = np.meshgrid(np.arange(v), np.arange(v), indexing="ij")
+        columns = [
+            array.T.ravel().tolist()
+            for array in (
+                b_array,
+                c_array,
+                bcim.numpy(),
+                dcim.numpy(),
+                wcm.numpy())]
+        matrices_rows = [
+            (nvar, bftt) + cell
+            for cell in zip(*columns)]
+
+    return ClassificationRows(
+        bent_function=[(nvar, bftt, name)],
+        graph=graph_rows,
+        cayley_graph=cayley_graph_rows,
+        function_summary=function_summary_rows,
+        class_summary=class_summary_rows,
+        graph_summary=graph_summary_rows,
+        matrices_blob=matrices_blob_rows,
+        matrices=matrices_rows)
+
+
+def insert_classification_rows(
+    conn,
+    list_of_rows,
+    batch_size=64):
+    """
+    Insert the prepared rows of a list of Cayley graph classifications into a database,
+    using one transaction for each batch of classifications.
+
+    INPUT:
+
+    - ``conn`` -- a connection object for the database.
+    - ``list_of_rows`` -- a list of ``ClassificationRows``, as returned by
+      ``classification_rows`` with the options given by ``classification_row_options``.
+    - ``batch_size`` -- integer (default: 64). The number of classifications
+      to insert per transaction.
+
+    OUTPUT: None.
+
+    EXAMPLE:
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_sqlite3 import *
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
+        sage: bfcgc = BentFunctionCayleyGraphClassification.from_function(BentFunction([0,0,0,1]))
+        sage: db_name = tmp_filename(ext='.db')
+        sage: conn = create_classification_tables(db_name)
+        sage: rows = classification_rows(bfcgc, "bentf", **classification_row_options(conn))
+        sage: insert_classification_rows(conn, [rows])
+        sage: select_classification_where_name(conn, "bentf") == bfcgc
+        True
+
+    A batch that fails is rolled back::
+
+        sage: insert_classification_rows(conn, [rows])
+        Traceback (most recent call last):
+        ...
+        sqlite3.IntegrityError: UNIQUE constraint failed: ...
+        sage: conn.in_transaction
+        False
+        sage: conn.close()
+        sage: drop_database(db_name)
+    """
+    curs = conn.cursor()
+    for batch_start in range(0, len(list_of_rows), batch_size):
+        curs.execute("BEGIN")
+        try:
+            for rows in list_of_rows[batch_start:batch_start + batch_size]:
+                for statement, table_rows in zip(insert_row_statements, rows):
+                    if table_rows:
+                        curs.executemany(statement, table_rows)
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
+
+def insert_classifications(
+    conn,
+    list_of_bfcgc,
+    names=None,
+    batch_size=64):
+    """
+    Insert a list of Cayley graph classifications into a database,
+    using one transaction for each batch of classifications.
+
+    INPUT:
+
+    - ``conn`` -- a connection object for the database.
+    - ``list_of_bfcgc`` -- a list of Cayley graph classifications.
+    - ``names`` -- a list of strings (default: `None`). The names of the bent functions.
+      If `None`, no names are recorded.
+    - ``batch_size`` -- integer (default: 64). The number of classifications
+      to insert per transaction.
+
+    OUTPUT: None.
+
+    EXAMPLE:
+
+    Create a database, with tables, using a temporary filename, insert
+    two classifications, retrieve one by name, then drop the database.
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_sqlite3 import *
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
+        sage: bfcgc0 = BentFunctionCayleyGraphClassification.from_function(BentFunction([0,0,0,1]))
+        sage: bfcgc1 = BentFunctionCayleyGraphClassification.from_function(BentFunction([1,0,0,0]))
+        sage: db_name = tmp_filename(ext='.db')
+        sage: conn = create_classification_tables(db_name)
+        sage: insert_classifications(conn, [bfcgc0, bfcgc1], ['bentf0', 'bentf1'])
+        sage: select_classification_where_name(conn, 'bentf1') == bfcgc1
+        True
+        sage: conn.close()
+        sage: drop_database(db_name)
+    """
+    if names is None:
+        names = [None] * len(list_of_bfcgc)
+    options = classification_row_options(conn)
+    for batch_start in range(0, len(list_of_bfcgc), batch_size):
+        batch_stop = batch_start + batch_size
+        insert_classification_rows(
+            conn,
+            [
+                classification_rows(bfcgc, name, **options)
+                for bfcgc, name in zip(
+                    list_of_bfcgc[batch_start:batch_stop],
+                    names[batch_start:batch_stop])],
+            batch_size=batch_size)
+
+
+def select_classification_where_bent_function(
+    conn,
+    bentf):
+    """
+    Retrieve a Cayley graph classification for a given bent function from a database.
+
+    INPUT:
+
+    - ``conn`` -- a connection object for the database.
+    - ``bentf`` -- class BentFunction. A bent function.
+
+    OUTPUT:
+
+    class BentFunctionCayleyGraphClassification.
+    The corresponding Cayley graph classification,
+    or ``None`` if the bent function is not in the database.
+
+    EXAMPLE:
+
+    Create a database, with tables, using a temporary filename, insert
+    a classification, retrieve it by bent function, then drop the database.
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_sqlite3 import *
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
+        sage: bentf = BentFunction([0,0,0,1])
+        sage: bfcgc = BentFunctionCayleyGraphClassification.from_function(bentf)
+        sage: bfcgc.algebraic_normal_form
+        x0*x1
+        sage: db_name = tmp_filename(ext='.db')
+        sage: conn = create_classification_tables(db_name)
+        sage: insert_classification(conn, bfcgc, 'bentf')
+        sage: result = select_classification_where_bent_function(conn, bentf)
+        sage: result.algebraic_normal_form
+        x0*x1
+        sage: type(result)
+        <class 'boolean_cayley_graphs.bent_function_cayley_graph_classification.BentFunctionCayleyGraphClassification'>
+        sage: result.report(report_on_matrix_details=True)
+        Algebraic normal form of Boolean function: x0*x1
+        Function is bent.
+        <BLANKLINE>
+        Weight class matrix:
+        [0 0 0 1]
+        [0 1 0 0]
+        [0 0 1 0]
+        [1 0 0 0]
+        <BLANKLINE>
+        SDP design incidence structure t-design parameters: (True, (1, 4, 1, 1))
+        <BLANKLINE>
+        Classification of Cayley graphs and classification of Cayley graphs of duals are the same:
+        <BLANKLINE>
+        There are 2 extended Cayley classes in the extended translation class.
+        <BLANKLINE>
+        Matrix of indices of Cayley graphs:
+        [0 0 0 1]
+        [0 1 0 0]
+        [0 0 1 0]
+        [1 0 0 0]
+        sage: drop_database(db_name)
+
+    The same classification is obtained from a database whose matrices are stored as BLOBs.
+
+    ::
+
+        sage: db_name = tmp_filename(ext='.db')
+        sage: conn = create_classification_tables(db_name, matrices_as_blobs=True)
+        sage: insert_classification(conn, bfcgc, 'bentf')
+        sage: result = select_classification_where_bent_function(conn, bentf)
+        sage: result == bfcgc
+        True
+        sage: select_classification_where_bent_function(conn, BentFunction([1,0,0,0])) is None
+        True
+        sage: conn.close()
+        sage: drop_database(db_name)
+
+    The same classification is obtained from databases whose canonical labels
+    are compressed, or kept in a separate store.
+
+    ::
+
+        sage: for label_storage in ("zlib", "store"):
+        ....:     db_name = tmp_filename(ext='.db')
+        ....:     conn = create_classification_tables(
+        ....:         db_name,
+        ....:         label_storage=label_storage,
+        ....:         label_store_directory=tmp_dir())
+        ....:     insert_classification(conn, bfcgc, 'bentf')
+        ....:     print(select_classification_where_bent_function(conn, bentf) == bfcgc)
+        ....:     print(len(select_cayley_graph_summaries_where_bent_function_cayley_graph(conn, bentf)))
+        ....:     conn.close()
+        ....:     drop_database(db_name)
+        True
+        1
+        True
+        1
+    """
+    dim = bentf.nvariables()
+    nvar = int(dim)
+    bftt = bentf.tt_buffer()
+    curs = conn.cursor()
+    curs.execute("""
+        SELECT COUNT(*)
+        FROM cayley_graph
+        WHERE nvariables = (?)
+        AND bent_function = (?)""",
+        (nvar, bftt))
+    cgcl_len = curs.fetchone()[0]
+    if cgcl_len == 0:
+        return None
+
+    cgcl = [None] * cgcl_len
+    codec = select_label_codec(conn)
+    curs.execute("""
+        SELECT cayley_graph_index, graph.canonical_label_hash, canonical_label
+        FROM cayley_graph, graph
+        WHERE nvariables = (?)
+        AND bent_function = (?)
+        AND cayley_graph.canonical_label_hash = graph.canonical_label_hash""",
+        (nvar, bftt))
+    for row in curs.fetchall():
+        cayley_graph_index = row["cayley_graph_index"]
+        canonical_label = codec.decode(row["canonical_label"], row["canonical_label_hash"])
+        cgcl[cayley_graph_index] = canonical_label
+
+    v = 2 ** dim
+    if has_matrices_blob_table(conn):
+        curs.execute("""
+            SELECT *
+            FROM matrices_blob
+            WHERE nvariables = (?)
+            AND bent_function = (?)""",
+            (nvar, bftt))
+        row = curs.fetchone()
+        if row is None:
+            return None
+        bcim = decode_matrix_blob(row["bent_cayley_graph_index_matrix"], v)
+        dcim = decode_matrix_blob(row["dual_cayley_graph_index_matrix"], v)
+        wcm  = decode_matrix_blob(row["weight_class_matrix"], v)
+    else:
+        curs.execute("""
+            SELECT b, c, bent_cayley_graph_index, dual_cayley_graph_index, weight_class
+            FROM matrices
+            WHERE nvariables = (?)
+            AND bent_function = (?)""",
+            (nvar, bftt))
+        cells = np.array(curs.fetchall(), dtype=np.int64).reshape(-1, 5)
+        arrays = np.zeros((3, v, v), dtype=np.int64)
+        for k in range(3):
+            arrays[k, cells[:, 1], cells[:, 0]] = cells[:, 2 + k]
+        bcim = matrix(ZZ, arrays[0])
+        dcim = matrix(ZZ, arrays[1])
+        wcm  = matrix(ZZ, arrays[2])
+
+    return BentFunctionCayleyGraphClassification(
+        algebraic_normal_form=bentf.algebraic_normal_form(),
+        cayley_graph_class_list=cgcl,
+        bent_cayley_graph_index_matrix=bcim,
+        dual_cayley_graph_index_matrix=dcim,
+        weight_class_matrix=wcm)
+
+
+# A summary of one extended Cayley class of one bent function in a database.
+CayleyGraphSummary = namedtuple(
+    "CayleyGraphSummary",
+    ["name", "nvariables", "bent_function", "cayley_graph_index", "cell_count"])
+
+
+def select_cayley_graph_summaries_where_canonical_label(
+    conn,
+    canonical_label):
+    """
+    Retrieve summaries of the extended Cayley classes, within all classifications
+    in a database, whose Cayley graph has a given canonical label.
+
+    The classifications are found using the index on ``cayley_graph(canonical_label_hash)``.
+    The cell counts are read from the ``class_summary`` table, if the database
+    has summary tables; otherwise they are counted from the matrices.
+
+    INPUT:
+
+    - ``conn`` -- a connection object for the database.
+    - ``canonical_label`` -- string. A graph6_string encoding a Graph canonical label.
+
+    OUTPUT:
+
+    A list of ``CayleyGraphSummary`` named tuples, sorted by name and by bent function.
+    Each summary contains the name, number of variables, and truth table buffer
+    of a bent function, the index of the matching Cayley class within its classification,
+    and the number of cells of the bent Cayley graph index matrix in this class.
+    The list is empty if no classification contains the canonical label.
+
+    EXAMPLE:
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_sqlite3 import *
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
+        sage: db_name = tmp_filename(ext='.db')
+        sage: conn = create_classification_tables(db_name)
+        sage: bfcgc0 = BentFunctionCayleyGraphClassification.from_function(BentFunction([0,0,0,1]))
+        sage: insert_classification(conn, bfcgc0, 'bentf0')
+        sage: bfcgc1 = BentFunctionCayleyGraphClassification.from_function(BentFunction([0,1,1,1]))
+        sage: insert_classification(conn, bfcgc1, 'bentf1')
+        sage: summaries = select_cayley_graph_summaries_where_canonical_label(conn, 'CK')
+        sage: [(s.name, s.cayley_graph_index, s.cell_count) for s in summaries]
+        [('bentf0', 0, 12), ('bentf1', 1, 12)]
+        sage: select_cayley_graph_summaries_where_canonical_label(conn, 'Not a label')
+        []
+        sage: conn.close()
+        sage: drop_database(db_name)
+    """
+    cgcl_hash = canonical_label_hash(canonical_label)
+    if not _canonical_label_is_stored(conn, select_label_codec(conn), cgcl_hash, canonical_label):
+        return []
+    curs = conn.cursor()
+    if has_summary_tables(conn):
+        # Read the cell counts maintained in the summary tables.
+        curs.execute("""
+            SELECT
+                bent_function.name AS name,
+                cayley_graph.nvariables AS nvariables,
+                cayley_graph.bent_function AS bent_function,
+                cayley_graph.cayley_graph_index AS cayley_graph_index,
+                class_summary.nbr_bent_cells AS cell_count
+            FROM cayley_graph
+            LEFT JOIN bent_function
+                ON bent_function.nvariables = cayley_graph.nvariables
+                AND bent_function.bent_function = cayley_graph.bent_function
+            LEFT JOIN class_summary
+                ON class_summary.nvariables = cayley_graph.nvariables
+                AND class_summary.bent_function = cayley_graph.bent_function
+                AND class_summary.cayley_graph_index = cayley_graph.cayley_graph_index
+            WHERE cayley_graph.canonical_label_hash = (?)""",
+            (cgcl_hash,))
+        summaries = [
+            CayleyGraphSummary(*tuple(row))
+            for row in curs.fetchall()]
+    elif has_matrices_blob_table(conn):
+        curs.execute("""
+            SELECT
+                bent_function.name AS name,
+                cayley_graph.nvariables AS nvariables,
+                cayley_graph.bent_function AS bent_function,
+                cayley_graph.cayley_graph_index AS cayley_graph_index,
+                matrices_blob.bent_cayley_graph_index_matrix AS bcim
+            FROM cayley_graph
+            LEFT JOIN bent_function
+                ON bent_function.nvariables = cayley_graph.nvariables
+                AND bent_function.bent_function = cayley_graph.bent_function
+            LEFT JOIN matrices_blob
+                ON matrices_blob.nvariables = cayley_graph.nvariables
+                AND matrices_blob.bent_function = cayley_graph.bent_function
+            WHERE cayley_graph.canonical_label_hash = (?)""",
+            (cgcl_hash,))
+        summaries = []
+        for row in curs.fetchall():
+            v = 2 ** row["nvariables"]
+            bcim = decode_matrix_blob_array(row["bcim"], v)
+            summaries.append(CayleyGraphSummary(
+                row["name"],
+                row["nvariables"],
+                row["bent_function"],
+                row["cayley_graph_index"],
+                int(np.count_nonzero(bcim == row["cayley_graph_index"]))))
+    else:
+        curs.execute("""
+            SELECT
+                bent_function.name AS name,
+                cayley_graph.nvariables AS nvariables,
+                cayley_graph.bent_function AS bent_function,
+                cayley_graph.cayley_graph_index AS cayley_graph_index,
+                (
+                    SELECT COUNT(*)
+                    FROM matrices
+                    WHERE matrices.nvariables = cayley_graph.nvariables
+                    AND matrices.bent_function = cayley_graph.bent_function
+                    AND matrices.bent_cayley_graph_index = cayley_graph.cayley_graph_index
+                ) AS cell_count
+            FROM cayley_graph
+            LEFT JOIN bent_function
+                ON bent_function.nvariables = cayley_graph.nvariables
+                AND bent_function.bent_function = cayley_graph.bent_function
+            WHERE cayley_graph.canonical_label_hash = (?)""",
+            (cgcl_hash,))
+        summaries = [
+            CayleyGraphSummary(*tuple(row))
+            for row in curs.fetchall()]
+    summaries.sort(key=lambda s: (s.name or "", s.nvariables, s.bent_function))
+    return summaries
+
+
+def select_cayley_graph_summaries_where_bent_function_cayley_graph(
+    conn,
+    bentf,
+    algorithm=default_algorithm):
+    """
+    Given a bent function ``bentf``, retrieve summaries of the extended Cayley classes,
+    within all classifications in a database, whose Cayley graph is isomorphic to
+    the Cayley graph of ``bentf``.
+
+    INPUT:
+
+    - ``conn`` -- a connection object for the database.
+    - ``bentf`` -- class BentFunction. A bent function.
+    - ``algorithm`` -- string (default: BentFunctionCayleyGraphClassification.default_algorithm).
+      Algorithm used for canonical labelling.
+
+    OUTPUT:
+
+    A list of ``CayleyGraphSummary`` named tuples, as per
+    ``select_cayley_graph_summaries_where_canonical_label``.
+
+    EXAMPLE:
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_sqlite3 import *
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
+        sage: db_name = tmp_filename(ext='.db')
+        sage: conn = create_classification_tables(db_name)
+        sage: bentf0 = BentFunction([0,0,0,1])
+        sage: bfcgc0 = BentFunctionCayleyGraphClassification.from_function(bentf0)
+        sage: insert_classification(conn, bfcgc0, 'bentf0')
+        sage: summaries = select_cayley_graph_summaries_where_bent_function_cayley_graph(conn, bentf0)
+        sage: [(s.name, s.cayley_graph_index, s.cell_count) for s in summaries]
+        [('bentf0', 0, 12)]
+        sage: conn.close()
+        sage: drop_database(db_name)
+    """
+    cayley_graph = bentf.extended_cayley_graph()
+    cgcl = cayley_graph.canonical_label(algorithm=algorithm).graph6_string()
+    return select_cayley_graph_summaries_where_canonical_label(conn, cgcl)
+
+
+def select_classifications_where_summaries(
+    conn,
+    summaries):
+    """
+    Lazily retrieve the Cayley graph classifications of the bent functions in a list of summaries.
+
+    INPUT:
+
+    - ``conn`` -- a connection object for the database.
+    - ``summaries`` -- a list of ``CayleyGraphSummary`` named tuples.
+
+    OUTPUT:
+
+    A generator yielding one ``BentFunctionCayleyGraphClassification`` for each distinct
+    bent function in ``summaries``, in order of first appearance. Each classification
+    is retrieved only when the generator reaches it.
+
+    EXAMPLE:
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_sqlite3 import *
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
+        sage: db_name = tmp_filename(ext='.db')
+        sage: conn = create_classification_tables(db_name)
+        sage: bentf0 = BentFunction([0,0,0,1])
+        sage: bfcgc0 = BentFunctionCayleyGraphClassification.from_function(bentf0)
+        sage: insert_classification(conn, bfcgc0, 'bentf0')
+        sage: summaries = select_cayley_graph_summaries_where_bent_function_cayley_graph(conn, bentf0)
+        sage: classifications = select_classifications_where_summaries(conn, summaries)
+        sage: next(classifications) == bfcgc0
+        True
+        sage: conn.close()
+        sage: drop_database(db_name)
+    """
+    seen = set()
+    for summary in summaries:
+        key = (summary.nvariables, bytes(summary.bent_function))
+        if key in seen:
+            continue
+        seen.add(key)
+        yield select_classification_where_bent_function(
+            conn,
+            BentFunction.from_tt_buffer(summary.nvariables, summary.bent_function))
+
+
+def select_classification_where_bent_function_cayley_graph(
+    conn,
+    bentf,
+    algorithm=default_algorithm):    
+    """
+    Given a bent function ``bentf``, retrieve all classifications that
+    contain a Cayley graph isomorphic to the Cayley graph of ``bentf``.
+
+    INPUT:
+
+    - ``conn`` -- a connection object for the database.
+    - ``bentf`` -- class BentFunction. A bent function.
+    - ``algorithm`` -- string (default: BentFunctionCayleyGraphClassification.default_algorithm). 
+      Algorithm used for canonical labelling.
+
+    OUTPUT:
+
+    A list where each entry has class BentFunctionCayleyGraphClassification.
+    The corresponding list of Cayley graph classifications.
+
+    NOTE:
+
+    ::
+
+        The list is not sorted in any way.
+
+    EXAMPLE:
+
+    Create a database, with tables, using a temporary filename, insert
+    a classification, retrieve it by bent function Cayley graph, then drop the database.
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_sqlite3 import *
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
+        sage: db_name = 'doctest_select_classification_where_bent_function_db_name'
+        sage: drop_database(db_name)
+        sage: conn = create_database(db_name)
+        sage: conn.close()
+        sage: conn = create_classification_tables(db_name)
+        sage: bentf0 = BentFunction([0,0,0,1])
+        sage: bfcgc0 = BentFunctionCayleyGraphClassification.from_function(bentf0)
+        sage: bfcgc0.algebraic_normal_form
+        x0*x1
+        sage: insert_classification(conn, bfcgc0, 'bentf0')
+        sage: bentf1 = BentFunction([1,0,0,0])
+        sage: bfcgc1 = BentFunctionCayleyGraphClassification.from_function(bentf1)
+        sage: bfcgc1.algebraic_normal_form
+        x0*x1 + x0 + x1 + 1
+        sage: insert_classification(conn, bfcgc1, 'bentf1')
+        sage: result = select_classification_where_bent_function_cayley_graph(conn, bentf1)
+        sage: type(result)
+        <class 'list'>
+        sage: len(result)
+        2
+        sage: sorted_result = sorted(result, key=lambda c: str(c.algebraic_normal_form))
+        sage: for c in sorted_result:
+        ....:     type(c)
+        ....:     c.algebraic_normal_form
+        ....:     c.report()
+        <class 'boolean_cayley_graphs.bent_function_cayley_graph_classification.BentFunctionCayleyGraphClassification'>
+        x0*x1
+        Algebraic normal form of Boolean function: x0*x1
+        Function is bent.
+        <BLANKLINE>
+        <BLANKLINE>
+        SDP design incidence structure t-design parameters: (True, (1, 4, 1, 1))
+        <BLANKLINE>
+        Classification of Cayley graphs and classification of Cayley graphs of duals are the same:
+        <BLANKLINE>
+        There are 2 extended Cayley classes in the extended translation class.
+        <class 'boolean_cayley_graphs.bent_function_cayley_graph_classification.BentFunctionCayleyGraphClassification'>
+        x0*x1 + x0 + x1 + 1
+        Algebraic normal form of Boolean function: x0*x1 + x0 + x1 + 1
+        Function is bent.
+        <BLANKLINE>
+        <BLANKLINE>
+        SDP design incidence structure t-design parameters: (True, (1, 4, 1, 1))
+        <BLANKLINE>
+        Classification of Cayley graphs and classification of Cayley graphs of duals are the same:
+        <BLANKLINE>
+        There are 2 extended Cayley classes in the extended translation class.
+        sage: conn.close()
+        sage: drop_database(db_name)
+    """
+    summaries = select_cayley_graph_summaries_where_bent_function_cayley_graph(
+        conn,
+        bentf,
+        algorithm=algorithm)
+    return list(select_classifications_where_summaries(conn, summaries))
+
+
+# The columns of the matrices table, one for each matrix of a classification.
+matrix_columns = (
+    "bent_cayley_graph_index",
+    "dual_cayley_graph_index",
+    "weight_class")
+
+
+def _check_matrix_column(matrix_column):
+    r"""
+    Check that ``matrix_column`` is one of ``matrix_columns``.
+
+    TESTS:
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_sqlite3 import _check_matrix_column
+        sage: _check_matrix_column("weight_class")
+        sage: _check_matrix_column("name")
+        Traceback (most recent call last):
+        ...
+        ValueError: Unknown matrix column: 'name'
+    """
+    if matrix_column not in matrix_columns:
+        raise ValueError("Unknown matrix column: {!r}".format(matrix_column))
+
+
+def select_class_count_where_bent_function(
+    conn,
+    bentf):
+    """
+    Retrieve the number of extended Cayley classes in the classification of a bent function.
+
+    INPUT:
+
+    - ``conn`` -- a connection object for the database.
+    - ``bentf`` -- class BentFunction. A bent function.
+
+    OUTPUT: an integer, or ``None`` if the bent function is not in the database.
+
+    EXAMPLE:
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_sqlite3 import *
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
+        sage: bentf = BentFunction([0,0,0,1])
+        sage: bfcgc = BentFunctionCayleyGraphClassification.from_function(bentf)
+        sage: db_name = tmp_filename(ext='.db')
+        sage: conn = create_classification_tables(db_name)
+        sage: insert_classification(conn, bfcgc, 'bentf')
+        sage: select_class_count_where_bent_function(conn, bentf)
+        2
+        sage: select_class_count_where_bent_function(conn, BentFunction([1,0,0,0])) is None
+        True
+        sage: conn.close()
+        sage: drop_database(db_name)
+    """
+    nvar = int(bentf.nvariables())
+    bftt = bentf.tt_buffer()
+    curs = conn.cursor()
+    curs.execute("""
+        SELECT COUNT(*)
+        FROM cayley_graph
+        WHERE nvariables = (?)
+        AND bent_function = (?)""",
+        (nvar, bftt))
+    count = curs.fetchone()[0]
+    return count if count > 0 else None
+
+
+def select_class_hashes_where_bent_function(
+    conn,
+    bentf):
+    """
+    Retrieve the list of extended Cayley classes in the classification of a bent function,
+    as canonical label hashes rather than canonical labels.
+
+    INPUT:
+
+    - ``conn`` -- a connection object for the database.
+    - ``bentf`` -- class BentFunction. A bent function.
+
+    OUTPUT: a list of bytes objects, in order of Cayley graph index.
+    Each is the hash of the canonical label of the corresponding class,
+    as per ``canonical_label_hash``.
+
+    EXAMPLE:
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_sqlite3 import *
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
+        sage: bentf = BentFunction([0,0,0,1])
+        sage: bfcgc = BentFunctionCayleyGraphClassification.from_function(bentf)
+        sage: db_name = tmp_filename(ext='.db')
+        sage: conn = create_classification_tables(db_name)
+        sage: insert_classification(conn, bfcgc, 'bentf')
+        sage: hashes = select_class_hashes_where_bent_function(conn, bentf)
+        sage: hashes == [canonical_label_hash(cgc) for cgc in bfcgc.cayley_graph_class_list]
+        True
+        sage: conn.close()
+        sage: drop_database(db_name)
+    """
+    nvar = int(bentf.nvariables())
+    bftt = bentf.tt_buffer()
+    curs = conn.cursor()
+    curs.execute("""
+        SELECT canonical_label_hash
+        FROM cayley_graph
+        WHERE nvariables = (?)
+        AND bent_function = (?)
+        ORDER BY cayley_graph_index""",
+        (nvar, bftt))
+    return [bytes(row[0]) for row in curs.fetchall()]
+
+
+def select_matrix_where_bent_function(
+    conn,
+    bentf,
+    matrix_column="bent_cayley_graph_index"):
+    """
+    Retrieve one matrix of the classification of a bent function, as a numpy array.
+
+    INPUT:
+
+    - ``conn`` -- a connection object for the database.
+    - ``bentf`` -- class BentFunction. A bent function.
+    - ``matrix_column`` -- string (default: "bent_cayley_graph_index").
+      One of ``matrix_columns``, selecting the matrix.
+
+    OUTPUT: a ``v`` by ``v`` numpy array of ``int64``, indexed by ``[c, b]``,
+    or ``None`` if the bent function is not in the database.
+
+    EXAMPLE:
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_sqlite3 import *
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
+        sage: bentf = BentFunction([0,0,0,1])
+        sage: bfcgc = BentFunctionCayleyGraphClassification.from_function(bentf)
+        sage: for matrices_as_blobs in (False, True):
+        ....:     db_name = tmp_filename(ext='.db')
+        ....:     conn = create_classification_tables(db_name, matrices_as_blobs=matrices_as_blobs)
+        ....:     insert_classification(conn, bfcgc, 'bentf')
+        ....:     wcm = select_matrix_where_bent_function(conn, bentf, "weight_class")
+        ....:     print(matrix(wcm) == bfcgc.weight_class_matrix)
+        ....:     conn.close()
+        ....:     drop_database(db_name)
+        True
+        True
+    """
+    _check_matrix_column(matrix_column)
+    nvar = int(bentf.nvariables())
+    bftt = bentf.tt_buffer()
+    v = 2 ** nvar
+    curs = conn.cursor()
+    if has_matrices_blob_table(conn):
+        curs.execute("""
+            SELECT {}_matrix
+            FROM matrices_blob
+            WHERE nvariables = (?)
+            AND bent_function = (?)""".format(matrix_column),
+            (nvar, bftt))
+        row = curs.fetchone()
+        if row is None or row[0] is None:
+            return None
+        return decode_matrix_blob_array(row[0], v).astype(np.int64)
+
+    curs.execute("""
+        SELECT c, b, {}
+        FROM matrices
+        WHERE nvariables = (?)
+        AND bent_function = (?)""".format(matrix_column),
+        (nvar, bftt))
+    cells = np.array(curs.fetchall(), dtype=np.int64).reshape(-1, 3)
+    if len(cells) == 0:
+        return None
+    result = np.zeros((v, v), dtype=np.int64)
+    result[cells[:, 0], cells[:, 1]] = cells[:, 2]
+    return result
+
+
+def select_matrix_row_where_bent_function(
+    conn,
+    bentf,
+    c,
+    matrix_column="bent_cayley_graph_index"):
+    """
+    Retrieve one row, for a given value of ``c``, of one matrix of the classification
+    of a bent function, as a numpy array.
+
+    INPUT:
+
+    - ``conn`` -- a connection object for the database.
+    - ``bentf`` -- class BentFunction. A bent function.
+    - ``c`` -- integer. The row index.
+    - ``matrix_column`` -- string (default: "bent_cayley_graph_index").
+      One of ``matrix_columns``, selecting the matrix.
+
+    OUTPUT: a numpy array of ``int64`` of length ``v``, indexed by ``b``,
+    or ``None`` if the bent function is not in the database.
+
+    EXAMPLE:
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_sqlite3 import *
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
+        sage: bentf = BentFunction([0,0,0,1])
+        sage: bfcgc = BentFunctionCayleyGraphClassification.from_function(bentf)
+        sage: db_name = tmp_filename(ext='.db')
+        sage: conn = create_classification_tables(db_name)
+        sage: insert_classification(conn, bfcgc, 'bentf')
+        sage: select_matrix_row_where_bent_function(conn, bentf, 1).tolist()
+        [0, 1, 0, 0]
+        sage: conn.close()
+        sage: drop_database(db_name)
+    """
+    _check_matrix_column(matrix_column)
+    if has_matrices_blob_table(conn):
+        result = select_matrix_where_bent_function(conn, bentf, matrix_column)
+        return None if result is None else result[c].copy()
+
+    nvar = int(bentf.nvariables())
+    bftt = bentf.tt_buffer()
+    curs = conn.cursor()
+    curs.execute("""
+        SELECT b, {}
+        FROM matrices
+        WHERE nvariables = (?)
+        AND bent_function = (?)
+        AND c = (?)""".format(matrix_column),
+        (nvar, bftt, int(c)))
+    cells = np.array(curs.fetchall(), dtype=np.int64).reshape(-1, 2)
+    if len(cells) == 0:
+        return None
+    result = np.zeros(2 ** nvar, dtype=np.int64)
+    result[cells[:, 0]] = cells[:, 1]
+    return result
+
+
+def select_matrix_column_where_bent_function(
+    conn,
+    bentf,
+    b,
+    matrix_column="bent_cayley_graph_index"):
+    """
+    Retrieve one column, for a given value of ``b``, of one matrix of the classification
+    of a bent function, as a numpy array.
+
+    INPUT:
+
+    - ``conn`` -- a connection object for the database.
+    - ``bentf`` -- class BentFunction. A bent function.
+    - ``b`` -- integer. The column index.
+    - ``matrix_column`` -- string (default: "bent_cayley_graph_index").
+      One of ``matrix_columns``, selecting the matrix.
+
+    OUTPUT: a numpy array of ``int64`` of length ``v``, indexed by ``c``,
+    or ``None`` if the bent function is not in the database.
+
+    EXAMPLE:
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_sqlite3 import *
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
+        sage: bentf = BentFunction([0,0,0,1])
+        sage: bfcgc = BentFunctionCayleyGraphClassification.from_function(bentf)
+        sage: db_name = tmp_filename(ext='.db')
+        sage: conn = create_classification_tables(db_name)
+        sage: insert_classification(conn, bfcgc, 'bentf')
+        sage: select_matrix_column_where_bent_function(conn, bentf, 3).tolist()
+        [1, 0, 0, 0]
+        sage: conn.close()
+        sage: drop_database(db_name)
+    """
+    _check_matrix_column(matrix_column)
+    if has_matrices_blob_table(conn):
+        result = select_matrix_where_bent_function(conn, bentf, matrix_column)
+        return None if result is None else result[:, b].copy()
+
+    nvar = int(bentf.nvariables())
+    bftt = bentf.tt_buffer()
+    curs = conn.cursor()
+    curs.execute("""
+        SELECT c, {}
+        FROM matrices
+        WHERE nvariables = (?)
+        AND bent_function = (?)
+        AND b = (?)""".format(matrix_column),
+        (nvar, bftt, int(b)))
+    cells = np.array(curs.fetchall(), dtype=np.int64).reshape(-1, 2)
+    if len(cells) == 0:
+        return None
+    result = np.zeros(2 ** nvar, dtype=np.int64)
+    result[cells[:, 0]] = cells[:, 1]
+    return result
+
+
+def select_class_histogram_where_bent_function(
+    conn,
+    bentf,
+    matrix_column="bent_cayley_graph_index"):
+    """
+    Retrieve the number of cells with each value in one matrix of the classification
+    of a bent function.
+
+    INPUT:
+
+    - ``conn`` -- a connection object for the database.
+    - ``bentf`` -- class BentFunction. A bent function.
+    - ``matrix_column`` -- string (default: "bent_cayley_graph_index").
+      One of ``matrix_columns``, selecting the matrix.
+
+    OUTPUT: a numpy array of ``int64``, whose entry ``n`` is the number of cells
+    with value ``n``, or ``None`` if the bent function is not in the database.
+    For the Cayley graph index matrices, the length of the array is the number of
+    extended Cayley classes.
+
+    EXAMPLE:
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_sqlite3 import *
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
+        sage: bentf = BentFunction([0,0,0,1])
+        sage: bfcgc = BentFunctionCayleyGraphClassification.from_function(bentf)
+        sage: db_name = tmp_filename(ext='.db')
+        sage: conn = create_classification_tables(db_name)
+        sage: insert_classification(conn, bfcgc, 'bentf')
+        sage: select_class_histogram_where_bent_function(conn, bentf).tolist()
+        [12, 4]
+        sage: select_class_histogram_where_bent_function(conn, bentf, "weight_class").tolist()
+        [12, 4]
+        sage: conn.close()
+        sage: drop_database(db_name)
+    """
+    _check_matrix_column(matrix_column)
+    minlength = (
+        select_class_count_where_bent_function(conn, bentf) or 0
+        if matrix_column != "weight_class" else
+        0)
+    if has_matrices_blob_table(conn):
+        result = select_matrix_where_bent_function(conn, bentf, matrix_column)
+        if result is None:
+            return None
+        return np.bincount(result.ravel(), minlength=minlength).astype(np.int64)
+
+    nvar = int(bentf.nvariables())
+    bftt = bentf.tt_buffer()
+    curs = conn.cursor()
+    curs.execute("""
+        SELECT {0}, COUNT(*)
+        FROM matrices
+        WHERE nvariables = (?)
+        AND bent_function = (?)
+        GROUP BY {0}""".format(matrix_column),
+        (nvar, bftt))
+    counts = np.array(curs.fetchall(), dtype=np.int64).reshape(-1, 2)
+    if len(counts) == 0:
+        return None
+    result = np.zeros(max(minlength, int(counts[:, 0].max()) + 1), dtype=np.int64)
+    result[counts[:, 0]] = counts[:, 1]
+    return result
+
+
+def select_strongly_regular_parameters_where_bent_function(
+    conn,
+    bentf):
+    """
+    Retrieve the strongly regular parameters of the Cayley graph of each
+    extended Cayley class of the classification of a bent function.
+
+    The parameters are computed from the number of variables of the bent function
+    and the weight class of a cell of each class, as per ``bent_cayley_class_parameters``,
+    without constructing the graphs.
+
+    INPUT:
+
+    - ``conn`` -- a connection object for the database.
+    - ``bentf`` -- class BentFunction. A bent function on at least 4 variables.
+
+    OUTPUT: a list of tuples of 4 integers, in order of Cayley graph index,
+    or ``None`` if the bent function is not in the database.
+
+    EXAMPLE:
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_sqlite3 import *
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
+        sage: bentf = BentFunction([0,0,0,1,0,0,0,1,0,0,0,1,1,1,1,0])
+        sage: bfcgc = BentFunctionCayleyGraphClassification.from_function(bentf)
+        sage: db_name = tmp_filename(ext='.db')
+        sage: conn = create_classification_tables(db_name)
+        sage: insert_classification(conn, bfcgc, 'bentf')
+        sage: select_strongly_regular_parameters_where_bent_function(conn, bentf)
+        [(16, 6, 2, 2), (16, 10, 6, 6)]
+        sage: conn.close()
+        sage: drop_database(db_name)
+    """
+    bent_cayley_graph_index_array = select_matrix_where_bent_function(
+        conn,
+        bentf,
+        "bent_cayley_graph_index")
+    if bent_cayley_graph_index_array is None:
+        return None
+    weight_class_array = select_matrix_where_bent_function(
+        conn,
+        bentf,
+        "weight_class")
+    return bent_cayley_class_parameters(
+        int(bentf.nvariables()),
+        bent_cayley_graph_index_array,
+        weight_class_array)
+
+
+def _update_digest(digest, curs, batch_size=4096):
+    """
+    Update a digest with the rows of the result of a query.
+
+    Each field is preceded by its length, so that the digest
+    does not depend on how the fields are split into rows and columns.
+
+    INPUT:
+
+    - ``digest`` -- a ``hashlib`` hash object.
+    - ``curs`` -- a cursor, after the query has been executed.
+    - ``batch_size`` -- integer (default: 4096). The number of rows fetched at a time.
+
+    OUTPUT: None.
+    """
+    rows = curs.fetchmany(batch_size)
+    while rows:
+        for row in rows:
+            for value in row:
+                data = (
+                    bytes(value)
+                    if isinstance(value, (bytes, memoryview)) else
+                    str(value).encode("UTF-8"))
+                digest.update(str(len(data)).encode("UTF-8") + b":" + data)
+            digest.update(b";")
+        rows = curs.fetchmany(batch_size)
+
+
+# The changes counted by the version counter of a database, by table.
+# Rows of ``matrices`` are only inserted together with a row of ``bent_function``,
+# so insertions into ``matrices`` are not counted.
+version_counter_events = (
+    ("bent_function", ("INSERT", "UPDATE", "DELETE")),
+    ("graph", ("INSERT", "UPDATE", "DELETE")),
+    ("cayley_graph", ("INSERT", "UPDATE", "DELETE")),
+    ("matrices", ("UPDATE", "DELETE")),
+    ("matrices_blob", ("INSERT", "UPDATE", "DELETE")))
+
+
+def create_version_counter(conn):
+    """
+    Create the version counter of a database, if it does not already exist.
+
+    The version counter consists of a random database identifier and a count
+    of changes, stored in the ``metadata`` table. The count is incremented by
+    triggers on the tables of ``version_counter_events``, so that every change
+    to a classification is counted, however it is made.
+
+    INPUT:
+
+    - ``conn`` -- a connection object for the database.
+
+    OUTPUT: None.
+
+    EXAMPLE:
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_sqlite3 import *
+        sage: db_name = tmp_filename(ext='.db')
+        sage: conn = create_classification_tables(db_name)
+        sage: version = select_database_version(conn)
+        sage: create_version_counter(conn)
+        sage: select_database_version(conn) == version
+        True
+        sage: conn.close()
+        sage: drop_database(db_name)
+    """
+    curs = conn.cursor()
+    curs.execute("""
+        CREATE TABLE IF NOT EXISTS metadata(
+        key TEXT PRIMARY KEY,
+        value TEXT)""")
+    curs.executemany("""
+        INSERT OR IGNORE INTO metadata
+        VALUES (?,?)""",
+        [
+            ("database_id", uuid.uuid4().hex),
+            ("change_count", "0")])
+    curs.execute("""
+        SELECT name
+        FROM sqlite_master
+        WHERE type = 'table'""")
+    table_names = set(row[0] for row in curs.fetchall())
+    for table, events in version_counter_events:
+        if table not in table_names:
+            continue
+        for event in events:
+            curs.execute("""
+                CREATE TRIGGER IF NOT EXISTS {0}_{1}_change_count
+                AFTER {2} ON {0}
+                BEGIN
+                    UPDATE metadata
+                    SET value = CAST(value AS INTEGER) + 1
+                    WHERE key = 'change_count';
+                END""".format(table, event.lower(), event))
+    conn.commit()
+
+
+def select_database_version(conn):
+    """
+    Return the version of a database, which changes
+    when a classification is inserted, deleted, renamed or changed.
+
+    The version is used to invalidate caches of results computed from the database,
+    such as the cache used by ``bent_function_cayley_graph_dashboard.py``.
+    It is read from the version counter, as per ``create_version_counter``,
+    without reading any classifications. For a database created without
+    a version counter, the version is given by the size and modification time
+    of the database file instead.
+
+    INPUT:
+
+    - ``conn`` -- a connection object for the database.
+
+    OUTPUT: a string.
+
+    EXAMPLE:
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_sqlite3 import *
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
+        sage: bfcgc = BentFunctionCayleyGraphClassification.from_function(BentFunction([0,0,0,1]))
         sage: db_name = tmp_filename(ext='.db')
         sage: conn = create_classification_tables(db_name)
+        sage: version = select_database_version(conn)
         sage: insert_classification(conn, bfcgc, 'bentf')
-        sage: result = select_classification_where_bent_function(conn, bentf)
-        sage: result.algebraic_normal_form
-        x0*x1
-        sage: type(result)
-        <class 'boolean_cayley_graphs.bent_function_cayley_graph_classification.BentFunctionCayleyGraphClassification'>
-        sage: result.report(report_on_matrix_details=True)
-        Algebraic normal form of Boolean function: x0*x1
-        Function is bent.
-        <BLANKLINE>
-        Weight class matrix:
-        [0 0 0 1]
-        [0 1 0 0]
-        [0 0 1 0]
-        [1 0 0 0]
-        <BLANKLINE>
-        SDP design incidence structure t-design parameters: (True, (1, 4, 1, 1))
-        <BLANKLINE>
-        Classification of Cayley graphs and classification of Cayley graphs of duals are the same:
-        <BLANKLINE>
-        There are 2 extended Cayley classes in the extended translation class.
-        <BLANKLINE>
-        Matrix of indices of Cayley graphs:
-        [0 0 0 1]
-        [0 1 0 0]
-        [0 0 1 0]
-        [1 0 0 0]
+        sage: select_database_version(conn) == version
+        False
+        sage: version = select_database_version(conn)
+        sage: result = conn.execute("UPDATE matrices SET weight_class = 1 - weight_class WHERE b = 0 AND c = 0")
+        sage: conn.commit()
+        sage: select_database_version(conn) == version
+        False
+        sage: conn.close()
         sage: drop_database(db_name)
     """
-    dim = bentf.nvariables()
-    nvar = int(dim)
-    bftt = bentf.tt_buffer()
     curs = conn.cursor()
     curs.execute("""
         SELECT COUNT(*)
-        FROM cayley_graph
-        WHERE nvariables = (?)
-        AND bent_function = (?)""",
-        (nvar, bftt))
-    row = curs.fetchone()
-    if row == None:
-        return None
+        FROM sqlite_master
+        WHERE type = 'table'
+        AND name = 'metadata'""")
+    if curs.fetchone()[0] > 0:
+        curs.execute("""
+            SELECT key, value
+            FROM metadata
+            WHERE key IN ('database_id', 'change_count')""")
+        metadata = {row[0]: row[1] for row in curs.fetchall()}
+        if len(metadata) == 2:
+            return "{}-{}".format(metadata["database_id"], metadata["change_count"])
+
+    # There is no version counter, so use the files of the database,
+    # including its write-ahead log, if any.
+    curs.execute("PRAGMA database_list")
+    file_name = [row[2] for row in curs.fetchall() if row[1] == "main"][0]
+    file_stats = []
+    for name in (file_name, file_name + "-wal"):
+        if name and os.path.isfile(name):
+            stat = os.stat(name)
+            file_stats.append("{}-{}".format(stat.st_size, stat.st_mtime_ns))
+    return "-".join(file_stats)
+
+
+def select_database_digest(conn):
+    """
+    Return a digest of the classifications in a database, which changes
+    when a classification is inserted, deleted, renamed or changed.
 
-    cgcl_len = row[0]
-    cgcl = [None] * cgcl_len
-    curs.execute("""
-        SELECT cayley_graph_index, canonical_label
-        FROM cayley_graph, graph
-        WHERE nvariables = (?)
-        AND bent_function = (?)
-        AND cayley_graph.canonical_label_hash = graph.canonical_label_hash""",
-        (nvar, bftt))
-    for row in curs:
-        cayley_graph_index = row["cayley_graph_index"]
-        canonical_label = row["canonical_label"]
-        cgcl[cayley_graph_index] = str(canonical_label)
+    The digest is computed from the contents of the bent function, Cayley graph,
+    graph and matrix tables, so each call reads every row of these tables.
+    It is intended for offline checks, such as comparing two copies of a database.
+    To detect changes cheaply, use ``select_database_version`` instead.
 
-    v = 2 ** dim
-    bcim = matrix(v, v)
-    dcim = matrix(v, v)
-    wcm  = matrix(v, v)
-    curs.execute("""
-        SELECT *
-        FROM matrices
-        WHERE nvariables = (?)
-        AND bent_function = (?)""",
-        (nvar, bftt))
-    for row in curs:
-        b = row["b"]
-        c = row["c"]
+    INPUT:
 
-        bent_cayley_graph_index = row["bent_cayley_graph_index"]
-        bcim[c, b] = bent_cayley_graph_index
+    - ``conn`` -- a connection object for the database.
 
-        dual_cayley_graph_index = row["dual_cayley_graph_index"]
-        dcim[c, b] = dual_cayley_graph_index
+    OUTPUT: a string of 64 hexadecimal digits.
 
-        weight_class = row["weight_class"]
-        wcm[c, b] = weight_class
+    EXAMPLE:
 
-    return BentFunctionCayleyGraphClassification(
-        algebraic_normal_form=bentf.algebraic_normal_form(),
-        cayley_graph_class_list=cgcl,
-        bent_cayley_graph_index_matrix=bcim,
-        dual_cayley_graph_index_matrix=dcim,
-        weight_class_matrix=wcm)
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_sqlite3 import *
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
+        sage: bfcgc = BentFunctionCayleyGraphClassification.from_function(BentFunction([0,0,0,1]))
+        sage: db_name = tmp_filename(ext='.db')
+        sage: conn = create_classification_tables(db_name)
+        sage: digest = select_database_digest(conn)
+        sage: insert_classification(conn, bfcgc, 'bentf')
+        sage: select_database_digest(conn) == digest
+        False
+        sage: len(select_database_digest(conn))
+        64
+        sage: digest = select_database_digest(conn)
+        sage: result = conn.execute("UPDATE matrices SET weight_class = 1 - weight_class WHERE b = 0 AND c = 0")
+        sage: select_database_digest(conn) == digest
+        False
+        sage: conn.close()
+        sage: drop_database(db_name)
+    """
+    matrices_query = (
+        """
+        SELECT nvariables, bent_function,
+            bent_cayley_graph_index_matrix,
+            dual_cayley_graph_index_matrix,
+            weight_class_matrix
+        FROM matrices_blob
+        ORDER BY nvariables, bent_function"""
+        if has_matrices_blob_table(conn) else
+        """
+        SELECT nvariables, bent_function, c, b,
+            bent_cayley_graph_index,
+            dual_cayley_graph_index,
+            weight_class
+        FROM matrices
+        ORDER BY nvariables, bent_function, c, b""")
+    queries = [
+        ("bent_function", """
+            SELECT nvariables, bent_function, name
+            FROM bent_function
+            ORDER BY nvariables, bent_function"""),
+        ("cayley_graph", """
+            SELECT nvariables, bent_function, cayley_graph_index, canonical_label_hash
+            FROM cayley_graph
+            ORDER BY nvariables, bent_function, cayley_graph_index"""),
+        ("graph", """
+            SELECT canonical_label_hash
+            FROM graph
+            ORDER BY canonical_label_hash"""),
+        ("matrices", matrices_query)]
+    digest = hashlib.sha256()
+    curs = conn.cursor()
+    for table, query in queries:
+        digest.update(table.encode("UTF-8") + b"|")
+        curs.execute(query)
+        _update_digest(digest, curs)
+    return digest.hexdigest()
 
 
-def select_classification_where_bent_function_cayley_graph(
-    conn,
-    bentf,
-    algorithm=default_algorithm):    
+def rebuild_summary_tables(conn):
     """
-    Given a bent function ``bentf``, retrieve all classifications that
-    contain a Cayley graph isomorphic to the Cayley graph of ``bentf``.
+    Create the summary tables of a database, if they do not already exist,
+    and rebuild their contents from the other tables.
 
     INPUT:
 
     - ``conn`` -- a connection object for the database.
-    - ``bentf`` -- class BentFunction. A bent function.
-    - ``algorithm`` -- string (default: BentFunctionCayleyGraphClassification.default_algorithm). 
-      Algorithm used for canonical labelling.
-
-    OUTPUT:
 
-    A list where each entry has class BentFunctionCayleyGraphClassification.
-    The corresponding list of Cayley graph classifications.
+    OUTPUT: None.
 
-    NOTE:
+    EXAMPLE:
 
     ::
 
-        The list is not sorted in any way.
+        sage: from boolean_cayley_graphs.classification_database_sqlite3 import *
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
+        sage: bfcgc0 = BentFunctionCayleyGraphClassification.from_function(BentFunction([0,0,0,1]))
+        sage: bfcgc1 = BentFunctionCayleyGraphClassification.from_function(BentFunction([0,1,1,1]))
+        sage: for matrices_as_blobs in (False, True):
+        ....:     db_name = tmp_filename(ext='.db')
+        ....:     conn = create_classification_tables(db_name, matrices_as_blobs=matrices_as_blobs)
+        ....:     insert_classifications(conn, [bfcgc0, bfcgc1], ['bentf0', 'bentf1'])
+        ....:     before = (select_function_summaries(conn), select_graph_summaries(conn))
+        ....:     rebuild_summary_tables(conn)
+        ....:     print(before == (select_function_summaries(conn), select_graph_summaries(conn)))
+        ....:     conn.close()
+        ....:     drop_database(db_name)
+        True
+        True
+    """
+    create_summary_tables(conn)
+    curs = conn.cursor()
+    curs.execute("BEGIN")
+    curs.execute("DELETE FROM function_summary")
+    curs.execute("DELETE FROM class_summary")
+    curs.execute("DELETE FROM graph_summary")
+    curs.execute("""
+        INSERT INTO function_summary
+        SELECT nvariables, bent_function, COUNT(*)
+        FROM cayley_graph
+        GROUP BY nvariables, bent_function""")
+    curs.execute("""
+        INSERT INTO graph_summary
+        SELECT canonical_label_hash, COUNT(*)
+        FROM cayley_graph
+        GROUP BY canonical_label_hash""")
+    if has_matrices_blob_table(conn):
+        curs.execute("""
+            SELECT
+                nvariables,
+                bent_function,
+                bent_cayley_graph_index_matrix,
+                dual_cayley_graph_index_matrix
+            FROM matrices_blob""")
+        for row in curs.fetchall():
+            nvar, bftt, bcim_blob, dcim_blob = tuple(row)
+            v = 2 ** nvar
+            inner = conn.cursor()
+            inner.execute("""
+                SELECT nbr_classes
+                FROM function_summary
+                WHERE nvariables = (?)
+                AND bent_function = (?)""",
+                (nvar, bftt))
+            cgcl_len = inner.fetchone()[0]
+            bent_counts = np.bincount(
+                decode_matrix_blob_array(bcim_blob, v).ravel(),
+                minlength=cgcl_len).tolist()
+            dual_counts = (
+                np.bincount(
+                    decode_matrix_blob_array(dcim_blob, v).ravel(),
+                    minlength=cgcl_len).tolist()
+                if dcim_blob is not None else
+                [None] * cgcl_len)
+            inner.executemany("""
+                INSERT INTO class_summary
+                VALUES (?,?,?,?,?)""",
+                [
+                    (nvar, bftt, n, bent_counts[n], dual_counts[n])
+                    for n in range(cgcl_len)])
+    else:
+        curs.execute("""
+            WITH
+            bent AS (
+                SELECT nvariables, bent_function, bent_cayley_graph_index AS n, COUNT(*) AS nbr_cells
+                FROM matrices
+                GROUP BY nvariables, bent_function, bent_cayley_graph_index),
+            dual AS (
+                SELECT nvariables, bent_function, dual_cayley_graph_index AS n, COUNT(*) AS nbr_cells
+                FROM matrices
+                GROUP BY nvariables, bent_function, dual_cayley_graph_index)
+            INSERT INTO class_summary
+            SELECT
+                cayley_graph.nvariables,
+                cayley_graph.bent_function,
+                cayley_graph.cayley_graph_index,
+                COALESCE(bent.nbr_cells, 0),
+                COALESCE(dual.nbr_cells, 0)
+            FROM cayley_graph
+            LEFT JOIN bent
+                ON bent.nvariables = cayley_graph.nvariables
+                AND bent.bent_function = cayley_graph.bent_function
+                AND bent.n = cayley_graph.cayley_graph_index
+            LEFT JOIN dual
+                ON dual.nvariables = cayley_graph.nvariables
+                AND dual.bent_function = cayley_graph.bent_function
+                AND dual.n = cayley_graph.cayley_graph_index""")
+    conn.commit()
 
-    EXAMPLE:
 
-    Create a database, with tables, using a temporary filename, insert
-    a classification, retrieve it by bent function Cayley graph, then drop the database.
+# A summary of the classification of one bent function in a database.
+FunctionSummary = namedtuple(
+    "FunctionSummary",
+    ["name", "nvariables", "bent_function", "nbr_classes"])
+
+
+# A summary of one extended Cayley class of one bent function in a database.
+ClassSummary = namedtuple(
+    "ClassSummary",
+    ["cayley_graph_index", "nbr_bent_cells", "nbr_dual_cells"])
+
+
+# A summary of one graph in a database.
+GraphSummary = namedtuple(
+    "GraphSummary",
+    ["canonical_label_hash", "nbr_functions"])
+
+
+def select_function_summaries(conn):
+    """
+    Retrieve the number of extended Cayley classes of each bent function in a database,
+    using the ``function_summary`` table.
+
+    INPUT:
+
+    - ``conn`` -- a connection object for the database.
+
+    OUTPUT: a list of ``FunctionSummary`` named tuples, sorted by name and by bent function.
+
+    EXAMPLE:
 
     ::
 
         sage: from boolean_cayley_graphs.classification_database_sqlite3 import *
         sage: from boolean_cayley_graphs.bent_function import BentFunction
         sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
-        sage: db_name = 'doctest_select_classification_where_bent_function_db_name'
-        sage: drop_database(db_name)
-        sage: conn = create_database(db_name)
-        sage: conn.close()
+        sage: bfcgc = BentFunctionCayleyGraphClassification.from_function(BentFunction([0,0,0,1]))
+        sage: db_name = tmp_filename(ext='.db')
         sage: conn = create_classification_tables(db_name)
-        sage: bentf0 = BentFunction([0,0,0,1])
-        sage: bfcgc0 = BentFunctionCayleyGraphClassification.from_function(bentf0)
-        sage: bfcgc0.algebraic_normal_form
-        x0*x1
-        sage: insert_classification(conn, bfcgc0, 'bentf0')
-        sage: bentf1 = BentFunction([1,0,0,0])
-        sage: bfcgc1 = BentFunctionCayleyGraphClassification.from_function(bentf1)
-        sage: bfcgc1.algebraic_normal_form
-        x0*x1 + x0 + x1 + 1
-        sage: insert_classification(conn, bfcgc1, 'bentf1')
-        sage: result = select_classification_where_bent_function_cayley_graph(conn, bentf1)
-        sage: type(result)
-        <class 'list'>
-        sage: len(result)
-        2
-        sage: sorted_result = sorted(result, key=lambda c: str(c.algebraic_normal_form))
-        sage: for c in sorted_result:
-        ....:     type(c)
-        ....:     c.algebraic_normal_form
-        ....:     c.report()
-        <class 'boolean_cayley_graphs.bent_function_cayley_graph_classification.BentFunctionCayleyGraphClassification'>
-        x0*x1
-        Algebraic normal form of Boolean function: x0*x1
-        Function is bent.
-        <BLANKLINE>
-        <BLANKLINE>
-        SDP design incidence structure t-design parameters: (True, (1, 4, 1, 1))
-        <BLANKLINE>
-        Classification of Cayley graphs and classification of Cayley graphs of duals are the same:
-        <BLANKLINE>
-        There are 2 extended Cayley classes in the extended translation class.
-        <class 'boolean_cayley_graphs.bent_function_cayley_graph_classification.BentFunctionCayleyGraphClassification'>
-        x0*x1 + x0 + x1 + 1
-        Algebraic normal form of Boolean function: x0*x1 + x0 + x1 + 1
-        Function is bent.
-        <BLANKLINE>
-        <BLANKLINE>
-        SDP design incidence structure t-design parameters: (True, (1, 4, 1, 1))
-        <BLANKLINE>
-        Classification of Cayley graphs and classification of Cayley graphs of duals are the same:
-        <BLANKLINE>
-        There are 2 extended Cayley classes in the extended translation class.
+        sage: insert_classification(conn, bfcgc, 'bentf')
+        sage: [(s.name, s.nvariables, s.nbr_classes) for s in select_function_summaries(conn)]
+        [('bentf', 2, 2)]
         sage: conn.close()
         sage: drop_database(db_name)
     """
-    # The result is a list of classifications.
-    result = []
+    curs = conn.cursor()
+    curs.execute("""
+        SELECT
+            bent_function.name,
+            function_summary.nvariables,
+            function_summary.bent_function,
+            function_summary.nbr_classes
+        FROM function_summary
+        LEFT JOIN bent_function
+            ON bent_function.nvariables = function_summary.nvariables
+            AND bent_function.bent_function = function_summary.bent_function
+        ORDER BY
+            bent_function.name,
+            function_summary.nvariables,
+            function_summary.bent_function""")
+    return [
+        FunctionSummary(*tuple(row))
+        for row in curs.fetchall()]
+
+
+def select_class_summaries_where_bent_function(
+    conn,
+    bentf):
+    """
+    Retrieve the number of cells in each extended Cayley class of a bent function,
+    using the ``class_summary`` table.
 
-    cayley_graph = bentf.extended_cayley_graph()
-    cgcl = cayley_graph.canonical_label(algorithm=algorithm).graph6_string()
-    cgcl_hash = canonical_label_hash(cgcl)
+    INPUT:
+
+    - ``conn`` -- a connection object for the database.
+    - ``bentf`` -- class BentFunction. A bent function.
+
+    OUTPUT: a list of ``ClassSummary`` named tuples, in order of Cayley graph index.
+    The number of dual cells is ``None`` if the classification has no dual Cayley graph index matrix.
+
+    EXAMPLE:
+
+    ::
 
-    # Check for a hash collision -- very unlikely.
+        sage: from boolean_cayley_graphs.classification_database_sqlite3 import *
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
+        sage: bentf = BentFunction([0,0,0,1])
+        sage: bfcgc = BentFunctionCayleyGraphClassification.from_function(bentf)
+        sage: db_name = tmp_filename(ext='.db')
+        sage: conn = create_classification_tables(db_name)
+        sage: insert_classification(conn, bfcgc, 'bentf')
+        sage: [tuple(s) for s in select_class_summaries_where_bent_function(conn, bentf)]
+        [(0, 12, 12), (1, 4, 4)]
+        sage: conn.close()
+        sage: drop_database(db_name)
+    """
+    nvar = int(bentf.nvariables())
+    bftt = bentf.tt_buffer()
     curs = conn.cursor()
     curs.execute("""
-        SELECT canonical_label
-        FROM graph
-        WHERE canonical_label_hash = (?)""",
-        (cgcl_hash,))
-    row = curs.fetchone()
-    canonical_label = row["canonical_label"]
-    if canonical_label != cgcl:
-        return result
+        SELECT cayley_graph_index, nbr_bent_cells, nbr_dual_cells
+        FROM class_summary
+        WHERE nvariables = (?)
+        AND bent_function = (?)
+        ORDER BY cayley_graph_index""",
+        (nvar, bftt))
+    return [
+        ClassSummary(*tuple(row))
+        for row in curs.fetchall()]
 
-    curs.execute("""
-        SELECT DISTINCT nvariables, bent_function
-        FROM cayley_graph
-        WHERE canonical_label_hash = (?)""",
-        (cgcl_hash,))
 
-    for row in curs:
-        nvar = row["nvariables"]
-        bftt = row["bent_function"]
-        row_bentf = BentFunction.from_tt_buffer(nvar, bftt)
-        result.append(
-            select_classification_where_bent_function(
-                conn,
-                row_bentf))
-    return result
+def select_graph_summaries(
+    conn,
+    min_nbr_functions=1):
+    """
+    Retrieve the number of bent functions whose classification contains each graph,
+    using the ``graph_summary`` table.
+
+    INPUT:
+
+    - ``conn`` -- a connection object for the database.
+    - ``min_nbr_functions`` -- integer (default: 1). Only graphs contained in
+      the classifications of at least this many bent functions are retrieved.
+
+    OUTPUT: a list of ``GraphSummary`` named tuples, sorted by decreasing
+    number of functions, then by canonical label hash.
+
+    EXAMPLE:
+
+    ::
+
+        sage: from boolean_cayley_graphs.classification_database_sqlite3 import *
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
+        sage: bfcgc0 = BentFunctionCayleyGraphClassification.from_function(BentFunction([0,0,0,1]))
+        sage: bfcgc1 = BentFunctionCayleyGraphClassification.from_function(BentFunction([0,1,1,1]))
+        sage: db_name = tmp_filename(ext='.db')
+        sage: conn = create_classification_tables(db_name)
+        sage: insert_classifications(conn, [bfcgc0, bfcgc1], ['bentf0', 'bentf1'])
+        sage: [s.nbr_functions for s in select_graph_summaries(conn)]
+        [2, 2]
+        sage: select_graph_summaries(conn, min_nbr_functions=3)
+        []
+        sage: conn.close()
+        sage: drop_database(db_name)
+    """
+    curs = conn.cursor()
+    curs.execute("""
+        SELECT canonical_label_hash, nbr_functions
+        FROM graph_summary
+        WHERE nbr_functions >= (?)
+        ORDER BY nbr_functions DESC, canonical_label_hash""",
+        (int(min_nbr_functions),))
+    return [
+        GraphSummary(bytes(row[0]), row[1])
+        for row in curs.fetchall()]
 
 
 def select_classification_where_name(
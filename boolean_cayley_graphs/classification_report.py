@@ -0,0 +1,548 @@
+r"""
+Structured reports on Cayley graph classifications
+==================================================
+
+The ``classification_report`` module defines a report engine for
+classifications of bent functions by their Cayley graphs.
+
+The function ``classification_report`` computes a report as a
+``ClassificationReport`` named tuple, without printing anything.
+The details of each extended Cayley class, namely its graph invariants
+and the linear code of its representative bent function, are computed
+as a ``ClassReport`` named tuple, in a pool of worker processes.
+The function ``render_report`` prints a report as text, in the format of
+``BentFunctionCayleyGraphClassification.report``, and ``report_lines``
+returns the same text as a list of lines.
+
+Since reports contain no open resources, they can be pickled, cached and
+reused, for example by a web interface or by the LaTeX table printers.
+
+AUTHORS:
+
+- Paul Leopardi (2024-07-15): initial version
+- Paul Leopardi (2024-07-22): fast t-design parameters
+
+EXAMPLES:
+
+::
+
+    sage: from boolean_cayley_graphs.bent_function import BentFunction
+    sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification as BentFunctionCGC
+    sage: from boolean_cayley_graphs.classification_report import classification_report, report_lines
+    sage: bentf = BentFunction([0,0,0,1,0,0,0,1,0,0,0,1,1,1,1,0])
+    sage: c = BentFunctionCGC.from_function(bentf)
+    sage: r = classification_report(c, report_on_graph_details=True, ncpus=2)
+    sage: r.t_design_parameters
+    (True, (2, 16, 6, 2))
+    sage: [(cr.strongly_regular_parameters, cr.rank, cr.group_order) for cr in r.class_reports]
+    [((16, 6, 2, 2), 6, 1152), ((16, 10, 6, 6), 6, 1920)]
+    sage: report_lines(r)[1:4]
+    ['Function is bent.', '', '']
+"""
+#*****************************************************************************
+#       Copyright (C) 2024 Paul Leopardi paul.leopardi@gmail.com
+#
+#  Distributed under the terms of the GNU General Public License (GPL)
+#  as published by the Free Software Foundation; either version 2 of
+#  the License, or (at your option) any later version.
+#                  http://www.gnu.org/licenses/
+#*****************************************************************************
+
+from collections import namedtuple
+from io import StringIO
+
+import multiprocessing
+import numpy as np
+import sys
+
+from sage.functions.log import log
+from sage.rings.integer import Integer
+
+from boolean_cayley_graphs.bent_function import BentFunction
+from boolean_cayley_graphs.strongly_regular_graph import StronglyRegularGraph
+from boolean_cayley_graphs.t_design import t_design_parameters
+
+import boolean_cayley_graphs.cayley_graph_controls as controls
+
+
+ClassificationReport = namedtuple(
+    "ClassificationReport",
+    [
+        "algebraic_normal_form",
+        "is_bent",
+        "weight_class_matrix",
+        "t_design_parameters",
+        "duals",
+        "nbr_bent_cayley_graph_classes",
+        "nbr_dual_cayley_graph_classes",
+        "tot_cayley_graph_classes",
+        "bent_cayley_graph_index_matrix",
+        "dual_cayley_graph_index_matrix",
+        "report_on_matrix_details",
+        "report_on_graph_details",
+        "verbose",
+        "class_reports"])
+ClassificationReport.__doc__ = r"""
+A report on a classification.
+
+The field ``duals`` is ``None`` if the classification has no dual Cayley graph
+index matrix, ``"same"`` if this matrix is the same as the Cayley graph
+index matrix, and ``"differ"`` otherwise. In the first two cases,
+``dual_cayley_graph_index_matrix`` and ``nbr_dual_cayley_graph_classes``
+are ``None``.
+
+The field ``class_reports`` is ``None`` unless ``report_on_graph_details``
+is ``True``. Otherwise, it is a list indexed by extended Cayley class,
+containing a ``ClassReport``, or ``None`` if the class has no representative
+bent function in the extended translation class.
+"""
+
+
+ClassReport = namedtuple(
+    "ClassReport",
+    [
+        "index",
+        "algebraic_normal_form",
+        "clique_polynomial",
+        "strongly_regular_parameters",
+        "rank",
+        "group_order",
+        "dual_index",
+        "dual_clique_polynomial",
+        "dual_strongly_regular_parameters",
+        "dual_rank",
+        "dual_group_order",
+        "order_is_power_of_2",
+        "automorphism_groups_isomorphic",
+        "linear_code",
+        "generator_matrix",
+        "is_projective",
+        "weight_distribution"])
+ClassReport.__doc__ = r"""
+A report on an extended Cayley class of a classification.
+
+The ``dual_`` fields are ``None`` unless the Cayley graph of the dual of the
+representative bent function is in a different extended Cayley class.
+The fields ``order_is_power_of_2`` and ``automorphism_groups_isomorphic``
+are ``None`` unless the report was made with ``controls.verbose`` set
+and the dual Cayley graph differs; ``automorphism_groups_isomorphic``
+is also ``None`` if the order of the automorphism group is a power of 2.
+"""
+
+
+def class_report(
+    truth_table,
+    index,
+    c,
+    b,
+    canonical_label,
+    dual_index=None,
+    dual_canonical_label=None,
+    is_bent=True,
+    verbose=False,
+    rank=None,
+    dual_rank=None):
+    r"""
+    Compute the report on an extended Cayley class of a classification.
+
+    This function is called by the worker processes of ``classification_report``.
+
+    INPUT:
+
+    - ``truth_table`` -- a list of integers. The truth table of the classified bent function.
+    - ``index`` -- integer. The index of the extended Cayley class.
+    - ``c`` -- integer. The row index of the representative bent function.
+    - ``b`` -- integer. The column index of the representative bent function.
+    - ``canonical_label`` -- string. The canonical label of the Cayley graph of the class.
+    - ``dual_index`` -- integer (default: `None`). The index of the class of the
+      Cayley graph of the dual of the representative, or `None` if there are no duals.
+    - ``dual_canonical_label`` -- string (default: `None`). The canonical label
+      of the Cayley graph of the class ``dual_index``.
+    - ``is_bent`` -- boolean (default: ``True``). If ``True``, the classified
+      function is bent, as per ``StronglyRegularGraph.from_canonical_label``.
+    - ``verbose`` -- boolean (default: ``False``). If ``True``, compare the
+      automorphism groups of the Cayley graph and the dual Cayley graph.
+    - ``rank`` -- integer (default: `None`). The 2-rank of the Cayley graph of the class,
+      as per ``cayley_graph_class_ranks``. Default is None, meaning that it is computed here.
+    - ``dual_rank`` -- integer (default: `None`). The 2-rank of the Cayley graph of
+      the class ``dual_index``. Default is None, meaning that it is computed here.
+
+    OUTPUT: a ``ClassReport``.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.classification_report import class_report
+        sage: bentf = BentFunction([0,0,0,1,0,0,0,1,0,0,0,1,1,1,1,0])
+        sage: label = bentf.cayley_graph().canonical_label().graph6_string()
+        sage: cr = class_report(bentf.truth_table(format='int'), 0, 0, 0, label)
+        sage: cr.strongly_regular_parameters
+        (16, 6, 2, 2)
+        sage: cr.weight_distribution
+        {0: 1, 2: 6, 4: 9}
+    """
+    bentf = BentFunction(list(truth_table))
+    f = bentf.extended_translate()
+    v = 2 ** bentf.nvariables()
+    c = Integer(c)
+    b = Integer(b)
+    fb = f(b)
+    fbc = bentf.extended_translate(b, c, fb)
+    bent_fbc = BentFunction([fbc(x) for x in range(v)])
+    s = StronglyRegularGraph.from_canonical_label(
+        canonical_label,
+        bent_cayley_graph=is_bent)
+
+    dual = dict()
+    order_is_power_of_2 = None
+    automorphism_groups_isomorphic = None
+    if dual_index is not None and dual_index != index:
+        dual_s = StronglyRegularGraph.from_canonical_label(
+            dual_canonical_label,
+            bent_cayley_graph=is_bent)
+        dual = {
+            "dual_index": dual_index,
+            "dual_clique_polynomial": dual_s.stored_clique_polynomial,
+            "dual_strongly_regular_parameters": dual_s.strongly_regular_parameters,
+            "dual_rank": dual_rank if dual_rank is not None else dual_s.rank,
+            "dual_group_order": dual_s.group_order}
+        if verbose:
+            order_is_power_of_2 = log(s.group_order, Integer(2)).is_integer()
+            if not order_is_power_of_2:
+                automorphism_groups_isomorphic = (
+                    dual_s.automorphism_group.is_isomorphic(s.automorphism_group))
+
+    lc = bent_fbc.linear_code()
+    wd = lc.weight_distribution()
+    return ClassReport(
+        index=index,
+        algebraic_normal_form=bent_fbc.algebraic_normal_form(),
+        clique_polynomial=s.stored_clique_polynomial,
+        strongly_regular_parameters=s.strongly_regular_parameters,
+        rank=rank if rank is not None else s.rank,
+        group_order=s.group_order,
+        dual_index=dual.get("dual_index"),
+        dual_clique_polynomial=dual.get("dual_clique_polynomial"),
+        dual_strongly_regular_parameters=dual.get("dual_strongly_regular_parameters"),
+        dual_rank=dual.get("dual_rank"),
+        dual_group_order=dual.get("dual_group_order"),
+        order_is_power_of_2=order_is_power_of_2,
+        automorphism_groups_isomorphic=automorphism_groups_isomorphic,
+        linear_code=lc,
+        generator_matrix=lc.generator_matrix().echelon_form(),
+        is_projective=lc.is_projective(),
+        weight_distribution=dict([
+            (w,wd[w]) for w in range(len(wd)) if wd[w] > 0]))
+
+
+def _class_report_star(args):
+    r"""
+    Call ``class_report`` with a tuple of arguments.
+    """
+    return class_report(*args)
+
+
+def classification_report(
+    classification,
+    report_on_matrix_details=False,
+    report_on_graph_details=False,
+    ncpus=1):
+    r"""
+    Compute a report on a classification.
+
+    INPUT:
+
+    - ``classification`` -- a ``BentFunctionCayleyGraphClassification``.
+    - ``report_on_matrix_details`` -- Boolean (default: False).
+       If True, the report includes each matrix.
+    - ``report_on_graph_details`` -- Boolean (default: False).
+       If True, the report includes a ``ClassReport`` for each Cayley graph.
+    - ``ncpus`` -- integer (default: 1). The number of worker processes used
+      to compute the class reports. If 1, no worker processes are used.
+
+    OUTPUT: a ``ClassificationReport``.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification as BentFunctionCGC
+        sage: from boolean_cayley_graphs.classification_report import classification_report
+        sage: c = BentFunctionCGC.from_function(BentFunction([0,0,0,1]))
+        sage: r = classification_report(c)
+        sage: r.duals, r.nbr_bent_cayley_graph_classes, r.class_reports is None
+        ('same', 2, True)
+        sage: loads(dumps(r)) == r
+        True
+    """
+    p = classification.algebraic_normal_form
+    bentf = BentFunction(p)
+    is_bent = bentf.is_bent()
+    verbose = controls.verbose
+
+    D = classification.weight_class_matrix
+    design_parameters = t_design_parameters(D)
+
+    cg_list   = classification.cayley_graph_class_list
+    ci_matrix = classification.bent_cayley_graph_index_matrix
+    di_matrix = classification.dual_cayley_graph_index_matrix
+
+    if di_matrix == None:
+        duals = None
+    elif ci_matrix == di_matrix:
+        duals = "same"
+    else:
+        duals = "differ"
+    dual_matrix = di_matrix if duals == "differ" else None
+
+    class_reports = None
+    if report_on_graph_details:
+        truth_table = bentf.truth_table(format='int')
+        cb_list = classification.first_matrix_index_list()
+        # Compute the ranks of all of the classes as batches, rather than one per task.
+        ranks = classification.cayley_graph_class_ranks()
+        tasks = []
+        for index in range(len(cg_list)):
+            c_b = cb_list[index]
+            if c_b == None:
+                continue
+            c, b = int(c_b[0]), int(c_b[1])
+            dual_index = (
+                int(dual_matrix[c, b])
+                if dual_matrix is not None else
+                None)
+            tasks.append((
+                truth_table,
+                index,
+                c,
+                b,
+                cg_list[index],
+                dual_index,
+                cg_list[dual_index] if dual_index is not None else None,
+                is_bent,
+                verbose,
+                ranks[index],
+                ranks[dual_index] if dual_index is not None else None))
+
+        pool = (
+            multiprocessing.get_context("fork").Pool(ncpus)
+            if ncpus > 1 and len(tasks) > 1 else
+            None)
+        try:
+            results = (
+                pool.map(_class_report_star, tasks)
+                if pool is not None else
+                list(map(_class_report_star, tasks)))
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+        class_reports = [None] * len(cg_list)
+        for result in results:
+            class_reports[result.index] = result
+
+    return ClassificationReport(
+        algebraic_normal_form=p,
+        is_bent=is_bent,
+        weight_class_matrix=D,
+        t_design_parameters=design_parameters,
+        duals=duals,
+        nbr_bent_cayley_graph_classes=len(np.unique(ci_matrix)),
+        nbr_dual_cayley_graph_classes=(
+            len(np.unique(dual_matrix))
+            if dual_matrix is not None else
+            None),
+        tot_cayley_graph_classes=len(cg_list),
+        bent_cayley_graph_index_matrix=ci_matrix,
+        dual_cayley_graph_index_matrix=dual_matrix,
+        report_on_matrix_details=report_on_matrix_details,
+        report_on_graph_details=report_on_graph_details,
+        verbose=verbose,
+        class_reports=class_reports)
+
+
+def render_report(report, out=None):
+    r"""
+    Print a report on a classification as text.
+
+    INPUT:
+
+    - ``report`` -- a ``ClassificationReport``.
+    - ``out`` -- a file object (default: `None`). Default is None, meaning standard output.
+
+    OUTPUT:
+
+    (To ``out``) The text of the report, as per ``BentFunctionCayleyGraphClassification.report``.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification as BentFunctionCGC
+        sage: from boolean_cayley_graphs.classification_report import classification_report, render_report
+        sage: c = BentFunctionCGC.from_function(BentFunction([0,0,0,1]))
+        sage: render_report(classification_report(c))
+        Algebraic normal form of Boolean function: x0*x1
+        Function is bent.
+        <BLANKLINE>
+        <BLANKLINE>
+        SDP design incidence structure t-design parameters: (True, (1, 4, 1, 1))
+        <BLANKLINE>
+        Classification of Cayley graphs and classification of Cayley graphs of duals are the same:
+        <BLANKLINE>
+        There are 2 extended Cayley classes in the extended translation class.
+    """
+    if out is None:
+        out = sys.stdout
+
+    def write(*args, **kwargs):
+        print(*args, file=out, **kwargs)
+
+
+    def print_compare(verb, a, b):
+
+        write((
+            verb + " the same."
+            if a == b
+            else a), end=' ')
+
+
+    def graph_and_linear_code_report():
+        r"""
+        Report on the Cayley graphs and linear codes given by the
+        representative bent functions in the extended translation class.
+        """
+        dual_cayley_graph_index_matrix = report.dual_cayley_graph_index_matrix
+
+        write("")
+        write("There are", report.nbr_bent_cayley_graph_classes, end=' ')
+        write("extended Cayley classes in the extended translation class.")
+
+        if dual_cayley_graph_index_matrix is not None:
+            write("There are", report.nbr_dual_cayley_graph_classes, end=' ')
+            write("extended Cayley classes of dual bent functions", end=' ')
+            write("in the extended translation class,")
+            write("and", report.tot_cayley_graph_classes, end=' ')
+            write("extended Cayley classes in the union of the two.")
+
+        if report.report_on_matrix_details:
+            write("")
+            write("Matrix of indices of Cayley graphs:")
+            write(report.bent_cayley_graph_index_matrix)
+
+            if dual_cayley_graph_index_matrix is not None:
+                write("Matrix of indices of Cayley graphs", end=' ')
+                write("of dual bent functions:")
+                write(dual_cayley_graph_index_matrix)
+
+        if not report.report_on_graph_details:
+            return
+
+        write("")
+        write("For each extended Cayley class in the extended translation class:")
+        write("Clique polynomial, strongly regular parameters,", end=' ')
+        write("rank, and order of a representative graph; and")
+        write("linear code and generator matrix for a representative bent function:")
+
+        for index in range(report.tot_cayley_graph_classes):
+            write("")
+            write("EC class", index, ":")
+            cr = report.class_reports[index]
+            if cr is None:
+                write("No such representative graph.")
+                continue
+
+            write("Algebraic normal form of representative:", cr.algebraic_normal_form)
+            write("Clique polynomial:", end=' ')
+            write(cr.clique_polynomial)
+            write("Strongly regular parameters:", end=' ')
+            write(cr.strongly_regular_parameters)
+            write("Rank:", cr.rank, end=' ')
+            write("Order:", cr.group_order)
+
+            if cr.dual_index is not None:
+                write("Cayley graph of dual of representative differs:")
+                write("Index is", cr.dual_index)
+                write("Clique polynomial", end=' ')
+                print_compare(
+                    "is",
+                    cr.dual_clique_polynomial,
+                    cr.clique_polynomial)
+                write("")
+                write("Strongly regular parameters", end=' ')
+                print_compare (
+                    "are",
+                    cr.dual_strongly_regular_parameters,
+                    cr.strongly_regular_parameters)
+                write("")
+                write("Rank", end=' ')
+                print_compare ("is", cr.dual_rank, cr.rank)
+                write("Order", end=' ')
+                print_compare (
+                    "is", cr.dual_group_order, cr.group_order)
+                write("")
+                if report.verbose:
+                    if cr.order_is_power_of_2:
+                        write("Order is a power of 2.")
+                    else:
+                        write("")
+                        write("Automorphism group", end=' ')
+                        write((
+                            "is"
+                            if cr.automorphism_groups_isomorphic
+                            else "is not"), end=' ')
+                        write("isomorphic.")
+
+            write("")
+            write("Linear code from representative:")
+            write(cr.linear_code)
+            write("Generator matrix:")
+            write(cr.generator_matrix)
+            write("Linear code", end=' ')
+            write("is" if cr.is_projective else "is not", end=' ')
+            write("projective.")
+            write("Weight distribution:", end=' ')
+            write(cr.weight_distribution)
+
+
+    write("Algebraic normal form of Boolean function:", report.algebraic_normal_form)
+    write("Function", ("is" if report.is_bent else "is not"), "bent.")
+    write("")
+    if report.report_on_matrix_details:
+        write("Weight class matrix:")
+        write(report.weight_class_matrix)
+
+    write("")
+    write("SDP design incidence structure t-design parameters:", end=' ')
+    write(report.t_design_parameters)
+
+    write("")
+    if report.duals is None:
+        write("Classification of Cayley graphs:")
+    else:
+        write("Classification of Cayley graphs and", end=' ')
+        write("classification of Cayley graphs of duals", end=' ')
+        if report.duals == "same":
+            write("are the same:")
+        else:
+            write("differ in matrices of indexes:")
+    graph_and_linear_code_report()
+
+
+def report_lines(report):
+    r"""
+    Return the text of a report on a classification, as a list of lines.
+
+    INPUT:
+
+    - ``report`` -- a ``ClassificationReport``.
+
+    OUTPUT: a list of strings, as printed by ``render_report``, without line endings.
+    """
+    out = StringIO()
+    render_report(report, out)
+    return out.getvalue().splitlines()
@@ -0,0 +1,174 @@
+r"""
+Classification in parallel using MPI and fork
+=============================================
+
+The ``classify_in_hybrid_parallel`` module defines functions that
+use MPI across nodes, together with ``sage.parallel`` and ``fork`` within each node,
+to save partial Cayley graph classifications in parallel.
+
+The intended use is one MPI rank per node. Each rank imports the Sage library
+once, warms its caches for the bent function being classified, and then forks
+a local pool of worker processes. The workers share the imported library and
+the warmed caches with their parent, copy-on-write, rather than each
+starting its own Sage interpreter.
+
+AUTHORS:
+
+- Paul Leopardi (2024-04-01): initial version
+
+"""
+#*****************************************************************************
+#       Copyright (C) 2024 Paul Leopardi paul.leopardi@gmail.com
+#
+#  Distributed under the terms of the GNU General Public License (GPL)
+#  as published by the Free Software Foundation; either version 2 of
+#  the License, or (at your option) any later version.
+#                  http://www.gnu.org/licenses/
+#*****************************************************************************
+
+import os
+
+from boolean_cayley_graphs.bent_function import BentFunction
+from boolean_cayley_graphs.bent_function_cayley_graph_classification import default_algorithm
+from boolean_cayley_graphs.boolean_cayley_graph import boolean_cayley_graph
+from boolean_cayley_graphs.classify_in_mpi_parallel import broadcast_class_part_manifest
+from boolean_cayley_graphs.classify_in_parallel import call_in_parallel
+from boolean_cayley_graphs.classify_in_parallel import save_one_class_part
+
+
+def local_ncpus():
+    r"""
+    Return the number of cpus available to the current process.
+
+    OUTPUT:
+
+    A positive integer.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.classify_in_hybrid_parallel import local_ncpus
+        sage: local_ncpus() > 0
+        True
+    """
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def warm_caches(bentf, algorithm=default_algorithm):
+    r"""
+    Compute and cache the properties of a bent function that are used
+    by every class part, before forking worker processes.
+
+    The truth table, algebraic normal form and Walsh Hadamard transform of ``bentf``
+    are cached within ``bentf``. One Cayley graph is canonically labelled, so that
+    the lazily imported parts of the Sage library used for canonical labelling
+    are loaded. The parity table of ``integer_bits`` is already constructed,
+    since it is constructed when the module is imported.
+
+    INPUT:
+
+    - ``bentf`` -- A bent function.
+    - ``algorithm`` -- string (default: ``default_algorithm``).
+      The algorithm used for canonical labelling.
+
+    OUTPUT:
+
+    None.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.classify_in_hybrid_parallel import warm_caches
+        sage: bentf = BentFunction([0,0,0,1])
+        sage: warm_caches(bentf)
+    """
+    dim = bentf.nvariables()
+    bentf.truth_table()
+    bentf.algebraic_normal_form()
+    bentf.walsh_hadamard_transform()
+    boolean_cayley_graph(dim, bentf.extended_translate()).canonical_label(algorithm=algorithm)
+
+
+def save_class_parts_in_hybrid_parallel(
+    comm,
+    name_prefix,
+    form,
+    c_len=1,
+    ncpus=None,
+    directory=None,
+    target_walltime=None,
+    memory_limit=None):
+    r"""
+    Using MPI across ranks, and fork within each rank, construct a complete list of
+    the partial Cayley graph classifications corresponding to a given bent function
+    or algebraic normal form.
+
+    The class parts are divided between the ranks of ``comm``, in the same way as
+    ``classify_in_mpi_parallel.save_class_parts_in_parallel``. Each rank then saves
+    its own parts using a local pool of ``ncpus`` forked worker processes.
+
+    INPUT:
+
+    - ``comm`` -- MPI communicator, usually with one rank per node.
+    - ``name_prefix`` -- String. Name prefix to use with ``save_mangled`` to save each class part.
+    - ``form`` -- A bent function or an algebraic normal form.
+    - ``c_len`` -- Integer, or the string ``"auto"``. Default=1.
+      The number of values of `c` to use in each class part.
+      If ``"auto"``, rank 0 uses ``plan_class_parts`` to choose ``c_len``
+      using at most the total number of cpus across all ranks.
+    - ``ncpus`` -- Integer, optional. The number of worker processes to fork within each rank.
+      Default is None, meaning the number of cpus available to the rank.
+    - ``directory`` -- string, optional. The directory where the object
+      is to be saved. Default is None, meaning the current directory.
+    - ``target_walltime`` -- number, optional. The target wall time in seconds,
+      used only when ``c_len`` is ``"auto"``. Default is None, meaning one hour.
+    - ``memory_limit`` -- integer, optional. The total memory available in bytes,
+      used only when ``c_len`` is ``"auto"``. Default is None, meaning unlimited.
+
+    OUTPUT: None.
+
+    EFFECT: Uses ``name_prefix`` to save all partial classifications corresponding to ``bentf``.
+    As with ``classify_in_mpi_parallel.save_class_parts_in_parallel``, a ``ClassPartManifest``
+    is used to skip parts saved by a previous job, and to record the checksums of the parts.
+    """
+    rank = comm.Get_rank()
+    size = comm.Get_size()
+    if ncpus is None:
+        ncpus = local_ncpus()
+
+    bentf = BentFunction(form)
+    manifest = broadcast_class_part_manifest(
+        comm,
+        name_prefix,
+        bentf,
+        c_len=c_len,
+        directory=directory,
+        target_walltime=target_walltime,
+        memory_limit=memory_limit,
+        max_ncpus=size * ncpus)
+
+    # Skip the parts of this rank that were saved intact by a previous job.
+    list_of_tuples = [
+        ((name_prefix + '_' + part["suffix"], bentf, part["c_start"], part["c_stop"], directory))
+        for part in manifest.parts[rank::size]
+        if not manifest.is_part_intact(part)]
+
+    if list_of_tuples:
+        # Warm the caches once in this rank, so that the forked workers share them.
+        warm_caches(bentf)
+        call_in_parallel(
+            save_one_class_part,
+            list_of_tuples,
+            min(ncpus, len(list_of_tuples)))
+
+    # Once all ranks are done, record the status and checksums of the saved parts.
+    comm.barrier()
+    if rank == 0:
+        manifest.refresh()
+        manifest.save()
@@ -24,6 +24,9 @@ from sage.crypto.boolean_function import BooleanFunction
 from sage.functions.other import Function_ceil
 
 from boolean_cayley_graphs.bent_function import BentFunction
+from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassPart
+from boolean_cayley_graphs.class_part_manifest import ClassPartManifest
+from boolean_cayley_graphs.class_part_planning import plan_class_parts_for_function
 from boolean_cayley_graphs.classify_in_parallel import save_one_classification
 from boolean_cayley_graphs.classify_in_parallel import save_one_class_part
 
@@ -67,12 +70,96 @@ def save_classifications_in_parallel(
             directory=directory)
 
 
+def broadcast_class_part_manifest(
+    comm,
+    name_prefix,
+    bentf,
+    c_len=1,
+    directory=None,
+    target_walltime=None,
+    memory_limit=None,
+    max_ncpus=None):
+    r"""
+    Using MPI, load or create the manifest of the class parts of a classification,
+    and broadcast it to all ranks.
+
+    Rank 0 loads the manifest saved with ``name_prefix``, if it exists.
+    Otherwise, rank 0 creates and saves a manifest of pending parts,
+    whose names are zero padded to the same width.
+
+    INPUT:
+
+    - ``comm`` -- MPI communicator.
+    - ``name_prefix`` -- String. Name prefix used with ``save_mangled`` to save each class part.
+    - ``bentf`` -- A bent function.
+    - ``c_len`` -- Integer, or the string ``"auto"``. Default=1.
+      The number of values of `c` to use in each class part.
+      If ``"auto"``, and no manifest exists, rank 0 uses ``plan_class_parts``
+      to choose ``c_len`` using at most ``max_ncpus`` cpus.
+    - ``directory`` -- string, optional. The directory where the parts
+      are saved. Default is None, meaning the current directory.
+    - ``target_walltime`` -- number, optional. The target wall time in seconds,
+      used only when ``c_len`` is ``"auto"``. Default is None, meaning one hour.
+    - ``memory_limit`` -- integer, optional. The total memory available in bytes,
+      used only when ``c_len`` is ``"auto"``. Default is None, meaning unlimited.
+    - ``max_ncpus`` -- integer, optional. The maximum number of cpus,
+      used only when ``c_len`` is ``"auto"``. Default is None, meaning unlimited.
+
+    OUTPUT: A ``ClassPartManifest``, the same on all ranks.
+
+    A ``ValueError`` is raised on all ranks if an existing manifest
+    does not match ``c_len`` and the number of variables of ``bentf``.
+    """
+    rank = comm.Get_rank()
+    dim = bentf.nvariables()
+    v = 2 ** dim
+    mangled_part_prefix = BentFunctionCayleyGraphClassPart.mangled_name(
+        name_prefix,
+        dir=directory)
+
+    # Rank 0 loads or creates the manifest, and broadcasts it to the other ranks.
+    manifest = None
+    error_message = None
+    if rank == 0:
+        if ClassPartManifest.exists(mangled_part_prefix):
+            manifest = ClassPartManifest.load(mangled_part_prefix)
+            if (c_len != "auto" and manifest.c_len != c_len) or manifest.v != v:
+                error_message = (
+                    "The existing manifest has c_len == {} and v == {}, not c_len == {} and v == {}.".format(
+                        manifest.c_len,
+                        manifest.v,
+                        c_len,
+                        v))
+        else:
+            if c_len == "auto":
+                plan = plan_class_parts_for_function(
+                    bentf,
+                    3600 if target_walltime is None else target_walltime,
+                    memory_limit=memory_limit,
+                    max_ncpus=max_ncpus)
+                c_len = plan["c_len"]
+            nbr_parts = (v + c_len - 1) // c_len
+            nbr_digits = Function_ceil()(log(nbr_parts, 10))
+            manifest = ClassPartManifest.create(
+                mangled_part_prefix,
+                v,
+                c_len,
+                ['{0:0={width}}'.format(n, width=nbr_digits) for n in range(nbr_parts)])
+            manifest.save()
+    manifest, error_message = comm.bcast((manifest, error_message), root=0)
+    if error_message is not None:
+        raise ValueError(error_message)
+    return manifest
+
+
 def save_class_parts_in_parallel(
     comm,
     name_prefix,
     form,
     c_len=1,
-    directory=None):
+    directory=None,
+    target_walltime=None,
+    memory_limit=None):
     r"""
     Using MPI, construct a complete list of the partial Cayley graph classifications
     corresponding to a given bent function or algebraic normal form.
@@ -82,22 +169,42 @@ def save_class_parts_in_parallel(
     - ``comm`` -- MPI communicator.
     - ``name_prefix`` -- String. Name prefix to use with ``save_mangled`` to save each class part.
     - ``form`` -- A bent function or an algebraic normal form.
-    - ``c_len`` -- Integer. Default=1. The number of values of `c` to use in each class part.
+    - ``c_len`` -- Integer, or the string ``"auto"``. Default=1.
+      The number of values of `c` to use in each class part.
+      If ``"auto"``, rank 0 samples the cost of a few cells and uses ``plan_class_parts``
+      to choose ``c_len`` so that the classification fits within ``target_walltime``
+      and ``memory_limit`` using at most the size of ``comm`` cpus.
+      The chosen value is broadcast to all other ranks.
     - ``directory`` -- string, optional. The directory where the object
       is to be saved. Default is None, meaning the current directory.
+    - ``target_walltime`` -- number, optional. The target wall time in seconds,
+      used only when ``c_len`` is ``"auto"``. Default is None, meaning one hour.
+    - ``memory_limit`` -- integer, optional. The total memory available in bytes,
+      used only when ``c_len`` is ``"auto"``. Default is None, meaning unlimited.
 
     OUTPUT: None.
 
     EFFECT: Uses ``name_prefix`` to save all partial classifications corresponding to ``bentf``.
+    Rank 0 saves a ``ClassPartManifest`` recording the expected parts.
+    If a manifest already exists, for example from an interrupted job,
+    parts that have already been saved are skipped, and ``c_len`` must
+    either match the manifest or be ``"auto"``.
+    When all ranks have finished, rank 0 records the checksums of the parts in the manifest.
     """
     rank = comm.Get_rank()
     size = comm.Get_size()
 
     bentf = BentFunction(form)
-    dim = bentf.nvariables()
-    v = 2 ** dim
-    ceil = Function_ceil()
-    nbr_parts = ceil(v * 1.0 / c_len)
+    manifest = broadcast_class_part_manifest(
+        comm,
+        name_prefix,
+        bentf,
+        c_len=c_len,
+        directory=directory,
+        target_walltime=target_walltime,
+        memory_limit=memory_limit,
+        max_ncpus=size)
+    nbr_parts = len(manifest.parts)
 
     # Include the case where size > nbr_parts and therefore
     # this function is being applied to many bent functions in parallel.
@@ -108,12 +215,20 @@ def save_class_parts_in_parallel(
         beg_n = rank
         end_n = nbr_parts
 
-    nbr_digits = ceil(log(nbr_parts, 10))
     for n in range(beg_n, end_n, size):
-        n_str = '{0:0={width}}'.format(n, width=nbr_digits)
+        part = manifest.parts[n]
+        if manifest.is_part_intact(part):
+            # This part was saved intact by a previous job.
+            continue
         save_one_class_part(
-            name=name_prefix + '_' + n_str,
+            name=name_prefix + '_' + part["suffix"],
             bentf=bentf,
-            c_start=c_len * n,
-            c_stop=c_len * (n + 1),
-            directory=directory)
+            c_start=part["c_start"],
+            c_stop=part["c_stop"],
+            dir=directory)
+
+    # Once all ranks are done, record the status and checksums of the saved parts.
+    comm.barrier()
+    if rank == 0:
+        manifest.refresh()
+        manifest.save()
@@ -3,11 +3,13 @@ Classification in parallel using fork
 =====================================
 
 The ``classify_in_parallel`` module defines functions that use ``sage.parallel`` and ``fork``
-to save Cayley graph classifications or partial classifications in parallel.
+to save Cayley graph classifications or partial classifications in parallel,
+or to assemble a classification in parallel using shared memory.
 
 AUTHORS:
 
 - Paul Leopardi (2017-05-22)
+- Paul Leopardi (2024-03-25): classification using shared memory
 
 """
 #*****************************************************************************
@@ -19,12 +21,24 @@ AUTHORS:
 #                  http://www.gnu.org/licenses/
 #*****************************************************************************
 
-from sage.functions.other import Function_ceil
+from multiprocessing.shared_memory import SharedMemory
+from sage.matrix.constructor import matrix
 from sage.parallel.decorate import parallel
 
+import numpy as np
+
 from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
 from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassPart
+from boolean_cayley_graphs.bent_function_cayley_graph_classification import default_algorithm
 from boolean_cayley_graphs.bent_function import BentFunction
+from boolean_cayley_graphs.class_part_manifest import ClassPartManifest
+from boolean_cayley_graphs.class_part_planning import plan_class_parts_for_function
+from boolean_cayley_graphs.containers import BijectiveList
+from boolean_cayley_graphs.containers import ShelveBijectiveList
+
+
+# The dtype of the classification matrices held in shared memory.
+shared_matrix_dtype = np.int32
 
 
 def call_in_parallel(
@@ -165,6 +179,218 @@ def classify_in_parallel(
         list_of_tuples,
         ncpus)
 
+def classify_part_into_shared_memory(
+    shared_memory_name,
+    bentf,
+    c_start,
+    c_stop,
+    list_dual_graphs=True,
+    algorithm=default_algorithm):
+    r"""
+    Construct a partial Cayley graph classification corresponding to a given bent function,
+    and write its matrices directly into the rows of whole-classification matrices
+    held in shared memory.
+
+    INPUT:
+
+    - ``shared_memory_name`` -- string. The name of a ``SharedMemory`` block
+      holding an array of ``shared_matrix_dtype`` of shape ``(3, v, v)``,
+      where ``v == 2 ** bentf.nvariables()``.
+      The three layers are the bent Cayley graph index matrix,
+      the dual Cayley graph index matrix, and the weight class matrix.
+    - ``bentf`` -- A bent function.
+    - ``c_start`` -- smallest value of `c` to use for extended translates. Integer.
+    - ``c_stop`` -- one more than largest value of `c` to use for extended translates. Integer.
+    - ``list_dual_graphs`` -- boolean (default: ``True``).
+      A flag indicating whether to list dual graphs.
+    - ``algorithm`` -- string (default: ``default_algorithm``).
+      The algorithm used for canonical labelling.
+
+    OUTPUT: A tuple ``(c_start, c_stop, cayley_graph_class_list)``, where the indices written into
+    rows ``c_start`` to ``c_stop - 1`` of the shared matrices are indices into the list
+    ``cayley_graph_class_list`` of ``graph6_string`` strings.
+
+    EXAMPLE:
+
+    ::
+
+        sage: import numpy as np
+        sage: from multiprocessing.shared_memory import SharedMemory
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.classify_in_parallel import classify_part_into_shared_memory
+        sage: from boolean_cayley_graphs.classify_in_parallel import shared_matrix_dtype
+        sage: f = BentFunction([0,1,1,1])
+        sage: shm = SharedMemory(create=True, size=3 * 4 * 4 * np.dtype(shared_matrix_dtype).itemsize)
+        sage: shared_matrices = np.ndarray((3, 4, 4), dtype=shared_matrix_dtype, buffer=shm.buf)
+        sage: shared_matrices[:] = 0
+        sage: classify_part_into_shared_memory(shm.name, f, 2, 4)
+        (2, 4, ['CK', 'C~'])
+        sage: shared_matrices[0, 2:4]
+        array([[0, 1, 0, 0],
+               [0, 0, 0, 1]], dtype=int32)
+        sage: del shared_matrices
+        sage: shm.close()
+        sage: shm.unlink()
+    """
+    part = BentFunctionCayleyGraphClassPart.from_function(
+        bentf,
+        list_dual_graphs=list_dual_graphs,
+        c_start=c_start,
+        c_stop=c_stop,
+        algorithm=algorithm)
+    v = 2 ** bentf.nvariables()
+    c_stop = c_start + part.weight_class_matrix.nrows()
+
+    shm = SharedMemory(name=shared_memory_name)
+    shared_matrices = None
+    try:
+        shared_matrices = np.ndarray(
+            (3, v, v),
+            dtype=shared_matrix_dtype,
+            buffer=shm.buf)
+        shared_matrices[0, c_start:c_stop] = part.bent_cayley_graph_index_matrix.numpy()
+        if list_dual_graphs:
+            shared_matrices[1, c_start:c_stop] = part.dual_cayley_graph_index_matrix.numpy()
+        shared_matrices[2, c_start:c_stop] = part.weight_class_matrix.numpy()
+    finally:
+        # Release the view of the buffer before closing the shared memory.
+        shared_matrices = None
+        shm.close()
+    return (c_start, c_stop, part.cayley_graph_class_list)
+
+
+def classify_in_shared_memory(
+    form,
+    c_len=1,
+    ncpus=4,
+    list_dual_graphs=True,
+    limited_memory=False,
+    algorithm=default_algorithm):
+    r"""
+    In parallel, construct the Cayley graph classification corresponding to
+    a given bent function or algebraic normal form, assembling the
+    classification matrices in shared memory.
+
+    The parent process allocates the whole-classification matrices in a
+    ``SharedMemory`` block. Each worker classifies a range of values of `c`
+    and writes its local indices directly into the corresponding rows,
+    returning only its list of ``graph6_string`` strings.
+    The parent then merges these lists, in order of `c`, and remaps the indices
+    in each range of rows. No class parts are pickled or saved as files.
+
+    INPUT:
+
+    - ``form`` -- A bent function or an algebraic normal form.
+    - ``c_len`` -- Integer. Default=1. The number of values of `c` classified by each worker call.
+    - ``ncpus`` -- Integer. Default=4. The number of cpus to use in parallel.
+    - ``list_dual_graphs`` -- boolean (default: ``True``).
+      A flag indicating whether to list dual graphs.
+    - ``limited_memory`` -- boolean (default: ``False``).
+      A flag indicating whether the list of graphs might be too large to fit into memory.
+    - ``algorithm`` -- string (default: ``default_algorithm``).
+      The algorithm used for canonical labelling.
+
+    OUTPUT:
+
+    An object of class ``BentFunctionCayleyGraphClassification``,
+    equal to the result of ``BentFunctionCayleyGraphClassification.from_parts``
+    applied to the class parts for the same values of ``c_len``.
+
+    EXAMPLE:
+
+    ::
+
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification as BFC
+        sage: from boolean_cayley_graphs.classify_in_parallel import classify_in_shared_memory
+        sage: f = BentFunction([0,0,0,1])
+        sage: classify_in_shared_memory(f, c_len=4, ncpus=2) == BFC.from_function(f)
+        True
+        sage: R4.<x0,x1,x2,x3> = BooleanPolynomialRing(4)
+        sage: g = BentFunction(x0*x1 + x2*x3)
+        sage: cl = classify_in_shared_memory(g, c_len=4, ncpus=4)
+        sage: whole = BFC.from_function(g)
+        sage: cl.weight_class_matrix == whole.weight_class_matrix
+        True
+        sage: def labels(c, m):
+        ....:     return [c.cayley_graph_class_list[i] for i in m.list()]
+        sage: labels(cl, cl.bent_cayley_graph_index_matrix) == labels(whole, whole.bent_cayley_graph_index_matrix)
+        True
+        sage: labels(cl, cl.dual_cayley_graph_index_matrix) == labels(whole, whole.dual_cayley_graph_index_matrix)
+        True
+    """
+    bentf = BentFunction(form)
+    dim = bentf.nvariables()
+    v = 2 ** dim
+    nbr_parts = (v + c_len - 1) // c_len
+
+    itemsize = np.dtype(shared_matrix_dtype).itemsize
+    shm = SharedMemory(create=True, size=3 * v * v * itemsize)
+    shared_matrices = None
+    rows = None
+    try:
+        shared_matrices = np.ndarray(
+            (3, v, v),
+            dtype=shared_matrix_dtype,
+            buffer=shm.buf)
+        shared_matrices[:] = 0
+
+        list_of_tuples = [
+            ((shm.name, bentf, c_len * n, min(c_len * (n + 1), v), list_dual_graphs, algorithm))
+            for n in range(nbr_parts)]
+        results = call_in_parallel(
+            classify_part_into_shared_memory,
+            list_of_tuples,
+            ncpus)
+        part_results = []
+        for args_kwds, result in results:
+            if not isinstance(result, tuple):
+                c_start = args_kwds[0][2]
+                raise RuntimeError(
+                    "Classification of class part starting at c == {} failed: {}".format(
+                        c_start,
+                        result))
+            part_results.append(result)
+        part_results.sort()
+
+        # Merge the part lists in order of c, so that the whole list
+        # is in the same order as that produced by from_parts.
+        cayley_graph_class_bijection = (
+            ShelveBijectiveList()
+            if dim > 8 or (dim == 8 and limited_memory) else
+            BijectiveList())
+        nbr_layers = 2 if list_dual_graphs else 1
+        for c_start, c_stop, part_class_list in part_results:
+            whole_cg_index = np.array(
+                [cayley_graph_class_bijection.index_append(label)
+                 for label in part_class_list],
+                dtype=shared_matrix_dtype)
+            rows = shared_matrices[:nbr_layers, c_start:c_stop]
+            rows[:] = whole_cg_index[rows]
+        cayley_graph_class_list = cayley_graph_class_bijection.get_list()
+        cayley_graph_class_bijection.close_dict()
+        cayley_graph_class_bijection.remove_dict()
+
+        bent_cayley_graph_index_matrix = matrix(shared_matrices[0].tolist())
+        dual_cayley_graph_index_matrix = (
+            matrix(shared_matrices[1].tolist())
+            if list_dual_graphs else
+            None)
+        weight_class_matrix = matrix(shared_matrices[2].tolist())
+    finally:
+        # Release the views of the buffer before closing the shared memory.
+        shared_matrices = None
+        rows = None
+        shm.close()
+        shm.unlink()
+
+    return BentFunctionCayleyGraphClassification(
+        algebraic_normal_form=bentf.algebraic_normal_form(),
+        cayley_graph_class_list=cayley_graph_class_list,
+        bent_cayley_graph_index_matrix=bent_cayley_graph_index_matrix,
+        dual_cayley_graph_index_matrix=dual_cayley_graph_index_matrix,
+        weight_class_matrix=weight_class_matrix)
+
 
 def save_one_classification(
     name,
@@ -365,7 +591,9 @@ def save_class_parts_in_parallel(
     form,
     c_len=1,
     ncpus=4,
-    dir=None):
+    dir=None,
+    target_walltime=None,
+    memory_limit=None):
     r"""
     In parallel, construct a complete list of the partial Cayley graph classifications
     corresponding to a given bent function or algebraic normal form.
@@ -374,14 +602,27 @@ def save_class_parts_in_parallel(
 
     - ``name_prefix`` -- String. Name prefix to use with ``save_mangled`` to save each class part.
     - ``form`` -- A bent function or an algebraic normal form.
-    - ``c_len`` -- Integer. Default=1. The number of values of `c` to use in each class part.
+    - ``c_len`` -- Integer, or the string ``"auto"``. Default=1.
+      The number of values of `c` to use in each class part.
+      If ``"auto"``, the cost of a few cells is sampled, and ``plan_class_parts``
+      is used to choose ``c_len`` so that the classification fits within
+      ``target_walltime`` and ``memory_limit`` using at most ``ncpus`` cpus.
     - ``ncpus`` -- Integer. Default=4. The number of cpus to use in parallel.
     - ``dir`` -- string, optional. The directory where the object
       is to be saved. Default is None, meaning the current directory.
+    - ``target_walltime`` -- number, optional. The target wall time in seconds,
+      used only when ``c_len`` is ``"auto"``. Default is None, meaning one hour.
+    - ``memory_limit`` -- integer, optional. The total memory available in bytes,
+      used only when ``c_len`` is ``"auto"``. Default is None, meaning unlimited.
 
-    OUTPUT: A list containing tuples, with names.
+    OUTPUT: A list containing tuples, with names, for the class parts saved by this call.
 
     EFFECT: Uses ``name_prefix`` to save all partial classifications corresponding to ``bentf``.
+    A ``ClassPartManifest`` recording the expected parts is saved with the parts.
+    If a manifest already exists, for example from an interrupted run,
+    only the parts that have not yet been saved are computed, and
+    ``c_len`` must either match the manifest or be ``"auto"``.
+    When all parts have been computed, the manifest records their checksums.
 
     EXAMPLE:
 
@@ -415,17 +656,95 @@ def save_class_parts_in_parallel(
         BentFunctionCayleyGraphClassPart__test_save_class_parts_in_parallel_1
         BentFunctionCayleyGraphClassPart__test_save_class_parts_in_parallel_2
         BentFunctionCayleyGraphClassPart__test_save_class_parts_in_parallel_3
+        sage: os.remove(BFCP.mangled_name(name_prefix + '_manifest.json', dir=d))
+        sage: os.rmdir(d)
+
+    TESTS:
+
+    Only the parts that are missing are computed when a run is resumed.
+
+    ::
+
+        sage: import os
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassPart as BFCP
+        sage: from boolean_cayley_graphs.class_part_manifest import ClassPartManifest
+        sage: from boolean_cayley_graphs.classify_in_parallel import save_class_parts_in_parallel
+        sage: f = BentFunction([0,0,0,1])
+        sage: name_prefix = 'test_save_class_parts_in_parallel_resume'
+        sage: d = tmp_dir()
+        sage: s = save_class_parts_in_parallel(name_prefix, f, c_len=2, dir=d)
+        sage: BFCP.remove_mangled(name_prefix + '_1', dir=d)
+        sage: s = save_class_parts_in_parallel(name_prefix, f, c_len=2, dir=d)
+        sage: sorted(name for (args, kwargs), name in s)
+        ['test_save_class_parts_in_parallel_resume_1']
+        sage: manifest = ClassPartManifest.load(BFCP.mangled_name(name_prefix, dir=d))
+        sage: manifest
+        Manifest of 2 class parts: 2 complete, 0 pending
+        sage: save_class_parts_in_parallel(name_prefix, f, c_len=1, dir=d)
+        Traceback (most recent call last):
+        ...
+        ValueError: The existing manifest has c_len == 2 and v == 4, not c_len == 1 and v == 4.
+        sage: for n in range(2):
+        ....:     BFCP.remove_mangled(name_prefix + '_' + str(n), dir=d)
+        sage: manifest.remove()
+        sage: os.rmdir(d)
+
+    ::
+
+        sage: import os
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassPart as BFCP
+        sage: from boolean_cayley_graphs.classify_in_parallel import save_class_parts_in_parallel
+        sage: f = BentFunction([0,0,0,1])
+        sage: name_prefix = 'test_save_class_parts_in_parallel_auto'
+        sage: d = tmp_dir()
+        sage: s = save_class_parts_in_parallel(name_prefix, f, c_len="auto", dir=d, target_walltime=60)
+        sage: p0 = BFCP.load_mangled(name_prefix + '_0', dir=d)
+        sage: p0.bent_cayley_graph_index_matrix.dimensions()
+        (4, 4)
+        sage: BFCP.remove_mangled(name_prefix + '_0', dir=d)
+        sage: os.remove(BFCP.mangled_name(name_prefix + '_manifest.json', dir=d))
         sage: os.rmdir(d)
     """
     bentf = BentFunction(form)
     dim = bentf.nvariables()
     v = 2 ** dim
-    ceil = Function_ceil()
-    nbr_parts = ceil(v * 1.0 / c_len)
+    mangled_part_prefix = BentFunctionCayleyGraphClassPart.mangled_name(
+        name_prefix,
+        dir=dir)
+    if ClassPartManifest.exists(mangled_part_prefix):
+        # Resume a previous run using its manifest.
+        manifest = ClassPartManifest.load(mangled_part_prefix)
+        if c_len == "auto":
+            c_len = manifest.c_len
+        if manifest.c_len != c_len or manifest.v != v:
+            raise ValueError(
+                "The existing manifest has c_len == {} and v == {}, not c_len == {} and v == {}.".format(
+                    manifest.c_len,
+                    manifest.v,
+                    c_len,
+                    v))
+    else:
+        if c_len == "auto":
+            plan = plan_class_parts_for_function(
+                bentf,
+                3600 if target_walltime is None else target_walltime,
+                memory_limit=memory_limit,
+                max_ncpus=ncpus)
+            c_len = plan["c_len"]
+        manifest = ClassPartManifest.create(mangled_part_prefix, v, c_len)
+        manifest.save()
+
     list_of_tuples = [
-        ((name_prefix + '_' + str(n), bentf, c_len * n, c_len * (n+1), dir))
-        for n in range(nbr_parts)]
-    return call_in_parallel(
+        ((name_prefix + '_' + part["suffix"], bentf, part["c_start"], part["c_stop"], dir))
+        for part in manifest.pending_parts()]
+    result = call_in_parallel(
         save_one_class_part,
         list_of_tuples,
         ncpus)
+
+    # Record the status and checksums of the saved parts.
+    manifest.refresh()
+    manifest.save()
+    return result
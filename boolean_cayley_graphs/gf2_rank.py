@@ -0,0 +1,425 @@
+r"""
+Ranks over GF(2) of bit-packed matrices
+=======================================
+
+The ``gf2_rank`` module defines functions that compute the rank over
+:math:`\mathbb{F}_2` of 0-1 matrices, such as the adjacency matrices of
+Cayley graphs, without constructing Sage matrices.
+
+Each row of a matrix is packed into an array of ``uint64`` words, and Gaussian
+elimination operates on whole words, on a batch of matrices at once.
+The adjacency matrix of the Cayley graph of a Boolean function on
+:math:`\mathbb{F}_2^{dim}` is built directly from its truth table,
+and the adjacency matrix of a graph encoded by a ``graph6`` string
+is decoded directly from the string.
+
+AUTHORS:
+
+- Paul Leopardi (2024-07-01): initial version
+
+EXAMPLES:
+
+::
+
+    sage: from boolean_cayley_graphs.bent_function import BentFunction
+    sage: from boolean_cayley_graphs.gf2_rank import cayley_graph_rank, graph6_rank
+    sage: bentf = BentFunction([0,0,0,1,0,0,0,1,0,0,0,1,1,1,1,0])
+    sage: cayley_graph_rank(bentf.truth_table(format='int'))
+    6
+    sage: label = bentf.cayley_graph().canonical_label().graph6_string()
+    sage: graph6_rank(label)
+    6
+    sage: matrix(GF(2), bentf.cayley_graph()).rank()
+    6
+"""
+#*****************************************************************************
+#       Copyright (C) 2024 Paul Leopardi paul.leopardi@gmail.com
+#
+#  Distributed under the terms of the GNU General Public License (GPL)
+#  as published by the Free Software Foundation; either version 2 of
+#  the License, or (at your option) any later version.
+#                  http://www.gnu.org/licenses/
+#*****************************************************************************
+
+import numpy as np
+
+
+# The number of bits in each word of a packed row.
+word_size = 64
+
+
+# The default maximum number of bytes of unpacked adjacency bits in each batch.
+default_batch_bytes = 2 ** 26
+
+
+def batch_length(v, batch_bytes=None):
+    r"""
+    Return the number of ``v`` by ``v`` adjacency matrices in each batch.
+
+    INPUT:
+
+    - ``v`` -- integer. The number of vertices.
+    - ``batch_bytes`` -- integer (default: `None`). The maximum number of bytes
+      of unpacked adjacency bits in each batch. Default is None,
+      meaning ``default_batch_bytes``.
+
+    OUTPUT: a positive integer.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.gf2_rank import batch_length
+        sage: batch_length(256)
+        1024
+        sage: batch_length(256, batch_bytes=1)
+        1
+    """
+    if batch_bytes is None:
+        batch_bytes = default_batch_bytes
+    return max(1, batch_bytes // (v * v))
+
+
+def pack_rows(bits):
+    r"""
+    Pack the rows of 0-1 matrices into ``uint64`` words.
+
+    Bit ``j % 64`` of word ``j // 64`` of each packed row is entry ``j`` of the row.
+
+    INPUT:
+
+    - ``bits`` -- a ``numpy`` array of 0-1 values, of shape ``(nrows, ncols)``,
+      or ``(nbr_matrices, nrows, ncols)`` for a batch of matrices.
+
+    OUTPUT: a ``numpy`` array of ``uint64``, of shape ``(..., nrows, nwords)``,
+    where ``nwords`` is ``ceil(ncols / 64)``.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.gf2_rank import pack_rows
+        sage: import numpy as np
+        sage: pack_rows(np.array([[1,0,1], [0,1,1]])).tolist()
+        [[5], [6]]
+        sage: pack_rows(np.ones((1, 65), dtype=int)).tolist()
+        [[18446744073709551615, 1]]
+    """
+    bits = np.asarray(bits, dtype=np.uint8) & 1
+    ncols = bits.shape[-1]
+    nwords = (ncols + word_size - 1) // word_size
+    padding = [(0, 0)] * (bits.ndim - 1) + [(0, nwords * word_size - ncols)]
+    bits = np.pad(bits, padding)
+    bytes_ = np.packbits(bits, axis=-1, bitorder="little")
+    return np.ascontiguousarray(bytes_).view("<u8").astype(np.uint64)
+
+
+def packed_ranks(packed):
+    r"""
+    Return the ranks over GF(2) of a batch of bit-packed matrices.
+
+    The matrices are reduced using Gaussian elimination, one column at a time,
+    with all of the matrices of the batch reduced together.
+
+    INPUT:
+
+    - ``packed`` -- a ``numpy`` array of ``uint64``, of shape ``(nbr_matrices, nrows, nwords)``,
+      as returned by ``pack_rows``. This array is not changed.
+
+    OUTPUT: a ``numpy`` array of ``int64``, of shape ``(nbr_matrices,)``.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.gf2_rank import pack_rows, packed_ranks
+        sage: import numpy as np
+        sage: a = np.array([[1,1,0], [0,1,1], [1,0,1]])
+        sage: b = np.eye(3, dtype=int)
+        sage: packed_ranks(pack_rows(np.array([a, b]))).tolist()
+        [2, 3]
+    """
+    rows = np.array(packed, dtype=np.uint64, copy=True)
+    nbr_matrices, nrows, nwords = rows.shape
+    batch = np.arange(nbr_matrices)
+    row_indices = np.arange(nrows)
+    ranks = np.zeros(nbr_matrices, dtype=np.int64)
+    for word in range(nwords):
+        for bit in range(word_size):
+            if (ranks == nrows).all():
+                return ranks
+            column = ((rows[:, :, word] >> np.uint64(bit)) & np.uint64(1)).astype(bool)
+            # Candidate pivots are the rows with a 1 in this column, below the reduced rows.
+            candidates = column & (row_indices[None, :] >= ranks[:, None])
+            has_pivot = candidates.any(axis=1)
+            if not has_pivot.any():
+                continue
+            pivots = np.argmax(candidates, axis=1)
+            # Swap each pivot row into the next position of its matrix.
+            targets = np.where(has_pivot, ranks, pivots)
+            pivot_rows = rows[batch, pivots].copy()
+            rows[batch, pivots] = rows[batch, targets]
+            rows[batch, targets] = pivot_rows
+            column[batch, pivots], column[batch, targets] = column[batch, targets], column[batch, pivots]
+            # Clear this column in all other rows.
+            eliminate = column & has_pivot[:, None] & (row_indices[None, :] != targets[:, None])
+            rows ^= np.where(eliminate[:, :, None], pivot_rows[:, None, :], np.uint64(0))
+            ranks += has_pivot
+    return ranks
+
+
+def packed_rank(packed):
+    r"""
+    Return the rank over GF(2) of a bit-packed matrix.
+
+    INPUT:
+
+    - ``packed`` -- a ``numpy`` array of ``uint64``, of shape ``(nrows, nwords)``,
+      as returned by ``pack_rows``.
+
+    OUTPUT: an integer.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.gf2_rank import pack_rows, packed_rank
+        sage: import numpy as np
+        sage: packed_rank(pack_rows(np.array([[1,1,0], [0,1,1], [1,0,1]])))
+        2
+    """
+    return int(packed_ranks(np.asarray(packed)[None, :, :])[0])
+
+
+def cayley_adjacency_bits(truth_table):
+    r"""
+    Return the adjacency matrix of the Cayley graph of a Boolean function.
+
+    Entry ``(x, y)`` is ``f(x ^ y) ^ f(0)``, as per ``boolean_cayley_graph``
+    applied to the extended translate of ``f`` used by ``cayley_graph``.
+
+    INPUT:
+
+    - ``truth_table`` -- a sequence of 0-1 values, of length ``2**dim``.
+      The truth table of a Boolean function ``f``.
+
+    OUTPUT: a ``numpy`` array of ``uint8``, of shape ``(2**dim, 2**dim)``.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.gf2_rank import cayley_adjacency_bits
+        sage: cayley_adjacency_bits([0,1,0,0]).tolist()
+        [[0, 1, 0, 0], [1, 0, 0, 0], [0, 0, 0, 1], [0, 0, 1, 0]]
+    """
+    tt = np.asarray([int(value) for value in truth_table], dtype=np.uint8)
+    tt ^= tt[0]
+    v = len(tt)
+    x = np.arange(v)
+    return tt[x[:, None] ^ x[None, :]]
+
+
+def cayley_graph_ranks(truth_tables, batch_bytes=None):
+    r"""
+    Return the ranks over GF(2) of the Cayley graphs of a batch of Boolean functions.
+
+    The adjacency matrices are built and reduced in batches of ``batch_length``
+    matrices, so that memory use does not grow with the number of functions.
+
+    INPUT:
+
+    - ``truth_tables`` -- a list of sequences of 0-1 values, all of the same length.
+    - ``batch_bytes`` -- integer (default: `None`). The maximum number of bytes
+      of unpacked adjacency bits in each batch, as per ``batch_length``.
+
+    OUTPUT: a list of integers.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.gf2_rank import cayley_graph_ranks
+        sage: cayley_graph_ranks([[0,0,0,1], [0,1,0,0]])
+        [4, 4]
+        sage: cayley_graph_ranks([[0,0,0,1], [0,1,0,0], [0,0,0,0]], batch_bytes=1)
+        [4, 4, 0]
+    """
+    if not truth_tables:
+        return []
+    length = batch_length(len(truth_tables[0]), batch_bytes)
+    ranks = []
+    for start in range(0, len(truth_tables), length):
+        bits = np.array([
+            cayley_adjacency_bits(tt)
+            for tt in truth_tables[start:start + length]])
+        ranks.extend(int(rank) for rank in packed_ranks(pack_rows(bits)))
+    return ranks
+
+
+def cayley_graph_rank(truth_table):
+    r"""
+    Return the rank over GF(2) of the Cayley graph of a Boolean function.
+
+    INPUT:
+
+    - ``truth_table`` -- a sequence of 0-1 values, of length ``2**dim``.
+
+    OUTPUT: an integer.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.gf2_rank import cayley_graph_rank
+        sage: cayley_graph_rank([0,0,0,1])
+        4
+    """
+    return cayley_graph_ranks([truth_table])[0]
+
+
+def graph6_order(graph6_string):
+    r"""
+    Return the number of vertices of a graph encoded as a ``graph6`` string.
+
+    INPUT:
+
+    - ``graph6_string`` -- string. A graph encoded in ``graph6`` format.
+
+    OUTPUT: an integer.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.gf2_rank import graph6_order
+        sage: graph6_order(graphs.PetersenGraph().graph6_string())
+        10
+    """
+    data = [ord(char) - 63 for char in graph6_string[:8]]
+    if data[0] < 63:
+        return data[0]
+    if data[1] < 63:
+        return (data[1] << 12) | (data[2] << 6) | data[3]
+    return (
+        (data[2] << 30) | (data[3] << 24) | (data[4] << 18) |
+        (data[5] << 12) | (data[6] << 6) | data[7])
+
+
+def graph6_adjacency_bits(graph6_string):
+    r"""
+    Decode the adjacency matrix of a graph from a ``graph6`` string.
+
+    INPUT:
+
+    - ``graph6_string`` -- string. A graph encoded in ``graph6`` format.
+
+    OUTPUT: a ``numpy`` array of ``uint8``, of shape ``(n, n)``,
+    where ``n`` is the number of vertices.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.gf2_rank import graph6_adjacency_bits
+        sage: g = graphs.PetersenGraph()
+        sage: graph6_adjacency_bits(g.graph6_string()).tolist() == g.adjacency_matrix().rows()
+        True
+    """
+    data = np.frombuffer(graph6_string.encode("ascii"), dtype=np.uint8).astype(np.int64) - 63
+    if data[0] < 63:
+        n = int(data[0])
+        data = data[1:]
+    elif data[1] < 63:
+        n = int((data[1] << 12) | (data[2] << 6) | data[3])
+        data = data[4:]
+    else:
+        n = int(
+            (data[2] << 30) | (data[3] << 24) | (data[4] << 18) |
+            (data[5] << 12) | (data[6] << 6) | data[7])
+        data = data[8:]
+    # Each character encodes 6 bits, most significant first.
+    bits = ((data[:, None] >> np.arange(5, -1, -1)[None, :]) & 1).astype(np.uint8).ravel()
+    # The bits are the upper triangle in column order: (0,1), (0,2), (1,2), (0,3), ...
+    i, j = np.triu_indices(n, 1)
+    order = np.lexsort((i, j))
+    adjacency = np.zeros((n, n), dtype=np.uint8)
+    adjacency[i[order], j[order]] = bits[:len(order)]
+    return adjacency | adjacency.T
+
+
+def graph6_ranks(graph6_strings, batch_bytes=None):
+    r"""
+    Return the ranks over GF(2) of the adjacency matrices of a batch of graphs.
+
+    The graphs are grouped by number of vertices, and each group is reduced
+    in batches of ``batch_length`` matrices.
+
+    INPUT:
+
+    - ``graph6_strings`` -- a list of strings. Graphs encoded in ``graph6`` format.
+    - ``batch_bytes`` -- integer (default: `None`). The maximum number of bytes
+      of unpacked adjacency bits in each batch, as per ``batch_length``.
+
+    OUTPUT: a list of integers, in the order of ``graph6_strings``.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.gf2_rank import graph6_ranks
+        sage: graphs_ = [graphs.PetersenGraph(), graphs.ClebschGraph(), graphs.CompleteGraph(4)]
+        sage: graph6_ranks([g.graph6_string() for g in graphs_])
+        [6, 16, 4]
+        sage: graph6_ranks([g.graph6_string() for g in graphs_], batch_bytes=1)
+        [6, 16, 4]
+        sage: [matrix(GF(2), g).rank() for g in graphs_]
+        [6, 16, 4]
+    """
+    ranks = [0] * len(graph6_strings)
+    sizes = dict()
+    for index, graph6_string in enumerate(graph6_strings):
+        sizes.setdefault(graph6_order(graph6_string), []).append(index)
+    for v, indices in sizes.items():
+        length = batch_length(v, batch_bytes)
+        for start in range(0, len(indices), length):
+            batch = indices[start:start + length]
+            bits = np.array([graph6_adjacency_bits(graph6_strings[index]) for index in batch])
+            for index, rank in zip(batch, packed_ranks(pack_rows(bits))):
+                ranks[index] = int(rank)
+    return ranks
+
+
+def graph6_rank(graph6_string):
+    r"""
+    Return the rank over GF(2) of the adjacency matrix of a graph.
+
+    INPUT:
+
+    - ``graph6_string`` -- string. A graph encoded in ``graph6`` format.
+
+    OUTPUT: an integer.
+    """
+    return graph6_ranks([graph6_string])[0]
+
+
+def graph_rank(graph):
+    r"""
+    Return the rank over GF(2) of the adjacency matrix of a Sage graph.
+
+    INPUT:
+
+    - ``graph`` -- a ``Graph``.
+
+    OUTPUT: an integer.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.gf2_rank import graph_rank
+        sage: from boolean_cayley_graphs.royle_x_graph import royle_x_graph
+        sage: graph_rank(royle_x_graph())
+        64
+    """
+    return graph6_rank(graph.graph6_string())
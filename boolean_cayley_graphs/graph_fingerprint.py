@@ -0,0 +1,329 @@
+r"""
+Invariant fingerprints of graphs and Cayley graphs
+==================================================
+
+The ``graph_fingerprint`` module defines functions that compute a fingerprint
+of a graph: a tuple of isomorphism invariants that is fast to compute using
+``numpy``, so that graphs with different fingerprints are known to be
+non-isomorphic without computing their canonical labels.
+
+The fingerprint of a graph combines the degrees of its vertices, the number of
+triangles containing each vertex, its rank over GF(2), as per ``gf2_rank``,
+and a digest of a few rounds of Weisfeiler-Lehman colour refinement.
+
+The fingerprint of the Cayley graph of a Boolean function :math:`f` is computed
+from the truth table of :math:`f`, without constructing the graph. Since the graph
+is vertex transitive, every vertex has the same degree, the same number of
+triangles, and the same colour under vertex colour refinement. Instead, the
+number of triangles is obtained from the autocorrelation of :math:`f`, computed
+using the Walsh-Hadamard transform, and colours are refined for the pairs of
+vertices :math:`(x, y)`, whose colours depend only on :math:`x + y`.
+
+Graphs with the same fingerprint need not be isomorphic. In particular,
+all strongly regular graphs with the same parameters have the same
+degrees, triangles and colour refinement, and are distinguished only by rank.
+
+AUTHORS:
+
+- Paul Leopardi (2024-08-26): initial version
+
+EXAMPLES:
+
+::
+
+    sage: from boolean_cayley_graphs.bent_function import BentFunction
+    sage: from boolean_cayley_graphs.graph_fingerprint import cayley_graph_fingerprint
+    sage: bentf = BentFunction([0,0,0,1,0,0,0,1,0,0,0,1,1,1,1,0])
+    sage: fp = cayley_graph_fingerprint(bentf.truth_table(format='int'))
+    sage: fp.order, fp.loops, fp.degree, fp.triangles, fp.rank
+    (16, False, 6, 6, 6)
+    sage: cayley_graph_fingerprint([0,1,0,0]) == cayley_graph_fingerprint([0,0,1,0])
+    True
+"""
+#*****************************************************************************
+#       Copyright (C) 2024 Paul Leopardi paul.leopardi@gmail.com
+#
+#  Distributed under the terms of the GNU General Public License (GPL)
+#  as published by the Free Software Foundation; either version 2 of
+#  the License, or (at your option) any later version.
+#                  http://www.gnu.org/licenses/
+#*****************************************************************************
+
+from collections import OrderedDict, namedtuple
+
+import hashlib
+
+import numpy as np
+
+from boolean_cayley_graphs.gf2_rank import pack_rows, packed_rank
+
+
+# The default number of rounds of colour refinement.
+default_wl_rounds = 3
+
+
+CayleyGraphFingerprint = namedtuple(
+    "CayleyGraphFingerprint",
+    ["order", "loops", "degree", "triangles", "rank", "colour_digest"])
+CayleyGraphFingerprint.__doc__ = r"""
+A fingerprint of the Cayley graph of a Boolean function.
+
+- ``order`` -- integer. The number of vertices.
+- ``loops`` -- boolean. Whether each vertex has a loop.
+- ``degree`` -- integer. The number of neighbours of each vertex, other than itself.
+- ``triangles`` -- integer. The number of triangles containing each vertex.
+- ``rank`` -- integer. The rank over GF(2) of the adjacency matrix.
+- ``colour_digest`` -- a bytes object. The SHA-256 digest of the
+  colour classes of the pairs of vertices, after each round of colour refinement.
+"""
+
+
+GraphFingerprint = namedtuple(
+    "GraphFingerprint",
+    ["order", "nbr_loops", "degrees", "triangles", "rank", "colour_digest"])
+GraphFingerprint.__doc__ = r"""
+A fingerprint of a graph.
+
+- ``order`` -- integer. The number of vertices.
+- ``nbr_loops`` -- integer. The number of vertices with a loop.
+- ``degrees`` -- a tuple of pairs ``(degree, count)``, in order of degree.
+  The number of vertices with each number of neighbours, other than themselves.
+- ``triangles`` -- a tuple of pairs ``(nbr_triangles, count)``, in order of ``nbr_triangles``.
+  The number of vertices contained in each number of triangles.
+- ``rank`` -- integer. The rank over GF(2) of the adjacency matrix.
+- ``colour_digest`` -- a bytes object. The SHA-256 digest of the
+  colour classes of the vertices, after each round of colour refinement.
+"""
+
+
+def walsh_hadamard(values):
+    r"""
+    Return the Walsh-Hadamard transform of an integer vector.
+
+    INPUT:
+
+    - ``values`` -- a sequence of integers, of length ``2**dim``.
+
+    OUTPUT: a ``numpy`` array of ``int64``. Entry ``u`` is the sum over ``x``
+    of ``values[x] * (-1)**<u, x>``. Applying the transform twice multiplies by ``2**dim``.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.graph_fingerprint import walsh_hadamard
+        sage: walsh_hadamard([1,0,0,1]).tolist()
+        [2, 0, 0, 2]
+        sage: walsh_hadamard(walsh_hadamard([3,1,4,1])).tolist()
+        [12, 4, 16, 4]
+    """
+    transform = np.array(values, dtype=np.int64)
+    v = transform.shape[0]
+    step = 1
+    while step < v:
+        pairs = transform.reshape(v // (2 * step), 2, step)
+        transform = np.concatenate(
+            (pairs[:, :1] + pairs[:, 1:], pairs[:, :1] - pairs[:, 1:]),
+            axis=1).reshape(v)
+        step *= 2
+    return transform
+
+
+def _refine_colours(colours, signatures, digest):
+    r"""
+    Return the colours given by the distinct rows of ``signatures``, and update ``digest``.
+
+    The new colours are numbered in lexicographic order of the rows,
+    so that they do not depend on the numbering of the vertices.
+
+    INPUT:
+
+    - ``colours`` -- a ``numpy`` array of integers. The current colour of each item.
+    - ``signatures`` -- a ``numpy`` array of integers, with one row per item.
+    - ``digest`` -- a ``hashlib`` hash object.
+
+    OUTPUT: a pair ``(new_colours, nbr_colours)``.
+    """
+    keys = np.column_stack((colours, signatures)).astype(np.int64)
+    rows, new_colours, counts = np.unique(
+        keys,
+        axis=0,
+        return_inverse=True,
+        return_counts=True)
+    digest.update(rows.tobytes())
+    digest.update(counts.astype(np.int64).tobytes())
+    return new_colours.reshape(-1), rows.shape[0]
+
+
+def cayley_graph_fingerprint(truth_table, wl_rounds=default_wl_rounds):
+    r"""
+    Return the fingerprint of the Cayley graph of a Boolean function.
+
+    Vertices ``x`` and ``y`` of the Cayley graph of ``f`` are adjacent if
+    ``f(x + y)`` is 1, as per ``boolean_cayley_graph``. Each pair of vertices
+    ``(x, y)`` is first coloured by whether ``x == y`` and whether the pair is adjacent.
+    Each round of refinement then colours the pair by its colour, together with
+    the multiset of colours of the pairs ``(x, z)`` and ``(z, y)``, over all ``z``.
+    Since the colour of ``(x, y)`` depends only on ``a = x + y``, this is the
+    multiset of the colours of ``b`` and ``a + b``, over all ``b``.
+
+    INPUT:
+
+    - ``truth_table`` -- a sequence of 0-1 values, of length ``2**dim``.
+      The truth table of a Boolean function ``f``.
+    - ``wl_rounds`` -- integer (default: 3). The maximum number of rounds of colour refinement.
+
+    OUTPUT: a ``CayleyGraphFingerprint``.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.boolean_function_improved import BooleanFunctionImproved
+        sage: from boolean_cayley_graphs.graph_fingerprint import cayley_graph_fingerprint
+        sage: f = BooleanFunctionImproved([0,1,1,0,1,0,0,0])
+        sage: fp = cayley_graph_fingerprint(f.truth_table(format='int'))
+        sage: g = f.cayley_graph()
+        sage: fp.degree == g.degree(0), fp.triangles == g.triangles_count() * 3 // g.order()
+        (True, True)
+        sage: fp.rank == matrix(GF(2), g).rank()
+        True
+        sage: cayley_graph_fingerprint([0,1,1,0,1,0,0,0]) == cayley_graph_fingerprint([0,1,0,0,0,1,1,0])
+        True
+        sage: cayley_graph_fingerprint([0,1,1,0,1,0,0,0]) == cayley_graph_fingerprint([0,1,1,1,0,0,0,0])
+        False
+    """
+    tt = np.array([int(value) for value in truth_table], dtype=np.int64)
+    v = tt.shape[0]
+    neighbours = tt.copy()
+    neighbours[0] = 0
+
+    # The autocorrelation of the neighbours of 0 counts the paths of length 2.
+    paths = walsh_hadamard(walsh_hadamard(neighbours) ** 2) // v
+    triangles = int(neighbours @ paths) // 2
+
+    x = np.arange(v)
+    sums = x[:, None] ^ x[None, :]
+    rank = packed_rank(pack_rows(tt[sums]))
+
+    digest = hashlib.sha256()
+    colours, nbr_colours = _refine_colours(
+        (x == 0).astype(np.int64),
+        tt[:, None],
+        digest)
+    for _ in range(wl_rounds):
+        # Row a lists the colours of the pairs (b, a + b), over all b, as a sorted multiset.
+        pair_colours = np.sort(colours[None, :] * nbr_colours + colours[sums], axis=1)
+        colours, new_nbr_colours = _refine_colours(colours, pair_colours, digest)
+        if new_nbr_colours == nbr_colours:
+            break
+        nbr_colours = new_nbr_colours
+
+    return CayleyGraphFingerprint(
+        v,
+        bool(tt[0]),
+        int(neighbours.sum()),
+        triangles,
+        rank,
+        digest.digest())
+
+
+def graph_fingerprint(adjacency, wl_rounds=default_wl_rounds):
+    r"""
+    Return the fingerprint of a graph.
+
+    Each vertex is first coloured by whether it has a loop, its degree, and the number
+    of triangles containing it. Each round of refinement then colours the vertex by
+    its colour, together with the number of its neighbours of each colour.
+
+    INPUT:
+
+    - ``adjacency`` -- a ``numpy`` array of 0-1 values, of shape ``(n, n)``.
+      The adjacency matrix of an undirected graph.
+    - ``wl_rounds`` -- integer (default: 3). The maximum number of rounds of colour refinement.
+
+    OUTPUT: a ``GraphFingerprint``.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.graph_fingerprint import graph_fingerprint
+        sage: import numpy as np
+        sage: petersen = np.array(graphs.PetersenGraph().adjacency_matrix())
+        sage: fp = graph_fingerprint(petersen)
+        sage: fp.degrees, fp.triangles, fp.rank
+        (((3, 10),), ((0, 10),), 6)
+        sage: p = np.random.permutation(10)
+        sage: graph_fingerprint(petersen[p][:, p]) == fp
+        True
+    """
+    adjacency = (np.asarray(adjacency) != 0).astype(np.int64)
+    n = adjacency.shape[0]
+    loops = np.diagonal(adjacency).copy()
+    neighbours = adjacency.copy()
+    np.fill_diagonal(neighbours, 0)
+
+    degrees = neighbours.sum(axis=1)
+    # The product of 0-1 matrices in floating point is exact for these sizes,
+    # and uses the BLAS.
+    m = neighbours.astype(np.float64)
+    triangles = np.rint(((m @ m) * m).sum(axis=1)).astype(np.int64) // 2
+    rank = packed_rank(pack_rows(adjacency))
+
+    digest = hashlib.sha256()
+    colours, nbr_colours = _refine_colours(
+        loops,
+        np.column_stack((degrees, triangles)),
+        digest)
+    for _ in range(wl_rounds):
+        colour_indicators = np.zeros((n, nbr_colours), dtype=np.float64)
+        colour_indicators[np.arange(n), colours] = 1
+        colour_counts = np.rint(m @ colour_indicators).astype(np.int64)
+        colours, new_nbr_colours = _refine_colours(colours, colour_counts, digest)
+        if new_nbr_colours == nbr_colours:
+            break
+        nbr_colours = new_nbr_colours
+
+    def histogram(values):
+        distinct, counts = np.unique(values, return_counts=True)
+        return tuple(zip(distinct.tolist(), counts.tolist()))
+
+    return GraphFingerprint(
+        n,
+        int(loops.sum()),
+        histogram(degrees),
+        histogram(triangles),
+        rank,
+        digest.digest())
+
+
+def bucket_by_fingerprint(functions):
+    r"""
+    Group Boolean functions by the fingerprints of their Cayley graphs.
+
+    Functions in different buckets have non-isomorphic Cayley graphs,
+    so that only functions in the same bucket need to be compared
+    using canonical labels.
+
+    INPUT:
+
+    - ``functions`` -- an iterable of ``BooleanFunctionImproved``.
+
+    OUTPUT: an ``OrderedDict`` mapping each ``CayleyGraphFingerprint``
+    to the list of functions that have it, in order of first occurrence.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.boolean_function_improved import BooleanFunctionImproved
+        sage: from boolean_cayley_graphs.graph_fingerprint import bucket_by_fingerprint
+        sage: functions = [BooleanFunctionImproved(tt) for tt in ([0,1,0,0], [0,1,1,0], [0,0,1,0])]
+        sage: [[f.truth_table(format='int') for f in bucket] for bucket in bucket_by_fingerprint(functions).values()]
+        [[(0, 1, 0, 0), (0, 0, 1, 0)], [(0, 1, 1, 0)]]
+    """
+    buckets = OrderedDict()
+    for f in functions:
+        buckets.setdefault(f.cayley_graph_fingerprint(), []).append(f)
+    return buckets
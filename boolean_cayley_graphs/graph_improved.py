@@ -9,6 +9,7 @@ a Graph and some of its computed properties, such as its clique polynomial.
 AUTHORS:
 
 - Paul Leopardi (2016-10-05): initial version
+- Paul Leopardi (2024-06-24): lazy clique polynomial
 
 """
 #*****************************************************************************
@@ -21,6 +22,7 @@ AUTHORS:
 #*****************************************************************************
 
 from sage.graphs.graph import Graph
+from sage.misc.lazy_attribute import lazy_attribute
 
 from boolean_cayley_graphs.saveable import Saveable
 
@@ -29,6 +31,7 @@ class GraphImproved(Graph, Saveable):
     r"""
     A Graph and some of its computed properties, such as its clique polynomial.
 
+    Each property is computed when it is first used.
     The constructor is based on the ``Graph`` constructor and takes the same arguments.
 
     EXAMPLES:
@@ -104,4 +107,24 @@ class GraphImproved(Graph, Saveable):
             40*t^2 + 16*t + 1
         """
         Graph.__init__(self, graph, **kwargs)
-        self.stored_clique_polynomial = self.clique_polynomial()
+
+
+    @lazy_attribute
+    def stored_clique_polynomial(self):
+        r"""
+        The clique polynomial of the graph.
+
+        EXAMPLES:
+
+        ::
+
+            sage: from boolean_cayley_graphs.graph_improved import GraphImproved
+            sage: PI = GraphImproved(graphs.PetersenGraph())
+            sage: "stored_clique_polynomial" in PI.__dict__
+            False
+            sage: PI.stored_clique_polynomial
+            15*t^2 + 10*t + 1
+            sage: "stored_clique_polynomial" in PI.__dict__
+            True
+        """
+        return self.clique_polynomial()
@@ -0,0 +1,401 @@
+r"""
+A persistent cache of graph invariants
+======================================
+
+The ``graph_invariant_cache`` module defines the ``GraphInvariantCache`` class,
+a persistent store of the invariants of graphs, such as the clique polynomial,
+strongly regular parameters, 2-rank and automorphism group order,
+keyed by the digest of the canonical label of each graph.
+
+The cache is an SQLite3 database, so that it can be shared between
+classifications, reports and processes. Each invariant of each graph is
+computed at most once, either on demand or in bulk, using
+``precompute_invariants``.
+
+A cache set using ``set_default_invariant_cache`` is used by the
+``StronglyRegularGraph`` objects created using ``from_canonical_label``,
+and by ``CayleyGraphClassRegistry``.
+
+AUTHORS:
+
+- Paul Leopardi (2024-06-24): initial version
+
+EXAMPLES:
+
+::
+
+    sage: from boolean_cayley_graphs.graph_invariant_cache import GraphInvariantCache
+    sage: cache = GraphInvariantCache(tmp_filename(ext='.db'))
+    sage: label = graphs.PetersenGraph().canonical_label().graph6_string()
+    sage: cache.invariant(label, "strongly_regular_parameters")
+    (10, 3, 0, 1)
+    sage: cache.get(label, "strongly_regular_parameters")
+    (10, 3, 0, 1)
+    sage: cache.get(label, "rank") is None
+    True
+"""
+#*****************************************************************************
+#       Copyright (C) 2024 Paul Leopardi paul.leopardi@gmail.com
+#
+#  Distributed under the terms of the GNU General Public License (GPL)
+#  as published by the Free Software Foundation; either version 2 of
+#  the License, or (at your option) any later version.
+#                  http://www.gnu.org/licenses/
+#*****************************************************************************
+
+import datetime
+import hashlib
+import multiprocessing
+
+from sage.graphs.graph import Graph
+from sage.misc.persist import dumps, loads
+
+from boolean_cayley_graphs.gf2_rank import batch_length, graph6_order, graph6_ranks, graph_rank
+from boolean_cayley_graphs.sqlite_cache import SQLiteCache
+
+
+encoding = "UTF-8"
+
+
+# The functions used to compute each invariant of a graph.
+invariant_functions = {
+    "clique_polynomial":
+        lambda g: g.clique_polynomial(),
+    "group_order":
+        lambda g: Graph.automorphism_group(g).order(),
+    "rank":
+        graph_rank,
+    "strongly_regular_parameters":
+        lambda g: g.is_strongly_regular(parameters=True)}
+
+
+# The cache used by default, if any.
+default_invariant_cache = None
+
+
+def set_default_invariant_cache(cache):
+    r"""
+    Set the cache used by default.
+
+    INPUT:
+
+    - ``cache`` -- a ``GraphInvariantCache``, or `None` to use no cache by default.
+
+    OUTPUT: None.
+    """
+    global default_invariant_cache
+    default_invariant_cache = cache
+
+
+def get_default_invariant_cache():
+    r"""
+    Return the cache used by default.
+
+    OUTPUT: a ``GraphInvariantCache``, or `None`.
+    """
+    return default_invariant_cache
+
+
+def canonical_label_digest(canonical_label):
+    r"""
+    Return the digest of a canonical label, used as the key of a cache.
+
+    INPUT:
+
+    - ``canonical_label`` -- string. A graph6_string encoding a Graph canonical label.
+
+    OUTPUT: a bytes object. The SHA-256 hash of ``canonical_label``,
+    as per ``canonical_label_hash`` in ``classification_database_sqlite3``.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.graph_invariant_cache import canonical_label_digest
+        sage: len(canonical_label_digest("CK"))
+        32
+    """
+    return hashlib.sha256(canonical_label.encode(encoding)).digest()
+
+
+class GraphInvariantCache(SQLiteCache):
+    r"""
+    A persistent cache of graph invariants, keyed by canonical label digest.
+
+    A database connection is opened on first use by each thread of each process,
+    as per ``SQLiteCache``, so that a cache can be shared between threads
+    and passed to worker processes.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.graph_invariant_cache import GraphInvariantCache
+        sage: db_name = tmp_filename(ext='.db')
+        sage: cache = GraphInvariantCache(db_name)
+        sage: cache.put("CK", "rank", 4)
+        sage: GraphInvariantCache(db_name).get("CK", "rank")
+        4
+        sage: len(cache)
+        1
+    """
+    def __init__(self, db_name):
+        r"""
+        Constructor.
+
+        INPUT:
+
+        - ``db_name`` -- string. The file name of the cache database.
+          It is created if it does not exist.
+        """
+        SQLiteCache.__init__(self, db_name)
+        conn = self.connection()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS graph_invariant(
+            canonical_label_hash BLOB,
+            invariant TEXT,
+            value BLOB,
+            PRIMARY KEY(canonical_label_hash, invariant))""")
+        conn.commit()
+
+
+    def __len__(self):
+        r"""
+        Return the number of invariants in the cache.
+        """
+        return self.connection().execute(
+            "SELECT COUNT(*) FROM graph_invariant").fetchone()[0]
+
+
+    def get(self, canonical_label, invariant_name, default=None):
+        r"""
+        Return a cached invariant of a graph.
+
+        INPUT:
+
+        - ``canonical_label`` -- string. A graph6_string encoding a Graph canonical label.
+        - ``invariant_name`` -- string. One of the keys of ``invariant_functions``.
+        - ``default`` -- (default: `None`). The value to return if the invariant is not cached.
+
+        OUTPUT: the value of the invariant, or ``default``.
+        """
+        row = self.connection().execute("""
+            SELECT value
+            FROM graph_invariant
+            WHERE canonical_label_hash = (?)
+            AND invariant = (?)""",
+            (canonical_label_digest(canonical_label), invariant_name)).fetchone()
+        return loads(row[0]) if row is not None else default
+
+
+    def missing(self, canonical_label, invariant_names):
+        r"""
+        Return the names of the invariants of a graph that are not cached.
+
+        INPUT:
+
+        - ``canonical_label`` -- string. A graph6_string encoding a Graph canonical label.
+        - ``invariant_names`` -- a list of strings. Keys of ``invariant_functions``.
+
+        OUTPUT: a list of strings, in the order of ``invariant_names``.
+        """
+        curs = self.connection().execute("""
+            SELECT invariant
+            FROM graph_invariant
+            WHERE canonical_label_hash = (?)""",
+            (canonical_label_digest(canonical_label),))
+        cached = set(row[0] for row in curs.fetchall())
+        return [name for name in invariant_names if name not in cached]
+
+
+    def put_many(self, canonical_label, invariant_values):
+        r"""
+        Store invariants of a graph, in one transaction.
+
+        If an invariant is already cached, its cached value is kept.
+
+        INPUT:
+
+        - ``canonical_label`` -- string. A graph6_string encoding a Graph canonical label.
+        - ``invariant_values`` -- a dictionary mapping invariant names to values.
+
+        OUTPUT: None.
+        """
+        digest = canonical_label_digest(canonical_label)
+        conn = self.connection()
+        with conn:
+            conn.executemany("""
+                INSERT OR IGNORE INTO graph_invariant
+                VALUES (?,?,?)""",
+                [
+                    (digest, invariant_name, dumps(value))
+                    for invariant_name, value in invariant_values.items()])
+
+
+    def put(self, canonical_label, invariant_name, value):
+        r"""
+        Store an invariant of a graph.
+
+        If the invariant is already cached, its cached value is kept.
+
+        INPUT:
+
+        - ``canonical_label`` -- string. A graph6_string encoding a Graph canonical label.
+        - ``invariant_name`` -- string. One of the keys of ``invariant_functions``.
+        - ``value`` -- the value of the invariant.
+
+        OUTPUT: None.
+        """
+        self.put_many(canonical_label, {invariant_name: value})
+
+
+    def invariant(self, canonical_label, invariant_name, graph=None):
+        r"""
+        Return an invariant of a graph, computing and caching it if it is not cached.
+
+        INPUT:
+
+        - ``canonical_label`` -- string. A graph6_string encoding a Graph canonical label.
+        - ``invariant_name`` -- string. One of the keys of ``invariant_functions``.
+        - ``graph`` -- a Graph (default: `None`). The graph, used to compute the invariant.
+          Default is None, meaning the graph encoded by ``canonical_label``.
+
+        OUTPUT: the value of the invariant.
+        """
+        value = self.get(canonical_label, invariant_name)
+        if value is None:
+            if graph is None:
+                graph = Graph(canonical_label)
+            value = invariant_functions[invariant_name](graph)
+            self.put(canonical_label, invariant_name, value)
+        return value
+
+
+def compute_invariants(canonical_label, invariant_names):
+    r"""
+    Compute invariants of a graph.
+
+    This function is called by the worker processes of ``precompute_invariants``.
+
+    INPUT:
+
+    - ``canonical_label`` -- string. A graph6_string encoding a Graph canonical label.
+    - ``invariant_names`` -- a list of strings. Keys of ``invariant_functions``.
+
+    OUTPUT: a tuple containing ``canonical_label`` and a dictionary
+    mapping each invariant name to its value.
+    """
+    g = Graph(canonical_label)
+    return canonical_label, {
+        invariant_name: invariant_functions[invariant_name](g)
+        for invariant_name in invariant_names}
+
+
+def _compute_task(task):
+    r"""
+    Call a task of ``precompute_invariants``, a pair ``(function, args)``,
+    and return a list of results of ``compute_invariants``.
+    """
+    function, args = task
+    result = function(*args)
+    return result if function is compute_ranks else [result]
+
+
+def compute_ranks(canonical_labels):
+    r"""
+    Compute the ranks of a batch of graphs, as per ``graph6_ranks``.
+
+    This function is called by the worker processes of ``precompute_invariants``.
+
+    INPUT:
+
+    - ``canonical_labels`` -- a list of strings. Graph6 strings encoding Graph canonical labels.
+
+    OUTPUT: a list of tuples, each containing a canonical label and a dictionary
+    mapping ``"rank"`` to its rank.
+    """
+    return [
+        (canonical_label, {"rank": rank})
+        for canonical_label, rank in zip(canonical_labels, graph6_ranks(canonical_labels))]
+
+
+def precompute_invariants(
+    cache,
+    canonical_labels,
+    invariant_names=None,
+    ncpus=4,
+    verbose=False):
+    r"""
+    Compute and cache the invariants of a number of graphs that are not yet cached.
+
+    A pool of worker processes computes the invariants, while the parent
+    process stores them in the cache. Ranks are computed in batches,
+    as per ``graph6_ranks``, rather than one graph at a time.
+
+    INPUT:
+
+    - ``cache`` -- a ``GraphInvariantCache``.
+    - ``canonical_labels`` -- an iterable of strings. Graph6 strings encoding Graph canonical labels.
+    - ``invariant_names`` -- a list of strings (default: `None`). The invariants to compute.
+      Default is None, meaning all keys of ``invariant_functions``.
+    - ``ncpus`` -- integer (default: 4). The number of worker processes.
+      If 1, no worker processes are used.
+    - ``verbose`` -- boolean (default: ``False``). If ``True``, print the progress.
+
+    OUTPUT: the number of graphs whose invariants were computed.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.graph_invariant_cache import *
+        sage: cache = GraphInvariantCache(tmp_filename(ext='.db'))
+        sage: labels = [g.canonical_label().graph6_string() for g in (graphs.PetersenGraph(), graphs.ClebschGraph())]
+        sage: precompute_invariants(cache, labels, ["clique_polynomial", "rank"], ncpus=2)
+        2
+        sage: cache.get(labels[1], "clique_polynomial")
+        40*t^2 + 16*t + 1
+        sage: precompute_invariants(cache, labels, ["clique_polynomial", "rank"], ncpus=2)
+        0
+    """
+    if invariant_names is None:
+        invariant_names = sorted(invariant_functions)
+    # Ranks are computed as batches of graphs with the same number of vertices,
+    # and the other invariants are computed one graph at a time.
+    tasks = []
+    rank_labels = dict()
+    for canonical_label in sorted(set(canonical_labels)):
+        missing_names = cache.missing(canonical_label, invariant_names)
+        if "rank" in missing_names:
+            missing_names.remove("rank")
+            rank_labels.setdefault(graph6_order(canonical_label), []).append(canonical_label)
+        if missing_names:
+            tasks.append((compute_invariants, (canonical_label, missing_names)))
+    for v, labels in sorted(rank_labels.items()):
+        length = batch_length(v)
+        for start in range(0, len(labels), length):
+            tasks.append((compute_ranks, (labels[start:start + length],)))
+
+    pool = (
+        multiprocessing.get_context("fork").Pool(ncpus)
+        if ncpus > 1 and len(tasks) > 1 else
+        None)
+    computed_labels = set()
+    try:
+        results = (
+            pool.imap_unordered(_compute_task, tasks)
+            if pool is not None else
+            map(_compute_task, tasks))
+        for result in results:
+            for canonical_label, invariant_values in result:
+                cache.put_many(canonical_label, invariant_values)
+                computed_labels.add(canonical_label)
+            if verbose:
+                print(
+                    datetime.datetime.now(),
+                    "computed", len(computed_labels), "graphs")
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+    return len(computed_labels)
@@ -9,6 +9,7 @@ such as partity and bitwise inner product.
 AUTHORS:
 
 - Paul Leopardi (2016-08-21): initial version
+- Paul Leopardi (2024-04-01): parity using a lookup table
 
 """
 #*****************************************************************************
@@ -51,6 +52,46 @@ EXAMPLES:
 """
 
 
+def _byte_parity(n):
+    r"""
+    Return the bit parity of a non-negative integer, one bit at a time.
+
+    This function is used to construct ``parity_table``.
+
+    TESTS:
+
+    ::
+
+        sage: from boolean_cayley_graphs.integer_bits import _byte_parity
+        sage: [_byte_parity(n) for n in range(8)]
+        [0, 1, 1, 0, 1, 0, 0, 1]
+    """
+    result = False
+    while n != 0:
+        n &= n - 1
+        result = not result
+    return 1 if result else 0
+
+
+parity_table = bytes(_byte_parity(n) for n in range(256))
+r"""
+The bit parities of the integers from 0 to 255.
+
+The table is constructed when the module is imported, so that processes
+forked from a process that has imported the module share the table.
+
+EXAMPLES:
+
+::
+
+    sage: from boolean_cayley_graphs.integer_bits import parity_table
+    sage: len(parity_table)
+    256
+    sage: parity_table[7], parity_table[255]
+    (1, 0)
+"""
+
+
 def parity(n):
     r"""
     Return the bit parity of a non-negative integer.
@@ -77,12 +118,14 @@ def parity(n):
         1
         sage: parity(3)
         0
+        sage: parity(2**100 + 2**50 + 1)
+        1
     """
-    result = False
+    result = 0
     while n != 0:
-        n &= n - 1
-        result = not result
-    return 1 if result else 0
+        result ^= parity_table[n & 0xff]
+        n >>= 8
+    return result
 
 
 def inner(a, b):
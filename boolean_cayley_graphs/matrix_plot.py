@@ -5,9 +5,13 @@ Convenience functions for plotting matrices
 The ``matrix_plot`` module defines some convenience functions that make
 matrix plots of integer matrices more useful.
 
+Large matrices can be downsampled to a target number of pixels before plotting,
+using ``block_downsample`` from the ``matrix_tiles`` module.
+
 AUTHORS:
 
 - Paul Leopardi (2023-11-20): initial version
+- Paul Leopardi (2024-08-12): plots downsampled to a target size
 
 """
 #*****************************************************************************
@@ -21,11 +25,66 @@ AUTHORS:
 
 from sage.plot.matrix_plot import matrix_plot
 
-def matrix_plot_with_colorbar(mat, xrange=None, yrange=None, **options):
+from boolean_cayley_graphs.matrix_tiles import block_downsample, matrix_array
+
+
+def downsampled_matrix_plot(
+    mat,
+    target_size=None,
+    method="mode",
+    xrange=None,
+    yrange=None,
+    **options):
+    r"""
+    Plot a matrix, downsampled to at most ``target_size`` by ``target_size`` pixels.
+
+    The axes of the plot show the rows and columns of the whole matrix.
+
+    INPUT:
+
+    - ``mat`` -- a matrix or ``numpy`` array.
+    - ``target_size`` -- positive integer (default: `None`).
+      Default is None, meaning that the matrix is not downsampled.
+    - ``method`` -- string (default: "mode"). One of ``downsample_methods``
+      in the ``matrix_tiles`` module.
+    - ``xrange``, ``yrange``, ``options`` -- as per ``matrix_plot``.
+
+    OUTPUT: a Graphics object.
+
+    EXAMPLE:
+
+    ::
+        sage: from boolean_cayley_graphs.matrix_plot import downsampled_matrix_plot
+        sage: import numpy as np
+        sage: downsampled_matrix_plot(np.eye(1024, dtype=int), target_size=128, method="max")
+        Graphics object consisting of 1 graphics primitive
+    """
+    arr = matrix_array(mat)
+    if target_size is not None:
+        nrows, ncols = arr.shape
+        arr = block_downsample(arr, target_size, method=method)
+        if xrange is None:
+            xrange = (0, ncols)
+        if yrange is None:
+            yrange = (0, nrows)
+    return matrix_plot(arr, xrange=xrange, yrange=yrange, **options)
+
+
+def matrix_plot_with_colorbar(
+    mat,
+    xrange=None,
+    yrange=None,
+    target_size=None,
+    method="mode",
+    **options):
     r"""
     Plot a matrix with a colorbar that sensibly depends on the matrix
     minimum and maximum values.
 
+    If ``target_size`` is given, the matrix is downsampled, as per
+    ``downsampled_matrix_plot``, and the colorbar depends on the
+    minimum and maximum values of the whole matrix.
+
     EXAMPLE:
 
     ::
@@ -33,26 +92,32 @@ def matrix_plot_with_colorbar(mat, xrange=None, yrange=None, **options):
         sage: mat = Matrix([[1, 2], [3, 4]])
         sage: matrix_plot_with_colorbar(mat, cmap='bone')
         Graphics object consisting of 1 graphics primitive
+        sage: matrix_plot_with_colorbar(mat, target_size=1, cmap='bone')
+        Graphics object consisting of 1 graphics primitive
     """
-    try:
-        matmin = int(mat.min())
-        matmax = int(mat.max())
-    except AttributeError:
-        matmin = int(mat.numpy().min())
-        matmax = int(mat.numpy().max())
+    arr = matrix_array(mat)
+    matmin = int(arr.min())
+    matmax = int(arr.max())
+    if target_size is not None:
+        options.setdefault('vmin', matmin)
+        options.setdefault('vmax', matmax)
 
     ncolors = matmax + 1
     if matmax-matmin < 10:
-        return matrix_plot(
-            mat,
+        return downsampled_matrix_plot(
+            arr,
+            target_size=target_size,
+            method=method,
             xrange=xrange,
             yrange=yrange,
             colorbar=True,
             colorbar_options={'ticks': range(ncolors)},
             **options)
     else:
-        return matrix_plot(
-            mat,
+        return downsampled_matrix_plot(
+            arr,
+            target_size=target_size,
+            method=method,
             xrange=xrange,
             yrange=yrange,
             colorbar=True,
@@ -0,0 +1,418 @@
+r"""
+Downsampled and tiled matrices for plotting
+===========================================
+
+The ``matrix_tiles`` module defines functions that downsample integer
+matrices, such as the matrices of a classification, to a target number of
+pixels, and the ``MatrixTilePyramid`` class, a pyramid of downsampled tiles
+of a matrix, so that a plot of a large matrix can show detail on zoom
+without using all of the entries of the matrix.
+
+Each pixel of a downsampled matrix aggregates a square block of entries.
+For matrices of class indices, such as ``bent_cayley_graph_index_matrix``,
+the aggregate used by default is the most frequent entry of each block, since
+the mean of class indices is not a class index.
+
+AUTHORS:
+
+- Paul Leopardi (2024-08-12): initial version
+
+EXAMPLES:
+
+::
+
+    sage: from boolean_cayley_graphs.matrix_tiles import block_downsample
+    sage: mat = matrix([[0,0,1,1],[0,2,1,1],[3,3,4,5],[3,3,4,4]])
+    sage: block_downsample(mat, 2).tolist()
+    [[0, 1], [3, 4]]
+    sage: block_downsample(mat, 2, method="max").tolist()
+    [[2, 1], [3, 5]]
+"""
+#*****************************************************************************
+#       Copyright (C) 2024 Paul Leopardi paul.leopardi@gmail.com
+#
+#  Distributed under the terms of the GNU General Public License (GPL)
+#  as published by the Free Software Foundation; either version 2 of
+#  the License, or (at your option) any later version.
+#                  http://www.gnu.org/licenses/
+#*****************************************************************************
+
+from builtins import object
+from collections import namedtuple
+
+import numpy as np
+
+
+# The methods used to aggregate each block of a matrix.
+downsample_methods = ("mode", "max", "min", "mean", "first")
+
+
+def matrix_array(mat):
+    r"""
+    Return a matrix as a two dimensional ``numpy`` array.
+
+    INPUT:
+
+    - ``mat`` -- a matrix or ``numpy`` array.
+
+    OUTPUT: a ``numpy`` array. The entries of a Sage integer matrix are ``int64``.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.matrix_tiles import matrix_array
+        sage: matrix_array(matrix([[1, 2], [3, 4]])).dtype
+        dtype('int64')
+    """
+    arr = np.array(mat)
+    if arr.dtype == object:
+        arr = arr.astype(np.int64)
+    return arr
+
+
+def _block_mode(blocks):
+    r"""
+    Return the most frequent entry of each block, the least if there is a tie.
+
+    INPUT:
+
+    - ``blocks`` -- a ``numpy`` array, whose last axis contains the entries of each block.
+
+    OUTPUT: a ``numpy`` array, with the shape of ``blocks`` without its last axis.
+    """
+    entries = np.sort(blocks, axis=-1)
+    positions = np.arange(entries.shape[-1])
+    starts = np.ones(entries.shape, dtype=bool)
+    starts[..., 1:] = entries[..., 1:] != entries[..., :-1]
+    # The length of the run of equal sorted entries ending at each position.
+    run_starts = np.maximum.accumulate(np.where(starts, positions, 0), axis=-1)
+    run_lengths = positions - run_starts + 1
+    # The first longest run has the least entry.
+    ends = np.argmax(run_lengths, axis=-1)
+    return np.take_along_axis(entries, ends[..., None], axis=-1)[..., 0]
+
+
+def downsample_by_factors(mat, row_factor, col_factor, method="mode"):
+    r"""
+    Aggregate each block of ``row_factor`` by ``col_factor`` entries of a matrix.
+
+    The blocks start at entry ``[0, 0]``. If the number of rows or columns is not
+    a multiple of the factor, the last blocks are padded by repeating the last
+    row or column.
+
+    INPUT:
+
+    - ``mat`` -- a matrix or ``numpy`` array.
+    - ``row_factor`` -- positive integer. The number of rows of each block.
+    - ``col_factor`` -- positive integer. The number of columns of each block.
+    - ``method`` -- string (default: "mode"). One of ``downsample_methods``:
+      the most frequent, maximum, minimum, or mean entry of each block,
+      or the first entry of each block.
+
+    OUTPUT: a ``numpy`` array, of shape
+    ``(ceil(nrows / row_factor), ceil(ncols / col_factor))``.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.matrix_tiles import downsample_by_factors
+        sage: import numpy as np
+        sage: mat = np.arange(12).reshape(3, 4)
+        sage: downsample_by_factors(mat, 2, 2, method="mean").tolist()
+        [[2.5, 4.5], [8.5, 10.5]]
+        sage: downsample_by_factors(mat, 1, 4, method="first").tolist()
+        [[0], [4], [8]]
+    """
+    if method not in downsample_methods:
+        raise ValueError("Unknown downsample method: {}".format(method))
+    arr = matrix_array(mat)
+    if method == "first" or (row_factor == 1 and col_factor == 1):
+        return arr[::row_factor, ::col_factor]
+
+    nrows, ncols = arr.shape
+    nbr_block_rows = -(-nrows // row_factor)
+    nbr_block_cols = -(-ncols // col_factor)
+    arr = np.pad(
+        arr,
+        ((0, nbr_block_rows * row_factor - nrows),
+         (0, nbr_block_cols * col_factor - ncols)),
+        mode="edge")
+    blocks = arr.reshape(
+        nbr_block_rows, row_factor,
+        nbr_block_cols, col_factor).transpose(0, 2, 1, 3).reshape(
+        nbr_block_rows, nbr_block_cols, row_factor * col_factor)
+    if method == "mode":
+        return _block_mode(blocks)
+    if method == "max":
+        return blocks.max(axis=-1)
+    if method == "min":
+        return blocks.min(axis=-1)
+    return blocks.mean(axis=-1)
+
+
+def downsample_factor(size, target_size):
+    r"""
+    Return the least block size that reduces ``size`` entries to at most ``target_size`` pixels.
+
+    INPUT:
+
+    - ``size`` -- positive integer. The number of rows or columns of a matrix.
+    - ``target_size`` -- positive integer. The maximum number of pixels.
+
+    OUTPUT: a positive integer.
+    """
+    return max(1, -(-size // target_size))
+
+
+def block_downsample(mat, target_size, method="mode"):
+    r"""
+    Downsample a matrix to at most ``target_size`` by ``target_size`` pixels.
+
+    INPUT:
+
+    - ``mat`` -- a matrix or ``numpy`` array.
+    - ``target_size`` -- positive integer. The maximum number of pixels in each direction.
+    - ``method`` -- string (default: "mode"). One of ``downsample_methods``.
+
+    OUTPUT: a ``numpy`` array, as per ``downsample_by_factors``.
+    If ``mat`` already fits, its entries are returned unchanged.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.matrix_tiles import block_downsample
+        sage: import numpy as np
+        sage: block_downsample(np.eye(1024, dtype=int), 256, method="max").shape
+        (256, 256)
+        sage: block_downsample(np.eye(4, dtype=int), 256).shape
+        (4, 4)
+    """
+    arr = matrix_array(mat)
+    nrows, ncols = arr.shape
+    return downsample_by_factors(
+        arr,
+        downsample_factor(nrows, target_size),
+        downsample_factor(ncols, target_size),
+        method=method)
+
+
+MatrixRegion = namedtuple(
+    "MatrixRegion",
+    ["array", "row_start", "col_start", "factor"])
+MatrixRegion.__doc__ = r"""
+A downsampled region of a matrix.
+
+- ``array`` -- a ``numpy`` array. Entry ``[i, j]`` aggregates the block of
+  ``factor`` by ``factor`` entries of the matrix starting at row
+  ``row_start + i * factor`` and column ``col_start + j * factor``.
+- ``row_start`` -- integer. The first row of the region.
+- ``col_start`` -- integer. The first column of the region.
+- ``factor`` -- integer. The number of rows and columns of each block.
+"""
+
+
+def clamp_range(start, stop, size):
+    r"""
+    Clamp a range of indices to a non-empty range within ``range(size)``.
+
+    INPUT:
+
+    - ``start``, ``stop`` -- integers. The range of indices.
+    - ``size`` -- positive integer. The number of indices.
+
+    OUTPUT: a pair of integers ``(start, stop)`` with ``0 <= start < stop <= size``.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.matrix_tiles import clamp_range
+        sage: clamp_range(-3, 5, 8), clamp_range(-100, -50, 8), clamp_range(20, 30, 8), clamp_range(4, 4, 8)
+        ((0, 5), (0, 1), (7, 8), (4, 5))
+    """
+    start = min(max(0, start), size - 1)
+    stop = min(max(stop, start + 1), size)
+    return start, stop
+
+
+class MatrixTilePyramid(object):
+    r"""
+    A pyramid of downsampled tiles of a matrix.
+
+    Level 0 is one tile containing the whole matrix, downsampled to at most
+    ``tile_size`` by ``tile_size`` pixels. Each level doubles the number of tiles
+    in each direction, and halves the downsampling factor, until the last level,
+    whose tiles contain the entries of the matrix. Each tile is computed when it is
+    first used, and is then kept.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.matrix_tiles import MatrixTilePyramid
+        sage: import numpy as np
+        sage: pyramid = MatrixTilePyramid(np.arange(64).reshape(8, 8), tile_size=2, method="min")
+        sage: pyramid.nbr_levels
+        3
+        sage: pyramid.tile(0, 0, 0).tolist()
+        [[0, 4], [32, 36]]
+        sage: pyramid.tile(2, 3, 1).tolist()
+        [[50, 51], [58, 59]]
+        sage: region = pyramid.region(0, 5, 1, 8)
+        sage: region.factor, region.row_start, region.col_start
+        (2, 0, 0)
+        sage: region.array.tolist()
+        [[0, 2, 4, 6], [16, 18, 20, 22], [32, 34, 36, 38], [48, 50, 52, 54]]
+        sage: pyramid.zmin, pyramid.zmax
+        (0, 63)
+
+    A region outside the matrix is moved to its nearest edge:
+
+    ::
+
+        sage: region = pyramid.region(-100, -50, 20, 30)
+        sage: region.factor, region.row_start, region.col_start
+        (1, 0, 6)
+        sage: region.array.tolist()
+        [[6, 7], [14, 15]]
+    """
+    def __init__(self, mat, tile_size=256, method="mode"):
+        r"""
+        Constructor.
+
+        INPUT:
+
+        - ``mat`` -- a matrix or ``numpy`` array.
+        - ``tile_size`` -- positive integer (default: 256).
+          The maximum number of pixels in each direction of each tile.
+        - ``method`` -- string (default: "mode"). One of ``downsample_methods``.
+        """
+        self.array = matrix_array(mat)
+        self.tile_size = tile_size
+        self.method = method
+        nbr_levels = 1
+        while tile_size * 2 ** (nbr_levels - 1) < max(self.array.shape):
+            nbr_levels += 1
+        self.nbr_levels = nbr_levels
+        self.tiles = dict()
+        # The range of entries, used to scale the colours of every region.
+        self.zmin = int(self.array.min())
+        self.zmax = int(self.array.max())
+
+
+    def factor(self, level):
+        r"""
+        Return the downsampling factor of the tiles of a level.
+
+        INPUT:
+
+        - ``level`` -- integer, from 0 to ``self.nbr_levels - 1``.
+
+        OUTPUT: a positive integer.
+        """
+        return 2 ** (self.nbr_levels - 1 - level)
+
+
+    def tile_counts(self, level):
+        r"""
+        Return the number of rows and columns of tiles of a level.
+
+        INPUT:
+
+        - ``level`` -- integer, from 0 to ``self.nbr_levels - 1``.
+
+        OUTPUT: a pair of positive integers.
+        """
+        span = self.tile_size * self.factor(level)
+        nrows, ncols = self.array.shape
+        return (-(-nrows // span), -(-ncols // span))
+
+
+    def tile(self, level, tile_row, tile_col):
+        r"""
+        Return a tile.
+
+        INPUT:
+
+        - ``level`` -- integer, from 0 to ``self.nbr_levels - 1``.
+        - ``tile_row`` -- integer. The row of the tile within the level.
+        - ``tile_col`` -- integer. The column of the tile within the level.
+
+        OUTPUT: a ``numpy`` array of at most ``self.tile_size`` by ``self.tile_size`` pixels,
+        fewer at the last row or column of tiles.
+        """
+        key = (level, tile_row, tile_col)
+        if key not in self.tiles:
+            factor = self.factor(level)
+            span = self.tile_size * factor
+            self.tiles[key] = downsample_by_factors(
+                self.array[
+                    tile_row * span:(tile_row + 1) * span,
+                    tile_col * span:(tile_col + 1) * span],
+                factor,
+                factor,
+                method=self.method)
+        return self.tiles[key]
+
+
+    def precompute(self, levels=None):
+        r"""
+        Compute all of the tiles of some levels.
+
+        INPUT:
+
+        - ``levels`` -- an iterable of integers (default: `None`).
+          Default is None, meaning all levels.
+
+        OUTPUT: the number of tiles computed.
+        """
+        if levels is None:
+            levels = range(self.nbr_levels)
+        nbr_tiles = len(self.tiles)
+        for level in levels:
+            nbr_tile_rows, nbr_tile_cols = self.tile_counts(level)
+            for tile_row in range(nbr_tile_rows):
+                for tile_col in range(nbr_tile_cols):
+                    self.tile(level, tile_row, tile_col)
+        return len(self.tiles) - nbr_tiles
+
+
+    def region(self, row_start, row_stop, col_start, col_stop):
+        r"""
+        Return the tiles covering a region of the matrix, joined together.
+
+        The level used is the one with the largest factor that shows
+        at least ``self.tile_size`` pixels across the region, or the last level,
+        so that at most 3 by 3 tiles are joined.
+
+        INPUT:
+
+        - ``row_start``, ``row_stop`` -- integers. The range of rows of the region.
+        - ``col_start``, ``col_stop`` -- integers. The range of columns of the region.
+
+        OUTPUT: a ``MatrixRegion``, containing the region, or the nearest region
+        of at least one row and column within the matrix.
+        """
+        nrows, ncols = self.array.shape
+        row_start, row_stop = clamp_range(row_start, row_stop, nrows)
+        col_start, col_stop = clamp_range(col_start, col_stop, ncols)
+        extent = max(row_stop - row_start, col_stop - col_start)
+
+        level = self.nbr_levels - 1
+        while level > 0 and extent >= self.tile_size * self.factor(level - 1):
+            level -= 1
+        span = self.tile_size * self.factor(level)
+
+        tile_rows = range(row_start // span, -(-row_stop // span))
+        tile_cols = range(col_start // span, -(-col_stop // span))
+        array = np.block([
+            [self.tile(level, tile_row, tile_col) for tile_col in tile_cols]
+            for tile_row in tile_rows])
+        return MatrixRegion(
+            array,
+            tile_rows[0] * span,
+            tile_cols[0] * span,
+            self.factor(level))
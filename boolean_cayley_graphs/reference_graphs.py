@@ -0,0 +1,337 @@
+r"""
+Tables of known strongly regular graphs
+=======================================
+
+The ``reference_graphs`` module defines the ``ReferenceGraphTable`` class,
+a dictionary from the digest of the canonical label of each of a number of
+known strongly regular graphs to a description of the graph,
+so that the classes of any classification can be matched against the known graphs
+by lookup, rather than by constructing and comparing the known graphs.
+
+The known graphs are organized into families, listed in ``reference_graph_families``:
+the graphs of the binary projective two-weight codes of Tonchev [Ton1996]_, [Ton2007]_,
+and the Royle X graph [Roy2008]_ and its complement. Further families can be added
+to ``reference_graph_families``.
+
+Since constructing and canonically labelling the known graphs is slow,
+a table can be saved using ``save_mangled``, and ``reference_graph_table``
+keeps one table per canonical labelling algorithm for each process.
+
+AUTHORS:
+
+- Paul Leopardi (2024-08-05): initial version
+
+EXAMPLES:
+
+::
+
+    sage: from boolean_cayley_graphs.reference_graphs import ReferenceGraphTable
+    sage: from boolean_cayley_graphs.royle_x_graph import royle_x_graph
+    sage: table = ReferenceGraphTable(families=["royle_x"])
+    sage: label = royle_x_graph().complement().canonical_label().graph6_string()
+    sage: table.matches(label)
+    [ReferenceGraph(family='Royle X', entry=1, code_parameters=None, complement=True)]
+"""
+#*****************************************************************************
+#       Copyright (C) 2024 Paul Leopardi paul.leopardi@gmail.com
+#
+#  Distributed under the terms of the GNU General Public License (GPL)
+#  as published by the Free Software Foundation; either version 2 of
+#  the License, or (at your option) any later version.
+#                  http://www.gnu.org/licenses/
+#*****************************************************************************
+
+from collections import OrderedDict, namedtuple
+
+import os.path
+
+from sage.graphs.strongly_regular_db import strongly_regular_from_two_weight_code
+from sage.structure.sage_object import SageObject
+
+from boolean_cayley_graphs.binary_projective_two_weight_codes import binary_projective_two_weight_27_6_12
+from boolean_cayley_graphs.binary_projective_two_weight_codes import binary_projective_two_weight_35_6_16
+from boolean_cayley_graphs.boolean_linear_code import linear_code_from_code_gens
+from boolean_cayley_graphs.graph_invariant_cache import canonical_label_digest
+from boolean_cayley_graphs.royle_x_graph import royle_x_graph
+from boolean_cayley_graphs.saveable import Saveable
+
+
+ReferenceGraph = namedtuple(
+    "ReferenceGraph",
+    ["family", "entry", "code_parameters", "complement"])
+ReferenceGraph.__doc__ = r"""
+A description of a known strongly regular graph.
+
+- ``family`` -- string. The name of the table or family containing the graph.
+- ``entry`` -- integer. The number of the entry within the family, starting at 1.
+- ``code_parameters`` -- a tuple ``(n, k, d)`` of integers, the parameters of the
+  linear code from which the graph is constructed, or `None`.
+- ``complement`` -- boolean. Whether the graph is the complement of the graph of the entry.
+"""
+
+
+def _two_weight_code_graphs(two_weight_codes, family, complement):
+    r"""
+    Return the graphs of a list of binary projective two-weight codes,
+    with their descriptions.
+    """
+    result = []
+    for k, tw in enumerate(two_weight_codes):
+        lc = linear_code_from_code_gens(tw)
+        g = strongly_regular_from_two_weight_code(lc)
+        if complement:
+            g = g.complement()
+        code_parameters = (
+            int(lc.length()),
+            int(lc.dimension()),
+            int(lc.minimum_distance()))
+        result.append((g, ReferenceGraph(family, k + 1, code_parameters, complement)))
+    return result
+
+
+def tonchev_27_6_12_graphs():
+    r"""
+    Return the graphs of the binary projective two-weight [27,6,12] codes
+    of Table 1.155 of Tonchev [Ton2007]_.
+
+    OUTPUT: a list of pairs ``(graph, reference_graph)``.
+    """
+    return _two_weight_code_graphs(
+        binary_projective_two_weight_27_6_12(),
+        "Table 1.155",
+        complement=False)
+
+
+def tonchev_35_6_16_graphs():
+    r"""
+    Return the complements of the graphs of the binary projective two-weight
+    [35,6,16] codes of Table 1.156 of Tonchev [Ton2007]_.
+
+    OUTPUT: a list of pairs ``(graph, reference_graph)``.
+    """
+    return _two_weight_code_graphs(
+        binary_projective_two_weight_35_6_16(),
+        "Table 1.156",
+        complement=True)
+
+
+def royle_x_graphs():
+    r"""
+    Return the Royle X graph [Roy2008]_ and its complement.
+
+    OUTPUT: a list of pairs ``(graph, reference_graph)``.
+    """
+    g = royle_x_graph()
+    return [
+        (g, ReferenceGraph("Royle X", 1, None, False)),
+        (g.complement(), ReferenceGraph("Royle X", 1, None, True))]
+
+
+# The functions that construct each family of known graphs, in order.
+reference_graph_families = OrderedDict([
+    ("tonchev_27_6_12", tonchev_27_6_12_graphs),
+    ("tonchev_35_6_16", tonchev_35_6_16_graphs),
+    ("royle_x", royle_x_graphs)])
+
+
+class ReferenceGraphTable(SageObject, Saveable):
+    r"""
+    A dictionary from canonical label digests to descriptions of known graphs.
+
+    EXAMPLES:
+
+    ::
+
+        sage: import os
+        sage: from boolean_cayley_graphs.reference_graphs import ReferenceGraphTable
+        sage: table = ReferenceGraphTable(families=["tonchev_27_6_12"])
+        sage: len(table)
+        5
+        sage: d = tmp_dir()
+        sage: table.save_mangled("tonchev", dir=d)
+        sage: ReferenceGraphTable.load_mangled("tonchev", dir=d) == table
+        True
+        sage: ReferenceGraphTable.remove_mangled("tonchev", dir=d)
+        sage: os.rmdir(d)
+    """
+    def __init__(self, *args, **kwargs):
+        r"""
+        Constructor from an object, or from a canonical labelling algorithm and a list of families.
+
+        INPUT:
+
+        - ``sobj`` -- ReferenceGraphTable: object to copy.
+
+        - ``algorithm`` -- string (default: "sage").
+          Algorithm used for canonical labelling, as per ``Graph.canonical_label``.
+          This must be the algorithm used to label the graphs to be matched.
+        - ``families`` -- list of strings (default: `None`). Keys of
+          ``reference_graph_families``. Default is None, meaning all families.
+        """
+        if args and isinstance(args[0], ReferenceGraphTable):
+            sobj = args[0]
+            self.algorithm = sobj.algorithm
+            self.families = list(sobj.families)
+            self.reference_graphs = dict(sobj.reference_graphs)
+            return
+
+        self.algorithm = kwargs.pop("algorithm", "sage")
+        families = kwargs.pop("families", None)
+        self.families = (
+            list(reference_graph_families)
+            if families is None else
+            list(families))
+        self.reference_graphs = dict()
+        for family in self.families:
+            for g, reference_graph in reference_graph_families[family]():
+                self.add(
+                    g.canonical_label(algorithm=self.algorithm).graph6_string(),
+                    reference_graph)
+
+
+    def _repr_(self):
+        r"""
+        Sage string representation.
+        """
+        return "ReferenceGraphTable(algorithm={!r}, families={!r})".format(
+            self.algorithm,
+            self.families)
+
+
+    def __eq__(self, other):
+        r"""
+        Test for equality between tables.
+        """
+        if not isinstance(other, ReferenceGraphTable):
+            return False
+        return (
+            self.algorithm == other.algorithm and
+            self.families == other.families and
+            self.reference_graphs == other.reference_graphs)
+
+
+    def __len__(self):
+        r"""
+        Return the number of known graphs in the table.
+        """
+        return sum(len(references) for references in self.reference_graphs.values())
+
+
+    def add(self, canonical_label, reference_graph):
+        r"""
+        Add a known graph to the table.
+
+        INPUT:
+
+        - ``canonical_label`` -- string. The canonical label of the graph,
+          as a graph6_string, computed using ``self.algorithm``.
+        - ``reference_graph`` -- a ``ReferenceGraph``. The description of the graph.
+
+        OUTPUT: None.
+        """
+        self.reference_graphs.setdefault(
+            canonical_label_digest(canonical_label),
+            []).append(reference_graph)
+
+
+    def matches(self, canonical_label):
+        r"""
+        Return the descriptions of the known graphs with a given canonical label.
+
+        INPUT:
+
+        - ``canonical_label`` -- string. A canonical label, as a graph6_string,
+          computed using ``self.algorithm``.
+
+        OUTPUT: a list of ``ReferenceGraph``, in the order of ``self.families``.
+        """
+        return list(self.reference_graphs.get(
+            canonical_label_digest(canonical_label),
+            []))
+
+
+    def classification_matches(self, classification, families=None):
+        r"""
+        Match the extended Cayley classes of a classification against the known graphs.
+
+        INPUT:
+
+        - ``classification`` -- a ``BentFunctionCayleyGraphClassification``.
+        - ``families`` -- list of strings (default: `None`). The names of the
+          families of ``ReferenceGraph`` to include. Default is None, meaning all families.
+
+        OUTPUT: a list of pairs ``(n, reference_graph)``, where ``n`` is the index
+        of a class and ``reference_graph`` is a ``ReferenceGraph``,
+        in order of class index, then in the order of ``self.families``.
+
+        EXAMPLES:
+
+        ::
+
+            sage: from boolean_cayley_graphs.bent_function import BentFunction
+            sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification as BentFunctionCGC
+            sage: from boolean_cayley_graphs.reference_graphs import ReferenceGraphTable
+            sage: c = BentFunctionCGC.from_function(BentFunction([0,0,0,1]))
+            sage: ReferenceGraphTable(families=["royle_x"]).classification_matches(c)
+            []
+        """
+        return [
+            (n, reference_graph)
+            for n, canonical_label in enumerate(classification.cayley_graph_class_list)
+            for reference_graph in self.matches(canonical_label)
+            if families is None or reference_graph.family in families]
+
+
+# The tables used by reference_graph_table, keyed by canonical labelling algorithm.
+reference_graph_tables = dict()
+
+
+def reference_graph_table(algorithm="sage", dir=None):
+    r"""
+    Return the table of all known graphs for a canonical labelling algorithm.
+
+    The table is constructed at most once per process. If ``dir`` is given,
+    the table is loaded from ``dir`` if it was saved there, and otherwise
+    it is constructed and saved there.
+
+    INPUT:
+
+    - ``algorithm`` -- string (default: "sage").
+      Algorithm used for canonical labelling.
+    - ``dir`` -- string (default: `None`). The directory of the saved table.
+      Default is None, meaning that the table is not saved.
+
+    OUTPUT: a ``ReferenceGraphTable`` containing all of ``reference_graph_families``.
+
+    EXAMPLES:
+
+    ::
+
+        sage: import os
+        sage: from boolean_cayley_graphs.reference_graphs import reference_graph_table, ReferenceGraphTable
+        sage: d = tmp_dir()
+        sage: table = reference_graph_table(dir=d)
+        sage: reference_graph_table() is table
+        True
+        sage: len(table)
+        14
+        sage: ReferenceGraphTable.remove_mangled("sage", dir=d)
+        sage: os.rmdir(d)
+    """
+    table = reference_graph_tables.get(algorithm)
+    if table is not None and table.families == list(reference_graph_families):
+        return table
+
+    table = None
+    if dir is not None:
+        file_name = ReferenceGraphTable.mangled_name(algorithm + ".sobj", dir=dir)
+        if os.path.isfile(file_name):
+            table = ReferenceGraphTable.load_mangled(algorithm, dir=dir)
+            if table.families != list(reference_graph_families):
+                table = None
+    if table is None:
+        table = ReferenceGraphTable(algorithm=algorithm)
+        if dir is not None:
+            table.save_mangled(algorithm, dir=dir)
+    reference_graph_tables[algorithm] = table
+    return table
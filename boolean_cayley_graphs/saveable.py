@@ -9,6 +9,7 @@ AUTHORS:
 
 - Paul Leopardi (2016-08-04): initial version
 - Paul Leopardi (2017-04-01): saveable.py based on persistent.py
+- Paul Leopardi (2024-03-18): atomic save
 
 """
 #*****************************************************************************
@@ -23,8 +24,59 @@ AUTHORS:
 from builtins import object
 import os
 import os.path
+import socket
 
-from sage.misc.persist import load, save
+from sage.misc.persist import dumps, load
+
+
+def write_file_atomically(data, file_name):
+    r"""
+    Write data to a file, so that the file either does not change or contains all of the data.
+
+    The data is written to a temporary file in the same directory,
+    which is then renamed to ``file_name``. The name of the temporary file
+    includes the host name and process id, so that concurrent writers of the
+    same file, such as MPI ranks on different nodes, do not collide.
+
+    INPUT:
+
+    - ``data`` -- bytes. The data to write.
+    - ``file_name`` -- string. The name of the file.
+
+    OUTPUT:
+
+    None.
+
+    EXAMPLES:
+
+    ::
+
+        sage: import os
+        sage: from boolean_cayley_graphs.saveable import write_file_atomically
+        sage: d = tmp_dir()
+        sage: file_name = os.path.join(d, "a.txt")
+        sage: write_file_atomically(b"abc", file_name)
+        sage: open(file_name, "rb").read()
+        b'abc'
+        sage: os.listdir(d)
+        ['a.txt']
+        sage: os.remove(file_name)
+        sage: os.rmdir(d)
+    """
+    temp_file_name = "{}.{}.{}.tmp".format(
+        file_name,
+        socket.gethostname(),
+        os.getpid())
+    try:
+        with open(temp_file_name, "wb") as temp_file:
+            temp_file.write(data)
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+        os.replace(temp_file_name, file_name)
+    except BaseException:
+        if os.path.isfile(temp_file_name):
+            os.remove(temp_file_name)
+        raise
 
 
 class Saveable(object):
@@ -181,6 +233,8 @@ class Saveable(object):
         EFFECT:
 
         A file is created and the object ``self`` is saved into the file.
+        The file is written atomically, so that an interrupted save never
+        leaves a partially written file under the standardized name.
 
         EXAMPLES:
 
@@ -196,6 +250,7 @@ class Saveable(object):
             sage: BFI.remove_mangled("a", dir=d)
             sage: os.rmdir(d)
         """
-        save(self, self.__class__.mangled_name(
-            name,
-            dir=dir))
+        file_name = self.__class__.mangled_name(
+            name + ".sobj",
+            dir=dir)
+        write_file_atomically(dumps(self), file_name)
@@ -0,0 +1,98 @@
+r"""
+Persistent caches stored in SQLite3 databases
+=============================================
+
+The ``sqlite_cache`` module defines the ``SQLiteCache`` class:
+a mixin class that manages the connections of a persistent cache
+stored in an SQLite3 database, such as ``GraphInvariantCache``
+and ``ClassificationArtifactCache``.
+
+AUTHORS:
+
+- Paul Leopardi (2024-08-19): initial version
+
+"""
+#*****************************************************************************
+#       Copyright (C) 2024 Paul Leopardi paul.leopardi@gmail.com
+#
+#  Distributed under the terms of the GNU General Public License (GPL)
+#  as published by the Free Software Foundation; either version 2 of
+#  the License, or (at your option) any later version.
+#                  http://www.gnu.org/licenses/
+#*****************************************************************************
+
+from builtins import object
+import os
+import sqlite3
+import threading
+
+
+class SQLiteCache(object):
+    r"""
+    A mixin class for a persistent cache stored in an SQLite3 database.
+
+    A database connection is opened on first use by each thread of each process,
+    so that a cache can be shared between threads and passed to worker processes.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.sqlite_cache import SQLiteCache
+        sage: cache = SQLiteCache(tmp_filename(ext='.db'))
+        sage: cache.connection() is cache.connection()
+        True
+        sage: loads(dumps(cache)).db_name == cache.db_name
+        True
+        sage: cache.close()
+    """
+    def __init__(self, db_name):
+        r"""
+        Constructor.
+
+        INPUT:
+
+        - ``db_name`` -- string. The file name of the cache database.
+          It is created if it does not exist.
+        """
+        self.db_name = db_name
+        self._local = threading.local()
+        self.connection().execute("PRAGMA journal_mode = wal")
+
+
+    def __getstate__(self):
+        r"""
+        Pickle the cache without its connection.
+        """
+        return {"db_name": self.db_name}
+
+
+    def __setstate__(self, state):
+        r"""
+        Unpickle the cache.
+        """
+        self.db_name = state["db_name"]
+        self._local = threading.local()
+
+
+    def connection(self):
+        r"""
+        Return the connection of the current thread, opening it if necessary.
+
+        OUTPUT: a database connection object.
+        """
+        # A forked process inherits the thread local data of its parent.
+        if getattr(self._local, "pid", None) != os.getpid():
+            # Several processes may write to the cache concurrently.
+            self._local.conn = sqlite3.connect(self.db_name, timeout=60)
+            self._local.pid = os.getpid()
+        return self._local.conn
+
+
+    def close(self):
+        r"""
+        Close the connection of the current thread, if any.
+        """
+        if getattr(self._local, "pid", None) == os.getpid():
+            self._local.conn.close()
+        self._local = threading.local()
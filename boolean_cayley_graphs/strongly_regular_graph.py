@@ -10,6 +10,9 @@ such as its stronly regular parameters.
 AUTHORS:
 
 - Paul Leopardi (2016-10-19): initial version
+- Paul Leopardi (2024-06-24): persistent cache of invariants
+- Paul Leopardi (2024-07-01): bit-packed rank
+- Paul Leopardi (2024-07-08): analytic parameters of Cayley graphs of bent functions
 
 """
 #*****************************************************************************
@@ -21,12 +24,157 @@ AUTHORS:
 #                  http://www.gnu.org/licenses/
 #*****************************************************************************
 
+import numpy as np
+import random
+
 from sage.graphs.graph import Graph
 from sage.matrix.constructor import matrix
 from sage.misc.lazy_attribute import lazy_attribute
 from sage.rings.finite_rings.finite_field_constructor import GF
 
+from boolean_cayley_graphs.gf2_rank import graph6_adjacency_bits, graph_rank
 from boolean_cayley_graphs.graph_improved import GraphImproved
+from boolean_cayley_graphs.graph_invariant_cache import get_default_invariant_cache
+
+
+def bent_cayley_graph_parameters(dim, weight_class):
+    r"""
+    Return the strongly regular parameters of the Cayley graph of a bent function.
+
+    The Cayley graph of a bent function :math:`f` on :math:`\mathbb{F}_2^{dim}`,
+    with :math:`f(0) = 0`, is strongly regular with parameters
+    :math:`(2^{dim}, k, k - 2^{dim-2}, k - 2^{dim-2})`, where the degree :math:`k`
+    is the weight of :math:`f`, either :math:`2^{dim-1} - 2^{dim/2-1}`
+    or :math:`2^{dim-1} + 2^{dim/2-1}`, according to its weight class [BC1999]_.
+
+    INPUT:
+
+    - ``dim`` -- even integer, at least 4. The number of variables of the bent function.
+    - ``weight_class`` -- integer, 0 or 1. The weight class of the bent function.
+
+    OUTPUT: a tuple of 4 integers.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.strongly_regular_graph import bent_cayley_graph_parameters
+        sage: bentf = BentFunction([0,0,0,1,0,0,0,1,0,0,0,1,1,1,1,0])
+        sage: bent_cayley_graph_parameters(4, 0)
+        (16, 6, 2, 2)
+        sage: bentf.cayley_graph().is_strongly_regular(parameters=True)
+        (16, 6, 2, 2)
+        sage: bent_cayley_graph_parameters(6, 1)
+        (64, 36, 20, 20)
+        sage: bent_cayley_graph_parameters(2, 0)
+        Traceback (most recent call last):
+        ...
+        ValueError: The dimension must be even and at least 4: 2
+    """
+    dim = int(dim)
+    if dim < 4 or dim % 2 != 0:
+        raise ValueError("The dimension must be even and at least 4: {}".format(dim))
+    v = 2 ** dim
+    k = 2 ** (dim - 1) + (2 * int(weight_class) - 1) * 2 ** (dim // 2 - 1)
+    lambda_mu = k - 2 ** (dim - 2)
+    return (v, k, lambda_mu, lambda_mu)
+
+
+def bent_cayley_class_parameters(dim, bent_cayley_graph_index_array, weight_class_array):
+    r"""
+    Return the strongly regular parameters of the Cayley graph of each extended Cayley class
+    of a classification of a bent function.
+
+    INPUT:
+
+    - ``dim`` -- even integer, at least 4. The number of variables of the bent function.
+    - ``bent_cayley_graph_index_array`` -- a ``numpy`` array. The bent Cayley graph index matrix.
+    - ``weight_class_array`` -- a ``numpy`` array. The weight class matrix.
+
+    OUTPUT:
+
+    A list of tuples, as per ``bent_cayley_graph_parameters``, indexed by the classes
+    in the Cayley graph class list, with `None` for a class that does not occur in
+    ``bent_cayley_graph_index_array``.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification as BentFunctionCGC
+        sage: from boolean_cayley_graphs.strongly_regular_graph import bent_cayley_class_parameters
+        sage: import numpy as np
+        sage: c = BentFunctionCGC.from_function(BentFunction([0,0,0,1,0,0,0,1,0,0,0,1,1,1,1,0]))
+        sage: parameters = bent_cayley_class_parameters(
+        ....:     4,
+        ....:     np.array(c.bent_cayley_graph_index_matrix, dtype=int),
+        ....:     np.array(c.weight_class_matrix, dtype=int))
+        sage: parameters == [
+        ....:     Graph(label).is_strongly_regular(parameters=True)
+        ....:     for label in c.cayley_graph_class_list]
+        True
+    """
+    index_array = np.asarray(bent_cayley_graph_index_array, dtype=np.int64).ravel()
+    wc_array = np.asarray(weight_class_array, dtype=np.int64).ravel()
+    nbr_classes = int(index_array.max()) + 1 if index_array.size > 0 else 0
+    # The first cell of each class gives the weight class of its graph.
+    first_cells = np.full(nbr_classes, -1, dtype=np.int64)
+    classes, first_indices = np.unique(index_array, return_index=True)
+    first_cells[classes] = first_indices
+    return [
+        None
+        if first_cell < 0 else
+        bent_cayley_graph_parameters(dim, wc_array[first_cell])
+        for first_cell in first_cells]
+
+
+def sample_strongly_regular_parameters(
+    adjacency,
+    parameters,
+    nbr_samples=64,
+    seed=None):
+    r"""
+    Test strongly regular parameters of a graph on a random sample of pairs of vertices.
+
+    INPUT:
+
+    - ``adjacency`` -- a ``numpy`` array of 0-1 values. The adjacency matrix of the graph.
+    - ``parameters`` -- a tuple of 4 integers. The claimed parameters.
+    - ``nbr_samples`` -- integer (default: 64). The number of random pairs of
+      distinct vertices whose common neighbours are counted.
+    - ``seed`` -- integer (default: `None`). The seed of the random number generator.
+
+    OUTPUT: ``True`` if the number of vertices, the degree of each sampled vertex,
+    and the number of common neighbours of each sampled pair agree with ``parameters``,
+    otherwise ``False``.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.strongly_regular_graph import sample_strongly_regular_parameters
+        sage: import numpy as np
+        sage: adjacency = np.array(graphs.PetersenGraph().adjacency_matrix(), dtype=int)
+        sage: sample_strongly_regular_parameters(adjacency, (10, 3, 0, 1), seed=1)
+        True
+        sage: sample_strongly_regular_parameters(adjacency, (10, 3, 1, 1), seed=1)
+        False
+    """
+    adjacency = np.asarray(adjacency, dtype=np.int64)
+    v, k, lambda_, mu = [int(p) for p in parameters]
+    if adjacency.shape[0] != v:
+        return False
+    rng = random.Random(seed)
+    for _ in range(nbr_samples):
+        x, y = rng.sample(range(v), 2)
+        if adjacency[x].sum() != k:
+            return False
+        common = int(adjacency[x] @ adjacency[y])
+        if common != (lambda_ if adjacency[x, y] else mu):
+            return False
+    return True
 
 
 class StronglyRegularGraph(GraphImproved):
@@ -36,6 +184,15 @@ class StronglyRegularGraph(GraphImproved):
     The class inherits from ``GraphImproved``, and is initialized either from a graph
     or from keyword arguments.
 
+    If the graph is created using ``from_canonical_label``, the clique polynomial,
+    strongly regular parameters, rank and automorphism group order are looked up in,
+    and stored in, a ``GraphInvariantCache``, if one is given or set as the default.
+
+    If the graph is known to be the Cayley graph of a bent function on at least
+    4 variables, its strongly regular parameters are given by ``bent_cayley_graph_parameters``,
+    and are optionally tested on a random sample of pairs of vertices,
+    according to ``parameter_verification_samples``.
+
     EXAMPLES:
 
     ::
@@ -88,12 +245,120 @@ class StronglyRegularGraph(GraphImproved):
             True
         """
         GraphImproved.__init__(self, graph, **kwargs)
+        self.canonical_label_string = None
+        self.invariant_cache = None
+        self.bent_cayley_graph = False
+
+
+    # The number of pairs of vertices used to test analytic strongly regular parameters.
+    # If 0, the parameters are not tested.
+    parameter_verification_samples = 0
+
+
+    @classmethod
+    def from_canonical_label(
+        cls,
+        canonical_label,
+        invariant_cache=None,
+        bent_cayley_graph=False):
+        r"""
+        Create a strongly regular graph from its canonical label.
+
+        INPUT:
+
+        - ``canonical_label`` -- string. A graph6_string encoding a Graph canonical label.
+        - ``invariant_cache`` -- a ``GraphInvariantCache`` (default: `None`).
+          The cache of invariants. Default is None, meaning the default cache, if any,
+          as set by ``set_default_invariant_cache``.
+        - ``bent_cayley_graph`` -- boolean (default: ``False``). If ``True``,
+          the graph is known to be the Cayley graph of a bent function.
+
+        OUTPUT: an object of class ``StronglyRegularGraph``.
+
+        EXAMPLES:
+
+        ::
+
+            sage: from boolean_cayley_graphs.bent_function import BentFunction
+            sage: from boolean_cayley_graphs.graph_invariant_cache import GraphInvariantCache
+            sage: from boolean_cayley_graphs.strongly_regular_graph import StronglyRegularGraph
+            sage: bentf = BentFunction([0,0,0,1,0,0,0,1,0,0,0,1,1,1,1,0])
+            sage: label = bentf.cayley_graph().canonical_label().graph6_string()
+            sage: cache = GraphInvariantCache(tmp_filename(ext='.db'))
+            sage: srg = StronglyRegularGraph.from_canonical_label(label, cache)
+            sage: srg.strongly_regular_parameters
+            (16, 6, 2, 2)
+            sage: srg.rank
+            6
+            sage: cache.get(label, "rank")
+            6
+            sage: StronglyRegularGraph.from_canonical_label(label, cache).group_order == srg.group_order
+            True
+        """
+        srg = cls(canonical_label)
+        srg.canonical_label_string = canonical_label
+        srg.invariant_cache = invariant_cache
+        srg.bent_cayley_graph = bent_cayley_graph
+        return srg
+
+
+    def cached_invariant(self, invariant_name, compute):
+        r"""
+        Return an invariant of the graph, using the cache of invariants, if any.
+
+        INPUT:
+
+        - ``invariant_name`` -- string. One of the keys of ``invariant_functions``
+          in ``graph_invariant_cache``.
+        - ``compute`` -- function. The function used to compute the invariant
+          if there is no cache or if the invariant is not cached.
+
+        OUTPUT: the value of the invariant.
+        """
+        canonical_label = getattr(self, "canonical_label_string", None)
+        cache = getattr(self, "invariant_cache", None)
+        if cache is None:
+            cache = get_default_invariant_cache()
+        if canonical_label is None or cache is None:
+            return compute()
+        value = cache.get(canonical_label, invariant_name)
+        if value is None:
+            value = compute()
+            cache.put(canonical_label, invariant_name, value)
+        return value
+
+
+    @lazy_attribute
+    def stored_clique_polynomial(self):
+        r"""
+        The clique polynomial of the graph.
+
+        EXAMPLES:
+
+        ::
+
+            sage: from boolean_cayley_graphs.strongly_regular_graph import StronglyRegularGraph
+            sage: srg = StronglyRegularGraph(graphs.ClebschGraph())
+            sage: srg.stored_clique_polynomial
+            40*t^2 + 16*t + 1
+        """
+        return self.cached_invariant(
+            "clique_polynomial",
+            self.clique_polynomial)
 
     @lazy_attribute
     def strongly_regular_parameters(self):
         r"""
         The strongly regular parameters of the graph.
 
+        For the Cayley graph of a bent function on at least 4 variables,
+        as per ``from_canonical_label``, the parameters are given by
+        ``bent_cayley_graph_parameters``, using the degree of the graph.
+        If ``parameter_verification_samples`` is positive, the parameters are
+        tested using ``sample_strongly_regular_parameters``, and
+        a ``ValueError`` is raised if the test fails.
+        Otherwise, the parameters are given by ``is_strongly_regular``.
+
         EXAMPLES:
 
         ::
@@ -108,8 +373,45 @@ class StronglyRegularGraph(GraphImproved):
             True
             sage: srg.strongly_regular_parameters
             (64, 35, 18, 20)
+
+        The Cayley graph of a bent function::
+
+            sage: from boolean_cayley_graphs.bent_function import BentFunction
+            sage: bentf = BentFunction([0,0,0,1,0,0,0,1,0,0,0,1,1,1,1,0])
+            sage: label = bentf.cayley_graph().canonical_label().graph6_string()
+            sage: StronglyRegularGraph.parameter_verification_samples = 16
+            sage: srg = StronglyRegularGraph.from_canonical_label(label, bent_cayley_graph=True)
+            sage: srg.strongly_regular_parameters
+            (16, 6, 2, 2)
+            sage: StronglyRegularGraph.parameter_verification_samples = 0
         """
-        return self.is_strongly_regular(parameters=True)
+        return self.cached_invariant(
+            "strongly_regular_parameters",
+            self._strongly_regular_parameters)
+
+
+    def _strongly_regular_parameters(self):
+        r"""
+        Compute the strongly regular parameters of the graph.
+        """
+        v = self.order()
+        dim = v.bit_length() - 1
+        if (not getattr(self, "bent_cayley_graph", False)
+            or v != 2 ** dim
+            or dim < 4
+            or dim % 2 != 0):
+            return self.is_strongly_regular(parameters=True)
+        k = self.degree(next(self.vertex_iterator()))
+        weight_class = 1 if k > 2 ** (dim - 1) else 0
+        parameters = bent_cayley_graph_parameters(dim, weight_class)
+        if parameters[1] != k:
+            raise ValueError("The degree {} is not that of the Cayley graph of a bent function.".format(k))
+        nbr_samples = self.parameter_verification_samples
+        if nbr_samples > 0:
+            adjacency = graph6_adjacency_bits(self.graph6_string())
+            if not sample_strongly_regular_parameters(adjacency, parameters, nbr_samples):
+                raise ValueError("The graph does not have parameters {}.".format(parameters))
+        return parameters
 
 
     @lazy_attribute
@@ -153,6 +455,8 @@ class StronglyRegularGraph(GraphImproved):
         r"""
         The 2-rank of the graph.
 
+        The rank is computed using ``graph_rank``, without constructing ``matrix_GF2``.
+
         EXAMPLES:
 
         ::
@@ -164,7 +468,9 @@ class StronglyRegularGraph(GraphImproved):
             sage: srg.rank
             64
         """
-        return self.matrix_GF2.rank()
+        return self.cached_invariant(
+            "rank",
+            lambda: graph_rank(self))
 
 
     @lazy_attribute
@@ -202,4 +508,6 @@ class StronglyRegularGraph(GraphImproved):
             sage: srg.group_order
             2580480
         """
-        return self.automorphism_group.order()
+        return self.cached_invariant(
+            "group_order",
+            lambda: self.automorphism_group.order())
@@ -0,0 +1,225 @@
+r"""
+Fast tests for t-designs given by incidence matrices
+====================================================
+
+The ``t_design`` module defines functions that find the parameters of the
+t-design given by a 0-1 incidence matrix, with the same result as
+``IncidenceStructure(M).is_t_design(return_parameters=True)``, but using
+matrix operations on the whole incidence matrix rather than enumerating
+the subsets of points of each block.
+
+The block sizes and replication numbers are the column and row sums of the
+incidence matrix, and the number of blocks containing each pair of points is
+an entry of the product of the incidence matrix with its transpose.
+Subsets of more than 2 points are enumerated only if the subsets
+containing a pair of points of the first block do not already rule out a t-design.
+
+The function ``bent_sdp_design_parameters`` gives the parameters of the
+symmetric design of a bent function directly from its Walsh spectrum.
+
+AUTHORS:
+
+- Paul Leopardi (2024-07-22): initial version
+
+EXAMPLES:
+
+::
+
+    sage: from boolean_cayley_graphs.bent_function import BentFunction
+    sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification as BentFunctionCGC
+    sage: from boolean_cayley_graphs.t_design import bent_sdp_design_parameters, t_design_parameters
+    sage: bentf = BentFunction([0,0,0,1,0,0,0,1,0,0,0,1,1,1,1,0])
+    sage: c = BentFunctionCGC.from_function(bentf)
+    sage: t_design_parameters(c.weight_class_matrix)
+    (True, (2, 16, 6, 2))
+    sage: IncidenceStructure(c.weight_class_matrix).is_t_design(return_parameters=True)
+    (True, (2, 16, 6, 2))
+    sage: bent_sdp_design_parameters(bentf)
+    (True, (2, 16, 6, 2))
+"""
+#*****************************************************************************
+#       Copyright (C) 2024 Paul Leopardi paul.leopardi@gmail.com
+#
+#  Distributed under the terms of the GNU General Public License (GPL)
+#  as published by the Free Software Foundation; either version 2 of
+#  the License, or (at your option) any later version.
+#                  http://www.gnu.org/licenses/
+#*****************************************************************************
+
+from itertools import combinations
+from math import comb
+
+import numpy as np
+
+
+def _appearing_counts_are_constant(counts):
+    r"""
+    Return ``True`` if all of the nonzero entries of a ``numpy`` array are equal.
+
+    As per ``IncidenceStructure.is_t_design``, only the subsets of points
+    contained in at least one block are compared.
+    """
+    counts = counts[counts > 0]
+    return counts.size == 0 or bool((counts == counts[0]).all())
+
+
+def _pair_counts(incidence):
+    r"""
+    Return the number of blocks containing each pair of distinct points.
+
+    INPUT:
+
+    - ``incidence`` -- a ``numpy`` array of 0-1 values, of shape ``(v, b)``.
+
+    OUTPUT: a ``numpy`` array of ``int64``, of length ``v*(v-1)/2``.
+    """
+    # The product of 0-1 matrices in floating point is exact for these sizes,
+    # and uses the BLAS.
+    m = incidence.astype(np.float64)
+    counts = np.rint(m @ m.T).astype(np.int64)
+    return counts[np.triu_indices(incidence.shape[0], 1)]
+
+
+def _subset_counts_are_constant(incidence, t):
+    r"""
+    Return ``True`` if every subset of ``t`` points contained in a block
+    is contained in the same number of blocks.
+
+    INPUT:
+
+    - ``incidence`` -- a ``numpy`` array of 0-1 values, of shape ``(v, b)``,
+      whose first block contains at least ``t`` points.
+    - ``t`` -- integer, at least 3.
+
+    OUTPUT: a boolean.
+    """
+    v, b = incidence.shape
+    # Usually, the subsets containing two points of the first block already differ.
+    x, y = np.flatnonzero(incidence[:, 0])[:2]
+    counts = incidence @ (incidence[x] * incidence[y])
+    counts[[x, y]] = 0
+    if not _appearing_counts_are_constant(counts):
+        return False
+
+    subset_counts = dict()
+    for block in range(b):
+        points = np.flatnonzero(incidence[:, block])
+        for subset in combinations(points.tolist(), t):
+            subset_counts[subset] = subset_counts.get(subset, 0) + 1
+    return len(set(subset_counts.values())) == 1
+
+
+def t_design_parameters(incidence):
+    r"""
+    Return the parameters of the t-design with the largest t given by an incidence matrix.
+
+    INPUT:
+
+    - ``incidence`` -- a 0-1 matrix, or a ``numpy`` array of 0-1 values,
+      of shape ``(v, b)``. Entry ``[i, j]`` is 1 if point ``i`` is in block ``j``.
+
+    OUTPUT:
+
+    A tuple ``(is_design, (t, v, k, l))``, as per
+    ``IncidenceStructure(incidence).is_t_design(return_parameters=True)``.
+    If the blocks do not all have the same size, the result is ``(False, (0, 0, 0, 0))``.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.t_design import t_design_parameters
+        sage: import numpy as np
+        sage: fano = designs.fano_plane()
+        sage: m = fano.incidence_matrix()
+        sage: t_design_parameters(m)
+        (True, (2, 7, 3, 1))
+        sage: fano.is_t_design(return_parameters=True)
+        (True, (2, 7, 3, 1))
+        sage: m = designs.steiner_quadruple_system(8).incidence_matrix()
+        sage: t_design_parameters(m) == IncidenceStructure(m).is_t_design(return_parameters=True)
+        True
+        sage: t_design_parameters(np.array([[1,0],[1,1]]))
+        (False, (0, 0, 0, 0))
+        sage: t_design_parameters(np.array([[1,0,0],[1,1,0],[0,1,1]]))
+        (True, (0, 3, 2, 3))
+    """
+    incidence = np.asarray(incidence, dtype=np.int64)
+    v, b = incidence.shape
+    block_sizes = incidence.sum(axis=0)
+    k = int(block_sizes[0]) if b > 0 else 0
+    if (block_sizes != k).any():
+        return (False, (0, 0, 0, 0))
+    if k == 0:
+        return (True, (0, v, k, b))
+    if k == v:
+        return (True, (v, v, k, b))
+
+    t = 0
+    for tt in range(1, k + 1):
+        # The number of blocks containing each subset of tt points must be an integer.
+        if (b * comb(k, tt)) % comb(v, tt) != 0:
+            break
+        if tt == 1:
+            is_design = _appearing_counts_are_constant(incidence.sum(axis=1))
+        elif tt == 2:
+            is_design = _appearing_counts_are_constant(_pair_counts(incidence))
+        else:
+            is_design = _subset_counts_are_constant(incidence, tt)
+        if not is_design:
+            break
+        t = tt
+
+    l = b * comb(k, t) // comb(v, t) if t > 0 else b
+    return (True, (t, v, k, l))
+
+
+def bent_sdp_design_parameters(bentf):
+    r"""
+    Return the parameters of the symmetric design given by the weight class matrix of a bent function.
+
+    Entry ``[c, b]`` of the weight class matrix of a bent function :math:`f` is
+    :math:`f(b) + \tilde{f}(c) + \langle c, b \rangle`, where :math:`\tilde{f}`
+    is the dual of :math:`f`, so that the Walsh spectrum of :math:`f` determines
+    the matrix. For :math:`dim \ge 4`, each block has :math:`k = (v - \sqrt{v})/2`
+    points, and the matrix is the incidence matrix of a symmetric
+    :math:`2-(v, k, k - v/4)` design, where :math:`v = 2^{dim}`.
+
+    INPUT:
+
+    - ``bentf`` -- a ``BentFunction``.
+
+    OUTPUT:
+
+    A tuple ``(is_design, (t, v, k, l))``, as per ``t_design_parameters``
+    applied to the weight class matrix of the classification of ``bentf``,
+    or `None` if the Walsh spectrum of ``bentf`` shows that it is not bent.
+
+    EXAMPLES:
+
+    ::
+
+        sage: from boolean_cayley_graphs.bent_function import BentFunction
+        sage: from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification as BentFunctionCGC
+        sage: from boolean_cayley_graphs.t_design import bent_sdp_design_parameters
+        sage: bentf = BentFunction([0,0,0,1])
+        sage: bent_sdp_design_parameters(bentf)
+        (True, (1, 4, 1, 1))
+        sage: IncidenceStructure(BentFunctionCGC.from_function(bentf).weight_class_matrix).is_t_design(return_parameters=True)
+        (True, (1, 4, 1, 1))
+        sage: bent_sdp_design_parameters(BentFunction([0,0,0,0])) is None
+        True
+    """
+    dim = int(bentf.nvariables())
+    if dim < 2 or dim % 2 != 0:
+        return None
+    v = 2 ** dim
+    sqrt_v = 2 ** (dim // 2)
+    walsh = np.abs(np.array(bentf.walsh_hadamard_transform(), dtype=np.int64))
+    if not (walsh == sqrt_v).all():
+        return None
+    k = (v - sqrt_v) // 2
+    if dim == 2:
+        # Blocks of 1 point form only a 1-design.
+        return (True, (1, v, k, 1))
+    return (True, (2, v, k, k - v // 4))
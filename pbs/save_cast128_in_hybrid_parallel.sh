@@ -0,0 +1,14 @@
+#!/bin/bash
+BNBR=$1
+FNBR=$2
+C_LEN=${3:-16}
+NNODES=${4:-1}
+CPUS_PER_NODE=${CPUS_PER_NODE:-16}
+MEM_PER_NODE=${MEM_PER_NODE:-32}
+NCPUS=$((NNODES * CPUS_PER_NODE))
+MEM=$((NNODES * MEM_PER_NODE))
+BCG_SITE_DIR=${BCG_SITE_DIR:-"/short/y03/pcl851/lib/python2.7/site-packages"}
+
+qsub -l ncpus=${NCPUS} -l mem=${MEM}gb \
+     -v QSUB_NNODES="$NNODES",QSUB_CPUS_PER_NODE="$CPUS_PER_NODE",QSUB_BNBR="$BNBR",QSUB_FNBR="$FNBR",QSUB_C_LEN="$C_LEN",BCG_SITE_DIR="$BCG_SITE_DIR" \
+     save_cast128_in_hybrid_parallel.pbs
@@ -2,11 +2,24 @@
 BNBR=$1
 FNBR=$2
 C_LEN=${3:-16}
-NCPUS=$((256 / C_LEN))
-MEM=$((NCPUS * 1))
 BCG_SITE_DIR=${BCG_SITE_DIR:-"/short/y03/pcl851/lib/python2.7/site-packages"}
+WALLTIME=3:00:00
 
-qsub -l ncpus=${NCPUS} -l mem=${MEM}gb \
+if [ "$C_LEN" == "auto" ]; then
+  # Sample the cost of some cells and choose C_LEN, NCPUS, MEM and WALLTIME.
+  TARGET_HOURS=${TARGET_HOURS:-3}
+  MAX_MEM_GB=${MAX_MEM_GB:-256}
+  MAX_NCPUS=${MAX_NCPUS:-256}
+  PLAN_FILE="${PWD}/cast128_${BNBR}_${FNBR}_plan.sh"
+  (cd ../sage-code && \
+   sage -python plan_cast128_class_parts.py \
+     $BNBR $FNBR $TARGET_HOURS $MAX_MEM_GB $MAX_NCPUS "$PLAN_FILE")
+  source "$PLAN_FILE"
+else
+  NCPUS=$((256 / C_LEN))
+  MEM=$((NCPUS * 1))
+fi
+
+qsub -l ncpus=${NCPUS} -l mem=${MEM}gb -l walltime=${WALLTIME} \
      -v QSUB_NCPUS="$NCPUS",QSUB_BNBR="$BNBR",QSUB_FNBR="$FNBR",QSUB_C_LEN="$C_LEN",BCG_SITE_DIR="$BCG_SITE_DIR" \
      save_cast128_in_mpi_parallel.pbs
-
@@ -12,6 +12,11 @@ sage -python bent_function_cayley_graph_dashboard.py
 AUTHORS:
 
 - Paul Leopardi (2018-06-17): initial version
+- Paul Leopardi (2024-06-03): pooled connections and prepared statements
+- Paul Leopardi (2024-06-24): persistent cache of graph invariants
+- Paul Leopardi (2024-07-15): structured reports instead of captured output
+- Paul Leopardi (2024-08-12): downsampled matrix figures, with tiles fetched on zoom
+- Paul Leopardi (2024-08-19): reports and downloads served from a content-addressed cache
 
 """
 
@@ -31,20 +36,29 @@ import dash_core_components as dcc
 import dash.dependencies as dd
 import dash_html_components as html
 import flask
+import math
 import os
+import threading
+import time
 import pandas as pd
 import plotly.graph_objs as go
 import database_interface as db
-import sys
 
-from io import StringIO
+from collections import OrderedDict
+from dash.exceptions import PreventUpdate
 from flask import Flask
 from pandas import DataFrame
+from urllib.parse import quote
 
 import sage.all
 
 from boolean_cayley_graphs.bent_function import BentFunction
 from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
+from boolean_cayley_graphs.classification_artifact_cache import ClassificationArtifactCache
+from boolean_cayley_graphs.classification_artifact_cache import artifact_names, classification_artifacts
+from boolean_cayley_graphs.classification_artifact_cache import matrix_from_artifact, report_from_artifact
+from boolean_cayley_graphs.graph_invariant_cache import GraphInvariantCache, set_default_invariant_cache
+from boolean_cayley_graphs.matrix_tiles import MatrixTilePyramid
 
 # From https://github.com/mbkupfer/dash-with-flask/blob/master/dash_app.py
 server = Flask(__name__)
@@ -54,53 +68,80 @@ app.config.requests_pathname_prefix = ''
 
 app.config['suppress_callback_exceptions'] = True
 
-output_dir = 'downloads'
-output_files = {
+# Graph invariants used by reports, as precomputed by precompute_graph_invariants.py.
+invariant_cache_file = 'graph_invariants.db'
+if os.path.isfile(invariant_cache_file):
+    set_default_invariant_cache(GraphInvariantCache(invariant_cache_file))
+
+# Reports, downloads and matrices of classifications, as precomputed by
+# precompute_dashboard_cache.py, or rendered on first use.
+artifact_cache_file = 'dashboard_cache.db'
+artifact_cache = ClassificationArtifactCache(artifact_cache_file)
+
+# The number of seconds between checks for changes to each database.
+version_check_interval = 60
+
+# The version of each database, and the time it was checked, keyed by database.
+database_versions = dict()
+
+download_files = {
     '1_bent_function': {
-        'filename': 'download_bent_function.csv',
+        'filename': 'bent_function.csv',
         'label':    'Bent function'},
     '2_cg_class_list': {
-        'filename': 'download_cg_class_list.csv',
+        'filename': 'cg_class_list.csv',
         'label':    'Cayley graph class list'},
     '3_matrices': {
-        'filename': 'download_matrices.csv',
-        'label':    'Contents of matrices'}}
+        'filename': 'matrices.csv',
+        'label':    'Contents of matrices'},
+    '4_classification': {
+        'filename': 'classification.zip',
+        'label':    'All of the above, as a ZIP file'}}
+
+download_mimetypes = {
+    '.csv': 'text/csv',
+    '.zip': 'application/zip'}
+
+# The number of bytes in each chunk of a streamed download.
+download_chunk_size = 1 << 16
+
+database_options = [
+    {
+        'label': '2 dimensions',
+        'value': 'p2'
+    },
+    {
+        'label': '4 dimensions',
+        'value': 'p4'
+    },
+    {
+        'label': '6 dimensions',
+        'value': 'p6'
+    },
+    {
+        'label': '8 dimensions to degree 3',
+        'value': 'p8'
+    },
+    {
+        'label': 'sigma functions to 8 dimensions',
+        'value': 'sigma'
+    },
+    {
+        'label': 'tau functions to 8 dimensions',
+        'value': 'tau'
+    },
+    {
+        'label': 'CAST-128 S-box functions',
+        'value': 'cast128'
+    },
+]
 
 app.layout = html.Div([
     html.H2('Bent function--Cayley graph virtual laboratory (prototype)'),
     html.Div([
         html.H3('Choose a database'),
         dcc.RadioItems(
-            options=[
-                {
-                    'label': '2 dimensions',
-                    'value': 'p2'
-                },
-                {
-                    'label': '4 dimensions',
-                    'value': 'p4'
-                },
-                {
-                    'label': '6 dimensions',
-                    'value': 'p6'
-                },
-                {
-                    'label': '8 dimensions to degree 3',
-                    'value': 'p8'
-                },
-                {
-                    'label': 'sigma functions to 8 dimensions',
-                    'value': 'sigma'
-                },
-                {
-                    'label': 'tau functions to 8 dimensions',
-                    'value': 'tau'
-                },
-                {
-                    'label': 'CAST-128 S-box functions',
-                    'value': 'cast128'
-                },
-            ],
+            options=database_options,
             value='p2',
             id='database-filter'
         )
@@ -113,17 +154,17 @@ app.layout = html.Div([
     ),
     html.Div([
         html.H3(
-            'Select a CSV file to Download.'),
+            'Select a file to Download.'),
         dcc.Dropdown(
             id='download-dropdown',
-            value=output_files['1_bent_function']['filename'],
+            value=download_files['1_bent_function']['filename'],
             options=[{
-                    'label': output_files[key]['label'],
-                    'value': output_files[key]['filename']}
-                for key in sorted(output_files.keys())]),
+                    'label': download_files[key]['label'],
+                    'value': download_files[key]['filename']}
+                for key in sorted(download_files.keys())]),
         html.A(
             id='download-link',
-            children='Download the CSV file from this link.',
+            children='Download the file from this link.',
             style={'padding-bottom': 200})])],
     style={'font-family': ["Open Sans", "Helvetica", "Arial"]})
 
@@ -151,100 +192,189 @@ def bent_function_filter(options):
 def set_bent_function_options(selected_database):
 
     try:
-        conn = db.connect_to_database(
-            selected_database)
+        with db.connection(selected_database) as conn:
+            bent_function_names = [
+                row[0]
+                for row in db.execute_prepared(
+                    selected_database,
+                    conn,
+                    'select_bent_function_names')]
     except IOError:
         print('Cannot connect to database {}.'.format(selected_database))
         return
 
-    bent_function_names = pd.read_sql('''
-        SELECT name
-        FROM bent_function
-        ''',
-        conn)
-    conn.close()
     options=[
         {
-            'label': opt[0],
-            'value': opt[0]
+            'label': name,
+            'value': name
         }
-        for opt in bent_function_names.values
+        for name in bent_function_names
     ]
     return bent_function_filter(options)
 
 
-class Capturing(list):
-    '''
-    From kindall:
-    https://stackoverflow.com/questions/16571150/how-to-capture-stdout-output-from-a-python-function-call
-    '''
-    def __enter__(self):
-        self._stdout = sys.stdout
-        sys.stdout = self._stringio = StringIO()
-        return self
-    def __exit__(self, *args):
-        self.extend(self._stringio.getvalue().splitlines())
-        del self._stringio    # free up some memory
-        sys.stdout = self._stdout
-
-
-def matrix_figure(matrix, colorscale='Earth'):
-    n = matrix.nrows()
+def current_database_version(selected_database):
+    version, checked = database_versions.get(selected_database, (None, 0))
+    now = time.time()
+    if now - checked >= version_check_interval:
+        with db.connection(selected_database) as conn:
+            new_version = db.cdb.select_database_version(conn)
+        if new_version != version:
+            artifact_cache.invalidate(selected_database, new_version)
+            with pyramid_cache_lock:
+                for key in [key for key in pyramid_cache if key[0] == selected_database]:
+                    del pyramid_cache[key]
+        version = new_version
+        database_versions[selected_database] = (version, now)
+    return version
+
+
+def cache_artifacts(selected_database, bentf_name, names=artifact_names):
+    version = current_database_version(selected_database)
+    if artifact_cache.missing(selected_database, version, [bentf_name], names):
+        with db.connection(selected_database) as conn:
+            bentf_c = db.cdb.select_classification_where_name(
+                conn,
+                bentf_name)
+        if bentf_c is None:
+            return None
+        artifact_cache.put_many(
+            selected_database,
+            version,
+            bentf_name,
+            classification_artifacts(bentf_c, names))
+    return version
+
+
+def cached_artifacts(selected_database, bentf_name, names=artifact_names):
+    version = cache_artifacts(selected_database, bentf_name, names)
+    if version is None:
+        return None
+    return artifact_cache.get_many(selected_database, version, bentf_name, names)
+
+
+# Tile pyramids of the matrices of classifications, keyed by database,
+# bent function name and matrix name, in least recently used order.
+# The callbacks may run in several threads, so the cache is locked.
+pyramid_cache = OrderedDict()
+pyramid_cache_lock = threading.Lock()
+
+# The maximum number of tile pyramids kept in pyramid_cache.
+pyramid_cache_size = 48
+
+# The number of pixels in each direction of each tile of a matrix figure.
+tile_size = 256
+
+# The matrix shown by each matrix figure.
+matrix_graph_names = OrderedDict([
+    ('wc-graph', 'weight_class_matrix'),
+    ('ci-graph', 'bent_cayley_graph_index_matrix'),
+    ('di-graph', 'dual_cayley_graph_index_matrix')])
+
+
+def cached_matrix_pyramid(selected_database, bentf_name, matrix_name, matrix=None):
+    key = (selected_database, bentf_name, matrix_name)
+    with pyramid_cache_lock:
+        pyramid = pyramid_cache.get(key)
+        if pyramid is not None:
+            pyramid_cache.move_to_end(key)
+            return pyramid
+    if matrix is None:
+        return None
+    # The pyramid is constructed outside the lock, so that other callbacks are not delayed.
+    pyramid = MatrixTilePyramid(matrix, tile_size=tile_size)
+    with pyramid_cache_lock:
+        pyramid = pyramid_cache.setdefault(key, pyramid)
+        pyramid_cache.move_to_end(key)
+        while len(pyramid_cache) > pyramid_cache_size:
+            pyramid_cache.popitem(last=False)
+    return pyramid
+
+
+def matrix_figure(pyramid, relayout_data=None, colorscale='Earth'):
+    nrows, ncols = pyramid.array.shape
+    layout = {
+        'width':  '512',
+        'height': '512',
+        'xaxis': {
+            'autorange': True
+        },
+        'yaxis': {
+            'autorange': 'reversed'
+        }
+    }
+    row_start, row_stop, col_start, col_stop = 0, nrows, 0, ncols
+    if relayout_data and 'xaxis.range[0]' in relayout_data:
+        x = sorted([relayout_data['xaxis.range[0]'], relayout_data['xaxis.range[1]']])
+        col_start, col_stop = int(math.floor(x[0] + 0.5)), int(math.ceil(x[1] + 0.5))
+        layout['xaxis'] = {'range': x}
+    if relayout_data and 'yaxis.range[0]' in relayout_data:
+        y = sorted([relayout_data['yaxis.range[0]'], relayout_data['yaxis.range[1]']])
+        row_start, row_stop = int(math.floor(y[0] + 0.5)), int(math.ceil(y[1] + 0.5))
+        layout['yaxis'] = {'range': y[::-1]}
+    # Only the tiles of the visible region are sent, at the resolution of the zoom.
+    region = pyramid.region(row_start, row_stop, col_start, col_stop)
+    offset = (region.factor - 1) / 2
     return {
         'data': [
             go.Heatmap(
-                z=[
-                    [
-                        matrix[i,j]
-                        for j in range(n)
-                    ]
-                    for i in range(n)
-                ],
+                z=region.array.tolist(),
+                x0=region.col_start + offset,
+                dx=region.factor,
+                y0=region.row_start + offset,
+                dy=region.factor,
+                zmin=pyramid.zmin,
+                zmax=pyramid.zmax,
                 colorscale=colorscale
             )
         ],
-        'layout': {
-            'width':  '512',
-            'height': '512',
-            'yaxis': {
-                'autorange': 'reversed'
-            }
-        }
+        'layout': layout
     }
 
 
+def zoom_matrix_figure_callback(graph_id, matrix_name):
+    @app.callback(
+        dd.Output(graph_id, 'figure'),
+        [dd.Input(graph_id, 'relayoutData')],
+        [dd.State('database-filter', 'value'),
+         dd.State('bent-function-filter', 'value')])
+    def zoom_matrix_figure(relayout_data, selected_database, bentf_name):
+        pyramid = cached_matrix_pyramid(selected_database, bentf_name, matrix_name)
+        if pyramid is None:
+            raise PreventUpdate
+        return matrix_figure(pyramid, relayout_data)
+    return zoom_matrix_figure
+
+
+for graph_id, matrix_name in matrix_graph_names.items():
+    zoom_matrix_figure_callback(graph_id, matrix_name)
+
+
 @app.callback(
     dd.Output('report-output-div', 'children'),
     [dd.Input('bent-function-filter', 'value')],
     [dd.State('database-filter', 'value')])
 def select_bent_function(bentf_name, selected_database):
+    if bentf_name is None:
+        return []
     try:
-        conn = db.connect_to_database(
-            selected_database)
+        artifacts = cached_artifacts(selected_database, bentf_name)
     except IOError:
         return ['Cannot connect to database {}.'.format(selected_database)]
-
-    if bentf_name is None:
-        return []
-    bentf_c = db.cdb.select_classification_where_name(
-        conn,
-        bentf_name)
-    bentf_path = os.path.join(output_dir, 'download')
-    bentf_c.save_as_csv(bentf_path)
-    with Capturing() as report:
-        bentf_c.report()
-    wc_matrix = bentf_c.weight_class_matrix
-    wc_graph = dcc.Graph(
-        figure=matrix_figure(wc_matrix),
-        id='wc-graph')
-    ci_matrix = bentf_c.bent_cayley_graph_index_matrix
-    ci_graph = dcc.Graph(
-        figure=matrix_figure(ci_matrix),
-        id='ci-graph')
-    di_matrix = bentf_c.dual_cayley_graph_index_matrix
-    di_graph = dcc.Graph(
-        figure=matrix_figure(di_matrix),
-        id='di-graph')
+    if artifacts is None:
+        return ['Cannot find {} in database {}.'.format(bentf_name, selected_database)]
+
+    report = report_from_artifact(artifacts['report.json'])
+    wc_graph, ci_graph, di_graph = [
+        dcc.Graph(
+            figure=matrix_figure(
+                cached_matrix_pyramid(
+                    selected_database,
+                    bentf_name,
+                    matrix_name,
+                    matrix_from_artifact(artifacts[matrix_name + '.npy']))),
+            id=graph_id)
+        for graph_id, matrix_name in matrix_graph_names.items()]
     return [
         html.P(bentf_name + ':')] + [
         html.P(line)
@@ -299,22 +429,48 @@ def select_bent_function(bentf_name, selected_database):
                     'display': 'inline-block'})])])]
 
 
-@app.callback(dd.Output('download-link', 'href'),
-              [dd.Input('download-dropdown', 'value')])
-def update_href(output_filename):
-    relative_filename = os.path.join(
-        output_dir,
-        output_filename)
-    return '/' + relative_filename
-
-
-@app.server.route('/downloads/<path:path>')
-def serve_static(path):
-    root_dir = os.getcwd()
-    return flask.send_from_directory(
-        os.path.join(root_dir, output_dir),
-        path,
-        as_attachment=True)
+@app.callback(
+    dd.Output('download-link', 'href'),
+    [dd.Input('download-dropdown', 'value'),
+     dd.Input('bent-function-filter', 'value')],
+    [dd.State('database-filter', 'value')])
+def update_href(download_filename, bentf_name, selected_database):
+    if bentf_name is None:
+        return None
+    return '/downloads/{}/{}/{}'.format(
+        quote(selected_database, safe=''),
+        quote(bentf_name, safe=''),
+        quote(download_filename, safe=''))
+
+
+# Each download is streamed from the cache in chunks, rather than written to a shared directory.
+@app.server.route('/downloads/<selected_database>/<bentf_name>/<download_filename>')
+def serve_download(selected_database, bentf_name, download_filename):
+    database_names = [option['value'] for option in database_options]
+    download_filenames = [file['filename'] for file in download_files.values()]
+    if selected_database not in database_names or download_filename not in download_filenames:
+        flask.abort(404)
+    try:
+        version = cache_artifacts(selected_database, bentf_name, [download_filename])
+    except IOError:
+        flask.abort(503)
+    chunks = (
+        None
+        if version is None else
+        artifact_cache.get_chunks(
+            selected_database,
+            version,
+            bentf_name,
+            download_filename,
+            chunk_size=download_chunk_size))
+    if chunks is None:
+        flask.abort(404)
+    return flask.Response(
+        chunks,
+        mimetype=download_mimetypes[os.path.splitext(download_filename)[1]],
+        headers={
+            'Content-Disposition':
+                'attachment; filename="{}_{}"'.format(bentf_name, download_filename)})
 
 if __name__ == '__main__':
     app.run_server(debug=False,host="0.0.0.0",port=8051)
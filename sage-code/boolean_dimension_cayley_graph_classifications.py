@@ -13,6 +13,8 @@ import numpy as np
 
 from boolean_cayley_graphs.bent_function import BentFunction
 from boolean_cayley_graphs.bent_function_cayley_graph_classification import BentFunctionCayleyGraphClassification
+from boolean_cayley_graphs.bent_function_cayley_graph_classification import save_matrix_plots_in_parallel
+from boolean_cayley_graphs.cayley_graph_class_registry import CayleyGraphClassRegistry
 from boolean_cayley_graphs.containers import BijectiveList
 from sage.structure.sage_object import register_unpickle_override
 
@@ -46,6 +48,32 @@ def save_boolean_dimension_cayley_graph_classifications(
     return c
 
 
+def save_boolean_dimension_cayley_graph_classifications_with_registry(
+    dim,
+    start=1,
+    stop=None,
+    ncpus=1,
+    dir=None):
+    r"""
+    """
+    p = bent_function_extended_affine_representative_polynomials(dim)
+    if stop is None:
+        stop = len(p)
+    registry_name = 'p'+str(dim)+'_registry'
+    try:
+        registry = CayleyGraphClassRegistry.load_mangled(registry_name, dir=dir)
+    except IOError:
+        registry = CayleyGraphClassRegistry()
+    registry.classify_all(
+        p[start:stop],
+        names=['p'+str(dim)+'_'+str(n) for n in range(start, stop)],
+        ncpus=ncpus,
+        dir=dir,
+        registry_name=registry_name)
+    registry.report()
+    return registry
+
+
 def load_boolean_dimension_cayley_graph_classifications(
     dim,
     start=1,
@@ -107,10 +135,8 @@ class BooleanDimensionCayleyGraphReclassification(SageObject):
                 cb_index_list   = c[n].first_matrix_index_list()
                 r[n] = matrix(5, len(cg_class_list))
 
-                c_class_counts = np.histogram(cg_index_matrix,
-                                              list(range(len(cg_class_list) + 1)))[0]
-                d_class_counts = np.histogram(dg_index_matrix,
-                                              list(range(len(cg_class_list) + 1)))[0]
+                c_class_counts = c[n].class_cell_index().counts
+                d_class_counts = c[n].class_cell_index(dual=True).counts
 
                 new_cg_index_matrix = cg_index_matrix.copy()
                 for i in range(len(cg_class_list)):
@@ -146,11 +172,21 @@ class BooleanDimensionCayleyGraphReclassification(SageObject):
         self.cayley_graph_class_list = cayley_graph_class_bijection.get_list()
 
 
-    def save_matrix_plots(self, prefix='re', cmap='gist_stern'):
+    def save_matrix_plots(
+        self,
+        prefix='re',
+        cmap='gist_stern',
+        target_size=None,
+        method="mode",
+        ncpus=1):
         r"""
         """
         c = self.classification_list
-        for n in range(len(c)):
-            if c[n] is not None:
-                figure_name = prefix + str(self.dim) + '_' + str(n)
-                c[n].save_matrix_plots(figure_name, cmap=cmap)
+        indices = [n for n in range(len(c)) if c[n] is not None]
+        save_matrix_plots_in_parallel(
+            [c[n] for n in indices],
+            [prefix + str(self.dim) + '_' + str(n) for n in indices],
+            cmap=cmap,
+            target_size=target_size,
+            method=method,
+            ncpus=ncpus)
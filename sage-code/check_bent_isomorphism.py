@@ -30,6 +30,10 @@ def check_bent_isomorphism(dim, k, certify=False):
     The optional parameter `certify`, which defaults to `False`, prints
     the truth table `v` and Cayley graph isomorphism `iso` corresponding
     to each bent function.
+
+    A Cayley graph whose fingerprint differs from that of the first graph,
+    as per `cayley_graph_fingerprint`, is non isomorphic to the first graph,
+    without testing for isomorphism.
     """
     v = 2 ** dim
     nbent = 0
@@ -42,9 +46,13 @@ def check_bent_isomorphism(dim, k, certify=False):
             g = f.cayley_graph()
             if nbent == 1:
                 g0 = g
+                fingerprint0 = f.cayley_graph_fingerprint()
                 print(g.is_strongly_regular(parameters=True))
                 if certify:
                     print(t)
+            elif f.cayley_graph_fingerprint() != fingerprint0:
+                print(a)
+                return nbent
             else:
                 if certify:
                     g_is_iso, iso = g.is_isomorphic(g0, certify=True)
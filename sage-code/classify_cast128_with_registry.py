@@ -0,0 +1,57 @@
+r"""
+Classify the CAST-128 S-box component functions against one shared registry
+of Cayley graph classes, and report the classes shared between functions.
+"""
+#*****************************************************************************
+#       Copyright (C) 2024 Paul Leopardi paul.leopardi@gmail.com
+#
+#  Distributed under the terms of the GNU General Public License (GPL)
+#  as published by the Free Software Foundation; either version 2 of
+#  the License, or (at your option) any later version.
+#                  http://www.gnu.org/licenses/
+#*****************************************************************************
+
+import os.path
+import sys
+
+from sage.all_cmdline import *
+
+from boolean_cayley_graphs.cayley_graph_class_registry import CayleyGraphClassRegistry
+
+r"""
+"""
+# Check that the correct number of arguments exist.
+if len(sys.argv) not in (2, 3):
+    print("Usage: classify_cast128_with_registry sobj_dir [ncpus]")
+    sys.exit(1)
+
+sobj_dir = sys.argv[1]
+ncpus = int(sys.argv[2]) if len(sys.argv) == 3 else 1
+registry_name = "cast128_registry"
+
+# Load the registry saved by a previous run, if any.
+if os.path.isfile(CayleyGraphClassRegistry.mangled_name(registry_name + ".sobj", dir=sobj_dir)):
+    registry = CayleyGraphClassRegistry.load_mangled(registry_name, dir=sobj_dir)
+else:
+    registry = CayleyGraphClassRegistry()
+
+# Load the bent functions.
+load("read_cast_128_s_boxes.sage")
+s_boxes = read_s_boxes_file()
+list_of_f = []
+names = []
+for bnbr in range(1, 9):
+    for fnbr in range(32):
+        list_of_f.append(s_boxes[bnbr][fnbr])
+        names.append("cast128_" + str(bnbr) + "_" + str(fnbr))
+
+# Classify each function not already in the registry,
+# saving the classification and the registry as we go.
+registry.classify_all(
+    list_of_f,
+    names=names,
+    ncpus=ncpus,
+    dir=sobj_dir,
+    registry_name=registry_name)
+registry.report()
+sys.exit(0)
@@ -7,6 +7,7 @@ For use with bent_function_cayley_graph_dashboard.py and similar.
 AUTHORS:
 
 - Paul Leopardi (2018-10-18): initial version
+- Paul Leopardi (2024-06-03): pooled connections
 
 """
 
@@ -21,6 +22,9 @@ AUTHORS:
 
 import json
 import psycopg2
+import threading
+
+from contextlib import contextmanager, ExitStack
 
 import boolean_cayley_graphs.classification_database_psycopg2 as cdb
 
@@ -59,3 +63,33 @@ def create_classification_tables(dbname):
     pass
 
 
+connection_managers = dict()
+connection_managers_lock = threading.Lock()
+
+
+@authorized(cdb.ConnectionManager)
+def connection_manager(dbname):
+    pass
+
+
+@contextmanager
+def connection(dbname):
+    r"""
+    Borrow a pooled connection to a database, creating the pool on first use.
+
+    A failure to connect raises ``IOError``, as for ``database_interface_sqlite3``.
+    """
+    with ExitStack() as stack:
+        try:
+            with connection_managers_lock:
+                if dbname not in connection_managers:
+                    connection_managers[dbname] = connection_manager(dbname)
+                manager = connection_managers[dbname]
+            conn = stack.enter_context(manager.connection())
+        except psycopg2.OperationalError as e:
+            raise IOError("Cannot connect to database {}: {}".format(dbname, e)) from e
+        yield conn
+
+
+def execute_prepared(dbname, conn, name, parameters=()):
+    return connection_managers[dbname].execute_prepared(conn, name, parameters)
@@ -7,6 +7,7 @@ bent_function_cayley_graph_dashboard.py and similar.
 AUTHORS:
 
 - Paul Leopardi (2018-10-18): initial version
+- Paul Leopardi (2024-06-03): cached read-only connections
 
 """
 
@@ -20,6 +21,7 @@ AUTHORS:
 #*****************************************************************************
 
 import sqlite3
+import threading
 
 import boolean_cayley_graphs.classification_database_sqlite3 as cdb
 
@@ -35,4 +37,21 @@ def connect_to_database(
     return conn
 
 
+connection_managers = dict()
+connection_managers_lock = threading.Lock()
 
+
+def connection(selected_database):
+    r"""
+    Use a cached read-only connection to a database, creating the manager on first use.
+    """
+    with connection_managers_lock:
+        if selected_database not in connection_managers:
+            connection_managers[selected_database] = cdb.ConnectionManager(
+                selected_database + '.db')
+        manager = connection_managers[selected_database]
+    return manager.connection()
+
+
+def execute_prepared(selected_database, conn, name, parameters=()):
+    return connection_managers[selected_database].execute_prepared(conn, name, parameters)
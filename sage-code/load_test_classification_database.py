@@ -0,0 +1,126 @@
+r"""
+Load test the asynchronous read interface of a classification database.
+
+Usage:
+
+    sage -python load_test_classification_database.py [--backend sqlite3|psycopg2]
+        [--clients N] [--requests N] [--workers N] [--change-probability P]
+        [--seed N] database
+
+Each simulated client repeatedly selects a random bent function and fetches
+its classification and matrices, as the dashboard does. With probability
+``P``, a client changes its selection before the fetch completes, which
+cancels the previous fetch. For the ``psycopg2`` backend, the user, password
+and host are read from ``postgresql-auth.json``.
+"""
+
+#*****************************************************************************
+#       Copyright (C) 2024 Paul Leopardi paul.leopardi@gmail.com
+#
+#  Distributed under the terms of the GNU General Public License (GPL)
+#  as published by the Free Software Foundation; either version 2 of
+#  the License, or (at your option) any later version.
+#                  http://www.gnu.org/licenses/
+#*****************************************************************************
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from boolean_cayley_graphs.classification_database_async import AsyncClassificationReader
+
+
+parser = argparse.ArgumentParser(
+    description="Load test the asynchronous read interface of a classification database.")
+parser.add_argument("database", help="database name, or file name for sqlite3")
+parser.add_argument("--backend", choices=["sqlite3", "psycopg2"], default="sqlite3")
+parser.add_argument("--clients", type=int, default=16, help="number of concurrent clients")
+parser.add_argument("--requests", type=int, default=20, help="number of selections per client")
+parser.add_argument("--workers", type=int, default=4, help="number of concurrent reads")
+parser.add_argument(
+    "--change-probability",
+    type=float,
+    default=0.2,
+    help="probability that a client changes its selection during a fetch")
+parser.add_argument("--seed", type=int, default=None)
+args = parser.parse_args()
+
+if args.backend == "sqlite3":
+    import boolean_cayley_graphs.classification_database_sqlite3 as cdb
+    manager = cdb.ConnectionManager(args.database)
+else:
+    import boolean_cayley_graphs.classification_database_psycopg2 as cdb
+    with open("postgresql-auth.json") as auth_file:
+        auth = json.load(auth_file)
+    manager = cdb.ConnectionManager(
+        args.database,
+        maxconn=args.workers,
+        user=auth["user"],
+        password=auth["password"],
+        host=auth["host"])
+
+reader = AsyncClassificationReader(cdb, manager, max_workers=args.workers)
+rng = random.Random(args.seed)
+
+
+async def fetch(name):
+    classification = await reader.select_classification_where_name(name)
+    projections = await reader.select_projections_where_name(name)
+    return classification, projections
+
+
+async def client(client_id, names, latencies, counts):
+    for request in range(args.requests):
+        name = rng.choice(names)
+        start = time.perf_counter()
+        selection = asyncio.ensure_future(reader.latest(client_id, fetch(name)))
+        if rng.random() < args.change_probability:
+            # The user changes the selection before the fetch completes.
+            await asyncio.sleep(0)
+            name = rng.choice(names)
+            start = time.perf_counter()
+            changed = asyncio.ensure_future(reader.latest(client_id, fetch(name)))
+            try:
+                await selection
+            except asyncio.CancelledError:
+                counts["cancelled"] += 1
+            selection = changed
+        await selection
+        latencies.append(time.perf_counter() - start)
+        counts["completed"] += 1
+
+
+async def main():
+    names = await reader.select_bent_function_names()
+    if not names:
+        raise ValueError("The database {} contains no named bent functions.".format(
+            args.database))
+    latencies = []
+    counts = {"completed": 0, "cancelled": 0}
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        client(client_id, names, latencies, counts)
+        for client_id in range(args.clients)])
+    seconds = time.perf_counter() - start
+    latencies.sort()
+    print("{} clients, {} workers, {} functions in database".format(
+        args.clients,
+        args.workers,
+        len(names)))
+    print("{completed} fetches completed, {cancelled} cancelled".format(**counts))
+    print("{:.1f} seconds ({:.2f} fetches per second)".format(
+        seconds,
+        counts["completed"] / seconds))
+    print("latency: mean {:.4f}, median {:.4f}, 95th percentile {:.4f}, max {:.4f} seconds".format(
+        sum(latencies) / len(latencies),
+        latencies[len(latencies) // 2],
+        latencies[int(0.95 * (len(latencies) - 1))],
+        latencies[-1]))
+
+
+try:
+    asyncio.run(main())
+finally:
+    reader.close()
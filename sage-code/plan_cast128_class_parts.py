@@ -0,0 +1,47 @@
+r"""
+"""
+#*****************************************************************************
+#       Copyright (C) 2024 Paul Leopardi paul.leopardi@gmail.com
+#
+#  Distributed under the terms of the GNU General Public License (GPL)
+#  as published by the Free Software Foundation; either version 2 of
+#  the License, or (at your option) any later version.
+#                  http://www.gnu.org/licenses/
+#*****************************************************************************
+
+import sys
+
+from sage.all_cmdline import *
+
+from boolean_cayley_graphs.class_part_planning import plan_class_parts_for_function
+from boolean_cayley_graphs.class_part_planning import save_class_part_plan
+
+r"""
+"""
+# Check that the correct number of arguments exist.
+if len(sys.argv) != 7:
+    print("Usage: plan_cast128_class_parts bnbr fnbr walltime_hours mem_gb max_ncpus plan_file")
+    sys.exit(1)
+
+# Convert the arguments.
+bnbr           = int(sys.argv[1])   # S-box number
+fnbr           = int(sys.argv[2])   # Function number within S-box
+walltime_hours = float(sys.argv[3]) # Target wall time in hours
+mem_gb         = int(sys.argv[4])   # Total memory limit in GB
+max_ncpus      = int(sys.argv[5])   # Maximum number of cpus
+plan_file      = sys.argv[6]        # Name of the plan file to write
+
+# Load the required bent function.
+load("read_cast_128_s_boxes.sage")
+s_boxes = read_s_boxes_file()
+bentf = s_boxes[bnbr][fnbr]
+
+# Sample the cost of some cells and choose c_len and ncpus.
+plan = plan_class_parts_for_function(
+    bentf,
+    walltime_hours * 3600,
+    memory_limit=mem_gb * 2 ** 30,
+    max_ncpus=max_ncpus)
+print(plan)
+save_class_part_plan(plan, plan_file)
+sys.exit(0)
@@ -30,6 +30,8 @@ conn = create_classification_tables(
 
 for i in range(1,9):
     stri = "%01d" % i
+    list_of_cgc = []
+    names = []
     for j in range(32):
         strj = "%02d" % j
         sobj_name = "cast128_" + stri + "_" + str(j) + ".sobj"
@@ -38,7 +40,10 @@ for i in range(1,9):
             sobj_name,
             directory="/data/sobj")
         print(datetime.datetime.now(), stri, strj)
-        insert_classification(conn, cgc, name)
+        list_of_cgc.append(cgc)
+        names.append(name)
+    # Insert the 32 classifications for this value of i in one transaction.
+    insert_classifications(conn, list_of_cgc, names, batch_size=32)
 print(datetime.datetime.now())
 
 curs = conn.cursor()
@@ -0,0 +1,72 @@
+r"""
+Populate a classification database from a directory of saved classifications.
+
+Usage:
+
+    sage -python populate_classification_database.py [--backend sqlite3|psycopg2]
+        [--pattern PATTERN] [--ncpus N] [--batch-size N] [--create] database directory
+
+For the ``psycopg2`` backend, the user, password and host are read from
+``postgresql-auth.json``. If the population is interrupted, running the same
+command again skips the classifications that were already inserted.
+"""
+
+#*****************************************************************************
+#       Copyright (C) 2024 Paul Leopardi paul.leopardi@gmail.com
+#
+#  Distributed under the terms of the GNU General Public License (GPL)
+#  as published by the Free Software Foundation; either version 2 of
+#  the License, or (at your option) any later version.
+#                  http://www.gnu.org/licenses/
+#*****************************************************************************
+
+import argparse
+import datetime
+import json
+
+from boolean_cayley_graphs.classification_database_population import populate_database
+
+
+parser = argparse.ArgumentParser(
+    description="Populate a classification database from saved classifications.")
+parser.add_argument("database", help="database name, or file name for sqlite3")
+parser.add_argument("directory", help="directory containing the saved classifications")
+parser.add_argument("--backend", choices=["sqlite3", "psycopg2"], default="sqlite3")
+parser.add_argument("--pattern", default=None, help="glob pattern for the file names")
+parser.add_argument("--ncpus", type=int, default=4)
+parser.add_argument("--batch-size", type=int, default=32)
+parser.add_argument("--create", action="store_true", help="create the classification tables")
+args = parser.parse_args()
+
+if args.backend == "sqlite3":
+    import boolean_cayley_graphs.classification_database_sqlite3 as cdb
+    if args.create:
+        cdb.create_database(args.database).close()
+        conn = cdb.create_classification_tables(args.database)
+    else:
+        conn = cdb.connect_to_database(args.database)
+else:
+    import boolean_cayley_graphs.classification_database_psycopg2 as cdb
+    with open("postgresql-auth.json") as auth_file:
+        auth = json.load(auth_file)
+    connect = cdb.create_classification_tables if args.create else cdb.connect_to_database
+    conn = connect(
+        args.database,
+        user=auth["user"],
+        password=auth["password"],
+        host=auth["host"])
+
+print(datetime.datetime.now(), "start")
+stats = populate_database(
+    conn,
+    cdb,
+    args.directory,
+    pattern=args.pattern,
+    ncpus=args.ncpus,
+    batch_size=args.batch_size,
+    verbose=True)
+conn.close()
+print(datetime.datetime.now(), "end")
+print(
+    "{nbr_files} files, {nbr_skipped} skipped, {nbr_inserted} inserted "
+    "in {seconds:.1f} seconds ({per_second:.2f} per second)".format(**stats))
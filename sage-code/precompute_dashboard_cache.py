@@ -0,0 +1,95 @@
+r"""
+Precompute the reports and downloads served by the dashboard for a classification database.
+
+Usage:
+
+    sage -python precompute_dashboard_cache.py [--backend sqlite3|psycopg2]
+        [--ncpus N] database cache
+
+The ``database`` is the name of the database as selected in
+``bent_function_cayley_graph_dashboard.py``, such as ``p4``. For the
+``sqlite3`` backend, the database file is ``database + ".db"``, and for the
+``psycopg2`` backend, the user, password and host are read from
+``postgresql-auth.json``. The artifacts of each classification that are
+not already in the cache, an SQLite3 file as per ``classification_artifact_cache``,
+are rendered in parallel and stored in the cache. The artifacts of previous
+versions of the database are removed. If the computation is interrupted,
+running the same command again skips the classifications that were already stored.
+"""
+
+#*****************************************************************************
+#       Copyright (C) 2024 Paul Leopardi paul.leopardi@gmail.com
+#
+#  Distributed under the terms of the GNU General Public License (GPL)
+#  as published by the Free Software Foundation; either version 2 of
+#  the License, or (at your option) any later version.
+#                  http://www.gnu.org/licenses/
+#*****************************************************************************
+
+import argparse
+import datetime
+import json
+import os
+
+from boolean_cayley_graphs.classification_artifact_cache import ClassificationArtifactCache, precompute_artifacts
+
+
+parser = argparse.ArgumentParser(
+    description="Precompute the reports and downloads served by the dashboard.")
+parser.add_argument("database", help="database name, as selected in the dashboard")
+parser.add_argument("cache", help="file name of the dashboard cache")
+parser.add_argument("--backend", choices=["sqlite3", "psycopg2"], default="sqlite3")
+parser.add_argument("--ncpus", type=int, default=4)
+args = parser.parse_args()
+
+if args.backend == "sqlite3":
+    import boolean_cayley_graphs.classification_database_sqlite3 as cdb
+
+    def connect_to_database():
+        return cdb.connect_to_database(args.database + ".db")
+else:
+    import boolean_cayley_graphs.classification_database_psycopg2 as cdb
+    with open("postgresql-auth.json") as auth_file:
+        auth = json.load(auth_file)
+
+    def connect_to_database():
+        return cdb.connect_to_database(
+            args.database,
+            user=auth["user"],
+            password=auth["password"],
+            host=auth["host"])
+
+
+# The connection of each process, keyed by process id.
+connections = dict()
+
+
+def load_classification(name):
+    pid = os.getpid()
+    if pid not in connections:
+        connections[pid] = connect_to_database()
+    return cdb.select_classification_where_name(connections[pid], name)
+
+
+conn = connect_to_database()
+database_version = cdb.select_database_version(conn)
+curs = conn.cursor()
+curs.execute("""
+    SELECT name
+    FROM bent_function
+    ORDER BY name""")
+bent_function_names = [row[0] for row in curs.fetchall()]
+conn.close()
+
+print(datetime.datetime.now(), "start:", len(bent_function_names), "classifications")
+cache = ClassificationArtifactCache(args.cache)
+nbr_rendered = precompute_artifacts(
+    cache,
+    args.database,
+    database_version,
+    bent_function_names,
+    load_classification,
+    ncpus=args.ncpus,
+    verbose=True)
+cache.close()
+print(datetime.datetime.now(), "end:", nbr_rendered, "classifications rendered")
@@ -0,0 +1,78 @@
+r"""
+Precompute the invariants of the Cayley graphs in a classification database.
+
+Usage:
+
+    sage -python precompute_graph_invariants.py [--backend sqlite3|psycopg2]
+        [--invariant NAME ...] [--ncpus N] database cache
+
+The canonical labels are read from the ``graph`` table of the classification
+database, and the invariants that are not already in the cache are computed in
+parallel and stored in the cache, an SQLite3 file as per ``graph_invariant_cache``.
+For the ``psycopg2`` backend, the user, password and host are read from
+``postgresql-auth.json``. If the computation is interrupted, running the same
+command again skips the invariants that were already stored.
+"""
+
+#*****************************************************************************
+#       Copyright (C) 2024 Paul Leopardi paul.leopardi@gmail.com
+#
+#  Distributed under the terms of the GNU General Public License (GPL)
+#  as published by the Free Software Foundation; either version 2 of
+#  the License, or (at your option) any later version.
+#                  http://www.gnu.org/licenses/
+#*****************************************************************************
+
+import argparse
+import datetime
+import json
+
+from boolean_cayley_graphs.graph_invariant_cache import GraphInvariantCache, invariant_functions, precompute_invariants
+
+
+parser = argparse.ArgumentParser(
+    description="Precompute the invariants of the Cayley graphs in a classification database.")
+parser.add_argument("database", help="database name, or file name for sqlite3")
+parser.add_argument("cache", help="file name of the invariant cache")
+parser.add_argument("--backend", choices=["sqlite3", "psycopg2"], default="sqlite3")
+parser.add_argument(
+    "--invariant",
+    action="append",
+    choices=sorted(invariant_functions),
+    help="invariant to compute; may be repeated; default is all invariants")
+parser.add_argument("--ncpus", type=int, default=4)
+args = parser.parse_args()
+
+if args.backend == "sqlite3":
+    import boolean_cayley_graphs.classification_database_sqlite3 as cdb
+    conn = cdb.connect_to_database(args.database)
+else:
+    import boolean_cayley_graphs.classification_database_psycopg2 as cdb
+    with open("postgresql-auth.json") as auth_file:
+        auth = json.load(auth_file)
+    conn = cdb.connect_to_database(
+        args.database,
+        user=auth["user"],
+        password=auth["password"],
+        host=auth["host"])
+
+codec = cdb.select_label_codec(conn)
+curs = conn.cursor()
+curs.execute("""
+    SELECT canonical_label_hash, canonical_label
+    FROM graph""")
+canonical_labels = [
+    codec.decode(canonical_label, cgcl_hash)
+    for cgcl_hash, canonical_label in curs.fetchall()]
+conn.close()
+
+print(datetime.datetime.now(), "start:", len(canonical_labels), "graphs")
+cache = GraphInvariantCache(args.cache)
+nbr_computed = precompute_invariants(
+    cache,
+    canonical_labels,
+    invariant_names=args.invariant,
+    ncpus=args.ncpus,
+    verbose=True)
+cache.close()
+print(datetime.datetime.now(), "end:", nbr_computed, "graphs computed")
@@ -0,0 +1,53 @@
+r"""
+Rebuild the summary tables of a classification database,
+and create its version counter if it does not already exist.
+
+Usage:
+
+    sage -python rebuild_summary_tables.py [--backend sqlite3|psycopg2] database
+
+For the ``psycopg2`` backend, the user, password and host are read from
+``postgresql-auth.json``.
+"""
+
+#*****************************************************************************
+#       Copyright (C) 2024 Paul Leopardi paul.leopardi@gmail.com
+#
+#  Distributed under the terms of the GNU General Public License (GPL)
+#  as published by the Free Software Foundation; either version 2 of
+#  the License, or (at your option) any later version.
+#                  http://www.gnu.org/licenses/
+#*****************************************************************************
+
+import argparse
+import datetime
+import json
+
+
+parser = argparse.ArgumentParser(
+    description="Rebuild the summary tables of a classification database.")
+parser.add_argument("database", help="database name, or file name for sqlite3")
+parser.add_argument("--backend", choices=["sqlite3", "psycopg2"], default="sqlite3")
+args = parser.parse_args()
+
+if args.backend == "sqlite3":
+    import boolean_cayley_graphs.classification_database_sqlite3 as cdb
+    conn = cdb.connect_to_database(args.database)
+else:
+    import boolean_cayley_graphs.classification_database_psycopg2 as cdb
+    with open("postgresql-auth.json") as auth_file:
+        auth = json.load(auth_file)
+    conn = cdb.connect_to_database(
+        args.database,
+        user=auth["user"],
+        password=auth["password"],
+        host=auth["host"])
+
+print(datetime.datetime.now(), "start")
+cdb.rebuild_summary_tables(conn)
+cdb.create_version_counter(conn)
+print(datetime.datetime.now(), "end")
+print(len(cdb.select_function_summaries(conn)), "functions")
+print(len(cdb.select_graph_summaries(conn)), "graphs")
+print("version", cdb.select_database_version(conn))
+conn.close()
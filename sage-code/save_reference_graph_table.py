@@ -0,0 +1,38 @@
+r"""
+Construct and save the table of known strongly regular graphs.
+
+Usage:
+
+    sage -python save_reference_graph_table.py [--algorithm ALGORITHM] directory
+
+The table is saved in ``directory`` using ``save_mangled``, with the name of the
+canonical labelling algorithm, so that ``reference_graph_table(algorithm, dir=directory)``
+loads it rather than constructing it.
+"""
+
+#*****************************************************************************
+#       Copyright (C) 2024 Paul Leopardi paul.leopardi@gmail.com
+#
+#  Distributed under the terms of the GNU General Public License (GPL)
+#  as published by the Free Software Foundation; either version 2 of
+#  the License, or (at your option) any later version.
+#                  http://www.gnu.org/licenses/
+#*****************************************************************************
+
+import argparse
+import datetime
+
+from boolean_cayley_graphs.bent_function_cayley_graph_classification import default_algorithm
+from boolean_cayley_graphs.reference_graphs import ReferenceGraphTable
+
+
+parser = argparse.ArgumentParser(
+    description="Construct and save the table of known strongly regular graphs.")
+parser.add_argument("directory", help="directory in which to save the table")
+parser.add_argument("--algorithm", default=default_algorithm, help="canonical labelling algorithm")
+args = parser.parse_args()
+
+print(datetime.datetime.now(), "start")
+table = ReferenceGraphTable(algorithm=args.algorithm)
+table.save_mangled(args.algorithm, dir=args.directory)
+print(datetime.datetime.now(), "end:", len(table), "graphs saved")